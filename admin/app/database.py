@@ -32,3 +32,11 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+def get_session_factory():
+    """
+    Зависимость для эндпоинтов, которые открывают несколько сессий параллельно
+    (каждая берёт своё соединение из пула).
+    """
+    return AsyncSessionLocal
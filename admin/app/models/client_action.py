@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -13,6 +13,10 @@ class ClientAction(Base):
     """Модель для логирования действий клиента в админке."""
     
     __tablename__ = "client_actions"
+    __table_args__ = (
+        # Страницы админки: ORDER BY created_at DESC, id DESC
+        Index("ix_client_actions_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
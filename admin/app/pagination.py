@@ -0,0 +1,206 @@
+"""
+Keyset-пагинация списков админки.
+
+Списки отдаются от новых к старым по ``(created_at, id)``, следующая страница
+начинается строго после последней строки предыдущей. Цена страницы N не
+зависит от N (составные индексы ``(created_at, id)``), а строки, добавленные
+между запросами, не сдвигают уже просмотренные страницы.
+
+Курсор — непрозрачный URL-safe токен из ответа (заголовок ``X-Next-Cursor``);
+тело ответа остаётся списком, как и раньше.
+
+В SQLite даты хранятся текстом, причём ``server_default=func.now()`` пишет их
+без микросекунд, а ORM — с ними. Поэтому там ключ страницы — хранимая строка
+как есть: курсор несёт её, и сравнение идёт в том же текстовом порядке, что и
+сортировка.
+
+Общее число строк считается только по запросу (``with_total``) и
+приблизительно: для таблицы без фильтров берётся оценка планировщика
+PostgreSQL (``pg_class.reltuples``), иначе — точный подсчёт, ограниченный
+``TOTAL_COUNT_CAP`` строками.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Table, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db import stored_text, stores_datetime_as_text
+
+MAX_PAGE_SIZE = 500
+TOTAL_COUNT_CAP = 10_000
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+# Ключи BIGINT: больший id из курсора отвергается до запроса
+_MAX_ID = 2**63 - 1
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetPage:
+    items: list[Any]
+    next_cursor: str | None
+    total: int | None = None
+    # total — оценка или нижняя граница, а не точное число
+    total_estimated: bool = False
+
+
+def encode_cursor(created_at: datetime.datetime | str | None, row_id: int) -> str:
+    """Курсор после строки ``(created_at, row_id)``.
+
+    ``created_at=None`` — ключ только по id, строка — хранимое значение (SQLite).
+    """
+    if created_at is None:
+        payload = f".{row_id}"
+    elif isinstance(created_at, str):
+        payload = f"s{created_at}.{row_id}"
+    elif created_at.tzinfo is not None:
+        payload = f"{(created_at - _EPOCH_UTC) // datetime.timedelta(microseconds=1)}z.{row_id}"
+    else:
+        payload = f"{(created_at - _EPOCH) // datetime.timedelta(microseconds=1)}.{row_id}"
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime | str | None, int]:
+    """Обратное к :func:`encode_cursor`; ``ValueError`` на любой чужой строке."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        key, dot, row_id = payload.rpartition(".")
+        if not dot:
+            raise ValueError("malformed cursor")
+        row_id = int(row_id)
+        if not 0 <= row_id <= _MAX_ID:
+            raise ValueError("id out of range")
+        if not key:
+            return None, row_id
+        if key.startswith("s"):
+            return key[1:], row_id
+        if key.endswith("z"):
+            return _EPOCH_UTC + datetime.timedelta(microseconds=int(key[:-1])), row_id
+        return _EPOCH + datetime.timedelta(microseconds=int(key)), row_id
+    except (binascii.Error, UnicodeDecodeError, OverflowError) as exc:
+        # OverflowError: микросекунды за пределами datetime
+        raise ValueError("malformed cursor") from exc
+
+
+def keyset_query(query, *, created_at, id_column, cursor: str | None = None, stored_key: bool = False):
+    """Отсортировать от новых к старым и продолжить после курсора.
+
+    Сравнение кортежем ``(created_at, id) < (:c, :i)`` PostgreSQL выполняет
+    одним диапазоном по составному индексу. Без ``created_at`` ключ — только id.
+    ``stored_key`` — сравнивать хранимый текст колонки (SQLite): курсор тогда
+    несёт строку, а не datetime.
+    """
+    if created_at is None:
+        query = query.order_by(id_column.desc())
+    else:
+        query = query.order_by(created_at.desc(), id_column.desc())
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.where(id_column < after_id)
+        elif after_created_at is None or isinstance(after_created_at, str) != stored_key:
+            raise ValueError("cursor of another list")
+        else:
+            key = stored_text(created_at) if stored_key else created_at
+            query = query.where(tuple_(key, id_column) < tuple_(after_created_at, after_id))
+    return query
+
+
+async def estimate_total(session: AsyncSession, query, *, cap: int = TOTAL_COUNT_CAP) -> tuple[int, bool]:
+    """Число строк запроса: ``(total, estimated)``.
+
+    Запрос к одной таблице без WHERE в PostgreSQL оценивается по статистике
+    планировщика без чтения таблицы. Остальные считаются честно, но не дальше
+    ``cap`` строк: при большем числе возвращается ``cap`` с ``estimated=True``.
+    """
+    froms = query.get_final_froms()
+    if (
+        query.whereclause is None
+        and len(froms) == 1
+        and isinstance(froms[0], Table)
+        and session.get_bind().dialect.name == "postgresql"
+    ):
+        reltuples = (await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+            {"name": froms[0].fullname},
+        )).scalar()
+        # -1: таблицу ещё не анализировали
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples), True
+    bounded = query.order_by(None).limit(cap + 1).subquery()
+    total = (await session.execute(select(func.count()).select_from(bounded))).scalar_one()
+    return min(total, cap), total > cap
+
+
+async def fetch_keyset_page(
+    session: AsyncSession,
+    query,
+    *,
+    created_at,
+    id_column,
+    cursor: str | None = None,
+    limit: int = 10,
+    skip: int = 0,
+    with_total: bool = False,
+) -> KeysetPage:
+    """Одна страница ``query`` (``limit + 1`` строк, чтобы узнать о следующей).
+
+    Args:
+        session: Асинхронная сессия.
+        query: SELECT с фильтрами списка, без сортировки и пагинации.
+        created_at: Колонка времени создания (``None`` — ключ только по id).
+        id_column: Первичный ключ, уникальный хвост ключа сортировки.
+        cursor: ``next_cursor`` предыдущей страницы.
+        limit: Размер страницы.
+        skip: Устаревший OFFSET для старых клиентов; с курсором не применяется.
+        with_total: Посчитать общее число строк (см. :func:`estimate_total`).
+
+    Returns:
+        KeysetPage: элементы (сущность или кортеж сущностей, как в ``query``)
+        и курсор следующей страницы.
+    """
+    width = len(query.column_descriptions)
+    total, estimated = (await estimate_total(session, query)) if with_total else (None, False)
+
+    stored_key = stores_datetime_as_text(session)
+    if created_at is None:
+        keys = (id_column,)
+    else:
+        keys = (stored_text(created_at) if stored_key else created_at, id_column)
+    paged = keyset_query(query, created_at=created_at, id_column=id_column, cursor=cursor, stored_key=stored_key)
+    paged = paged.add_columns(*(key.label(f"_page_key_{n}") for n, key in enumerate(keys)))
+    if skip and not cursor:
+        paged = paged.offset(skip)
+    rows = (await session.execute(paged.limit(limit + 1))).all()
+
+    items = [row[0] if width == 1 else tuple(row[:width]) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(None, last[-1]) if created_at is None else encode_cursor(last[-2], last[-1])
+    return KeysetPage(items=items, next_cursor=next_cursor, total=total, total_estimated=estimated)
+
+
+async def paginate(session: AsyncSession, response: Response, query, **kwargs) -> list[Any]:
+    """:func:`fetch_keyset_page` для эндпоинта: курсор и total уходят в заголовки ответа.
+
+    Битый курсор — 400. Заголовки: ``X-Next-Cursor`` (нет — последняя
+    страница), ``X-Total-Count`` и ``X-Total-Count-Estimated``.
+    """
+    try:
+        page = await fetch_keyset_page(session, query, **kwargs)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор")
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        response.headers["X-Total-Count-Estimated"] = "1" if page.total_estimated else "0"
+    return page.items
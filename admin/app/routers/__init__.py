@@ -3,7 +3,9 @@ from fastapi import APIRouter
 from .admins import router as admins_router
 from .analytics import router as analytics_router
 from .bids import router as bids_router
+from .chats import router as chats_router
 from .client_actions import router as client_actions_router
+from .exports import router as exports_router
 from .masters import router as masters_router
 from .orders import router as orders_router
 from .payouts import router as payouts_router
@@ -27,3 +29,5 @@ api_router.include_router(specialties_router, prefix="/specialties", tags=["spec
 api_router.include_router(specialists_router, prefix="/specialists", tags=["specialists"])
 api_router.include_router(client_actions_router, prefix="/client-actions", tags=["client_actions"])
 api_router.include_router(partners_router, prefix="/partners", tags=["partners"])
+api_router.include_router(chats_router, prefix="/chats", tags=["chats"])
+api_router.include_router(exports_router, prefix="/exports", tags=["exports"])
@@ -1,5 +1,5 @@
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import or_
@@ -8,6 +8,7 @@ from sqlalchemy.future import select
 
 from admin.app.auth import get_current_admin, get_password_hash, verify_password
 from admin.app.database import get_db
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from admin.app.schemas import UserResponse
 from app.models.user import User
 
@@ -21,8 +22,11 @@ async def get_admins_page(request: Request, current_admin=Depends(get_current_ad
 
 @router.get("/api", response_model=list[UserResponse])
 async def get_admins(
-    skip: int = 0,
-    limit: int = 10,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     is_active: bool | None = None,
     search: str | None = None,
     db: AsyncSession = Depends(get_db),
@@ -44,13 +48,11 @@ async def get_admins(
             )
         )
 
-    # Добавляем пагинацию
-    query = query.offset(skip).limit(limit).order_by(User.id.desc())
-
-    result = await db.execute(query)
-    admins = result.scalars().all()
-
-    return admins
+    # Страница от новых к старым по (created_at, id)
+    return await paginate(
+        db, response, query, created_at=User.created_at, id_column=User.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
 
 @router.get("/create", response_class=HTMLResponse)
 async def get_create_admin_page(request: Request, current_admin=Depends(get_current_admin)):
@@ -1,6 +1,5 @@
-import csv
-import io
-from datetime import datetime, timedelta
+import asyncio
+from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
@@ -8,56 +7,55 @@ from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from admin.app.auth import get_current_admin
-from admin.app.database import get_db
+from admin.app.database import get_db, get_session_factory
 from app.models.bid import Bid
-from app.models.order import Order
-from app.models.payout import Payout
 from app.models.user import User
+from app.services.analytics_rollups import rollup_daily, rollup_totals
+from app.services.exports import encode_csv
+from core.config import get_settings
+from core.redis import get_cache, set_cache
 
 router = APIRouter()
 
+DASHBOARD_CACHE_PREFIX = "analytics:dashboard"
+_dashboard_locks: dict[str, asyncio.Lock] = {}
+
+# Заказы, которые ещё в работе
+ACTIVE_ORDER_STATUSES = ("new", "assigned")
+# Выручка — цены заказов, кроме отменённых; расходы — проведённые выплаты
+REVENUE_ORDER_STATUSES = ("new", "assigned", "done")
+EXPENSE_PAYOUT_STATUSES = ("paid",)
+
+
+def _bucket(day: date, period: str) -> date:
+    """Начало интервала группировки: день (month), неделя (quarter) или месяц (year)."""
+    if period == "quarter":
+        return day - timedelta(days=day.weekday())
+    if period == "year":
+        return day.replace(day=1)
+    return day
+
+
 # API эндпоинты для аналитики
+# Все цифры читаются из дневных агрегатов (app.services.analytics_rollups),
+# а не из исходных таблиц: время ответа не зависит от длины истории.
 @router.get("/api/statistics")
 async def get_statistics(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
     """Получение основной статистики: пользователи, заказы, средний чек."""
-    # Общее количество пользователей
-    total_users_query = select(func.count()).select_from(User)
-    total_users = await db.execute(total_users_query)
-    total_users = total_users.scalar() or 0
-
-    # Общее количество заказов
-    total_orders_query = select(func.count()).select_from(Order)
-    total_orders = await db.execute(total_orders_query)
-    total_orders = total_orders.scalar() or 0
-
-    # Количество активных заказов
-    active_orders_query = select(func.count()).select_from(Order).where(
-        Order.status.in_(["new", "in_progress"])
-    )
-    active_orders = await db.execute(active_orders_query)
-    active_orders = active_orders.scalar() or 0
-
-    # Средний чек
-    avg_price_query = select(func.avg(Order.price)).select_from(Order)
-    avg_price = await db.execute(avg_price_query)
-    avg_price = avg_price.scalar() or 0
-
-    # Распределение пользователей по ролям
-    users_by_role_query = select(
-        User.role, func.count().label("count")
-    ).group_by(User.role)
-    users_by_role = await db.execute(users_by_role_query)
-    users_by_role = [{"role": role, "count": count} for role, count in users_by_role]
+    users = await rollup_totals(db, "users_role")
+    orders = await rollup_totals(db, "orders_status")
+    priced_orders, priced_amount = (await rollup_totals(db, "order_prices")).get("", (0, 0))
 
     return {
-        "total_users": total_users,
-        "total_orders": total_orders,
-        "active_orders": active_orders,
-        "average_order_price": float(avg_price),
-        "users_by_role": users_by_role
+        "total_users": sum(count for count, _ in users.values()),
+        "total_orders": sum(count for count, _ in orders.values()),
+        "active_orders": sum(orders.get(status, (0, 0))[0] for status in ACTIVE_ORDER_STATUSES),
+        # Средний чек — по заказам с выбранной ставкой
+        "average_order_price": float(priced_amount / priced_orders) if priced_orders else 0.0,
+        "users_by_role": [{"role": role, "count": count} for role, (count, _) in users.items()]
     }
 
 @router.get("/api/user-growth")
@@ -67,26 +65,11 @@ async def get_user_growth(
     current_user: User = Depends(get_current_admin)
 ):
     """Получение данных о росте числа пользователей за указанный период."""
-    end_date = datetime.now()
+    end_date = date.today()
     start_date = end_date - timedelta(days=days)
 
-    # Запрос для получения количества новых пользователей по дням
-    query = select(
-        func.date(User.created_at).label("date"),
-        func.count().label("count")
-    ).where(
-        User.created_at >= start_date,
-        User.created_at <= end_date
-    ).group_by(
-        func.date(User.created_at)
-    ).order_by(
-        func.date(User.created_at)
-    )
-
-    result = await db.execute(query)
-    user_growth = [{"date": date.strftime("%Y-%m-%d"), "count": count} for date, count in result]
-
-    return user_growth
+    daily = await rollup_daily(db, "users_role", start_date, end_date)
+    return [{"date": day.strftime("%Y-%m-%d"), "count": count} for day, (count, _) in daily.items()]
 
 @router.get("/api/order-statistics")
 async def get_order_statistics(
@@ -95,39 +78,15 @@ async def get_order_statistics(
     current_user: User = Depends(get_current_admin)
 ):
     """Получение статистики заказов: количество по дням и распределение по статусам."""
-    end_date = datetime.now()
+    end_date = date.today()
     start_date = end_date - timedelta(days=days)
 
-    # Запрос для получения количества заказов по дням
-    daily_query = select(
-        func.date(Order.created_at).label("date"),
-        func.count().label("count")
-    ).where(
-        Order.created_at >= start_date,
-        Order.created_at <= end_date
-    ).group_by(
-        func.date(Order.created_at)
-    ).order_by(
-        func.date(Order.created_at)
-    )
-
-    daily_result = await db.execute(daily_query)
-    daily_orders = [{"date": date.strftime("%Y-%m-%d"), "count": count} for date, count in daily_result]
-
-    # Запрос для получения распределения заказов по статусам
-    status_query = select(
-        Order.status,
-        func.count().label("count")
-    ).group_by(
-        Order.status
-    )
-
-    status_result = await db.execute(status_query)
-    status_statistics = [{"status": status, "count": count} for status, count in status_result]
+    daily = await rollup_daily(db, "orders_status", start_date, end_date)
+    statuses = await rollup_totals(db, "orders_status")
 
     return {
-        "daily_orders": daily_orders,
-        "status_statistics": status_statistics
+        "daily_orders": [{"date": day.strftime("%Y-%m-%d"), "count": count} for day, (count, _) in daily.items()],
+        "status_statistics": [{"status": status, "count": count} for status, (count, _) in statuses.items()]
     }
 
 @router.get("/api/bid-statistics")
@@ -137,18 +96,10 @@ async def get_bid_statistics(
     current_user: User = Depends(get_current_admin)
 ):
     """Получение статистики ставок: распределение по статусам и топ мастеров."""
-    # Запрос для получения распределения ставок по статусам
-    status_query = select(
-        Bid.status,
-        func.count().label("count")
-    ).group_by(
-        Bid.status
-    )
-
-    status_result = await db.execute(status_query)
-    status_statistics = [{"status": status, "count": count} for status, count in status_result]
+    statuses = await rollup_totals(db, "bids_status")
+    status_statistics = [{"status": status, "count": count} for status, (count, _) in statuses.items()]
 
-    # Запрос для получения топ-5 мастеров по количеству принятых ставок
+    # Запрос для получения топ-5 мастеров по количеству принятых (выбранных клиентом) ставок
     top_masters_query = select(
         User.id,
         User.name,
@@ -156,7 +107,7 @@ async def get_bid_statistics(
     ).join(
         Bid, User.id == Bid.master_id
     ).where(
-        Bid.status == "accepted"
+        Bid.status == "selected"
     ).group_by(
         User.id, User.name
     ).order_by(
@@ -181,42 +132,18 @@ async def get_payout_statistics(
     current_user: User = Depends(get_current_admin)
 ):
     """Получение статистики выплат: распределение по статусам и суммы по дням."""
-    end_date = datetime.now()
+    end_date = date.today()
     start_date = end_date - timedelta(days=days)
 
-    # Запрос для получения распределения выплат по статусам
-    status_query = select(
-        Payout.status,
-        func.count().label("count")
-    ).group_by(
-        Payout.status
-    )
-
-    status_result = await db.execute(status_query)
-    status_statistics = [{"status": status, "count": count} for status, count in status_result]
-
-    # Запрос для получения сумм выплат по дням
-    amount_query = select(
-        func.date(Payout.created_at).label("date"),
-        func.sum(Payout.amount).label("amount")
-    ).where(
-        Payout.created_at >= start_date,
-        Payout.created_at <= end_date
-    ).group_by(
-        func.date(Payout.created_at)
-    ).order_by(
-        func.date(Payout.created_at)
-    )
-
-    amount_result = await db.execute(amount_query)
-    amount_statistics = [
-        {"date": date.strftime("%Y-%m-%d"), "amount": float(amount)}
-        for date, amount in amount_result
-    ]
+    statuses = await rollup_totals(db, "payouts_status")
+    daily = await rollup_daily(db, "payouts_status", start_date, end_date)
 
     return {
-        "status_statistics": status_statistics,
-        "amount_statistics": amount_statistics
+        "status_statistics": [{"status": status, "count": count} for status, (count, _) in statuses.items()],
+        "amount_statistics": [
+            {"date": day.strftime("%Y-%m-%d"), "amount": float(amount)}
+            for day, (_, amount) in daily.items()
+        ]
     }
 
 @router.get("/api/revenue-statistics")
@@ -226,188 +153,195 @@ async def get_revenue_statistics(
     current_user: User = Depends(get_current_admin)
 ):
     """Получение статистики доходов и расходов за указанный период."""
-    end_date = datetime.now()
-
-    # Определение начальной даты в зависимости от периода
-    if period == "month":
-        start_date = end_date - timedelta(days=30)
-        group_by = func.date(Order.created_at)
-    elif period == "quarter":
-        start_date = end_date - timedelta(days=90)
-        group_by = func.date_trunc('week', Order.created_at)
-    else:  # year
-        start_date = end_date - timedelta(days=365)
-        group_by = func.date_trunc('month', Order.created_at)
-
-    # Запрос для получения доходов (суммы заказов) по периодам
-    revenue_query = select(
-        group_by.label("date"),
-        func.sum(Order.price).label("revenue")
-    ).where(
-        Order.created_at >= start_date,
-        Order.created_at <= end_date
-    ).group_by(
-        group_by
-    ).order_by(
-        group_by
-    )
-
-    revenue_result = await db.execute(revenue_query)
-    revenue_data = {date: float(revenue) for date, revenue in revenue_result}
-
-    # Запрос для получения расходов (суммы выплат) по периодам
-    expenses_query = select(
-        func.date_trunc(
-            'day' if period == "month" else 'week' if period == "quarter" else 'month',
-            Payout.created_at
-        ).label("date"),
-        func.sum(Payout.amount).label("expenses")
-    ).where(
-        Payout.created_at >= start_date,
-        Payout.created_at <= end_date,
-        Payout.status == "approved"
-    ).group_by(
-        func.date_trunc(
-            'day' if period == "month" else 'week' if period == "quarter" else 'month',
-            Payout.created_at
-        )
-    ).order_by(
-        func.date_trunc(
-            'day' if period == "month" else 'week' if period == "quarter" else 'month',
-            Payout.created_at
-        )
-    )
-
-    expenses_result = await db.execute(expenses_query)
-    expenses_data = {date: float(expenses) for date, expenses in expenses_result}
-
-    # Объединение данных
-    all_dates = sorted(set(list(revenue_data.keys()) + list(expenses_data.keys())))
+    end_date = date.today()
+    start_date = end_date - timedelta(days={"month": 30, "quarter": 90, "year": 365}[period])
+
+    revenue_daily = await rollup_daily(db, "orders_status", start_date, end_date, dimensions=REVENUE_ORDER_STATUSES)
+    expenses_daily = await rollup_daily(db, "payouts_status", start_date, end_date, dimensions=EXPENSE_PAYOUT_STATUSES)
+
+    # Группировка по дням, неделям или месяцам
+    revenue_data: dict[date, float] = {}
+    expenses_data: dict[date, float] = {}
+    for day, (_, amount) in revenue_daily.items():
+        bucket = _bucket(day, period)
+        revenue_data[bucket] = revenue_data.get(bucket, 0) + float(amount)
+    for day, (_, amount) in expenses_daily.items():
+        bucket = _bucket(day, period)
+        expenses_data[bucket] = expenses_data.get(bucket, 0) + float(amount)
 
     combined_data = []
     total_revenue = 0
     total_expenses = 0
 
-    for date in all_dates:
-        revenue = revenue_data.get(date, 0)
-        expenses = expenses_data.get(date, 0)
-        profit = revenue - expenses
+    for bucket in sorted(set(revenue_data) | set(expenses_data)):
+        revenue = revenue_data.get(bucket, 0)
+        expenses = expenses_data.get(bucket, 0)
 
         total_revenue += revenue
         total_expenses += expenses
 
-        date_str = date.strftime("%Y-%m-%d") if isinstance(date, datetime) else date.strftime("%Y-%m-%d")
-
         combined_data.append({
-            "date": date_str,
+            "date": bucket.strftime("%Y-%m-%d"),
             "revenue": revenue,
             "expenses": expenses,
-            "profit": profit
+            "profit": revenue - expenses
         })
 
-    total_profit = total_revenue - total_expenses
-
     return {
         "revenue_data": combined_data,
         "total_revenue": total_revenue,
         "total_expenses": total_expenses,
-        "total_profit": total_profit
+        "total_profit": total_revenue - total_expenses
     }
 
-@router.get("/api/export")
-async def export_analytics(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
-):
-    """Экспорт аналитических данных в CSV формате."""
-    # Получаем основную статистику
-    stats = await get_statistics(db, current_user)
+async def _section(session_factory, endpoint, **params):
+    """Один раздел дашборда на собственной сессии (отдельное соединение из пула)."""
+    async with session_factory() as session:
+        return await endpoint(db=session, current_user=None, **params)
+
+
+async def build_dashboard(session_factory, days: int = 30, period: str = "month") -> dict:
+    """Все разделы дашборда разом: независимые агрегаты считаются параллельно."""
+    stats, user_growth, order_stats, bid_stats, payout_stats, revenue_stats = await asyncio.gather(
+        _section(session_factory, get_statistics),
+        _section(session_factory, get_user_growth, days=days),
+        _section(session_factory, get_order_statistics, days=days),
+        _section(session_factory, get_bid_statistics, days=days),
+        _section(session_factory, get_payout_statistics, days=days),
+        _section(session_factory, get_revenue_statistics, period=period),
+    )
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "statistics": stats,
+        "user_growth": user_growth,
+        "order_statistics": order_stats,
+        "bid_statistics": bid_stats,
+        "payout_statistics": payout_stats,
+        "revenue_statistics": revenue_stats,
+    }
 
-    # Получаем статистику заказов
-    order_stats = await get_order_statistics(days=30, db=db, current_user=current_user)
 
-    # Получаем статистику ставок
-    bid_stats = await get_bid_statistics(days=30, db=db, current_user=current_user)
+async def get_cached_dashboard(session_factory, days: int = 30, period: str = "month") -> dict:
+    """Дашборд из кэша (core.redis) на ANALYTICS_DASHBOARD_CACHE_TTL секунд.
 
-    # Получаем статистику выплат
-    payout_stats = await get_payout_statistics(days=30, db=db, current_user=current_user)
+    Одновременные запросы при пустом кэше ждут одного вычисления в процессе.
+    """
+    key = f"{DASHBOARD_CACHE_PREFIX}:{days}:{period}"
+    payload = await get_cache(key)
+    if payload is not None:
+        return payload
+    lock = _dashboard_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        payload = await get_cache(key)
+        if payload is None:
+            payload = await build_dashboard(session_factory, days=days, period=period)
+            await set_cache(key, payload, get_settings().analytics_dashboard_cache_ttl)
+    return payload
 
-    # Получаем статистику доходов и расходов
-    revenue_stats = await get_revenue_statistics(period="month", db=db, current_user=current_user)
 
-    # Создаем CSV файл в памяти
-    output = io.StringIO()
-    writer = csv.writer(output)
+@router.get("/api/dashboard")
+async def get_dashboard(
+    days: int = Query(30, ge=1, le=365),
+    period: str = Query("month", regex="^(month|quarter|year)$"),
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(get_current_admin)
+):
+    """Все данные страницы аналитики одним ответом (с коротким кэшем на сервере)."""
+    return await get_cached_dashboard(session_factory, days=days, period=period)
+
+def _report_rows(dashboard: dict):
+    """Строки CSV-отчёта по данным дашборда."""
+    stats = dashboard["statistics"]
+    order_stats = dashboard["order_statistics"]
+    bid_stats = dashboard["bid_statistics"]
+    payout_stats = dashboard["payout_statistics"]
+    revenue_stats = dashboard["revenue_statistics"]
 
     # Записываем заголовок и дату экспорта
-    writer.writerow(["Аналитический отчет GoodRobot"])
-    writer.writerow(["Дата экспорта:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
-    writer.writerow([])
+    yield ["Аналитический отчет GoodRobot"]
+    yield ["Дата экспорта:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")]
+    yield []
 
     # Записываем основную статистику
-    writer.writerow(["Основная статистика"])
-    writer.writerow(["Всего пользователей:", stats["total_users"]])
-    writer.writerow(["Всего заказов:", stats["total_orders"]])
-    writer.writerow(["Активных заказов:", stats["active_orders"]])
-    writer.writerow(["Средний чек:", stats["average_order_price"]])
-    writer.writerow([])
+    yield ["Основная статистика"]
+    yield ["Всего пользователей:", stats["total_users"]]
+    yield ["Всего заказов:", stats["total_orders"]]
+    yield ["Активных заказов:", stats["active_orders"]]
+    yield ["Средний чек:", stats["average_order_price"]]
+    yield []
 
     # Записываем распределение пользователей по ролям
-    writer.writerow(["Распределение пользователей по ролям"])
-    writer.writerow(["Роль", "Количество"])
+    yield ["Распределение пользователей по ролям"]
+    yield ["Роль", "Количество"]
     for role_data in stats["users_by_role"]:
-        writer.writerow([role_data["role"], role_data["count"]])
-    writer.writerow([])
+        yield [role_data["role"], role_data["count"]]
+    yield []
 
     # Записываем статистику заказов по статусам
-    writer.writerow(["Статистика заказов по статусам"])
-    writer.writerow(["Статус", "Количество"])
+    yield ["Статистика заказов по статусам"]
+    yield ["Статус", "Количество"]
     for status_data in order_stats["status_statistics"]:
-        writer.writerow([status_data["status"], status_data["count"]])
-    writer.writerow([])
+        yield [status_data["status"], status_data["count"]]
+    yield []
 
     # Записываем статистику ставок по статусам
-    writer.writerow(["Статистика ставок по статусам"])
-    writer.writerow(["Статус", "Количество"])
+    yield ["Статистика ставок по статусам"]
+    yield ["Статус", "Количество"]
     for status_data in bid_stats["status_statistics"]:
-        writer.writerow([status_data["status"], status_data["count"]])
-    writer.writerow([])
+        yield [status_data["status"], status_data["count"]]
+    yield []
 
     # Записываем топ мастеров
-    writer.writerow(["Топ мастеров по принятым ставкам"])
-    writer.writerow(["ID", "Имя", "Количество принятых ставок"])
+    yield ["Топ мастеров по принятым ставкам"]
+    yield ["ID", "Имя", "Количество принятых ставок"]
     for master in bid_stats["top_masters"]:
-        writer.writerow([master["id"], master["name"], master["accepted_bids"]])
-    writer.writerow([])
+        yield [master["id"], master["name"], master["accepted_bids"]]
+    yield []
 
     # Записываем статистику выплат по статусам
-    writer.writerow(["Статистика выплат по статусам"])
-    writer.writerow(["Статус", "Количество"])
+    yield ["Статистика выплат по статусам"]
+    yield ["Статус", "Количество"]
     for status_data in payout_stats["status_statistics"]:
-        writer.writerow([status_data["status"], status_data["count"]])
-    writer.writerow([])
+        yield [status_data["status"], status_data["count"]]
+    yield []
 
     # Записываем статистику доходов и расходов
-    writer.writerow(["Доходы и расходы"])
-    writer.writerow(["Общий доход:", revenue_stats["total_revenue"]])
-    writer.writerow(["Общие расходы:", revenue_stats["total_expenses"]])
-    writer.writerow(["Общая прибыль:", revenue_stats["total_profit"]])
-    writer.writerow([])
-
-    writer.writerow(["Детализация доходов и расходов по дням"])
-    writer.writerow(["Дата", "Доход", "Расходы", "Прибыль"])
+    yield ["Доходы и расходы"]
+    yield ["Общий доход:", revenue_stats["total_revenue"]]
+    yield ["Общие расходы:", revenue_stats["total_expenses"]]
+    yield ["Общая прибыль:", revenue_stats["total_profit"]]
+    yield []
+
+    yield ["Детализация доходов и расходов по дням"]
+    yield ["Дата", "Доход", "Расходы", "Прибыль"]
     for data in revenue_stats["revenue_data"]:
-        writer.writerow([
+        yield [
             data["date"],
             data["revenue"],
             data["expenses"],
             data["profit"]
-        ])
+        ]
+
+
+@router.get("/api/export")
+async def export_analytics(
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(get_current_admin)
+):
+    """Экспорт аналитических данных в CSV формате."""
+    dashboard = await get_cached_dashboard(session_factory)
+
+    async def chunks():
+        batch = []
+        for row in _report_rows(dashboard):
+            batch.append(row)
+            if len(batch) >= 100:
+                yield encode_csv(batch)
+                batch = []
+        yield encode_csv(batch)
 
-    # Возвращаем CSV файл
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        chunks(),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=analytics_export.csv"}
     )
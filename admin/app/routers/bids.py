@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import and_
@@ -9,6 +9,7 @@ from sqlalchemy.future import select
 
 from admin.app.auth import get_current_admin
 from admin.app.database import get_db
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from admin.app.schemas import BidResponse, BidUpdate
 from app.models.bid import Bid
 from app.models.order import Order
@@ -24,8 +25,11 @@ async def get_bids_page(request: Request, current_admin=Depends(get_current_admi
 
 @router.get("/api", response_model=list[BidResponse])
 async def get_bids(
-    skip: int = 0,
-    limit: int = 10,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     order_id: int | None = None,
     master_id: int | None = None,
     date: date | None = None,
@@ -49,13 +53,11 @@ async def get_bids(
         end_date = datetime.combine(date, datetime.max.time())
         query = query.filter(and_(Bid.created_at >= start_date, Bid.created_at <= end_date))
 
-    # Добавляем пагинацию и сортировку по убыванию даты создания
-    query = query.offset(skip).limit(limit).order_by(Bid.created_at.desc())
-
-    result = await db.execute(query)
-    bids = result.scalars().all()
-
-    return bids
+    # Страница от новых к старым по (created_at, id)
+    return await paginate(
+        db, response, query, created_at=Bid.created_at, id_column=Bid.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
 
 @router.get("/{bid_id}", response_class=HTMLResponse)
 async def get_bid_page(
@@ -0,0 +1,25 @@
+"""История чатов клиентов и мастеров для админки (оперативная и архивная)."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from admin.app.auth import get_current_admin
+from admin.app.schemas import ChatHistoryResponse
+from app.services.chat_archive import get_chat_archive, load_chat_history
+from core.db import get_session
+
+router = APIRouter()
+
+
+@router.get("/api/{session_id}/messages", response_model=ChatHistoryResponse)
+async def get_chat_messages(
+    session_id: int,
+    db: AsyncSession = Depends(get_session),
+    current_admin=Depends(get_current_admin),
+):
+    """Все сообщения чата: из chat_messages и из архива закрытых чатов."""
+    archive = get_chat_archive()
+    messages = await load_chat_history(db, session_id, archive=archive)
+    if messages is None:
+        raise HTTPException(status_code=404, detail="Чат не найден")
+    archived = any(m.get("archived") for m in messages)
+    return {"session_id": session_id, "archived": archived, "messages": messages}
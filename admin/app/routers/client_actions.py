@@ -3,16 +3,16 @@ import json
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
 from admin.app.auth import get_current_admin
 from admin.app.models import ClientAction
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from app.models.user import User
 from core.db import get_session
 
@@ -34,8 +34,11 @@ async def get_client_actions_page(request: Request):
 
 @router.get("/api")
 async def get_client_actions(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     user_id: int = None,
     action_type: str = None,
     db: AsyncSession = Depends(get_session),
@@ -50,11 +53,11 @@ async def get_client_actions(
     if action_type:
         query = query.filter(ClientAction.action_type == action_type)
     
-    # Сортировка и пагинация
-    query = query.order_by(desc(ClientAction.created_at)).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    actions = result.scalars().all()
+    # Страница от новых к старым по (created_at, id)
+    actions = await paginate(
+        db, response, query, created_at=ClientAction.created_at, id_column=ClientAction.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
     
     # Преобразуем в формат для ответа
     response_data = []
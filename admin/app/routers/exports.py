@@ -0,0 +1,46 @@
+"""Выгрузка сырых данных (заказы, ставки, выплаты, сообщения чатов) потоком в CSV/NDJSON."""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from admin.app.auth import get_current_admin
+from admin.app.database import get_session_factory
+from app.models import ChatMessage
+from app.services.exports import DATASETS, export_filename, export_media_type, stream_export
+
+router = APIRouter()
+
+
+@router.get("/api/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    gzip: bool = False,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    session_id: int | None = None,
+    session_factory=Depends(get_session_factory),
+    current_admin=Depends(get_current_admin),
+):
+    """Выгрузка таблицы целиком или за период [since, until).
+
+    Строки читаются курсором и отдаются по мере чтения, файл в памяти не собирается.
+    Сообщения чатов — только оперативные (chat_messages); архив закрытых чатов уже
+    лежит файлами в CHAT_ARCHIVE_DIR.
+    """
+    spec = DATASETS.get(dataset)
+    if spec is None:
+        raise HTTPException(status_code=404, detail="Неизвестный набор данных")
+    filters = []
+    if session_id is not None:
+        if dataset != "chat_messages":
+            raise HTTPException(status_code=400, detail="session_id применим только к chat_messages")
+        filters.append(ChatMessage.session_id == session_id)
+
+    query = spec.query(since=since, until=until, filters=filters)
+    return StreamingResponse(
+        stream_export(session_factory, query, spec.header, fmt=format, compress=gzip),
+        media_type=export_media_type(format, gzip),
+        headers={"Content-Disposition": f"attachment; filename={export_filename(dataset, format, gzip)}"},
+    )
@@ -2,7 +2,7 @@ import logging
 import random
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import delete, or_
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from admin.app.auth import get_current_admin, get_password_hash
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from admin.app.schemas import UserResponse
 from admin.app.schemas_category import MasterCategoryResponse, MasterCategoryUpdate
 from app.models.category import MasterCategory, master_categories
@@ -36,8 +37,11 @@ async def get_masters_page(request: Request):
 
 @router.get("/api", response_model=list[UserResponse])
 async def get_masters(
-    skip: int = 0,
-    limit: int = 10,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     is_active: bool | None = None,
     search: str | None = None,
     db: AsyncSession = Depends(get_session),
@@ -64,11 +68,11 @@ async def get_masters(
             )
         )
 
-    # Сортировка и пагинация
-    query = query.order_by(User.id.desc()).offset(skip).limit(limit)
-
-    result = await db.execute(query)
-    masters = result.scalars().all()
+    # Страница от новых к старым по (created_at, id)
+    masters = await paginate(
+        db, response, query, created_at=User.created_at, id_column=User.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
 
     # Оптимизированная обработка вычисляемых атрибутов
     for m in masters:
@@ -277,7 +281,9 @@ async def get_master_page(
     # Кэшируем категории мастера для будущих запросов
     if master_categories_list:
         cache_service = await get_master_categories_cache()
-        await cache_service.set_master_categories(master_id, master_categories_list)
+        await cache_service.set_master_categories(
+            master_id, sorted({getattr(c, "category", c) for c in master_categories_list})
+        )
 
     # Получаем статистику заказов мастера
     # В реальном приложении здесь был бы запрос к таблице заказов
@@ -363,7 +369,7 @@ async def update_master_categories(
 
         # Обновляем кэш после успешного обновления в БД
         cache_service = await get_master_categories_cache()
-        cache_success = await cache_service.set_master_categories(master_id, categories.categories)
+        cache_success = await cache_service.update_master_categories(master_id, categories.categories)
 
         if cache_success:
             logger.info(f"Successfully updated cache for master {master_id}", extra={
@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import and_, or_
@@ -9,6 +9,7 @@ from sqlalchemy.future import select
 
 from admin.app.auth import get_current_admin
 from admin.app.database import get_db
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from admin.app.schemas import OrderResponse, OrderUpdate
 from app.models.order import Order
 from app.models.user import User
@@ -23,15 +24,18 @@ async def get_orders_page(request: Request, current_admin=Depends(get_current_ad
 
 @router.get("/api", response_model=list[OrderResponse])
 async def get_orders(
-    skip: int = 0,
-    limit: int = 10,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     status: str | None = None,
     date: date | None = None,
     search: str | None = None,
     db: AsyncSession = Depends(get_db),
     current_admin=Depends(get_current_admin)
 ):
-    """Получает список заказов с возможностью фильтрации"""
+    """Получает список заказов с возможностью фильтрации (keyset-пагинация, см. admin.app.pagination)"""
     query = select(Order)
 
     # Применяем фильтры, если они указаны
@@ -51,13 +55,11 @@ async def get_orders(
             )
         )
 
-    # Добавляем пагинацию и сортировку по убыванию даты создания
-    query = query.offset(skip).limit(limit).order_by(Order.created_at.desc())
-
-    result = await db.execute(query)
-    orders = result.scalars().all()
-
-    return orders
+    # Страница от новых к старым по (created_at, id)
+    return await paginate(
+        db, response, query, created_at=Order.created_at, id_column=Order.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
 
 @router.get("/{order_id}", response_class=HTMLResponse)
 async def get_order_page(
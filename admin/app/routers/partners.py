@@ -1,7 +1,7 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
@@ -9,6 +9,7 @@ from sqlalchemy import or_, select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from admin.app.auth import get_current_admin
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from app.models.partner import Partner
 from app.models.user import User
 from core.db import get_session
@@ -55,9 +56,12 @@ async def get_partners_page(request: Request, current_admin=Depends(get_current_
 
 @router.get("/api", response_model=list[PartnerResponse])
 async def list_partners(
+    response: Response,
     search: Optional[str] = Query(default=None, description="Поиск по телефону, имени или tg_id"),
-    skip: int = 0,
-    limit: int = 20,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     db: AsyncSession = Depends(get_session),
     current_admin=Depends(get_current_admin),
 ):
@@ -65,9 +69,6 @@ async def list_partners(
     stmt = (
         select(Partner, User)
         .join(User, User.id == Partner.user_id)
-        .order_by(Partner.id.desc())
-        .offset(skip)
-        .limit(limit)
     )
     if search:
         like = f"%{search}%"
@@ -82,8 +83,11 @@ async def list_partners(
                 (User.tg_id == tg_id_val) if tg_id_val else False,
             )
         )
-    res = await db.execute(stmt)
-    rows = res.all()
+    # У партнёров нет created_at: ключ страницы — Partner.id (порядок создания)
+    rows = await paginate(
+        db, response, stmt, created_at=None, id_column=Partner.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
     items: list[PartnerResponse] = []
     for p, u in rows:
         items.append(
@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,6 +8,7 @@ from sqlalchemy.future import select
 
 from admin.app.auth import get_current_admin
 from admin.app.database import get_db
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from admin.app.schemas import PayoutCreate, PayoutResponse, PayoutUpdate
 from app.models.payout import Payout
 from app.models.user import User
@@ -22,8 +23,11 @@ async def get_payouts_page(request: Request, current_admin=Depends(get_current_a
 
 @router.get("/api", response_model=list[PayoutResponse])
 async def get_payouts(
-    skip: int = 0,
-    limit: int = 10,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     user_id: int | None = None,
     status: str | None = None,
     date_from: date | None = None,
@@ -31,7 +35,7 @@ async def get_payouts(
     db: AsyncSession = Depends(get_db),
     current_admin=Depends(get_current_admin)
 ):
-    """Получает список выплат с возможностью фильтрации"""
+    """Получает список выплат с возможностью фильтрации (keyset-пагинация, см. admin.app.pagination)"""
     query = select(Payout)
 
     # Применяем фильтры, если они указаны
@@ -46,13 +50,11 @@ async def get_payouts(
         end_date = datetime.combine(date_to, datetime.max.time())
         query = query.filter(Payout.created_at <= end_date)
 
-    # Добавляем пагинацию и сортировку по убыванию даты создания
-    query = query.offset(skip).limit(limit).order_by(Payout.created_at.desc())
-
-    result = await db.execute(query)
-    payouts = result.scalars().all()
-
-    return payouts
+    # Страница от новых к старым по (created_at, id)
+    return await paginate(
+        db, response, query, created_at=Payout.created_at, id_column=Payout.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
 
 @router.get("/{payout_id}", response_class=HTMLResponse)
 async def get_payout_page(
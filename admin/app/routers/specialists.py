@@ -2,7 +2,7 @@
 import logging
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import or_, select
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from admin.app.auth import get_current_admin
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from admin.app.schemas import UserResponse
 from app.models.specialty import Specialty
 from app.models.user import User
@@ -33,8 +34,11 @@ async def get_specialists_page(request: Request):
 
 @router.get("/api", response_model=List[UserResponse])
 async def get_specialists(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
     specialty_id: Optional[int] = None,
@@ -62,11 +66,11 @@ async def get_specialists(
     if specialty_id:
         query = query.join(User.specialties).filter(Specialty.id == specialty_id)
     
-    # Сортировка и пагинация
-    query = query.order_by(User.id.desc()).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    specialists = result.scalars().all()
+    # Страница от новых к старым по (created_at, id)
+    specialists = await paginate(
+        db, response, query, created_at=User.created_at, id_column=User.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
     
     # Подготавливаем данные для ответа
     for specialist in specialists:
@@ -1,5 +1,5 @@
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy import or_
@@ -8,6 +8,7 @@ from sqlalchemy.future import select
 
 from admin.app.auth import get_current_admin
 from admin.app.database import get_db
+from admin.app.pagination import MAX_PAGE_SIZE, paginate
 from admin.app.schemas import UserResponse, UserUpdate
 from app.models.user import User
 
@@ -21,8 +22,11 @@ async def get_users_page(request: Request, current_admin=Depends(get_current_adm
 
 @router.get("/api", response_model=list[UserResponse])
 async def get_users(
-    skip: int = 0,
-    limit: int = 10,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
+    with_total: bool = False,
     role: str | None = None,
     is_active: bool | None = None,
     search: str | None = None,
@@ -46,13 +50,11 @@ async def get_users(
             )
         )
 
-    # Добавляем пагинацию
-    query = query.offset(skip).limit(limit).order_by(User.id.desc())
-
-    result = await db.execute(query)
-    users = result.scalars().all()
-
-    return users
+    # Страница от новых к старым по (created_at, id)
+    return await paginate(
+        db, response, query, created_at=User.created_at, id_column=User.id,
+        cursor=cursor, limit=limit, skip=skip, with_total=with_total,
+    )
 
 @router.get("/{user_id}", response_class=HTMLResponse)
 async def get_user_page(
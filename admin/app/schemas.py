@@ -147,3 +147,20 @@ class PayoutResponse(PayoutBase):
 
     class Config:
         from_attributes = True
+
+# Схемы для истории чатов
+class ChatMessageResponse(BaseModel):
+    id: int
+    session_id: int
+    sender_id: int
+    receiver_id: int
+    message_type: str
+    content_text: str | None = None
+    file_id: str | None = None
+    created_at: datetime
+    archived: bool = False
+
+class ChatHistoryResponse(BaseModel):
+    session_id: int
+    archived: bool
+    messages: list[ChatMessageResponse]
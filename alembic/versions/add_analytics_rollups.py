@@ -0,0 +1,53 @@
+"""add analytics daily rollups and dirty days queue
+
+Revision ID: add_analytics_rollups
+Revises: partition_chat_messages
+Create Date: 2026-10-17 20:00:00.000000
+
+The tables are filled by ``python scripts/rollup_analytics.py --backfill``
+after the upgrade (see app.services.analytics_rollups).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_analytics_rollups'
+down_revision: Union[str, None] = 'partition_chat_messages'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ('users', 'orders', 'bids', 'payouts')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'analytics_daily_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('metric', sa.String(length=32), nullable=False),
+        sa.Column('dimension', sa.String(length=128), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.Column('amount', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'metric', 'dimension'),
+    )
+    op.create_index('ix_analytics_daily_rollups_metric_day', 'analytics_daily_rollups', ['metric', 'day'], unique=False)
+    op.create_table(
+        'analytics_dirty_days',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Агрегатор пересчитывает дни диапазонами created_at
+    for table in TABLES:
+        op.create_index(f'ix_{table}_created_at', table, ['created_at'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_created_at', table_name=table, if_exists=True)
+    op.drop_index('ix_analytics_daily_rollups_metric_day', table_name='analytics_daily_rollups')
+    op.drop_table('analytics_dirty_days')
+    op.drop_table('analytics_daily_rollups')
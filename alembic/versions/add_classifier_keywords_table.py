@@ -0,0 +1,34 @@
+"""add classifier_keywords table for the AI text classifier
+
+Revision ID: add_classifier_keywords
+Revises: add_order_geo
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_classifier_keywords'
+down_revision: Union[str, None] = 'add_order_geo'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'classifier_keywords',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('dictionary', sa.String(length=16), nullable=False),
+        sa.Column('category', sa.String(length=64), nullable=False),
+        sa.Column('keyword', sa.String(length=128), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dictionary', 'category', 'keyword', name='uq_classifier_keywords'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('classifier_keywords')
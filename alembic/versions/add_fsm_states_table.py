@@ -0,0 +1,36 @@
+"""add fsm_states table for persistent FSM storage
+
+Revision ID: add_fsm_states
+Revises: add_master_matching
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_fsm_states'
+down_revision: Union[str, None] = 'add_master_matching'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fsm_states',
+        sa.Column('key', sa.String(length=128), nullable=False),
+        sa.Column('state', sa.String(), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_fsm_states_expires_at'), 'fsm_states', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_fsm_states_expires_at'), table_name='fsm_states')
+    op.drop_table('fsm_states')
@@ -0,0 +1,41 @@
+"""add (created_at, id) indexes for keyset pagination of admin lists
+
+Revision ID: add_keyset_indexes
+Revises: add_partner_stats
+Create Date: 2026-10-17 23:00:00.000000
+
+The composite indexes replace the single-column created_at ones from
+add_analytics_rollups: their leading column serves the same date ranges.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_keyset_indexes'
+down_revision: Union[str, None] = 'add_partner_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ('users', 'orders', 'bids', 'payouts')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'], unique=False, if_not_exists=True)
+        op.drop_index(f'ix_{table}_created_at', table_name=table, if_exists=True)
+    # client_actions не создаётся миграциями и может отсутствовать
+    if sa.inspect(op.get_bind()).has_table('client_actions'):
+        op.create_index(
+            'ix_client_actions_created_at_id', 'client_actions', ['created_at', 'id'], unique=False, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_client_actions_created_at_id', table_name='client_actions', if_exists=True)
+    for table in TABLES:
+        op.create_index(f'ix_{table}_created_at', table, ['created_at'], unique=False, if_not_exists=True)
+        op.drop_index(f'ix_{table}_created_at_id', table_name=table, if_exists=True)
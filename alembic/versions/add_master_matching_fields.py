@@ -0,0 +1,36 @@
+"""add master location and category lookup index
+
+Revision ID: add_master_matching
+Revises: d90c3fb44c85
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_master_matching'
+down_revision: Union[str, None] = 'd90c3fb44c85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('users', sa.Column('longitude', sa.Float(), nullable=True))
+    op.create_index(
+        'ix_master_categories_category_user',
+        'master_categories',
+        ['category', 'user_id'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_master_categories_category_user', table_name='master_categories', if_exists=True)
+    op.drop_column('users', 'longitude')
+    op.drop_column('users', 'latitude')
@@ -0,0 +1,39 @@
+"""add indexes for the master order feed
+
+Revision ID: add_order_feed_indexes
+Revises: add_fsm_states
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_order_feed_indexes'
+down_revision: Union[str, None] = 'add_fsm_states'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_orders_status_created_id',
+        'orders',
+        ['status', 'created_at', 'id'],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_bids_master_order',
+        'bids',
+        ['master_id', 'order_id'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bids_master_order', table_name='bids', if_exists=True)
+    op.drop_index('ix_orders_status_created_id', table_name='orders', if_exists=True)
@@ -0,0 +1,69 @@
+"""add numeric coordinates and geohash to orders
+
+Revision ID: add_order_geo
+Revises: add_order_feed_indexes
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.geohash import encode as geohash_encode
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_order_geo'
+down_revision: Union[str, None] = 'add_order_feed_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def _parse(value):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('geo_lat', sa.Float(), nullable=True))
+    op.add_column('orders', sa.Column('geo_lon', sa.Float(), nullable=True))
+    op.add_column('orders', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # Переносим строковые координаты существующих заказов в числовые колонки
+    connection = op.get_bind()
+    orders = sa.table(
+        'orders',
+        sa.column('id', sa.BigInteger),
+        sa.column('latitude', sa.String),
+        sa.column('longitude', sa.String),
+        sa.column('geo_lat', sa.Float),
+        sa.column('geo_lon', sa.Float),
+        sa.column('geohash', sa.String),
+    )
+    rows = connection.execute(
+        sa.select(orders.c.id, orders.c.latitude, orders.c.longitude)
+        .where(orders.c.latitude.is_not(None), orders.c.longitude.is_not(None))
+    ).all()
+    updates = []
+    for order_id, latitude, longitude in rows:
+        lat, lon = _parse(latitude), _parse(longitude)
+        if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            continue
+        updates.append({'b_id': order_id, 'geo_lat': lat, 'geo_lon': lon, 'geohash': geohash_encode(lat, lon)})
+    stmt = orders.update().where(orders.c.id == sa.bindparam('b_id'))
+    for start in range(0, len(updates), BATCH_SIZE):
+        connection.execute(stmt, updates[start:start + BATCH_SIZE])
+
+    op.create_index('ix_orders_geohash', 'orders', ['geohash'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_geohash', table_name='orders', if_exists=True)
+    op.drop_column('orders', 'geohash')
+    op.drop_column('orders', 'geo_lon')
+    op.drop_column('orders', 'geo_lat')
@@ -0,0 +1,46 @@
+"""add partner_stats summary and referral indexes
+
+Revision ID: add_partner_stats
+Revises: add_analytics_rollups
+Create Date: 2026-10-17 22:00:00.000000
+
+partner_stats is filled lazily on the first dashboard read and by
+scripts/rollup_analytics.py (app.services.partner_stats.refresh_all_partner_stats).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_partner_stats'
+down_revision: Union[str, None] = 'add_analytics_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'partner_stats',
+        sa.Column('partner_user_id', sa.BigInteger(), nullable=False),
+        sa.Column('referred_users', sa.BigInteger(), nullable=False),
+        sa.Column('active_orders', sa.BigInteger(), nullable=False),
+        sa.Column('completed_orders', sa.BigInteger(), nullable=False),
+        sa.Column('pending_payouts', sa.BigInteger(), nullable=False),
+        sa.Column('total_earned', sa.BigInteger(), nullable=False),
+        sa.Column('pending_amount', sa.BigInteger(), nullable=False),
+        sa.Column('payouts_count', sa.BigInteger(), nullable=False),
+        sa.Column('payouts_partner_sum', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['partner_user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('partner_user_id'),
+    )
+    op.create_index('ix_users_referrer_id', 'users', ['referrer_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_orders_client_id', 'orders', ['client_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_client_id', table_name='orders', if_exists=True)
+    op.drop_index('ix_users_referrer_id', table_name='users', if_exists=True)
+    op.drop_table('partner_stats')
@@ -0,0 +1,126 @@
+"""partition chat_messages by month and add chat_sessions.archived_at
+
+Revision ID: partition_chat_messages
+Revises: add_classifier_keywords
+Create Date: 2026-10-17 18:00:00.000000
+
+PostgreSQL: chat_messages becomes a table partitioned by RANGE (created_at)
+with one partition per month (from the oldest message up to two months
+ahead) and a DEFAULT partition. Partitions for the following months are
+created by the daily archival job (scripts/archive_chats.py, service
+archive-chats in docker-compose.yml) via
+app.services.chat_archive.ensure_chat_partitions.
+Existing rows are copied; ids keep their sequence. Other dialects keep the
+plain table and only get the new index and column.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_chat_messages'
+down_revision: Union[str, None] = 'add_classifier_keywords'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = "id, session_id, sender_id, receiver_id, message_type, content_text, file_id, created_at"
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+    if not _is_postgres():
+        op.create_index('ix_chat_messages_session_created', 'chat_messages', ['session_id', 'created_at'],
+                        unique=False, if_not_exists=True)
+        op.drop_index('ix_chat_messages_session_id', table_name='chat_messages', if_exists=True)
+        return
+
+    op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_unpartitioned")
+    op.execute("ALTER TABLE chat_messages_unpartitioned RENAME CONSTRAINT chat_messages_pkey TO chat_messages_unpartitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_chat_messages_id")
+    op.execute("DROP INDEX IF EXISTS ix_chat_messages_message_type")
+    op.execute("DROP INDEX IF EXISTS ix_chat_messages_session_id")
+    # Последовательность id переживёт удаление старой таблицы
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY NONE")
+    op.execute(
+        """
+        CREATE TABLE chat_messages (
+            id BIGINT NOT NULL DEFAULT nextval('chat_messages_id_seq'),
+            session_id BIGINT NOT NULL REFERENCES chat_sessions (id),
+            sender_id BIGINT NOT NULL REFERENCES users (id),
+            receiver_id BIGINT NOT NULL REFERENCES users (id),
+            message_type chat_message_type_enum NOT NULL,
+            content_text TEXT,
+            file_id VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT chat_messages_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY chat_messages.id")
+    op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT")
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            m date;
+            last_month date := (date_trunc('month', now()) + interval '2 months')::date;
+        BEGIN
+            SELECT date_trunc('month', COALESCE(min(created_at), now()))::date INTO m FROM chat_messages_unpartitioned;
+            WHILE m <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF chat_messages FOR VALUES FROM (%L) TO (%L)',
+                    'chat_messages_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM'),
+                    m, (m + interval '1 month')::date
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END$$;
+        """
+    )
+    op.create_index('ix_chat_messages_id', 'chat_messages', ['id'], unique=False)
+    op.create_index('ix_chat_messages_session_created', 'chat_messages', ['session_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_messages_message_type', 'chat_messages', ['message_type'], unique=False)
+    op.execute(f"INSERT INTO chat_messages ({COLUMNS}) SELECT {COLUMNS} FROM chat_messages_unpartitioned")
+    op.execute("DROP TABLE chat_messages_unpartitioned")
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY NONE")
+        op.execute("ALTER TABLE chat_messages RENAME TO chat_messages_partitioned")
+        op.execute("ALTER TABLE chat_messages_partitioned RENAME CONSTRAINT chat_messages_pkey TO chat_messages_partitioned_pkey")
+        op.execute("DROP INDEX IF EXISTS ix_chat_messages_id")
+        op.execute("DROP INDEX IF EXISTS ix_chat_messages_session_created")
+        op.execute("DROP INDEX IF EXISTS ix_chat_messages_message_type")
+        op.execute(
+            """
+            CREATE TABLE chat_messages (
+                id BIGINT NOT NULL DEFAULT nextval('chat_messages_id_seq'),
+                session_id BIGINT NOT NULL REFERENCES chat_sessions (id),
+                sender_id BIGINT NOT NULL REFERENCES users (id),
+                receiver_id BIGINT NOT NULL REFERENCES users (id),
+                message_type chat_message_type_enum NOT NULL,
+                content_text TEXT,
+                file_id VARCHAR,
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+                CONSTRAINT chat_messages_pkey PRIMARY KEY (id)
+            )
+            """
+        )
+        op.execute("ALTER SEQUENCE chat_messages_id_seq OWNED BY chat_messages.id")
+        op.execute(f"INSERT INTO chat_messages ({COLUMNS}) SELECT {COLUMNS} FROM chat_messages_partitioned")
+        op.execute("DROP TABLE chat_messages_partitioned")
+        op.create_index('ix_chat_messages_id', 'chat_messages', ['id'], unique=False)
+        op.create_index('ix_chat_messages_message_type', 'chat_messages', ['message_type'], unique=False)
+    else:
+        op.drop_index('ix_chat_messages_session_created', table_name='chat_messages', if_exists=True)
+    op.create_index('ix_chat_messages_session_id', 'chat_messages', ['session_id'], unique=False, if_not_exists=True)
+    op.drop_column('chat_sessions', 'archived_at')
@@ -0,0 +1,208 @@
+"""Cache of AI assistant answers keyed by the normalized question.
+
+Most questions are variants of a handful of topics ("как создать заказ",
+"как выбрать мастера"), so answers are reused instead of calling the model:
+
+- exact tier: the question normalized (case, "ё", punctuation, spaces) is the key;
+- similarity tier (off by default): character trigram vectors of cached
+  questions are compared by cosine similarity; a hit needs ``similarity`` or
+  more. Trigrams barely notice "не" or a changed order number, so a similar
+  hit also requires the same negation words and the same number tokens
+  ("мастер не пришел" never answers "мастер пришел", "заказ 124" never gets
+  the answer about "заказ 123"). Candidates come from an inverted trigram
+  index, so only questions sharing trigrams with the new one are scored.
+
+Entries live at most ``ttl`` seconds, the cache holds at most ``maxsize``
+questions (least recently used are evicted). ``stats()`` exposes hit rates.
+
+Configuration (env): ``AI_CACHE_SIZE``, ``AI_CACHE_TTL``,
+``AI_CACHE_SIMILARITY`` (default 0: exact normalized match only).
+"""
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+# Сколько кандидатов с наибольшим числом общих триграмм сравнивать точно
+MAX_CANDIDATES = 32
+# Слова, меняющие смысл вопроса на противоположный
+NEGATIONS = frozenset({"не", "нет", "ни", "без", "нельзя", "никак", "никогда", "ничего", "невозможно"})
+
+
+def normalize_question(text: str) -> str:
+    """Lower-case, "ё" -> "е", no punctuation, single spaces."""
+    text = text.lower().replace("ё", "е")
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def trigrams(normalized: str) -> Counter:
+    padded = f"  {normalized} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def meaning_guard(normalized: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Negation words and number tokens of the question; similar hits must match them exactly."""
+    words = normalized.split()
+    return (
+        tuple(word for word in words if word in NEGATIONS),
+        tuple(word for word in words if any(char.isdigit() for char in word)),
+    )
+
+
+@dataclass(slots=True)
+class _Entry:
+    answer: str
+    expires_at: float
+    vector: Counter
+    norm: float
+    guard: tuple[tuple[str, ...], tuple[str, ...]]
+
+
+class AnswerCache:
+    """Bounded TTL cache of answers with an optional trigram similarity tier."""
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        ttl: float = 3600.0,
+        similarity: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity = similarity
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._postings: dict[str, set[str]] = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, question: str) -> str | None:
+        key = normalize_question(question)
+        if not key:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry.answer
+            if self.similarity > 0:
+                match = self._most_similar(key, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.similar_hits += 1
+                    return self._entries[match].answer
+            self.misses += 1
+            return None
+
+    def put(self, question: str, answer: str) -> None:
+        key = normalize_question(question)
+        if not key or not answer:
+            return
+        vector = trigrams(key)
+        entry = _Entry(
+            answer, self._clock() + self.ttl, vector, math.sqrt(sum(v * v for v in vector.values())),
+            meaning_guard(key),
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for gram in vector:
+                self._postings.setdefault(gram, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def stats(self) -> dict[str, Any]:
+        hits = self.exact_hits + self.similar_hits
+        total = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+    def _live(self, key: str, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._remove(key)
+            self.expired += 1
+            return None
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for gram in entry.vector:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def _most_similar(self, key: str, now: float) -> str | None:
+        vector = trigrams(key)
+        shared: Counter = Counter()
+        for gram in vector:
+            for other in self._postings.get(gram, ()):
+                shared[other] += 1
+        if not shared:
+            return None
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        guard = meaning_guard(key)
+        best_key, best_score = None, self.similarity
+        for other, _ in shared.most_common(MAX_CANDIDATES):
+            entry = self._live(other, now)
+            if entry is None or entry.guard != guard:
+                continue
+            dot = sum(count * entry.vector.get(gram, 0) for gram, count in vector.items())
+            score = dot / (norm * entry.norm)
+            if score >= best_score:
+                best_key, best_score = other, score
+        return best_key
+
+
+_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide answer cache configured from the environment."""
+    global _cache
+    if _cache is None:
+        _cache = AnswerCache(
+            maxsize=int(os.getenv("AI_CACHE_SIZE", "1000")),
+            ttl=float(os.getenv("AI_CACHE_TTL", "3600")),
+            similarity=float(os.getenv("AI_CACHE_SIMILARITY", "0")),
+        )
+    return _cache
@@ -0,0 +1,315 @@
+"""Micro-batched inference for the AI assistant.
+
+Before, every question ran ``get_ai_response`` on the default thread pool, so
+concurrent users competed for the CPU with separate unbatched pipeline calls.
+:class:`InferenceBatcher` collects prompts for a short window (or until the
+batch is full) and runs them as one padded batch through the backend's
+``get_responses`` on a dedicated single-thread executor:
+
+- one batch at a time owns the CPU, the model is not entered concurrently;
+- a seq2seq step over a batch costs far less than the same number of
+  separate calls, so throughput grows with the number of waiting users;
+- the number of waiting prompts is bounded; above the limit new prompts are
+  rejected immediately (:class:`InferenceOverloaded`) instead of queueing
+  for minutes.
+
+Only the local HF model is batched. Gemini requests are independent network
+calls that ``get_responses`` would make one after another, so while Gemini is
+the active backend prompts bypass the queue and run concurrently on the
+default executor, as before batching.
+
+:func:`stream_answer` streams one answer chunk by chunk through the same
+executor when nobody else is waiting, so the first words are shown long before
+the generation ends; under load it falls back to the batched path.
+
+Configuration (env): ``AI_BATCH_MAX_SIZE``, ``AI_BATCH_WINDOW_MS``,
+``AI_QUEUE_LIMIT``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.ai_agent.answer_cache import get_answer_cache
+from app.ai_agent.registry import ModelRegistry, get_model_registry
+from app.ai_agent.sanitizer import StreamingSanitizer
+from app.ai_agent.simple_ai import (
+    SHORT_ANSWER_LIMIT,
+    build_prompt,
+    finalize_response,
+    quick_reply,
+    shorten_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceOverloaded(RuntimeError):
+    """Raised when the inference queue is full and the prompt is shed."""
+
+
+class InferenceBatcher:
+    """Collects prompts into batches and runs them on a dedicated executor."""
+
+    def __init__(
+        self,
+        registry: ModelRegistry | None = None,
+        *,
+        max_batch: int = 16,
+        window: float = 0.02,
+        max_queue: int = 100,
+    ) -> None:
+        self.registry = registry
+        self.max_batch = max_batch
+        self.window = window
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-infer")
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending = 0
+        self.batches = 0
+        self.prompts = 0
+        self.shed = 0
+        self.largest_batch = 0
+        self.streams = 0
+        self.direct = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    def _registry(self) -> ModelRegistry:
+        return self.registry or get_model_registry()
+
+    def _is_remote(self) -> bool:
+        """Gemini is active: prompts bypass the batch queue."""
+        return self._registry().active_backend == "gemini"
+
+    async def generate(self, prompt: str) -> str | None:
+        """Queue the prompt and wait for its batch; raises InferenceOverloaded when full."""
+        if self._is_remote():
+            self.direct += 1
+            registry = self._registry()
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: registry.get().get_response(prompt)
+            )
+        if self._pending >= self.max_queue:
+            self.shed += 1
+            raise InferenceOverloaded(f"inference queue is full ({self._pending})")
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._pending += 1
+        try:
+            self._queue.put_nowait((prompt, future))
+            return await future
+        finally:
+            self._pending -= 1
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Generate one prompt on the inference executor, yielding raw chunks as they come.
+
+        Takes a queue slot like :meth:`generate` and runs between batches, so
+        the model is still entered by one thread at a time. Gemini streams run
+        on the default executor without a queue slot.
+        """
+        remote = self._is_remote()
+        if not remote and self._pending >= self.max_queue:
+            self.shed += 1
+            raise InferenceOverloaded(f"inference queue is full ({self._pending})")
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def put(item: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(chunks.put_nowait, item)
+            except RuntimeError:  # цикл уже закрыт, ответ никому не нужен
+                stop.set()
+
+        def produce() -> None:
+            try:
+                backend = self._registry().get()
+                if hasattr(backend, "stream_response"):
+                    for chunk in backend.stream_response(prompt):
+                        if stop.is_set():
+                            break  # обработчик перестал читать: освобождаем модель
+                        put(chunk)
+                else:
+                    text = backend.get_response(prompt)
+                    if text:
+                        put(text)
+            except Exception as e:
+                put(e)
+            finally:
+                put(None)
+
+        slots = 0 if remote else 1
+        self._pending += slots
+        self.streams += 1
+        try:
+            loop.run_in_executor(None if remote else self._executor, produce)
+            while True:
+                item = await chunks.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            self._pending -= slots
+
+    async def _collect(self) -> list[tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Запросы, чьи обработчики уже отменены, в модель не отправляем
+        return [(prompt, future) for prompt, future in batch if not future.done()]
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            prompts = [prompt for prompt, _ in batch]
+            try:
+                results = await self._loop.run_in_executor(self._executor, self._generate_batch, prompts)
+            except Exception as e:
+                logger.error("AI batch of %d failed: %s", len(prompts), e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.prompts += len(prompts)
+            self.largest_batch = max(self.largest_batch, len(prompts))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _generate_batch(self, prompts: list[str]) -> list[str | None]:
+        backend = self._registry().get()
+        if hasattr(backend, "get_responses"):
+            return backend.get_responses(prompts)
+        return [backend.get_response(prompt) for prompt in prompts]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "shed": self.shed,
+            "largest_batch": self.largest_batch,
+            "streams": self.streams,
+            "direct": self.direct,
+            "avg_batch": round(self.prompts / self.batches, 2) if self.batches else 0.0,
+        }
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+
+_batcher: InferenceBatcher | None = None
+
+
+def get_inference_batcher() -> InferenceBatcher:
+    """Process-wide batcher configured from the environment."""
+    global _batcher
+    if _batcher is None:
+        _batcher = InferenceBatcher(
+            max_batch=int(os.getenv("AI_BATCH_MAX_SIZE", "16")),
+            window=int(os.getenv("AI_BATCH_WINDOW_MS", "20")) / 1000,
+            max_queue=int(os.getenv("AI_QUEUE_LIMIT", "100")),
+        )
+    return _batcher
+
+
+async def shutdown_inference_batcher() -> None:
+    """Stop the batch worker (registered on dispatcher shutdown)."""
+    global _batcher
+    if _batcher is not None:
+        await _batcher.close()
+        _batcher = None
+
+
+async def answer_question(user_input: str, batcher: InferenceBatcher | None = None) -> str:
+    """Async counterpart of ``get_ai_response`` going through the batcher.
+
+    Raises:
+        InferenceOverloaded: the queue is full, the caller should ask to retry later.
+    """
+    quick = quick_reply(user_input)
+    if quick is not None:
+        return quick
+    cached = get_answer_cache().get(user_input)
+    if cached is not None:
+        return cached
+    generated = await (batcher or get_inference_batcher()).generate(build_prompt(user_input))
+    return finalize_response(generated, user_input)
+
+
+async def stream_answer(user_input: str, batcher: InferenceBatcher | None = None) -> AsyncIterator[str]:
+    """Yield the answer as it grows, for display; the last item is the final answer.
+
+    Intermediate items are cleaned incrementally (:class:`StreamingSanitizer`),
+    the final one is exactly what :func:`answer_question` would return. When
+    other prompts are already waiting, the answer is produced by the batched
+    path and yielded once: batching keeps throughput under load.
+
+    Raises:
+        InferenceOverloaded: the queue is full, the caller should ask to retry later.
+    """
+    batcher = batcher or get_inference_batcher()
+    if batcher.pending:
+        yield await answer_question(user_input, batcher)
+        return
+    quick = quick_reply(user_input)
+    if quick is not None:
+        yield quick
+        return
+    cached = get_answer_cache().get(user_input)
+    if cached is not None:
+        yield cached
+        return
+
+    sanitizer = StreamingSanitizer()
+    released = ""
+    raw: list[str] = []
+    async for chunk in batcher.stream(build_prompt(user_input)):
+        raw.append(chunk)
+        released += sanitizer.feed(chunk)
+        tail = sanitizer.preview()
+        shown = f"{released} {tail}" if released and tail else released or tail
+        if shown:
+            yield shown if len(shown) <= SHORT_ANSWER_LIMIT else shown[:SHORT_ANSWER_LIMIT] + "..."
+    yield finalize_response(shorten_response("".join(raw)), user_input)
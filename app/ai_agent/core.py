@@ -2,7 +2,8 @@
 import logging
 from typing import Dict, Any, Optional
 
-from app.ai_agent.models.text_classifier import TextClassifier
+from app.ai_agent.registry import get_model_registry
+from app.ai_agent.models.text_classifier import get_text_classifier
 from app.ai_agent.models.text_generator import TextGenerator
 from app.ai_agent.processors.order_processor import OrderProcessor
 from app.ai_agent.processors.query_classifier import QueryClassifier
@@ -14,16 +15,20 @@ class AIAgent:
 
     def __init__(self):
         """Initialize the AI Agent with all necessary components."""
-        from app.ai_agent.simple_ai import GeminiAI  # local CPU LLM wrapper (DistilGPT-2)
-        self.gemini = GeminiAI()
-        self.text_classifier = TextClassifier()
+        # Общий на процесс: ключевые слова подгружаются из БД при старте бота
+        self.text_classifier = get_text_classifier()
         self.text_generator = TextGenerator()
         self.order_processor = OrderProcessor(self.text_generator, self.text_classifier)
         self.query_classifier = QueryClassifier(self.text_classifier)
 
+    @property
+    def gemini(self):
+        """Shared process-wide backend (loaded on first use)."""
+        return get_model_registry().get()
+
     async def initialize(self):
-        # Initialize local LLM pipeline lazily
-        self.gemini.initialize()
+        # Load the shared backend once per process
+        get_model_registry().warm_up()
 
     async def process_order_description(self, description: str) -> Dict[str, Any]:
         """Process and enhance order description using AI.
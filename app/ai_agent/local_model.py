@@ -0,0 +1,59 @@
+"""Local CPU fallback model (seq2seq), imported and loaded lazily.
+
+``transformers`` and ``torch`` are imported only when the fallback model is
+first needed. The bot process starts without them, and with Gemini
+configured it never imports them at all.
+
+The weights can be slimmed down for CPU inference (``AI_MODEL_QUANTIZE``):
+
+- ``none``: full-precision fp32 weights (the previous behaviour);
+- ``int8``: dynamic int8 quantization of the ``Linear`` layers. Weights are
+  stored as int8 and activations are quantized on the fly, so memory is
+  about 3x smaller and matmuls are faster on CPU;
+- ``bf16``: bfloat16 weights (half the memory, fast only on CPUs with
+  native bf16 support).
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+QUANTIZE_MODES = ("none", "int8", "bf16")
+
+
+def quantize_mode() -> str:
+    """Configured weight format (``AI_MODEL_QUANTIZE``), ``none`` if unknown."""
+    mode = (os.getenv("AI_MODEL_QUANTIZE") or "none").strip().lower()
+    if mode not in QUANTIZE_MODES:
+        logger.warning("Неизвестный AI_MODEL_QUANTIZE=%r, используем none", mode)
+        return "none"
+    return mode
+
+
+def load_seq2seq(model_name: str, quantize: str = "none") -> tuple[Any, Any]:
+    """Load the tokenizer and the (optionally quantized) seq2seq model for CPU."""
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model.eval()
+    if quantize == "int8":
+        import torch
+
+        # Замена Linear на квантованные слои на месте, без второй копии весов
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    elif quantize == "bf16":
+        import torch
+
+        model = model.to(torch.bfloat16)
+    return tokenizer, model
+
+
+def text_iterator_streamer(tokenizer: Any, **kwargs: Any) -> Any:
+    """``transformers.TextIteratorStreamer`` without importing transformers up front."""
+    from transformers import TextIteratorStreamer
+
+    return TextIteratorStreamer(tokenizer, **kwargs)
@@ -0,0 +1,94 @@
+"""Multi-pattern keyword matching (Aho-Corasick) for the text classifier."""
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+# До этого числа слов ``keyword in text`` (поиск в C) быстрее прохода автомата
+# в Python; см. scripts/bench_text_classifier.py
+SUBSTRING_SCAN_LIMIT = 200
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over keyword groups (e.g. categories).
+
+    The automaton is compiled once into a DFA (every state has a direct
+    transition for every character of the keyword alphabet), so scanning a
+    text is one dictionary lookup per character regardless of how many
+    keywords and groups there are. Matches are substring matches, exactly
+    like ``keyword in text``, overlapping keywords included.
+
+    For small keyword sets (``SUBSTRING_SCAN_LIMIT``) the per-keyword
+    substring search is still faster than a Python-level scan, so
+    :meth:`matches` uses it there; the result is the same.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        """Compile the automaton.
+
+        Args:
+            groups: Mapping of group name to its keywords (lower-case)
+        """
+        self.groups: List[str] = list(groups)
+        self.keywords: List[Tuple[int, str]] = []  # (group index, keyword)
+        seen = set()
+        for index, group in enumerate(self.groups):
+            for keyword in groups[group]:
+                keyword = keyword.lower()
+                if keyword and (index, keyword) not in seen:
+                    seen.add((index, keyword))
+                    self.keywords.append((index, keyword))
+        self._delta, self._outputs = self._compile()
+
+    def _compile(self) -> Tuple[List[Dict[str, int]], List[Tuple[int, ...]]]:
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for keyword_id, (_, keyword) in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(keyword_id)
+
+        # BFS: ссылки неудач и полная таблица переходов (DFA)
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            # Переходы, которых нет в боре, берём у состояния-неудачи
+            for ch, target in delta[fail[state]].items():
+                delta[state].setdefault(ch, target)
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(child)
+        return delta, [tuple(ids) for ids in outputs]
+
+    def matches(self, text: str) -> Set[int]:
+        """IDs of keywords occurring in the (already lower-cased) text."""
+        if len(self.keywords) <= SUBSTRING_SCAN_LIMIT:
+            return {keyword_id for keyword_id, (_, keyword) in enumerate(self.keywords) if keyword in text}
+        return self.scan(text)
+
+    def scan(self, text: str) -> Set[int]:
+        """Same as :meth:`matches`, always through the automaton."""
+        delta = self._delta
+        outputs = self._outputs
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each group found in the text."""
+        scores = dict.fromkeys(self.groups, 0)
+        for keyword_id in self.matches(text.lower()):
+            scores[self.groups[self.keywords[keyword_id][0]]] += 1
+        return scores
@@ -1,9 +1,23 @@
-"""Text classification models for AI Agent."""
+"""Text classification models for AI Agent.
+
+The process-wide classifier (:func:`get_text_classifier`) loads its keywords
+from the ``classifier_keywords`` table at bot startup and then re-reads the
+table every ``CLASSIFIER_KEYWORDS_REFRESH_SECONDS`` (default 300, 0 disables),
+so keywords edited in the database reach running bot processes without a
+restart.
+"""
+import asyncio
 import logging
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
+
+from app.ai_agent.models.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
+# Словари классификатора и их имена в таблице classifier_keywords
+DICTIONARIES = ("order", "query", "urgency")
+
 class TextClassifier:
     """Text classifier for categorizing user input."""
     
@@ -32,6 +46,76 @@ class TextClassifier:
             "medium": ["скоро", "в ближайшее время", "нужно"],
             "low": ["когда будет", "планирую", "в будущем"]
         }
+        self._compile()
+
+    def _compile(self) -> None:
+        """Build keyword automata; replacing the references is atomic for readers."""
+        self._order_matcher = KeywordMatcher(self.order_categories)
+        self._query_matcher = KeywordMatcher(self.query_categories)
+        self._urgency_matcher = KeywordMatcher(self.urgency_levels)
+
+    def reload_keywords(
+        self,
+        order_categories: Optional[Dict[str, List[str]]] = None,
+        query_categories: Optional[Dict[str, List[str]]] = None,
+        urgency_levels: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        """Replace keyword dictionaries (None keeps the current one) and recompile.
+
+        Args:
+            order_categories: Order category -> keywords
+            query_categories: Query category -> keywords
+            urgency_levels: Urgency level -> keywords, in priority order
+        """
+        order_matcher = KeywordMatcher(order_categories) if order_categories is not None else self._order_matcher
+        query_matcher = KeywordMatcher(query_categories) if query_categories is not None else self._query_matcher
+        urgency_matcher = KeywordMatcher(urgency_levels) if urgency_levels is not None else self._urgency_matcher
+        if order_categories is not None:
+            self.order_categories = order_categories
+        if query_categories is not None:
+            self.query_categories = query_categories
+        if urgency_levels is not None:
+            self.urgency_levels = urgency_levels
+        self._order_matcher = order_matcher
+        self._query_matcher = query_matcher
+        self._urgency_matcher = urgency_matcher
+
+    async def reload_from_db(self, session) -> Dict[str, int]:
+        """Load keywords from the classifier_keywords table.
+
+        A dictionary that has rows in the table replaces the built-in one;
+        known categories keep their order (it decides ties and urgency
+        priority), new ones are appended. Dictionaries without rows are kept.
+
+        Args:
+            session: Async DB session
+
+        Returns:
+            Number of keywords loaded per dictionary
+        """
+        from sqlalchemy import select
+
+        from app.models import ClassifierKeyword
+
+        rows = (await session.execute(
+            select(ClassifierKeyword.dictionary, ClassifierKeyword.category, ClassifierKeyword.keyword)
+            .order_by(ClassifierKeyword.id)
+        )).all()
+        loaded: Dict[str, Dict[str, List[str]]] = {}
+        for dictionary, category, keyword in rows:
+            if dictionary in DICTIONARIES:
+                loaded.setdefault(dictionary, {}).setdefault(category, []).append(keyword.lower())
+
+        current = {"order": self.order_categories, "query": self.query_categories, "urgency": self.urgency_levels}
+        merged = {}
+        for dictionary, categories in loaded.items():
+            ordered = {name: categories.get(name, []) for name in current[dictionary]}
+            ordered.update(categories)
+            merged[dictionary] = ordered
+        self.reload_keywords(merged.get("order"), merged.get("query"), merged.get("urgency"))
+        counts = {name: sum(len(words) for words in categories.values()) for name, categories in loaded.items()}
+        logger.info("Classifier keywords reloaded from DB: %s", counts)
+        return counts
     
     def classify_order_category(self, text: str) -> str:
         """Classify order category based on text content.
@@ -42,13 +126,10 @@ class TextClassifier:
         Returns:
             Category name
         """
-        text_lower = text.lower()
-        
-        # Count matches for each category
-        category_scores = {}
-        for category, keywords in self.order_categories.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            category_scores[category] = score
+        # Один проход автомата по тексту даёт счёт по всем категориям
+        category_scores = self._order_matcher.scores(text)
+        if not category_scores:
+            return "other"
         
         # Return category with highest score, or 'other' if no matches
         best_category = max(category_scores, key=category_scores.get)
@@ -63,13 +144,9 @@ class TextClassifier:
         Returns:
             Query category
         """
-        text_lower = text.lower()
-        
-        # Count matches for each category
-        category_scores = {}
-        for category, keywords in self.query_categories.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            category_scores[category] = score
+        category_scores = self._query_matcher.scores(text)
+        if not category_scores:
+            return "general"
         
         # Return category with highest score, or 'general' if no matches
         best_category = max(category_scores, key=category_scores.get)
@@ -84,11 +161,10 @@ class TextClassifier:
         Returns:
             Urgency level (high, medium, low)
         """
-        text_lower = text.lower()
-        
-        # Check for urgency keywords
-        for level, keywords in self.urgency_levels.items():
-            if any(keyword in text_lower for keyword in keywords):
+        # Check for urgency keywords: first level (by priority) with any match
+        level_scores = self._urgency_matcher.scores(text)
+        for level, score in level_scores.items():
+            if score:
                 return level
         
         # Default to medium urgency
@@ -113,3 +189,56 @@ class TextClassifier:
         
         # Return unique keywords (up to max_keywords)
         return list(dict.fromkeys(keywords))[:max_keywords]
+
+
+_classifier: Optional[TextClassifier] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def get_text_classifier() -> TextClassifier:
+    """Process-wide classifier shared by the AI agent and the keyword refresh."""
+    global _classifier
+    if _classifier is None:
+        _classifier = TextClassifier()
+    return _classifier
+
+
+async def load_classifier_keywords(session_factory=None) -> Dict[str, int]:
+    """Reload the shared classifier from the classifier_keywords table."""
+    if session_factory is None:
+        from core.db import SessionFactory as session_factory
+    async with session_factory() as session:
+        return await get_text_classifier().reload_from_db(session)
+
+
+async def _refresh_keywords(interval: float, session_factory) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_classifier_keywords(session_factory)
+        except Exception as e:
+            logger.warning("Classifier keywords refresh failed: %s", e)
+
+
+def start_keyword_refresh(interval: Optional[float] = None, session_factory=None) -> None:
+    """Re-read the keywords every ``interval`` seconds in the background (0 disables)."""
+    global _refresh_task
+    if interval is None:
+        interval = float(os.getenv("CLASSIFIER_KEYWORDS_REFRESH_SECONDS", "300"))
+    if interval <= 0 or (_refresh_task is not None and not _refresh_task.done()):
+        return
+    _refresh_task = asyncio.get_running_loop().create_task(
+        _refresh_keywords(interval, session_factory), name="classifier-keywords-refresh"
+    )
+
+
+async def stop_keyword_refresh() -> None:
+    """Cancel the background refresh (registered on dispatcher shutdown)."""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _refresh_task = None
@@ -0,0 +1,155 @@
+"""Process-wide registry of loaded AI backends.
+
+``get_ai_response`` used to build a new :class:`GeminiAI` and load the HF
+fallback (tokenizer + weights) for every question. The registry owns one
+initialized backend per process and hands it out to callers:
+
+- the backend is created and initialized once, under a lock, so concurrent
+  first requests do not load the model several times;
+- ``warm_up()`` loads it ahead of the first user request (bot startup);
+- ``health()`` reports state, active backend, load time and last error;
+- when the AI env configuration changes (key, model name, token limit) the
+  next ``get()`` builds a fresh backend, a failed load is retried only after
+  ``retry_after`` seconds instead of on every request.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Переменные окружения, изменение которых требует пересоздать бэкенд
+CONFIG_ENV_VARS = ("API_GEMINI_FREE", "GEMINI_MODEL_NAME", "AI_MODEL_NAME", "AI_MAX_NEW_TOKENS")
+
+
+def _config_fingerprint() -> str:
+    raw = "\0".join(os.getenv(name) or "" for name in CONFIG_ENV_VARS)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class ModelRegistry:
+    """Owns the process-wide AI backend (Gemini client and/or HF pipeline)."""
+
+    def __init__(self, factory: Callable[[], Any] | None = None, *, retry_after: float = 60.0) -> None:
+        self._factory = factory
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._backend: Any = None
+        self._fingerprint: str | None = None
+        self._failed_at: float | None = None
+        self.state = "cold"
+        self.load_seconds: float | None = None
+        self.loaded_at: float | None = None
+        self.last_error: str | None = None
+        self.loads = 0
+
+    def _create(self) -> Any:
+        if self._factory is not None:
+            return self._factory()
+        from app.ai_agent.simple_ai import GeminiAI
+
+        return GeminiAI()
+
+    def get(self) -> Any:
+        """Return the initialized backend, loading or reloading it if needed."""
+        fingerprint = _config_fingerprint()
+        backend = self._backend
+        if backend is not None and self._fingerprint == fingerprint and not self._should_retry():
+            return backend
+        with self._lock:
+            if self._backend is None or self._fingerprint != fingerprint or self._should_retry():
+                self._load(fingerprint)
+            return self._backend
+
+    def _should_retry(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at >= self.retry_after
+
+    def _load(self, fingerprint: str) -> None:
+        if self._backend is not None and self._fingerprint != fingerprint:
+            logger.info("AI configuration changed, reloading backend")
+        self.state = "loading"
+        started = time.perf_counter()
+        backend = self._create()
+        try:
+            backend.initialize()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = repr(e)
+            logger.error("AI backend initialization failed: %s", e)
+        self.load_seconds = time.perf_counter() - started
+        self.loaded_at = time.time()
+        self.loads += 1
+        self._backend = backend
+        self._fingerprint = fingerprint
+
+        active = self.active_backend
+        if active is None:
+            self.state = "failed"
+            self._failed_at = time.monotonic()
+        else:
+            self.state = "ready"
+            self._failed_at = None
+        logger.info("AI backend loaded: state=%s backend=%s in %.2fs", self.state, active, self.load_seconds)
+
+    @property
+    def active_backend(self) -> str | None:
+        """"gemini", "hf" or None if nothing could be initialized."""
+        backend = self._backend
+        if backend is None:
+            return None
+        if getattr(backend, "_gemini_model", None) is not None:
+            return "gemini"
+        if getattr(backend, "_pipe", None) is not None:
+            return "hf"
+        return None
+
+    def warm_up(self, prompt: str | None = None) -> bool:
+        """Load the backend (and optionally run one generation); True if it is usable."""
+        backend = self.get()
+        if prompt and self.active_backend is not None:
+            try:
+                backend.get_response(prompt)
+            except Exception as e:
+                logger.warning("AI warm-up generation failed: %s", e)
+        return self.state == "ready"
+
+    def reload(self) -> Any:
+        """Drop the current backend and load a new one."""
+        with self._lock:
+            self._load(_config_fingerprint())
+            return self._backend
+
+    def reset(self) -> None:
+        """Forget the backend; the next ``get()`` loads it again."""
+        with self._lock:
+            self._backend = None
+            self._fingerprint = None
+            self._failed_at = None
+            self.state = "cold"
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "backend": self.active_backend,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "loaded_at": self.loaded_at,
+            "loads": self.loads,
+            "last_error": self.last_error,
+        }
+
+
+_registry: ModelRegistry | None = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry instance."""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
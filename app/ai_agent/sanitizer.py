@@ -0,0 +1,146 @@
+"""Cleanup of LLM output: markers, repeated punctuation/words, duplicate sentences.
+
+:func:`sanitize` cleans a complete answer. Patterns are compiled once at
+import, and short duplicate sentences are dropped in one pass over the
+sentence delimiters, without building a split list.
+
+:class:`StreamingSanitizer` does the same cleanup on partial output
+(tokens or chunks as the model produces them). It releases a sentence as
+soon as its delimiter is complete. Concatenating everything it returns
+gives exactly ``sanitize(full_text)``.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+
+# Служебный префикс ответа модели: "Ответ:", "Assistant:", "Bot:"
+_MARKER_RE = re.compile(r"^(Ответ|Assistant|Bot)\s*:\s*", re.IGNORECASE)
+# Префикс, который ещё может стать маркером, когда придёт ":"
+_MARKER_HEAD_RE = re.compile(r"(Ответ|Assistant|Bot)\s*", re.IGNORECASE)
+_MARKER_WORDS = ("ответ", "assistant", "bot")
+_PUNCT_RUN_RE = re.compile(r"([!?.,])\1{2,}")
+_WORD_RUN_RE = re.compile(r"\b(\w{1,3})\b(\s+\1\b){2,}", re.IGNORECASE)
+# Пробелы перед знаками препинания не ищем: предложение всё равно обрезается
+# strip(), а границы (конец разделителя) те же, что у ``\s*[!?.]+\s*``
+_DELIM_RE = re.compile(r"[!?.]+\s*")
+
+
+def _collapse(text: str) -> str:
+    """3+ одинаковых знака препинания -> 2, серия одного короткого слова -> одно слово."""
+    return _WORD_RUN_RE.sub(r"\1", _PUNCT_RUN_RE.sub(r"\1\1", text))
+
+
+def _sentences(text: str) -> Iterator[str]:
+    """Sentences with their delimiters, stripped (empty ones included)."""
+    pos = 0
+    for match in _DELIM_RE.finditer(text):
+        end = match.end()
+        yield text[pos:end].strip()
+        pos = end
+    yield text[pos:].strip()
+
+
+class _ShortSentenceFilter:
+    """Drops consecutive repeats of a short sentence ("Что? Что? Что?")."""
+
+    __slots__ = ("_last_short",)
+
+    def __init__(self) -> None:
+        self._last_short: str | None = None
+
+    def accept(self, sentence: str) -> bool:
+        if not sentence:
+            return False
+        words = sentence.lower().split()
+        norm = " ".join(words)
+        # Короткое: до 12 символов или не больше двух слов
+        is_short = len(words) <= 2 or len(norm) <= 12
+        keep = not (is_short and self._last_short == norm)
+        self._last_short = norm if is_short else None
+        return keep
+
+
+def _dedupe(sentences: Iterable[str]) -> list[str]:
+    accept = _ShortSentenceFilter().accept
+    return [sentence for sentence in sentences if accept(sentence)]
+
+
+def sanitize(text: str) -> str:
+    """Clean up a complete LLM answer: remove excessive repeats and artifacts."""
+    text = _MARKER_RE.sub("", text.strip())
+    return " ".join(_dedupe(_sentences(_collapse(text))))
+
+
+class StreamingSanitizer:
+    """Incremental :func:`sanitize` for output that arrives in chunks.
+
+    ``feed()`` returns the cleaned text that became final with the chunk
+    (possibly ``""``), ``finish()`` returns the rest. A sentence is held back
+    until the character after its delimiter arrives, because the delimiter
+    may continue ("?" -> "?!") and the next sentence may repeat it.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._head = True  # маркер в начале ответа ещё не разобран
+        self._filter = _ShortSentenceFilter()
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        if self._head and not self._resolve_head():
+            return ""
+        buffer = self._buffer
+        pos = 0
+        settled: list[str] = []
+        for match in _DELIM_RE.finditer(buffer):
+            end = match.end()
+            if end == len(buffer):
+                break  # разделитель может продолжиться в следующем фрагменте
+            settled.append(_collapse(buffer[pos:end]).strip())
+            pos = end
+        self._buffer = buffer[pos:]
+        return self._emit(settled)
+
+    def finish(self) -> str:
+        """Flush the held-back tail; the sanitizer must not be fed afterwards."""
+        rest = self._buffer
+        self._buffer = ""
+        if self._head:
+            self._head = False
+            rest = _MARKER_RE.sub("", rest.strip())
+        return self._emit(_sentences(_collapse(rest)))
+
+    def preview(self) -> str:
+        """Cleaned held-back tail for display; it may still change or be dropped."""
+        if self._head:
+            return ""
+        return _collapse(self._buffer).strip()
+
+    def _resolve_head(self) -> bool:
+        """Strip the leading marker once it is decidable; False while it is not."""
+        buffer = self._buffer.lstrip()
+        self._buffer = buffer
+        if not buffer:
+            return False
+        match = _MARKER_RE.match(buffer)
+        if match is not None:
+            if match.end() == len(buffer):
+                return False  # после ":" могут прийти ещё пробелы
+            self._buffer = buffer[match.end():]
+        elif _MARKER_HEAD_RE.fullmatch(buffer) or any(word.startswith(buffer.lower()) for word in _MARKER_WORDS):
+            return False
+        self._head = False
+        return True
+
+    def _emit(self, sentences: Iterable[str]) -> str:
+        accept = self._filter.accept
+        kept = [sentence for sentence in sentences if accept(sentence)]
+        if not kept:
+            return ""
+        text = " ".join(kept)
+        if self._started:
+            text = " " + text
+        self._started = True
+        return text
@@ -2,18 +2,22 @@
 
 Public interface remains the same to avoid changes in other modules:
 - class GeminiAI with .initialize() and .get_response(prompt)
+  (plus .stream_response(prompt) for incremental output)
 - function get_ai_response(user_input: str, use_gemini: bool = True)
 
 Behavior:
 - Если задан `API_GEMINI_FREE`, используется Gemini (по умолчанию ``gemini-2.0-flash``)
-- Иначе используется локальная HF text2text модель (по умолчанию ``cointegrated/rut5-base-multitask``)
+- Иначе используется локальная HF text2text модель (по умолчанию ``cointegrated/rut5-base-multitask``);
+  transformers/torch импортируются только при её загрузке, веса можно квантовать (AI_MODEL_QUANTIZE)
 - Ответы короткие по умолчанию: лимит через AI_MAX_NEW_TOKENS (по умолчанию 60)
 """
 import logging
+import threading
+import time
+from collections.abc import Iterator
 from typing import Optional
 
 import os
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
 
 # Optional import: google-generativeai
 try:  # pragma: no cover
@@ -21,8 +25,24 @@ try:  # pragma: no cover
 except Exception:  # pragma: no cover
     genai = None  # type: ignore
 
+from app.ai_agent.answer_cache import get_answer_cache
+from app.ai_agent.local_model import load_seq2seq, quantize_mode, text_iterator_streamer
+from app.ai_agent.registry import get_model_registry
+from app.ai_agent.sanitizer import sanitize
+
 logger = logging.getLogger(__name__)
 
+# Ответ модели обрезается до стольких символов (с "..." в конце)
+SHORT_ANSWER_LIMIT = 200
+
+
+def pipeline(*args, **kwargs):
+    """``transformers.pipeline``, imported on first use (see app.ai_agent.local_model)."""
+    from transformers import pipeline as hf_pipeline
+
+    return hf_pipeline(*args, **kwargs)
+
+
 class GeminiAI:
     """Cloud-first (Gemini) text generator with local HF fallback.
 
@@ -43,6 +63,11 @@ class GeminiAI:
         # Lazy-initialized clients
         self._gemini_model = None
         self._pipe = None  # HF text2text-generation pipeline
+        # Неудачная загрузка HF не повторяется на каждом запросе
+        self._hf_failed_at: float | None = None
+        self.hf_retry_seconds = float(os.getenv("AI_INIT_RETRY_SECONDS", "60"))
+        # Сколько ждать следующий токен локальной модели при потоковой генерации
+        self.stream_timeout = float(os.getenv("AI_STREAM_TOKEN_TIMEOUT", "30"))
 
     def _init_gemini(self) -> bool:
         """Initialize Gemini client if api key is available."""
@@ -70,22 +95,25 @@ class GeminiAI:
         """Initialize local HF fallback."""
         if self._pipe is not None:
             return True
+        if self._hf_failed_at is not None and time.monotonic() - self._hf_failed_at < self.hf_retry_seconds:
+            return False
         # По умолчанию используем русскоязычную инструкционную модель
         local_model_name = os.getenv("AI_MODEL_NAME", "cointegrated/rut5-base-multitask")
+        quantize = quantize_mode()
         try:
-            tokenizer = AutoTokenizer.from_pretrained(local_model_name)
-            model = AutoModelForSeq2SeqLM.from_pretrained(local_model_name)
+            tokenizer, model = load_seq2seq(local_model_name, quantize=quantize)
             self._pipe = pipeline(
                 "text2text-generation",
                 model=model,
                 tokenizer=tokenizer,
                 device=-1,  # CPU
             )
-            logger.info("HF pipeline initialized on CPU: %s", local_model_name)
+            logger.info("HF pipeline initialized on CPU: %s (weights: %s)", local_model_name, quantize)
             return True
         except Exception as e:  # pragma: no cover
             logger.error(f"Ошибка инициализации локальной модели: {e}")
             self._pipe = None
+            self._hf_failed_at = time.monotonic()
             return False
 
     def initialize(self) -> None:
@@ -113,11 +141,7 @@ class GeminiAI:
                         "top_p": 0.9,
                     },
                 )
-                text = getattr(resp, "text", None) or ""
-                text = _sanitize_text(text)
-                if len(text) > 200:
-                    text = text[:200] + "..."
-                return text.strip() or None
+                return shorten_response(getattr(resp, "text", None) or "")
             except Exception as e:  # pragma: no cover
                 logger.error(f"Ошибка генерации Gemini: {e}")
                 # fall through to HF
@@ -132,55 +156,156 @@ class GeminiAI:
                     num_beams=1,
                     early_stopping=True,
                 )
-                text = outputs[0]["generated_text"]
-                text = _sanitize_text(text)
-                if len(text) > 200:
-                    text = text[:200] + "..."
-                return text.strip() or None
+                return shorten_response(outputs[0]["generated_text"])
             except Exception as e:
                 logger.error(f"Ошибка генерации локальной модели: {e}")
 
         return None
 
-def _sanitize_text(text: str) -> str:
-    """Clean up LLM output: remove excessive repeats and artifacts."""
-    import re
-    s = text.strip()
-    # Remove leading markers like "Ответ:" or "Assistant:"
-    s = re.sub(r"^(Ответ|Assistant|Bot)\s*:\s*", "", s, flags=re.IGNORECASE)
-
-    # Collapse 3+ repeated punctuation
-    s = re.sub(r"([!?.,])\1{2,}", r"\1\1", s)
-    # Remove long runs of the same short word
-    s = re.sub(r"\b(\w{1,3})\b(\s+\1\b){2,}", r"\1", s, flags=re.IGNORECASE)
-
-    # Sentence-level de-duplication for short sentences like "Что?"
-    parts = re.split(r"(\s*[!?\.]+\s*)", s)  # keep delimiters
-    rebuilt: list[str] = []
-    last_short_norm: str | None = None
-
-    def norm_sent(x: str) -> str:
-        return re.sub(r"\s+", " ", x.strip().lower())
-
-    i = 0
-    while i < len(parts):
-        sent = parts[i]
-        delim = parts[i + 1] if i + 1 < len(parts) else ""
-        full = (sent + (delim or "")).strip()
-        if full:
-            sent_norm = norm_sent(full)
-            # consider short if <= 12 chars or <= 2 words
-            is_short = len(sent_norm) <= 12 or len(sent_norm.split()) <= 2
-            if is_short and last_short_norm == sent_norm:
-                # skip consecutive duplicate
-                pass
-            else:
-                rebuilt.append(full)
-            last_short_norm = sent_norm if is_short else None
-        i += 2
-
-    s = " ".join(rebuilt).strip()
-    return s
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """Yield raw text chunks as they are generated (Gemini or local fallback).
+
+        Chunks are not sanitized or shortened; concatenated they are the text
+        that :meth:`get_response` passes to ``shorten_response``. Yields nothing if
+        both backends are unavailable.
+        """
+        self.initialize()
+
+        if self._gemini_model is not None:
+            produced = False
+            try:
+                stream = self._gemini_model.generate_content(
+                    prompt,
+                    generation_config={
+                        "max_output_tokens": self.max_new_tokens,
+                        "temperature": 0.2,
+                        "top_p": 0.9,
+                    },
+                    stream=True,
+                )
+                for chunk in stream:
+                    text = getattr(chunk, "text", None)
+                    if text:
+                        produced = True
+                        yield text
+                return
+            except Exception as e:  # pragma: no cover
+                logger.error(f"Ошибка потоковой генерации Gemini: {e}")
+                if produced:
+                    return
+                # fall through to HF
+
+        if self._pipe is not None:
+            tokenizer = self._pipe.tokenizer
+            # Декодер seq2seq начинает со служебного токена: skip_prompt его пропускает
+            streamer = text_iterator_streamer(
+                tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=self.stream_timeout
+            )
+            inputs = tokenizer(prompt, return_tensors="pt")
+            worker = threading.Thread(
+                target=self._pipe.model.generate,
+                kwargs=dict(
+                    **inputs,
+                    streamer=streamer,
+                    max_new_tokens=self.max_new_tokens,
+                    do_sample=False,  # deterministic
+                    num_beams=1,
+                ),
+                name="ai-stream",
+                daemon=True,
+            )
+            worker.start()
+            try:
+                for text in streamer:
+                    if text:
+                        yield text
+            except Exception as e:
+                logger.error(f"Ошибка потоковой генерации локальной модели: {e}")
+            finally:
+                worker.join(self.stream_timeout)
+
+    def get_responses(self, prompts: list[str]) -> list[Optional[str]]:
+        """Generate responses for several prompts at once.
+
+        The local HF model runs them as one padded batch (one forward pass per
+        decoding step for the whole batch); Gemini requests are independent
+        network calls and are made one by one.
+        """
+        self.initialize()
+        if self._gemini_model is not None or self._pipe is None:
+            return [self.get_response(prompt) for prompt in prompts]
+        try:
+            outputs = self._pipe(
+                list(prompts),
+                batch_size=len(prompts),
+                max_new_tokens=self.max_new_tokens,
+                do_sample=False,  # deterministic
+                num_beams=1,
+                early_stopping=True,
+            )
+        except Exception as e:
+            logger.error(f"Ошибка пакетной генерации локальной модели: {e}")
+            return [None] * len(prompts)
+        results: list[Optional[str]] = []
+        for output in outputs:
+            if isinstance(output, list):
+                output = output[0]
+            results.append(shorten_response(output["generated_text"]))
+        return results
+
+
+def shorten_response(text: str) -> Optional[str]:
+    """Sanitize model output and cut it to 200 characters."""
+    text = sanitize(text)
+    if len(text) > SHORT_ANSWER_LIMIT:
+        text = text[:SHORT_ANSWER_LIMIT] + "..."
+    return text.strip() or None
+
+
+def quick_reply(user_input: str) -> Optional[str]:
+    """Ответ без модели для слишком коротких/неинформативных вопросов (иначе None)."""
+    # If input is too short or non-informative, ask a clarifying question
+    short = len(user_input.strip()) < 5
+    if short or user_input.strip().lower() in {"что", "что?", "??", "помощь", "help"}:
+        return (
+            "Чем могу помочь? Кратко опишите задачу: что нужно сделать, где и когда. "
+            "Например: ‘Сантехник для замены смесителя, Алматы, сегодня вечером’."
+        )
+    return None
+
+
+def build_prompt(user_input: str) -> str:
+    """Промпт ассистента для вопроса пользователя."""
+    return (
+        "Инструкция: Ты — ассистент русскоязычного сервиса GoodRobot по поиску мастеров. "
+        "Отвечай кратко (1–2 предложения), по делу и без лишней воды. Если вопрос общий, кратко объясни: "
+        "как создать заявку, как выбрать мастера, как проходит оплата. Избегай повторов и бессмысленных фраз.\n\n"
+        f"Вопрос: {user_input}\n"
+        "Краткий ответ:"
+    )
+
+
+def finalize_response(generated_text: Optional[str], question: Optional[str] = None) -> str:
+    """Очистить ответ модели и подставить понятный текст, если ответа нет.
+
+    Если передан ``question``, содержательный ответ кладётся в кэш ответов.
+    """
+    if not generated_text:
+        return (
+            "Извините, я не могу дать точный ответ на этот вопрос. "
+            "Попробуйте задать более конкретный вопрос."
+        )
+
+    cleaned = sanitize(generated_text)
+    # If still low-signal after cleaning, provide structured fallback
+    if len(cleaned) < 5:
+        return (
+            "Не совсем понимаю запрос. Уточните, пожалуйста: категорию работ, адрес и удобное время. "
+            "Например: ‘Электрик, замена розетки, завтра 10:00’."
+        )
+    if question is not None:
+        get_answer_cache().put(question, cleaned)
+    return cleaned
 
 
 def get_ai_response(user_input: str, use_gemini: bool = True) -> str:
@@ -191,40 +316,17 @@ def get_ai_response(user_input: str, use_gemini: bool = True) -> str:
     try:
         logger.info("Пробуем Gemini 2.0 (короткие ответы), фоллбек на локальную модель")
 
-        gemini = GeminiAI()
-        gemini.initialize()
+        quick = quick_reply(user_input)
+        if quick is not None:
+            return quick
+        # Похожий вопрос уже задавали — отвечаем без модели
+        cached = get_answer_cache().get(user_input)
+        if cached is not None:
+            return cached
 
-        # If input is too short or non-informative, ask a clarifying question
-        short = len(user_input.strip()) < 5
-        if short or user_input.strip().lower() in {"что", "что?", "??", "помощь", "help"}:
-            return (
-                "Чем могу помочь? Кратко опишите задачу: что нужно сделать, где и когда. "
-                "Например: ‘Сантехник для замены смесителя, Алматы, сегодня вечером’."
-            )
-
-        prompt = (
-            "Инструкция: Ты — ассистент русскоязычного сервиса GoodRobot по поиску мастеров. "
-            "Отвечай кратко (1–2 предложения), по делу и без лишней воды. Если вопрос общий, кратко объясни: "
-            "как создать заявку, как выбрать мастера, как проходит оплата. Избегай повторов и бессмысленных фраз.\n\n"
-            f"Вопрос: {user_input}\n"
-            "Краткий ответ:"
-        )
-
-        generated_text = gemini.get_response(prompt)
-        if not generated_text:
-            return (
-                "Извините, я не могу дать точный ответ на этот вопрос. "
-                "Попробуйте задать более конкретный вопрос."
-            )
-
-        cleaned = _sanitize_text(generated_text)
-        # If still low-signal after cleaning, provide structured fallback
-        if len(cleaned) < 5:
-            return (
-                "Не совсем понимаю запрос. Уточните, пожалуйста: категорию работ, адрес и удобное время. "
-                "Например: ‘Электрик, замена розетки, завтра 10:00’."
-            )
-        return cleaned
+        # Один загруженный бэкенд на процесс (см. app.ai_agent.registry)
+        gemini = get_model_registry().get()
+        return finalize_response(gemini.get_response(build_prompt(user_input)), user_input)
     except Exception as e:
         logger.error(f"Ошибка генерации ответа: {e}")
         return "Извините, в настоящее время у меня технические трудности. Попробуйте позже."
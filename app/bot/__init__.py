@@ -1,13 +1,30 @@
 """Bot subpackage with Aiogram setup."""
 
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from core.config import get_settings
 
 settings = get_settings()
 
+
+def create_storage() -> BaseStorage:
+    """FSM storage selected by FSM_STORAGE (memory | db)."""
+    if settings.fsm_storage.lower() == "db":
+        from app.bot.storage import SQLAlchemyStorage
+        from core.db import SessionFactory
+
+        return SQLAlchemyStorage(
+            SessionFactory,
+            state_ttl=settings.fsm_state_ttl,
+            cache_ttl=settings.fsm_cache_ttl,
+            cache_size=settings.fsm_cache_size,
+        )
+    return MemoryStorage()
+
+
 bot = Bot(token=settings.bot_token, parse_mode="HTML")
-dp = Dispatcher(storage=MemoryStorage())
+dp = Dispatcher(storage=create_storage())
 
 __all__ = ["bot", "dp"]
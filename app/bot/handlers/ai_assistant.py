@@ -1,16 +1,24 @@
 """AI Assistant handler for GoodRobot bot (local LLM)."""
 import logging
-from asyncio import get_running_loop
+import os
 
 from aiogram import F, Router
 from aiogram.types import Message
 
-# Импортируем локальную реализацию ИИ (DistilGPT-2 через Transformers)
-from app.ai_agent.simple_ai import get_ai_response
+# Вопросы идут через общий пакетный обработчик локальной модели
+from app.ai_agent.answer_cache import get_answer_cache
+from app.ai_agent.batching import InferenceOverloaded, stream_answer
+from app.ai_agent.simple_ai import quick_reply
+from app.bot.startup import get_startup
+from app.bot.streaming import DEFAULT_EDIT_INTERVAL, StreamedReply
 
 logger = logging.getLogger(__name__)
 router = Router()
 
+# Как часто (сек) обновлять сообщение с ответом, пока модель его пишет
+STREAM_EDIT_INTERVAL = float(os.getenv("AI_STREAM_EDIT_INTERVAL", str(DEFAULT_EDIT_INTERVAL)))
+AI_WARMING_UP_TEXT = "🤖 ИИ-помощник ещё запускается. Попробуйте, пожалуйста, через минуту."
+
 # Состояния для отслеживания диалога с ИИ
 ai_users = set()
 
@@ -54,15 +62,21 @@ async def ai_assistant_query(message: Message) -> None:
     if message.from_user.id not in ai_users:
         return
 
-    try:
-        loop = get_running_loop()
-        response = await loop.run_in_executor(
-            None,
-            get_ai_response,
-            message.text,
-            True  # параметр сохраняем для совместимости; внутри игнорируется
-        )
+    if get_startup().is_warming("ai"):
+        # Модель ещё грузится в фоне: отвечаем тем, что есть без неё
+        response = quick_reply(message.text) or get_answer_cache().get(message.text) or AI_WARMING_UP_TEXT
         await message.answer(response)
+        return
+
+    # Ответ показывается по мере генерации и дописывается правками сообщения
+    reply = StreamedReply(message, min_interval=STREAM_EDIT_INTERVAL)
+    try:
+        response = ""
+        async for response in stream_answer(message.text):
+            await reply.update(response)
+        await reply.finish(response)
+    except InferenceOverloaded:
+        await reply.finish("Сейчас много вопросов к помощнику. Попробуйте, пожалуйста, через минуту.")
     except Exception as e:
         logger.error(f"Ошибка ИИ: {e}")
-        await message.answer("Извините, не могу обработать запрос")
+        await reply.finish("Извините, не могу обработать запрос")
@@ -4,10 +4,13 @@ MVP flow:
 - Clients and Masters open chat from main menu ("💬 Чат") or from tracking via "open_chat:{order_id}".
 - Chat session is created (or reused if active) bound to an Order and users.
 - Messages are relayed via the bot; supported: text, photo, video, voice, document.
+- Session participants and status are cached on open (app.services.chat_context),
+  so relaying a message needs no DB lookups.
 - Users can close chat via inline button; status switches to 'closed'.
 
 Safety notes:
-- We store minimal message metadata (text or file_id) in DB.
+- We store minimal message metadata (text or file_id) in DB, written in batches
+  by the chat journal (app.services.chat_journal).
 - We ensure role validation and that order belongs to users.
 """
 from __future__ import annotations
@@ -28,7 +31,9 @@ from aiogram.types import (
 from sqlalchemy import and_, select
 
 from app.bot.states import ClientActions, MasterActions
-from app.models import ChatMessage, ChatSession, Order, User
+from app.models import ChatSession, Order, User
+from app.services.chat_context import invalidate_chat, load_chat_context, remember_chat
+from app.services.chat_journal import get_chat_journal
 from core.db import SessionFactory
 
 logger = logging.getLogger("bot.chat")
@@ -181,6 +186,11 @@ async def open_chat(callback: CallbackQuery, state: FSMContext) -> None:
         order_id=order.id,
         peer_tg_id=other.tg_id,
     )
+    # Участники и статус для пересылки: сообщения чата идут без запросов к БД
+    if user.role == "master":
+        remember_chat(session_obj, client=other, master=user)
+    else:
+        remember_chat(session_obj, client=user, master=other)
 
     # Notify and present controls
     try:
@@ -228,6 +238,7 @@ async def close_chat(callback: CallbackQuery, state: FSMContext) -> None:
         cs.closed_at = now
         cs.last_activity_at = now
         await db.commit()
+        invalidate_chat(session_id)
 
         # Determine peer
         peer_id = cs.master_id if u.id == cs.client_id else cs.client_id
@@ -248,46 +259,25 @@ async def close_chat(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer()
 
 
-# ===== Relay helpers =====
-
-async def persist_message(
-    db_session,
-    session_id: int,
-    sender_id: int,
-    receiver_id: int,
-    message_type: str,
-    content_text: Optional[str] = None,
-    file_id: Optional[str] = None,
-) -> None:
-    msg = ChatMessage(
-        session_id=session_id,
-        sender_id=sender_id,
-        receiver_id=receiver_id,
-        message_type=message_type,
-        content_text=content_text,
-        file_id=file_id,
-    )
-    db_session.add(msg)
-    # Update activity on session
-    cs = (
-        await db_session.execute(select(ChatSession).where(ChatSession.id == session_id))
-    ).scalars().first()
-    if cs:
-        cs.last_activity_at = datetime.datetime.utcnow()
-    await db_session.commit()
-
+# ===== Relay =====
 
 async def relay_to_peer(message: Message, state: FSMContext, role: str) -> None:
     data = await state.get_data()
     session_id = data.get("chat_session_id")
-    peer_tg_id = data.get("peer_tg_id")
     order_id = data.get("order_id")
 
-    if not session_id or not peer_tg_id:
+    context = await load_chat_context(session_id) if session_id else None
+    participants = context.participants(message.from_user.id) if context else None
+    if participants is None:
         await message.answer("Чат не инициализирован. Откройте чат снова.")
         return
+    if not context.is_active:
+        # Собеседник закрыл чат: его состояние уже сброшено, сбрасываем и это
+        await state.clear()
+        await message.answer("Чат закрыт.")
+        return
 
-    sender_tg = message.from_user.id
+    peer_tg_id = participants.receiver_tg_id
 
     # Determine type and send
     sent_ok = False
@@ -339,24 +329,15 @@ async def relay_to_peer(message: Message, state: FSMContext, role: str) -> None:
     if not sent_ok:
         return
 
-    # Persist in DB
-    async with SessionFactory() as db:
-        sender: Optional[User] = (
-            await db.execute(select(User).where(User.tg_id == sender_tg))
-        ).scalars().first()
-        receiver: Optional[User] = (
-            await db.execute(select(User).where(User.tg_id == peer_tg_id))
-        ).scalars().first()
-        if sender and receiver:
-            await persist_message(
-                db_session=db,
-                session_id=session_id,
-                sender_id=sender.id,
-                receiver_id=receiver.id,
-                message_type=msg_type,
-                content_text=text,
-                file_id=file_id,
-            )
+    # Persist in DB: write-behind journal, the relay does not wait for the commit
+    get_chat_journal().record(
+        session_id=context.session_id,
+        sender_id=participants.sender_id,
+        receiver_id=participants.receiver_id,
+        message_type=msg_type,
+        content_text=text,
+        file_id=file_id,
+    )
 
     # Keep controls visible for the sender
     try:
@@ -32,6 +32,10 @@ from app.services.assignments import (
     AssignmentError,
     select_bid as service_select_bid,
 )
+from app.services.fanout import get_notification_fanout
+from app.services.identity import UserIdentity, invalidate_user
+from app.services.matching import find_candidate_masters
+from core.cache_service import master_categories_cache
 
 logger = logging.getLogger("bot.client")
 
@@ -146,6 +150,7 @@ async def cmd_start(message: Message, state: FSMContext) -> None:
             # Assign partner role and ensure Partner record
             user.role = "partner"
             await session.commit()
+            invalidate_user(tg_id)
             partner = (await session.execute(
                 select(Partner).where(Partner.user_id == user.id)
             )).scalars().first()
@@ -183,6 +188,7 @@ async def choose_role(callback: CallbackQuery, state: FSMContext) -> None:
         if user:
             user.role = role
             await session.commit()
+            invalidate_user(tg_id)
 
     if role == "client":
         await callback.message.edit_text(
@@ -214,7 +220,7 @@ async def choose_role(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data.startswith("order:"))
-async def view_order_details_client(callback: CallbackQuery, state: FSMContext) -> None:
+async def view_order_details_client(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать детали заказа для клиента с кнопкой перехода к ставкам."""
     try:
         order_id = int(callback.data.split(":", 1)[1])
@@ -224,7 +230,7 @@ async def view_order_details_client(callback: CallbackQuery, state: FSMContext)
 
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         order = (await session.execute(select(Order).where(Order.id == order_id))).scalars().first()
         if not order or not user or order.client_id != user.id:
             await callback.answer("Заказ не найден", show_alert=True)
@@ -260,7 +266,7 @@ async def view_order_details_client(callback: CallbackQuery, state: FSMContext)
 
 
 @router.callback_query(F.data.startswith("order_bids:"))
-async def order_bids_list(callback: CallbackQuery, state: FSMContext) -> None:
+async def order_bids_list(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать список ставок по заказу для клиента."""
     try:
         order_id = int(callback.data.split(":", 1)[1])
@@ -270,7 +276,7 @@ async def order_bids_list(callback: CallbackQuery, state: FSMContext) -> None:
 
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         order = (await session.execute(select(Order).where(Order.id == order_id))).scalars().first()
         if not order or not user or order.client_id != user.id:
             await callback.answer("Заказ не найден", show_alert=True)
@@ -433,7 +439,7 @@ async def process_location(message: Message, state: FSMContext) -> None:
 
 
 @router.message(ClientActions.waiting_location, F.location)
-async def update_client_location(message: Message, state: FSMContext) -> None:
+async def update_client_location(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик обновления геолокации клиентом по запросу мастера."""
     # Получаем координаты из объекта геолокации
     latitude = message.location.latitude
@@ -455,7 +461,7 @@ async def update_client_location(message: Message, state: FSMContext) -> None:
 
     async with SessionFactory() as session:
         # Получаем клиента
-        client = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        client = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not client:
             await message.answer(
                 "Не удалось найти ваш профиль. Используйте /start для начала работы.",
@@ -532,7 +538,7 @@ async def update_client_location(message: Message, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data.startswith("decline_location:"))
-async def decline_location_update(callback: CallbackQuery, state: FSMContext):
+async def decline_location_update(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None):
     """Обработчик отказа клиента от обновления геолокации."""
     # Получаем данные из состояния
     data = await state.get_data()
@@ -550,7 +556,7 @@ async def decline_location_update(callback: CallbackQuery, state: FSMContext):
 
     async with SessionFactory() as session:
         # Получаем клиента
-        client = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        client = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not client:
             await callback.message.edit_text(
                 "Не удалось найти ваш профиль. Используйте /start для начала работы."
@@ -776,12 +782,12 @@ async def process_description(message: Message, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "confirm:yes")
-async def order_create_confirm_handler(callback: CallbackQuery, state: FSMContext):
+async def order_create_confirm_handler(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None):
     # Save order to DB
     data = await state.get_data()
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
 
         # Создаем заказ в БД
         order = Order(
@@ -797,44 +803,65 @@ async def order_create_confirm_handler(callback: CallbackQuery, state: FSMContex
         await session.commit()
         await session.refresh(order)
 
-        # Уведомляем всех мастеров
-        masters = (await session.execute(
-            select(User).where(User.role == "master")
-        )).scalars().all()
+        # Уведомляем только подходящих мастеров: категория/специализация и, если задан радиус, расстояние
+        order_lat, order_lon = _parse_coordinates(data.get("latitude"), data.get("longitude"))
+        master_tg_ids = await find_candidate_masters(
+            session,
+            data["category"],
+            latitude=order_lat,
+            longitude=order_lon,
+            radius_km=get_settings().master_match_radius_km,
+            exclude_user_id=user.id,
+            # Мастера категории из индекса (только при общем кэше), иначе их найдёт запрос
+            category_master_ids=await master_categories_cache.masters_for_category(session, data["category"]),
+        )
 
         await state.clear()
-        await callback.message.edit_text("Заявка создана! Мастера будут уведомлены.")
+        if master_tg_ids:
+            await callback.message.edit_text(
+                f"Заявка создана! Уведомление получат подходящие мастера: {len(master_tg_ids)}."
+            )
+        else:
+            await callback.message.edit_text(
+                "Заявка создана! Подходящих мастеров пока нет — заявка останется доступной в списке заказов."
+            )
 
-    # Send notifications outside transaction
-    logger.info("client_order:created", extra={"user_id": tg_id, "order_id": order.id, "masters_count": len(masters)})
-    for m in masters:
-        if m.tg_id:
-            try:
-                await callback.message.bot.send_message(
-                    chat_id=m.tg_id,
-                    text=(
-                        "Новая заявка доступна:\n"
-                        f"Категория: {data.get('category')}\n"
-                        f"Адрес: {data.get('address')}\n"
-                        f"Описание: {data.get('description')}\n"
-                        f"Медиа: {len(data.get('media', []) or [])} файл(ов)"
-                    ),
-                    reply_markup=InlineKeyboardMarkup(
-                        inline_keyboard=[[InlineKeyboardButton(text="Откликнуться", callback_data=f"bid:{order.id}")]]
-                    ),
-                )
-            except Exception:
-                # Игнорируем возможные ошибки отправки
-                pass
+    # Рассылка идёт в фоне через очередь с учётом лимитов Telegram, клиент не ждёт её завершения
+    fanout = get_notification_fanout(callback.message.bot)
+    queued = fanout.submit_many(
+        master_tg_ids,
+        text=(
+            "Новая заявка доступна:\n"
+            f"Категория: {data.get('category')}\n"
+            f"Адрес: {data.get('address')}\n"
+            f"Описание: {data.get('description')}\n"
+            f"Медиа: {len(data.get('media', []) or [])} файл(ов)"
+        ),
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="Откликнуться", callback_data=f"bid:{order.id}")]]
+        ),
+    )
+    logger.info(
+        "client_order:created",
+        extra={"user_id": tg_id, "order_id": order.id, "masters_count": len(master_tg_ids), "count": queued},
+    )
     await callback.answer()
 
 
+def _parse_coordinates(latitude, longitude) -> tuple[float | None, float | None]:
+    """Привести координаты из FSM к float (None, если не заданы или некорректны)."""
+    try:
+        return float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None, None
+
+
 @router.message(F.text == "👤 Мой профиль")
-async def profile_button(message: Message, state: FSMContext) -> None:
+async def profile_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки 'Мой профиль' в главном меню клиента."""
     tg_id = message.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user:
             await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
             return
@@ -860,11 +887,11 @@ async def messages_button(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == "⚙️ Настройки")
-async def settings_button(message: Message, state: FSMContext) -> None:
+async def settings_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки 'Настройки' в главном меню клиента."""
     tg_id = message.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user:
             await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
             return
@@ -882,11 +909,11 @@ async def settings_button(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == "📦 Мои заказы")
-async def my_orders_button(message: Message, state: FSMContext) -> None:
+async def my_orders_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки 'Мои заказы' в главном меню клиента."""
     tg_id = message.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user:
             await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
             return
@@ -9,7 +9,9 @@ from aiogram.types import (
     CallbackQuery,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
+    KeyboardButton,
     Message,
+    ReplyKeyboardMarkup,
 )
 from sqlalchemy import select
 
@@ -24,9 +26,14 @@ from app.bot.keyboards import (
 from app.bot.states import (
     BidCreate,
     MasterCategorySetup,
+    MasterSetup,
     MasterSpecialtySetup,
 )
 from app.models import Bid, MasterCategory, Order, Specialty, User, master_categories, master_specialties
+from app.services.identity import UserIdentity
+from app.services.order_feed import FeedPage, decode_cursor, fetch_master_feed
+from core.cache_service import master_categories_cache
+from core.config import get_settings
 from core.db import SessionFactory
 
 logger = logging.getLogger("bot.master")
@@ -42,11 +49,11 @@ async def cmd_help_master(message: Message) -> None:
 
 
 @router.message(Command("menu"))
-async def cmd_menu(message: Message, state: FSMContext) -> None:
+async def cmd_menu(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать главное меню с кнопками."""
     tg_id = message.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "master":
             return
     await state.clear()
@@ -57,41 +64,27 @@ async def cmd_menu(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == "📋 Новые заказы")
-async def nearby_orders_button(message: Message, state: FSMContext) -> None:
+async def nearby_orders_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки просмотра новых заказов."""
     tg_id = message.from_user.id
 
     async with SessionFactory() as session:
         # Получаем мастера
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user:
             await message.answer("Пользователь не найден. Используйте /start для начала работы.")
             return
 
-        # Получаем заказы со статусом "new" и "assigned"
-        # Получаем все заказы со статусом "new"
-        new_orders_query = select(Order).where(
-            Order.status == "new",
-            # Исключаем заказы самого мастера, если он вдруг создал заказ как клиент
-            Order.client_id != user.id
-        ).order_by(Order.created_at.desc())
-
-        # Получаем заказы со статусом "assigned", назначенные этому мастеру
-        assigned_orders_query = select(Order).where(
-            Order.master_id == user.id,
-            Order.status == "assigned"
-        ).order_by(Order.created_at.desc())
-
-        # Выполняем оба запроса
-        new_orders = (await session.execute(new_orders_query)).scalars().all()
-        assigned_orders = (await session.execute(assigned_orders_query)).scalars().all()
-
-        # Получаем ставки мастера, чтобы отметить заказы, на которые он уже сделал ставку
-        bids = (await session.execute(
-            select(Bid.order_id).where(Bid.master_id == user.id)
+        # Заказы со статусом "assigned", назначенные этому мастеру
+        assigned_orders = (await session.execute(
+            select(Order).where(
+                Order.master_id == user.id,
+                Order.status == "assigned"
+            ).order_by(Order.created_at.desc()).limit(5)
         )).scalars().all()
 
-        bid_order_ids = set(bids)
+        # Первая страница новых заказов: категории, флаг ставки и лимит считает БД
+        page = await fetch_master_feed(session, user.id, near=await _feed_near(session, user.id))
 
         # Structured debug logging
         logger.info(
@@ -99,16 +92,16 @@ async def nearby_orders_button(message: Message, state: FSMContext) -> None:
             extra={
                 "user_id": tg_id,
                 "chat_id": message.chat.id if message.chat else None,
-                "new_found": len(new_orders),
+                "new_found": len(page.items),
                 "assigned_found": len(assigned_orders),
-                "bids_made": len(bid_order_ids),
+                "has_more": page.next_cursor is not None,
             },
         )
 
     # Сначала показываем заказы, назначенные мастеру
     if assigned_orders:
         await message.answer("🟡 Заказы в работе:")
-        for order in assigned_orders[:5]:  # Ограничиваем до 5 заказов
+        for order in assigned_orders:
             order_text = (
                 f"📦 Заказ #{order.id} (В работе)\n"
                 f"Категория: {order.category}\n"
@@ -124,36 +117,93 @@ async def nearby_orders_button(message: Message, state: FSMContext) -> None:
             await message.answer(order_text, reply_markup=keyboard)
 
     # Затем показываем новые заказы
-    if new_orders:
+    if page.items:
         await message.answer("🔵 Новые заказы:")
-        for order in new_orders[:10]:  # Ограничиваем до 10 заказов
-            # Отмечаем, сделал ли мастер ставку на этот заказ
-            has_bid = order.id in bid_order_ids
-            bid_status = "✓ Ставка сделана" if has_bid else "Ставка не сделана"
+        await _send_feed_page(message, page)
 
-            order_text = (
-                f"📦 Заказ #{order.id}\n"
-                f"Категория: {order.category}\n"
-                f"Статус ставки: {bid_status}\n"
-                f"Дата: {order.created_at.strftime('%d.%m.%Y %H:%M')}\n"
-            )
+    # Если нет ни новых, ни назначенных заказов
+    if not page.items and not assigned_orders:
+        await message.answer("Пока нет новых заказов, и у вас нет заказов в работе.")
 
-            keyboard_buttons = [
-                [InlineKeyboardButton(text="Подробнее", callback_data=f"view_order:{order.id}")]
-            ]
 
-            # Добавляем кнопку ставки только если мастер еще не делал ставку
-            if not has_bid:
-                keyboard_buttons.append([InlineKeyboardButton(text="Сделать ставку", callback_data=f"bid:{order.id}")])
-            else:
-                keyboard_buttons.append([InlineKeyboardButton(text="Изменить ставку", callback_data=f"edit_bid_order:{order.id}")])
+async def _feed_near(session, user_id: int) -> tuple[float, float, float] | None:
+    """Фильтр ленты по расстоянию: рабочая точка мастера и MASTER_MATCH_RADIUS_KM."""
+    radius_km = get_settings().master_match_radius_km
+    if not radius_km:
+        return None
+    location = (await session.execute(
+        select(User.latitude, User.longitude).where(User.id == user_id)
+    )).first()
+    if not location or location.latitude is None or location.longitude is None:
+        return None
+    return location.latitude, location.longitude, radius_km
 
-            keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
-            await message.answer(order_text, reply_markup=keyboard)
 
-    # Если нет ни новых, ни назначенных заказов
-    if not new_orders and not assigned_orders:
-        await message.answer("Пока нет новых заказов, и у вас нет заказов в работе.")
+async def _send_feed_page(message: Message, page: FeedPage) -> None:
+    """Отправить карточки заказов страницы ленты и кнопку следующей страницы."""
+    for item in page.items:
+        bid_status = "✓ Ставка сделана" if item.has_bid else "Ставка не сделана"
+        created = item.created_at.strftime('%d.%m.%Y %H:%M') if item.created_at else "—"
+
+        order_text = (
+            f"📦 Заказ #{item.id}\n"
+            f"Категория: {item.category}\n"
+            f"Статус ставки: {bid_status}\n"
+            f"Дата: {created}\n"
+        )
+
+        keyboard_buttons = [
+            [InlineKeyboardButton(text="Подробнее", callback_data=f"view_order:{item.id}")]
+        ]
+
+        # Добавляем кнопку ставки только если мастер еще не делал ставку
+        if not item.has_bid:
+            keyboard_buttons.append([InlineKeyboardButton(text="Сделать ставку", callback_data=f"bid:{item.id}")])
+        else:
+            keyboard_buttons.append([InlineKeyboardButton(text="Изменить ставку", callback_data=f"edit_bid_order:{item.id}")])
+
+        keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
+        await message.answer(order_text, reply_markup=keyboard)
+
+    if page.next_cursor:
+        await message.answer(
+            "Показать следующие заказы?",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="Ещё заказы ▶", callback_data=f"mfeed:{page.next_cursor}")]
+            ]),
+        )
+
+
+@router.callback_query(F.data.startswith("mfeed:"))
+async def nearby_orders_next_page(callback: CallbackQuery, identity: UserIdentity | None = None) -> None:
+    """Следующая страница ленты новых заказов (курсор в callback_data)."""
+    cursor = callback.data.split(":", 1)[1]
+    try:
+        decode_cursor(cursor)
+    except ValueError:
+        await callback.answer("Некорректная страница", show_alert=True)
+        return
+
+    async with SessionFactory() as session:
+        user = identity or (await session.execute(
+            select(User).where(User.tg_id == callback.from_user.id)
+        )).scalars().first()
+        if not user:
+            await callback.answer("Пользователь не найден", show_alert=True)
+            return
+        page = await fetch_master_feed(session, user.id, cursor=cursor, near=await _feed_near(session, user.id))
+
+    # Убираем кнопку «Ещё заказы» под предыдущей страницей
+    try:
+        await callback.message.edit_reply_markup(reply_markup=None)
+    except Exception:
+        pass
+
+    if not page.items:
+        await callback.message.answer("Больше новых заказов нет.")
+    else:
+        await _send_feed_page(callback.message, page)
+    await callback.answer()
 
 
 @router.callback_query(F.data.startswith("view_order:"))
@@ -206,13 +256,13 @@ async def view_order_details(callback: CallbackQuery, state: FSMContext) -> None
 
 
 @router.message(F.text == "💰 Мои ставки")
-async def my_bids_button(message: Message, state: FSMContext) -> None:
+async def my_bids_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки просмотра своих ставок."""
     tg_id = message.from_user.id
 
     async with SessionFactory() as session:
         # Получаем мастера
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user:
             await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
             return
@@ -255,13 +305,13 @@ async def my_bids_button(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == "📦 Мои заказы")
-async def my_orders_button(message: Message, state: FSMContext) -> None:
+async def my_orders_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки просмотра заказов мастера."""
     tg_id = message.from_user.id
 
     async with SessionFactory() as session:
         # Получаем мастера
-        master = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await message.answer("Вы не зарегистрированы как мастер. Используйте /start для начала работы.")
             return
@@ -314,12 +364,12 @@ async def my_orders_button(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == "👤 Профиль")
-async def profile_button(message: Message) -> None:
+async def profile_button(message: Message, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки 'Профиль' в главном меню мастера."""
     tg_id = message.from_user.id
 
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user:
             await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
             return
@@ -349,26 +399,63 @@ async def settings_button(message: Message) -> None:
             await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
             return
 
+        has_location = user.latitude is not None and user.longitude is not None
         settings_text = (
             f"⚙️ Настройки профиля:\n\n"
             f"Имя: {user.name or 'Не указано'}\n"
+            f"Рабочая точка: {'задана' if has_location else 'не задана'}\n"
         )
 
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="📍 Рабочая точка", callback_data="master_location")],
             [InlineKeyboardButton(text="Изменить роль", callback_data="change_role")]
         ])
 
         await message.answer(settings_text, reply_markup=keyboard)
 
 
+@router.callback_query(F.data == "master_location")
+async def master_location_entry(callback: CallbackQuery, state: FSMContext) -> None:
+    """Запросить у мастера рабочую точку для подбора заказов по расстоянию."""
+    await state.set_state(MasterSetup.location)
+    await callback.message.answer(
+        "Отправьте геолокацию, от которой считать расстояние до заказов:",
+        reply_markup=ReplyKeyboardMarkup(
+            keyboard=[[KeyboardButton(text="📍 Отправить геолокацию", request_location=True)]],
+            resize_keyboard=True,
+            one_time_keyboard=True,
+        ),
+    )
+    await callback.answer()
+
+
+@router.message(MasterSetup.location, F.location)
+async def save_master_location(message: Message, state: FSMContext) -> None:
+    """Сохранить рабочую точку мастера."""
+    tg_id = message.from_user.id
+    async with SessionFactory() as session:
+        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        if not user:
+            await state.clear()
+            await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
+            return
+        user.latitude = message.location.latitude
+        user.longitude = message.location.longitude
+        await session.commit()
+
+    await state.clear()
+    logger.info("master_location:saved", extra={"user_id": tg_id})
+    await message.answer("✅ Рабочая точка сохранена.", reply_markup=master_main_menu_keyboard())
+
+
 @router.message(F.text == "📍 Отслеживание")
-async def tracking_clients_button(message: Message, state: FSMContext) -> None:
+async def tracking_clients_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки отслеживания заказов."""
     tg_id = message.from_user.id
 
     async with SessionFactory() as session:
         # Получаем мастера
-        master = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await message.answer("Вы не зарегистрированы как мастер. Используйте /start для начала работы.")
             return
@@ -395,13 +482,13 @@ async def tracking_clients_button(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == "📊 Активные заказы")
-async def active_orders_button(message: Message, state: FSMContext) -> None:
+async def active_orders_button(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки просмотра активных заказов."""
     tg_id = message.from_user.id
 
     async with SessionFactory() as session:
         # Получаем мастера
-        master = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await message.answer("Вы не зарегистрированы как мастер. Используйте /start для начала работы.")
             return
@@ -476,20 +563,25 @@ async def help_button(message: Message) -> None:
 
 
 @router.message(F.text == "📂 Категории")
-async def master_categories_entry(message: Message, state: FSMContext) -> None:
+async def master_categories_entry(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать выбор категорий заказов для мастера."""
     tg_id = message.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "master":
             await message.answer("Вы не зарегистрированы как мастер. Используйте /start для начала работы.")
             return
 
-        # Получаем текущие выбранные категории мастера
-        result = await session.execute(
-            select(master_categories.c.category).where(master_categories.c.user_id == user.id)
-        )
-        selected_categories = {row[0] for row in result.all()}
+        # Получаем текущие выбранные категории мастера (сначала из кэша)
+        cached = await master_categories_cache.get_master_categories(user.id)
+        if cached is not None:
+            selected_categories = set(cached)
+        else:
+            result = await session.execute(
+                select(master_categories.c.category).where(master_categories.c.user_id == user.id)
+            )
+            selected_categories = {row[0] for row in result.all()}
+            await master_categories_cache.set_master_categories(user.id, sorted(selected_categories))
 
     # Получаем список всех доступных категорий
     all_categories = MasterCategory.CATEGORIES
@@ -537,14 +629,14 @@ async def toggle_master_category(callback: CallbackQuery, state: FSMContext) ->
 
 
 @router.callback_query(MasterCategorySetup.selecting, F.data == "mcat:done")
-async def save_master_categories(callback: CallbackQuery, state: FSMContext) -> None:
+async def save_master_categories(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Сохранить выбранные категории мастера."""
     tg_id = callback.from_user.id
     data = await state.get_data()
     selected_categories = set(data.get("mcat_selected", []))
 
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "master":
             await callback.answer("Вы не зарегистрированы как мастер", show_alert=True)
             return
@@ -566,6 +658,7 @@ async def save_master_categories(callback: CallbackQuery, state: FSMContext) ->
 
         await session.commit()
 
+    await master_categories_cache.update_master_categories(user.id, sorted(selected_categories))
     await state.clear()
     categories_text = ", ".join(selected_categories) if selected_categories else "—"
     try:
@@ -577,11 +670,11 @@ async def save_master_categories(callback: CallbackQuery, state: FSMContext) ->
 
 
 @router.message(F.text == "🔧 Специализации")
-async def master_specialties_entry(message: Message, state: FSMContext) -> None:
+async def master_specialties_entry(message: Message, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать выбор специализаций для мастера."""
     tg_id = message.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "master":
             await message.answer("Вы не зарегистрированы как мастер. Используйте /start для начала работы.")
             return
@@ -683,7 +776,7 @@ async def save_master_specialties(callback: CallbackQuery, state: FSMContext) ->
 
 
 @router.callback_query(F.data.startswith("track_order:"))
-async def track_order_callback(callback: CallbackQuery, state: FSMContext) -> None:
+async def track_order_callback(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик выбора заказа для отслеживания."""
     try:
         order_id = int(callback.data.split(":", 1)[1])
@@ -694,7 +787,7 @@ async def track_order_callback(callback: CallbackQuery, state: FSMContext) -> No
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
         # Получаем мастера
-        master = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await callback.answer("Вы не зарегистрированы как мастер", show_alert=True)
             return
@@ -752,12 +845,12 @@ async def track_order_callback(callback: CallbackQuery, state: FSMContext) -> No
 
 
 @router.callback_query(F.data.startswith("back:"))
-async def handle_back_button(callback: CallbackQuery, state: FSMContext) -> None:
+async def handle_back_button(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки 'Назад' для всех состояний мастера."""
     # Обрабатываем только если это мастер
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "master":
             return
     back_to = callback.data.split(":", 1)[1] if ":" in callback.data else "main"
@@ -856,7 +949,7 @@ async def view_bid_details(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data.startswith("complete_order:"))
-async def complete_order(callback: CallbackQuery, state: FSMContext) -> None:
+async def complete_order(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Завершить заказ мастером."""
     try:
         order_id = int(callback.data.split(":", 1)[1])
@@ -869,7 +962,7 @@ async def complete_order(callback: CallbackQuery, state: FSMContext) -> None:
 
     async with SessionFactory() as session:
         # Получаем мастера
-        master = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master:
             await callback.answer("Пользователь не найден", show_alert=True)
             return
@@ -924,7 +1017,7 @@ async def complete_order(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data.startswith("edit_bid_order:"))
-async def edit_bid_by_order(callback: CallbackQuery, state: FSMContext) -> None:
+async def edit_bid_by_order(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Изменить ставку по ID заказа."""
     try:
         order_id = int(callback.data.split(":", 1)[1])
@@ -935,7 +1028,7 @@ async def edit_bid_by_order(callback: CallbackQuery, state: FSMContext) -> None:
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
         # Получаем мастера
-        master = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master:
             await callback.answer("Пользователь не найден", show_alert=True)
             return
@@ -954,7 +1047,7 @@ async def edit_bid_by_order(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data.startswith("edit_bid:"))
-async def edit_bid_price(callback: CallbackQuery, state: FSMContext, bid_id=None) -> None:
+async def edit_bid_price(callback: CallbackQuery, state: FSMContext, bid_id=None, identity: UserIdentity | None = None) -> None:
     """Инициировать изменение цены для своей активной ставки."""
     if bid_id is None:
         try:
@@ -965,7 +1058,7 @@ async def edit_bid_price(callback: CallbackQuery, state: FSMContext, bid_id=None
 
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         bid = (await session.execute(select(Bid).where(Bid.id == bid_id))).scalars().first()
 
     if not user or not bid or bid.master_id != (user.id if user else None):
@@ -996,7 +1089,7 @@ async def edit_bid_price(callback: CallbackQuery, state: FSMContext, bid_id=None
 
 
 @router.callback_query(F.data.startswith("cancel_bid:"))
-async def cancel_bid(callback: CallbackQuery, state: FSMContext) -> None:
+async def cancel_bid(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Отмена своей активной ставки (удаление)."""
     try:
         bid_id = int(callback.data.split(":", 1)[1])
@@ -1006,7 +1099,7 @@ async def cancel_bid(callback: CallbackQuery, state: FSMContext) -> None:
 
     tg_id = callback.from_user.id
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         bid = (await session.execute(select(Bid).where(Bid.id == bid_id))).scalars().first()
         if not user or not bid or bid.master_id != (user.id if user else None):
             await callback.answer("Ставка не найдена", show_alert=True)
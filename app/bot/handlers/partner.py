@@ -10,10 +10,12 @@ from aiogram.types import (
     InlineKeyboardMarkup,
     Message,
 )
-from sqlalchemy import func, select
+from sqlalchemy import select
 
 from app.bot.keyboards import partner_main_menu_keyboard
 from app.models import Order, Partner, Payout, User
+from app.services.identity import UserIdentity
+from app.services.partner_stats import compute_partner_statistics, load_partner_dashboard
 from core.db import SessionFactory
 
 logger = logging.getLogger("bot.partner")
@@ -77,12 +79,12 @@ async def help_button(message: Message) -> None:
 
 
 @router.message(F.text == "👨‍🔧 Профиль")
-async def profile_button(message: Message) -> None:
+async def profile_button(message: Message, identity: UserIdentity | None = None) -> None:
     """Обработчик кнопки профиля."""
     tg_id = message.from_user.id
 
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user:
             await message.answer("Вы не зарегистрированы. Используйте /start для начала работы.")
             return
@@ -174,13 +176,13 @@ async def cmd_help_partner(message: Message) -> None:
 
 
 @router.message(Command("partner_link"))
-async def cmd_partner_link(message: Message) -> None:
+async def cmd_partner_link(message: Message, identity: UserIdentity | None = None) -> None:
     """Generate and show partner referral link."""
     tg_id = message.from_user.id
     logger.info("partner_cmd:link", extra={"user_id": tg_id})
 
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "partner":
             await message.answer("Вы не зарегистрированы как партнер. Используйте /start для выбора роли.")
             return
@@ -226,62 +228,41 @@ async def cmd_partner_link(message: Message) -> None:
 
 
 @router.message(Command("partner_stats"))
-async def cmd_partner_stats(message: Message) -> None:
+async def cmd_partner_stats(message: Message, identity: UserIdentity | None = None) -> None:
     """Show partner statistics."""
     tg_id = message.from_user.id
     logger.info("partner_cmd:stats", extra={"user_id": tg_id})
 
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "partner":
             await message.answer("Вы не зарегистрированы как партнер.")
             return
 
-        partner = (await session.execute(select(Partner).where(Partner.user_id == user.id))).scalars().first()
+        # Партнёрская запись и сводка одним запросом (app.services.partner_stats)
+        partner, stats = await load_partner_dashboard(session, user.id)
         if not partner:
             await message.answer("Партнерская запись не найдена.")
             return
 
-        # Count referred users
-        referred_users = (await session.execute(
-            select(func.count(User.id)).where(User.referrer_id == user.id)
-        )).scalar()
-
-        # Count completed orders with commission
-        completed_orders = (await session.execute(
-            select(func.count(Payout.id))
-            .join(Order, Payout.order_id == Order.id)
-            .join(User, Order.client_id == User.id)
-            .where(User.referrer_id == user.id)
-            .where(Payout.status == "paid")
-        )).scalar()
-
-        total_earned = (await session.execute(
-            select(func.coalesce(func.sum(Payout.amount_partner), 0))
-            .join(Order, Payout.order_id == Order.id)
-            .join(User, Order.client_id == User.id)
-            .where(User.referrer_id == user.id)
-            .where(Payout.status == "paid")
-        )).scalar()
-
     stats_text = (
         f"📊 Ваша партнерская статистика:\n\n"
-        f"👥 Приведено клиентов: {referred_users}\n"
-        f"✅ Выполнено заказов: {completed_orders}\n"
-        f"💰 Заработано: {total_earned} KZT\n"
+        f"👥 Приведено клиентов: {stats['referred_users']}\n"
+        f"✅ Выполнено заказов: {stats['completed_orders']}\n"
+        f"💰 Заработано: {stats['total_earned']} KZT\n"
         f"📈 Процент: 5% от каждого заказа"
     )
     await message.answer(stats_text)
 
 
 @router.message(Command("partner_payouts"))
-async def cmd_partner_payouts(message: Message) -> None:
+async def cmd_partner_payouts(message: Message, identity: UserIdentity | None = None) -> None:
     """Show partner payout history."""
     tg_id = message.from_user.id
     logger.info("partner_cmd:payouts", extra={"user_id": tg_id})
 
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "partner":
             await message.answer("Вы не зарегистрированы как партнер.")
             return
@@ -316,25 +297,22 @@ async def cmd_partner_payouts(message: Message) -> None:
 
 
 @router.message(Command("partner_dashboard"))
-async def cmd_partner_dashboard(message: Message) -> None:
+async def cmd_partner_dashboard(message: Message, identity: UserIdentity | None = None) -> None:
     """Show comprehensive partner dashboard."""
     tg_id = message.from_user.id
     logger.info("partner_cmd:dashboard", extra={"user_id": tg_id})
 
     async with SessionFactory() as session:
-        user = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        user = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not user or user.role != "partner":
             await message.answer("Вы не зарегистрированы как партнер.")
             return
 
-        partner = (await session.execute(select(Partner).where(Partner.user_id == user.id))).scalars().first()
+        partner, stats = await load_partner_dashboard(session, user.id)
         if not partner:
             await message.answer("Партнерская запись не найдена.")
             return
 
-        # Get comprehensive stats
-        stats = await get_partner_statistics(session, user.id)
-
     dashboard_text = (
         f"🎯 Партнерский дашборд\n\n"
         f"🔗 Код: {partner.referral_code}\n"
@@ -360,66 +338,8 @@ async def cmd_partner_dashboard(message: Message) -> None:
 
 
 async def get_partner_statistics(session, partner_user_id):
-    """Get comprehensive partner statistics."""
-    referred_users = (await session.execute(
-        select(func.count(User.id)).where(User.referrer_id == partner_user_id)
-    )).scalar()
-
-    active_orders = (await session.execute(
-        select(func.count(Order.id))
-        .join(User, Order.client_id == User.id)
-        .where(User.referrer_id == partner_user_id)
-        .where(Order.status == "assigned")
-    )).scalar()
-
-    completed_orders = (await session.execute(
-        select(func.count(Payout.id))
-        .join(Order, Payout.order_id == Order.id)
-        .join(User, Order.client_id == User.id)
-        .where(User.referrer_id == partner_user_id)
-        .where(Payout.status == "paid")
-    )).scalar()
-
-    pending_payouts = (await session.execute(
-        select(func.count(Payout.id))
-        .join(Order, Payout.order_id == Order.id)
-        .join(User, Order.client_id == User.id)
-        .where(User.referrer_id == partner_user_id)
-        .where(Payout.status == "pending")
-    )).scalar()
-
-    total_earned = (await session.execute(
-        select(func.coalesce(func.sum(Payout.amount_partner), 0))
-        .join(Order, Payout.order_id == Order.id)
-        .join(User, Order.client_id == User.id)
-        .where(User.referrer_id == partner_user_id)
-        .where(Payout.status == "paid")
-    )).scalar()
-
-    pending_amount = (await session.execute(
-        select(func.coalesce(func.sum(Payout.amount_partner), 0))
-        .join(Order, Payout.order_id == Order.id)
-        .join(User, Order.client_id == User.id)
-        .where(User.referrer_id == partner_user_id)
-        .where(Payout.status == "pending")
-    )).scalar()
-
-    avg_order_value = (await session.execute(
-        select(func.coalesce(func.avg(Payout.amount_partner * 20), 0))
-        .join(Order, Payout.order_id == Order.id)
-        .join(User, Order.client_id == User.id)
-        .where(User.referrer_id == partner_user_id)
-    )).scalar()
-
-    return {
-        'referred_users': referred_users,
-        'active_orders': active_orders,
-        'completed_orders': completed_orders,
-        'pending_payouts': pending_payouts,
-        'total_earned': total_earned,
-        'pending_amount': pending_amount,
-        'avg_order_value': int(avg_order_value) if avg_order_value else 0
-    }
+    """Get comprehensive partner statistics (one aggregate query over the source tables)."""
+    return await compute_partner_statistics(session, partner_user_id)
 
 
 @router.callback_query(F.data == "partner_detailed_stats")
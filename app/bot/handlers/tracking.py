@@ -18,6 +18,7 @@ from app.bot.keyboards import (
 )
 from app.bot.states import ClientActions, MasterActions
 from app.models import Order, User
+from app.services.identity import UserIdentity
 from core.db import SessionFactory
 
 logger = logging.getLogger("bot.tracking")
@@ -26,7 +27,7 @@ router = Router()
 
 
 @router.callback_query(F.data.startswith("request_location:"))
-async def request_location_update(callback: CallbackQuery, state: FSMContext) -> None:
+async def request_location_update(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Обработчик запроса обновления геолокации клиента."""
     try:
         order_id: int = int(callback.data.split(":", 1)[1])
@@ -37,7 +38,7 @@ async def request_location_update(callback: CallbackQuery, state: FSMContext) ->
     tg_id: int = callback.from_user.id
     async with SessionFactory() as session:
         # Получаем мастера
-        master: User | None = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master: User | UserIdentity | None = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await callback.answer("Вы не зарегистрированы как мастер", show_alert=True)
             return
@@ -102,7 +103,7 @@ async def request_location_update(callback: CallbackQuery, state: FSMContext) ->
 
 
 @router.callback_query(F.data.startswith("show_map:"))
-async def show_client_location(callback: CallbackQuery, state: FSMContext) -> None:
+async def show_client_location(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать местоположение клиента на карте."""
     try:
         order_id: int = int(callback.data.split(":", 1)[1])
@@ -113,7 +114,7 @@ async def show_client_location(callback: CallbackQuery, state: FSMContext) -> No
     tg_id: int = callback.from_user.id
     async with SessionFactory() as session:
         # Получаем мастера
-        master: User | None = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master: User | UserIdentity | None = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await callback.answer("Вы не зарегистрированы как мастер", show_alert=True)
             return
@@ -170,7 +171,7 @@ async def show_client_location(callback: CallbackQuery, state: FSMContext) -> No
 
 
 @router.callback_query(F.data.startswith("contact_client:"))
-async def contact_client(callback: CallbackQuery, state: FSMContext) -> None:
+async def contact_client(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Связаться с клиентом."""
     try:
         order_id: int = int(callback.data.split(":", 1)[1])
@@ -181,7 +182,7 @@ async def contact_client(callback: CallbackQuery, state: FSMContext) -> None:
     tg_id: int = callback.from_user.id
     async with SessionFactory() as session:
         # Получаем мастера
-        master: User | None = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master: User | UserIdentity | None = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await callback.answer("Вы не зарегистрированы как мастер", show_alert=True)
             return
@@ -265,7 +266,7 @@ async def start_message_to_client(callback: CallbackQuery, state: FSMContext) ->
 
 
 @router.callback_query(F.data.startswith("track_order:"))
-async def track_order(callback: CallbackQuery, state: FSMContext) -> None:
+async def track_order(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать действия для отслеживания конкретного заказа."""
     try:
         order_id: int = int(callback.data.split(":", 1)[1])
@@ -276,7 +277,7 @@ async def track_order(callback: CallbackQuery, state: FSMContext) -> None:
     tg_id: int = callback.from_user.id
     async with SessionFactory() as session:
         # Получаем мастера
-        master: User | None = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master: User | UserIdentity | None = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await callback.answer("Вы не зарегистрированы как мастер", show_alert=True)
             return
@@ -327,13 +328,13 @@ async def track_order(callback: CallbackQuery, state: FSMContext) -> None:
 
 
 @router.callback_query(F.data == "tracking:list")
-async def show_tracking_list(callback: CallbackQuery, state: FSMContext) -> None:
+async def show_tracking_list(callback: CallbackQuery, state: FSMContext, identity: UserIdentity | None = None) -> None:
     """Показать список заказов для отслеживания."""
     tg_id: int = callback.from_user.id
 
     async with SessionFactory() as session:
         # Получаем мастера
-        master: User | None = (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+        master: User | UserIdentity | None = identity or (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
         if not master or master.role != "master":
             await callback.answer("Вы не зарегистрированы как мастер", show_alert=True)
             return
@@ -12,8 +12,25 @@ from app.bot.handlers import tracking
 from app.bot.handlers import chat
 from app.bot.handlers import ai_assistant
 from app.bot.logging_setup import configure_logging
+from app.bot.middlewares.identity_middleware import IdentityMiddleware
 from app.bot.middlewares.logging_middleware import LoggingMiddleware
-from app.ai_agent.simple_ai import GeminiAI
+from app.bot.startup import get_startup, shutdown_startup
+from app.ai_agent.batching import shutdown_inference_batcher
+from app.ai_agent.models.text_classifier import load_classifier_keywords, start_keyword_refresh, stop_keyword_refresh
+from app.ai_agent.registry import get_model_registry
+from app.services.chat_journal import shutdown_chat_journal
+from app.services.fanout import shutdown_notification_fanout
+from core.db import engine
+
+BOT_COMMANDS = [
+    BotCommand(command="start", description="Начать работу"),
+    BotCommand(command="menu", description="Главное меню"),
+    BotCommand(command="partner_dashboard", description="Партнерский дашборд"),
+    BotCommand(command="partner_link", description="Реферальная ссылка"),
+    BotCommand(command="partner_stats", description="Статистика партнера"),
+    BotCommand(command="partner_payouts", description="История выплат"),
+    BotCommand(command="help_partner", description="Помощь для партнеров"),
+]
 
 
 def register_handlers() -> None:
@@ -25,30 +42,60 @@ def register_handlers() -> None:
     dp.include_router(ai_assistant.router)
 
 
-async def main() -> None:  # pragma: no cover
-    """Configure dispatcher, commands and start polling."""
-    # dp is imported from app.bot; already created with MemoryStorage in that module.
+async def _warm_up_db() -> None:
+    # Первое соединение пула (DNS, TLS, аутентификация) — не на первом апдейте
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+
+
+async def _load_classifier_keywords() -> None:
+    # Ключевые слова классификатора из таблицы classifier_keywords, дальше — по таймеру
+    await load_classifier_keywords()
+    start_keyword_refresh()
+
+
+async def _set_commands() -> None:
+    await bot.set_my_commands(BOT_COMMANDS)
+
+
+def register_warm_ups(commands: bool = True) -> None:
+    """Подсистемы, которые прогреваются в фоне после начала опроса."""
+    startup = get_startup()
+    # Один загруженный бэкенд ИИ на процесс (см. app.ai_agent.registry)
+    startup.add("ai", get_model_registry().warm_up)
+    startup.add("db", _warm_up_db)
+    startup.add("classifier", _load_classifier_keywords)
+    if commands:
+        startup.add("commands", _set_commands)
+
+
+def setup_dispatcher() -> None:
+    """Middleware, роутеры и обработчики остановки (общие для polling и webhook)."""
     # Setup structured logging and middleware
     configure_logging()
     dp.update.middleware(LoggingMiddleware(logging.getLogger("bot")))
+    # tg_id -> пользователь из кэша; хендлеры получают его аргументом identity
+    dp.update.middleware(IdentityMiddleware())
     register_handlers()
+    # Дослать уведомления из очереди рассылки перед остановкой
+    dp.shutdown.register(shutdown_notification_fanout)
+    dp.shutdown.register(shutdown_inference_batcher)
+    dp.shutdown.register(shutdown_startup)
+    dp.shutdown.register(stop_keyword_refresh)
+    # Дописать в БД сообщения чата из буфера журнала
+    dp.shutdown.register(shutdown_chat_journal)
 
-    # Warm up local AI model to avoid slow/poor first response
-    try:
-        await asyncio.to_thread(GeminiAI().initialize)
-    except Exception as e:
-        logging.getLogger("bot").warning("AI warm-up failed: %s", e)
+
+async def main() -> None:  # pragma: no cover
+    """Configure dispatcher, commands and start polling."""
+    # dp is imported from app.bot; already created with MemoryStorage in that module.
+    setup_dispatcher()
 
     await bot.delete_webhook(drop_pending_updates=True)
-    await bot.set_my_commands([
-        BotCommand(command="start", description="Начать работу"),
-        BotCommand(command="menu", description="Главное меню"),
-        BotCommand(command="partner_dashboard", description="Партнерский дашборд"),
-        BotCommand(command="partner_link", description="Реферальная ссылка"),
-        BotCommand(command="partner_stats", description="Статистика партнера"),
-        BotCommand(command="partner_payouts", description="История выплат"),
-        BotCommand(command="help_partner", description="Помощь для партнеров"),
-    ])
+    # Модель ИИ и прочее грузятся в фоне: апдейты принимаются сразу,
+    # ИИ-помощник до готовности отвечает заглушкой
+    register_warm_ups()
+    get_startup().start()
 
     await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
 
@@ -0,0 +1,40 @@
+"""Aiogram 3 middleware resolving the update sender to a cached DB identity."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.services.identity import UserIdentityCache, resolve_user
+
+
+class IdentityMiddleware(BaseMiddleware):
+    """Put ``identity`` (``UserIdentity`` or None for unregistered users) into handler data.
+
+    Handlers opt in by declaring an ``identity`` argument. The lookup goes
+    through :class:`UserIdentityCache`, so repeated updates from an active user
+    do not hit the database.
+    """
+
+    def __init__(
+        self,
+        cache: UserIdentityCache | None = None,
+        session_factory: Callable[[], Any] | None = None,
+    ) -> None:
+        self.cache = cache
+        self.session_factory = session_factory
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        identity = None
+        if from_user is not None:
+            identity = await resolve_user(from_user.id, session_factory=self.session_factory, cache=self.cache)
+        data["identity"] = identity
+        return await handler(event, data)
@@ -0,0 +1,131 @@
+"""Фоновый прогрев подсистем бота при старте.
+
+Раньше ``main()`` ждал загрузки модели ИИ до ``start_polling``, и бот не
+принимал обновления, пока модель грузилась. Теперь подсистемы (модель ИИ,
+соединение с БД, команды бота) прогреваются фоновыми задачами, а опрос
+Telegram начинается сразу:
+
+- у каждой подсистемы своё состояние: pending -> warming -> ready | failed;
+- ``readiness()`` отдаёт состояния, время прогрева и ошибки (пишется в лог);
+- хендлеры спрашивают ``is_warming(name)`` и, пока подсистема не готова,
+  отвечают заглушкой вместо ожидания.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger("bot.startup")
+
+
+@dataclass(slots=True)
+class Subsystem:
+    """Состояние прогрева одной подсистемы."""
+
+    name: str
+    warm_up: Callable[[], Any] | Callable[[], Awaitable[Any]]
+    state: str = "pending"
+    seconds: float | None = None
+    error: str | None = None
+
+
+class StartupOrchestrator:
+    """Запускает прогрев подсистем в фоне и хранит их готовность."""
+
+    def __init__(self) -> None:
+        self._subsystems: dict[str, Subsystem] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.started_at: float | None = None
+
+    def add(self, name: str, warm_up: Callable[[], Any] | Callable[[], Awaitable[Any]]) -> None:
+        """Зарегистрировать подсистему; синхронный прогрев выполняется в отдельном потоке.
+
+        Прогрев, вернувший ``False``, считается неудачным.
+        """
+        self._subsystems[name] = Subsystem(name, warm_up)
+
+    def start(self) -> None:
+        """Запустить прогрев всех подсистем, не дожидаясь его окончания."""
+        self.started_at = time.perf_counter()
+        for name, subsystem in self._subsystems.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._warm(subsystem), name=f"warm-up:{name}")
+
+    async def _warm(self, subsystem: Subsystem) -> None:
+        subsystem.state = "warming"
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(subsystem.warm_up):
+                result = await subsystem.warm_up()
+            else:
+                result = await asyncio.to_thread(subsystem.warm_up)
+            subsystem.state = "failed" if result is False else "ready"
+        except asyncio.CancelledError:
+            subsystem.state = "failed"
+            subsystem.error = "cancelled"
+            raise
+        except Exception as e:
+            subsystem.state = "failed"
+            subsystem.error = repr(e)
+        finally:
+            subsystem.seconds = time.perf_counter() - started
+        log = logger.info if subsystem.state == "ready" else logger.warning
+        log(
+            "startup_subsystem",
+            extra={"subsystem": subsystem.name, "state": subsystem.state,
+                   "seconds": round(subsystem.seconds, 3), "error": subsystem.error},
+        )
+
+    def state(self, name: str) -> str | None:
+        subsystem = self._subsystems.get(name)
+        return subsystem.state if subsystem else None
+
+    def is_warming(self, name: str) -> bool:
+        """True, пока зарегистрированная подсистема ещё не прогрета (ни успешно, ни с ошибкой)."""
+        return self.state(name) in ("pending", "warming")
+
+    async def wait(self, name: str, timeout: float | None = None) -> str | None:
+        """Дождаться окончания прогрева подсистемы и вернуть её состояние."""
+        task = self._tasks.get(name)
+        if task is not None and not task.done():
+            await asyncio.wait({task}, timeout=timeout)
+        return self.state(name)
+
+    def readiness(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {
+                "state": s.state,
+                "seconds": round(s.seconds, 3) if s.seconds is not None else None,
+                "error": s.error,
+            }
+            for name, s in self._subsystems.items()
+        }
+
+    async def stop(self) -> None:
+        """Отменить незавершённый прогрев (при остановке бота)."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_startup: StartupOrchestrator | None = None
+
+
+def get_startup() -> StartupOrchestrator:
+    """Оркестратор старта процесса бота."""
+    global _startup
+    if _startup is None:
+        _startup = StartupOrchestrator()
+    return _startup
+
+
+async def shutdown_startup() -> None:
+    """Остановить фоновый прогрев (регистрируется на dp.shutdown)."""
+    if _startup is not None:
+        await _startup.stop()
@@ -15,6 +15,7 @@ class OrderCreate(StatesGroup):
 
 class MasterSetup(StatesGroup):
     zones = State()
+    location = State()
 
 
 class MasterSpecialtySetup(StatesGroup):
@@ -0,0 +1,226 @@
+"""Persistent FSM storage on top of the project's SQLAlchemy engine.
+
+``SQLAlchemyStorage`` keeps FSM state and data in the ``fsm_states`` table, so
+order-creation and chat scenarios survive restarts and several bot processes
+can share one database. Writes are buffered and flushed in batches (one upsert
+per flush); abandoned states expire after ``state_ttl`` and are purged by the
+background flusher.
+
+Recently used records are also kept in a small local cache. Running several
+processes therefore requires that updates of one chat are handled by the same
+process (e.g. webhook workers partitioned by chat id); pass ``cache_ttl=0``
+(``FSM_CACHE_TTL=0``) to always read from the database. Records being flushed
+stay visible to this process until their batch is committed.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import delete, select
+
+from app.models import FSMState
+
+logger = logging.getLogger("bot.fsm_storage")
+
+
+@dataclass
+class _Entry:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    cached_at: float = field(default_factory=time.monotonic)
+
+
+class SQLAlchemyStorage(BaseStorage):
+    """Aiogram FSM storage persisted in the ``fsm_states`` table.
+
+    Args:
+        session_factory: ``async_sessionmaker`` bound to the project engine.
+        state_ttl: Seconds of inactivity after which a state is considered abandoned.
+        flush_interval: Max delay before buffered writes reach the database.
+        max_batch: Buffered writes that trigger an immediate flush.
+        cache_ttl: Seconds a record read from the database is served locally (0 disables).
+        cache_size: Max number of locally cached records.
+        purge_interval: Seconds between deletions of expired rows.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        *,
+        state_ttl: float = 24 * 3600,
+        flush_interval: float = 0.05,
+        max_batch: int = 500,
+        cache_ttl: float = 30.0,
+        cache_size: int = 10_000,
+        purge_interval: float = 600.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.state_ttl = state_ttl
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.purge_interval = purge_interval
+        self._cache: OrderedDict[str, _Entry] = OrderedDict()
+        self._dirty: dict[str, _Entry] = {}
+        # Записи, которые flush() уже забрал из буфера, но ещё не закоммитил
+        self._inflight: dict[str, _Entry] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+        self._batch_flushes: set[asyncio.Task] = set()
+        self._last_purge = time.monotonic()
+
+    @staticmethod
+    def build_key(key: StorageKey) -> str:
+        return f"{key.bot_id}:{key.chat_id}:{key.thread_id or ''}:{key.user_id}:{key.destiny}"
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._load(self.build_key(key))
+        self._write(self.build_key(key), _Entry(
+            state=state.state if isinstance(state, State) else state,
+            data=entry.data,
+        ))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._load(self.build_key(key))).state
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        entry = await self._load(self.build_key(key))
+        self._write(self.build_key(key), _Entry(state=entry.state, data=data.copy()))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return (await self._load(self.build_key(key))).data.copy()
+
+    async def close(self) -> None:
+        """Stop the background flusher and write everything still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write buffered states in one batch. Returns the number of rows written."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            self._inflight = batch
+            now = datetime.datetime.utcnow()
+            expires_at = now + datetime.timedelta(seconds=self.state_ttl)
+            rows = [
+                {"key": k, "state": e.state, "data": e.data, "updated_at": now, "expires_at": expires_at}
+                for k, e in batch.items()
+            ]
+            try:
+                async with self.session_factory() as session:
+                    await self._upsert(session, rows)
+                    await session.commit()
+            except Exception as e:
+                # Возвращаем записи в буфер, если их не перезаписали за время flush
+                for k, entry in batch.items():
+                    self._dirty.setdefault(k, entry)
+                logger.error("fsm_flush_failed", extra={"count": len(rows), "error": str(e)})
+                raise
+            finally:
+                self._inflight = {}
+            return len(rows)
+
+    async def purge_expired(self) -> int:
+        """Delete abandoned states. Returns the number of deleted rows."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(FSMState).where(FSMState.expires_at < datetime.datetime.utcnow())
+            )
+            await session.commit()
+        self._last_purge = time.monotonic()
+        return result.rowcount or 0
+
+    async def _load(self, key: str) -> _Entry:
+        entry = self._dirty.get(key) or self._inflight.get(key)
+        if entry is not None:
+            return entry
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry.cached_at < self.cache_ttl:
+            self._cache.move_to_end(key)
+            return entry
+
+        async with self.session_factory() as session:
+            row = (await session.execute(
+                select(FSMState.state, FSMState.data).where(
+                    FSMState.key == key,
+                    FSMState.expires_at > datetime.datetime.utcnow(),
+                )
+            )).first()
+        entry = _Entry(state=row.state, data=dict(row.data or {})) if row else _Entry()
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        if self.cache_ttl <= 0:
+            return
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _write(self, key: str, entry: _Entry) -> None:
+        self._dirty[key] = entry
+        self._remember(key, entry)
+        if len(self._dirty) >= self.max_batch:
+            task = asyncio.create_task(self._safe_flush())
+            self._batch_flushes.add(task)
+            task.add_done_callback(self._batch_flushes.discard)
+        self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop(), name="fsm-storage-flusher")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._safe_flush()
+            if time.monotonic() - self._last_purge >= self.purge_interval:
+                try:
+                    await self.purge_expired()
+                except Exception as e:
+                    logger.error("fsm_purge_failed", extra={"error": str(e)})
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception:
+            # Уже залогировано в flush(); записи остались в буфере до следующей попытки
+            pass
+
+    async def _upsert(self, session: Any, rows: list[dict[str, Any]]) -> None:
+        dialect = session.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            for row in rows:
+                await session.merge(FSMState(**row))
+            return
+        stmt = insert(FSMState.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={
+                "state": stmt.excluded.state,
+                "data": stmt.excluded.data,
+                "updated_at": stmt.excluded.updated_at,
+                "expires_at": stmt.excluded.expires_at,
+            },
+        )
+        await session.execute(stmt, rows)
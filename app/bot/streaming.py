@@ -0,0 +1,97 @@
+"""Постепенный вывод текста в одно сообщение бота.
+
+Первая непустая версия текста отправляется сразу (``message.answer``), дальше
+сообщение заменяется через ``edit_message_text`` не чаще ``min_interval``
+секунд: Telegram допускает около одного сообщения в секунду на чат, и
+редактирования тоже считаются. Версии, пришедшие между правками, не
+показываются, отправляется только самая свежая. ``finish()`` всегда выводит
+итоговый текст, при необходимости дождавшись разрешённого момента.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EDIT_INTERVAL = 1.0  # секунд между правками одного сообщения
+
+
+class StreamedReply:
+    """Одно сообщение-ответ, которое обновляется по мере генерации текста."""
+
+    def __init__(
+        self,
+        message: Any,
+        *,
+        min_interval: float = DEFAULT_EDIT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._message = message
+        self.min_interval = min_interval
+        self._clock = clock
+        self._sent: Any = None
+        self._shown = ""
+        self._next_edit_at = 0.0
+        self.edits = 0
+        self.skipped = 0
+
+    @property
+    def started(self) -> bool:
+        return self._sent is not None
+
+    async def update(self, text: str) -> None:
+        """Показать промежуточный текст, если это разрешено ограничением частоты."""
+        if not text or text == self._shown:
+            return
+        if self._sent is None:
+            await self._send(text)
+        elif self._clock() >= self._next_edit_at:
+            await self._edit(text)
+        else:
+            self.skipped += 1
+
+    async def finish(self, text: str) -> None:
+        """Показать итоговый текст (отправить или дождаться следующей правки)."""
+        if not text or text == self._shown:
+            return
+        if self._sent is None:
+            await self._send(text)
+            return
+        delay = self._next_edit_at - self._clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if not await self._edit(text):
+            # Flood control: ждём, сколько попросил Telegram, и повторяем один раз
+            await asyncio.sleep(max(self._next_edit_at - self._clock(), 0))
+            await self._edit(text)
+
+    async def _send(self, text: str) -> None:
+        self._sent = await self._message.answer(text)
+        self._shown = text
+        self._next_edit_at = self._clock() + self.min_interval
+
+    async def _edit(self, text: str) -> bool:
+        try:
+            await self._message.bot.edit_message_text(
+                text=text,
+                chat_id=self._sent.chat.id,
+                message_id=self._sent.message_id,
+            )
+        except TelegramRetryAfter as e:
+            self._next_edit_at = self._clock() + e.retry_after
+            logger.warning("Ограничение частоты при правке ответа: %s с", e.retry_after)
+            return False
+        except TelegramBadRequest as e:
+            # "message is not modified" и т.п. — показываем следующую версию
+            logger.debug("Правка ответа отклонена: %s", e)
+            return True
+        self._shown = text
+        self.edits += 1
+        self._next_edit_at = self._clock() + self.min_interval
+        return True
@@ -0,0 +1,327 @@
+"""Приём апдейтов через вебхук с обработкой в нескольких процессах.
+
+``python -m app.bot.webhook`` (``BOT_MODE=webhook``) поднимает FastAPI-приложение
+под uvicorn. Telegram присылает апдейты POST-запросами, а приложение:
+
+- проверяет секрет (``X-Telegram-Bot-Api-Secret-Token``);
+- определяет ключ апдейта (id чата, для апдейтов без чата — id пользователя)
+  и кладёт апдейт в очередь процесса ``key % workers``. Все апдейты одного
+  чата попадают в один процесс, там они обрабатываются строго по очереди,
+  разные чаты — параллельно. Состояние FSM в памяти тоже остаётся в одном
+  процессе;
+- очередь каждого процесса ограничена (``WEBHOOK_QUEUE_SIZE``). Если она
+  заполнена, апдейт не принимается: ответ 503 с ``Retry-After``, и Telegram
+  пришлёт его повторно позже.
+
+Процессы-обработчики запускаются через ``spawn``. Каждый собирает свой
+Dispatcher (``setup(workers=N)``) и свои пулы соединений; число процессов
+задаёт ``WEBHOOK_WORKERS`` (0 — по числу ядер).
+
+Что делится между процессами, а что нет:
+
+- лимит Telegram на рассылку общий для бота, поэтому каждый процесс
+  рассылает уведомления со скоростью ``DEFAULT_GLOBAL_RATE / workers``;
+- модель ИИ, её очередь батчей и кэш ответов у каждого процесса свои.
+  С локальной HF-моделью память под веса растёт пропорционально числу
+  процессов (каждый грузит свою копию), а батчи собираются только из
+  вопросов своего процесса. С локальной моделью держите ``WEBHOOK_WORKERS``
+  небольшим (по памяти: workers × размер модели) или используйте Gemini
+  (``API_GEMINI_FREE``): его клиент лёгкий.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger("bot.webhook")
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+DEFAULT_WORKER_SETUP = "app.bot.webhook:setup_bot_worker"
+# Сколько апдейтов разных чатов один процесс обрабатывает одновременно
+DEFAULT_WORKER_CONCURRENCY = 64
+
+# Поля апдейта, в которых есть чат (порядок не важен: в апдейте одно поле)
+_CHAT_FIELDS = (
+    "message", "edited_message", "channel_post", "edited_channel_post",
+    "business_message", "edited_business_message", "message_reaction", "message_reaction_count",
+    "my_chat_member", "chat_member", "chat_join_request", "chat_boost", "removed_chat_boost",
+)
+_USER_FIELDS = ("inline_query", "chosen_inline_result", "shipping_query", "pre_checkout_query")
+
+
+def update_partition_key(update: dict[str, Any]) -> int:
+    """Ключ упорядочивания апдейта: id чата, иначе id пользователя, иначе update_id."""
+    for field in _CHAT_FIELDS:
+        payload = update.get(field)
+        if payload and payload.get("chat"):
+            return payload["chat"]["id"]
+    callback = update.get("callback_query")
+    if callback:
+        message = callback.get("message")
+        if message and message.get("chat"):
+            return message["chat"]["id"]
+        return callback["from"]["id"]
+    for field in _USER_FIELDS:
+        payload = update.get(field)
+        if payload:
+            return payload["from"]["id"]
+    poll_answer = update.get("poll_answer")
+    if poll_answer and poll_answer.get("user"):
+        return poll_answer["user"]["id"]
+    return update.get("update_id", 0)
+
+
+def partition(key: int, workers: int) -> int:
+    return key % workers
+
+
+def _load(path: str) -> Callable[..., Any]:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def setup_bot_worker(workers: int = 1):
+    """Dispatcher процесса-обработчика: те же роутеры и middleware, что в polling."""
+    from app.bot import bot, dp
+    from app.bot.main import register_warm_ups, setup_dispatcher
+    from app.bot.startup import get_startup
+    from app.services.fanout import DEFAULT_GLOBAL_RATE, configure_notification_fanout
+
+    # Лимит рассылки общий для бота: процессы делят его поровну
+    configure_notification_fanout(global_rate=DEFAULT_GLOBAL_RATE / workers)
+    setup_dispatcher()
+    # Команды бота ставит процесс вебхука, обработчики только прогревают своё
+    register_warm_ups(commands=False)
+
+    async def start_warm_ups() -> None:
+        get_startup().start()
+
+    dp.startup.register(start_warm_ups)
+    return bot, dp
+
+
+async def _handle(dp, bot, update: dict, previous: asyncio.Task | None, limit: asyncio.Semaphore, data: dict) -> None:
+    if previous is not None:
+        # Порядок внутри чата: ждём предыдущий апдейт (его ошибка нас не касается)
+        await asyncio.wait({previous})
+    async with limit:
+        try:
+            await dp.feed_raw_update(bot, update, **data)
+        except Exception:
+            logger.exception("webhook_update_failed", extra={"update_id": update.get("update_id")})
+
+
+def _forget(tails: dict, key: int, task: asyncio.Task) -> None:
+    if tails.get(key) is task:
+        del tails[key]
+
+
+async def _serve(index: int, updates: Any, setup: str, concurrency: int, workers: int) -> None:
+    bot, dp = _load(setup)(workers=workers)
+    data = {"dispatcher": dp, "bots": [bot], **dp.workflow_data}
+    await dp.emit_startup(bot=bot, **data)
+    loop = asyncio.get_running_loop()
+    reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"webhook-queue-{index}")
+    limit = asyncio.Semaphore(concurrency)
+    tails: dict[int, asyncio.Task] = {}  # последний апдейт каждого чата
+    try:
+        while True:
+            item = await loop.run_in_executor(reader, updates.get)
+            if item is None:
+                break
+            key, raw = item
+            task = asyncio.create_task(_handle(dp, bot, json.loads(raw), tails.get(key), limit, data))
+            tails[key] = task
+            task.add_done_callback(partial(_forget, tails, key))
+        # Каждый незавершённый апдейт либо последний в своём чате, либо его ждёт последний
+        await asyncio.gather(*tails.values(), return_exceptions=True)
+    finally:
+        reader.shutdown(wait=False)
+        try:
+            await dp.emit_shutdown(bot=bot, **data)
+        finally:
+            await bot.session.close()
+
+
+def _worker_main(index: int, updates: Any, setup: str, concurrency: int, workers: int) -> None:
+    asyncio.run(_serve(index, updates, setup, concurrency, workers))
+
+
+class WorkerPool:
+    """Процессы-обработчики апдейтов с ограниченной очередью у каждого."""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        *,
+        queue_size: int = 1000,
+        setup: str = DEFAULT_WORKER_SETUP,
+        concurrency: int = DEFAULT_WORKER_CONCURRENCY,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.setup = setup
+        self.concurrency = concurrency
+        self._context = mp.get_context("spawn")
+        self._queues: list[Any] = []
+        self._processes: list[Any] = []
+        self.accepted = [0] * self.workers
+        self.rejected = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        self._queues = [self._context.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._processes = [self._spawn(index) for index in range(self.workers)]
+        logger.info("webhook_workers_started", extra={"count": self.workers})
+
+    def _spawn(self, index: int):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self._queues[index], self.setup, self.concurrency, self.workers),
+            name=f"bot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def submit(self, key: int, raw: bytes) -> bool:
+        """Поставить апдейт в очередь его процесса; False, если очередь полна."""
+        index = partition(key, self.workers)
+        if not self._processes[index].is_alive():
+            # Упавший процесс перезапускаем на той же очереди: апдейты чата не теряются
+            logger.error("webhook_worker_died", extra={"worker": index})
+            self._processes[index] = self._spawn(index)
+            self.restarts += 1
+        try:
+            self._queues[index].put_nowait((key, raw))
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.accepted[index] += 1
+        return True
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Дообработать очереди и остановить процессы."""
+        for updates in self._queues:
+            try:
+                updates.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def stats(self) -> dict[str, Any]:
+        def depth(updates) -> int | None:
+            try:
+                return updates.qsize()
+            except NotImplementedError:  # macOS
+                return None
+
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for process in self._processes if process.is_alive()),
+            "accepted": sum(self.accepted),
+            "accepted_per_worker": list(self.accepted),
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "queued": [depth(updates) for updates in self._queues],
+        }
+
+
+def create_webhook_app(
+    pool: WorkerPool,
+    *,
+    path: str = "/telegram/webhook",
+    secret: str | None = None,
+    on_startup: Callable[[], Any] | None = None,
+) -> FastAPI:
+    """FastAPI-приложение, принимающее апдейты Telegram в ``pool``."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        pool.start()
+        if on_startup is not None:
+            await on_startup()
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(pool.stop)
+
+    app = FastAPI(title="GoodRobot Bot Webhook", lifespan=lifespan)
+
+    @app.post(path)
+    async def receive_update(request: Request):
+        if secret and request.headers.get(SECRET_HEADER) != secret:
+            raise HTTPException(status_code=403, detail="bad secret token")
+        raw = await request.body()
+        try:
+            key = update_partition_key(json.loads(raw))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise HTTPException(status_code=400, detail="malformed update")
+        if not pool.submit(key, raw):
+            # Telegram повторит доставку позже
+            return JSONResponse({"ok": False, "error": "overloaded"}, status_code=503, headers={"Retry-After": "1"})
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return pool.stats()
+
+    return app
+
+
+async def _configure_bot() -> None:
+    from app.bot import bot, dp, settings
+    from app.bot.main import BOT_COMMANDS, register_handlers
+
+    # Роутеры нужны здесь только чтобы узнать, какие типы апдейтов запрашивать
+    register_handlers()
+    if settings.webhook_url:
+        await bot.set_webhook(
+            url=settings.webhook_url.rstrip("/") + settings.webhook_path,
+            secret_token=settings.webhook_secret,
+            allowed_updates=dp.resolve_used_update_types(),
+            drop_pending_updates=True,
+        )
+    else:
+        logger.warning("webhook_url_not_set")
+    await bot.set_my_commands(BOT_COMMANDS)
+    await bot.session.close()
+
+
+def main() -> None:  # pragma: no cover
+    import uvicorn
+
+    from core.config import get_settings
+
+    settings = get_settings()
+    pool = WorkerPool(settings.webhook_workers, queue_size=settings.webhook_queue_size)
+    if pool.workers > 1 and not os.getenv("API_GEMINI_FREE"):
+        logger.warning(
+            "webhook_workers_load_local_model",
+            extra={"workers": pool.workers, "hint": "каждый процесс грузит свою копию модели ИИ"},
+        )
+    app = create_webhook_app(
+        pool, path=settings.webhook_path, secret=settings.webhook_secret, on_startup=_configure_bot
+    )
+    uvicorn.run(app, host=settings.webhook_host, port=settings.webhook_port)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
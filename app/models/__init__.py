@@ -8,6 +8,10 @@ from .rating import Rating
 from .specialty import Specialty, master_specialties
 from .user import User
 from .chat import ChatSession, ChatMessage
+from .fsm_state import FSMState
+from .classifier_keyword import ClassifierKeyword
+from .analytics import AnalyticsDailyRollup, AnalyticsDirtyDay
+from .partner_stats import PartnerStats
 
 __all__ = [
     "Base",
@@ -23,4 +27,9 @@ __all__ = [
     "master_categories",
     "ChatSession",
     "ChatMessage",
+    "FSMState",
+    "ClassifierKeyword",
+    "AnalyticsDailyRollup",
+    "AnalyticsDirtyDay",
+    "PartnerStats",
 ]
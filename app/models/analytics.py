@@ -0,0 +1,72 @@
+"""Daily analytics rollups and the queue of days to recompute."""
+from __future__ import annotations
+
+import datetime
+
+from sqlalchemy import BigInteger, Date, Index, Integer, String, event, inspect, insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from .base import Base
+from .bid import Bid
+from .order import Order
+from .payout import Payout
+from .user import User
+
+
+class AnalyticsDailyRollup(Base):
+    """Счётчики за день: ``metric`` — что считаем, ``dimension`` — статус/роль/категория."""
+
+    __tablename__ = "analytics_daily_rollups"
+    __table_args__ = (
+        # Эндпоинты читают одну метрику за диапазон дней
+        Index("ix_analytics_daily_rollups_metric_day", "metric", "day"),
+    )
+
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    metric: Mapped[str] = mapped_column(String(32), primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(128), primary_key=True, default="")
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<AnalyticsDailyRollup({self.day} {self.metric}:{self.dimension} count={self.count})>"
+
+
+class AnalyticsDirtyDay(Base):
+    """День, чьи строки изменились после того, как агрегатор его посчитал."""
+
+    __tablename__ = "analytics_dirty_days"
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    day: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+
+
+# Последние дни агрегатор пересчитывает всегда, отмечать их не нужно
+ALWAYS_REFRESHED_DAYS = 2
+_TRACKED = (User, Order, Bid, Payout)
+
+
+def _created_day(obj) -> datetime.date | None:
+    # Только уже загруженное значение: в after_flush нельзя ходить в БД за атрибутами
+    value = inspect(obj).dict.get("created_at")
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dirty_days(session: Session, flush_context) -> None:
+    """Запомнить дни созданных задним числом, изменённых и удалённых строк."""
+    horizon = datetime.date.today() - datetime.timedelta(days=ALWAYS_REFRESHED_DAYS - 1)
+    days = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, _TRACKED):
+            continue
+        day = _created_day(obj)
+        if day is not None and day < horizon:
+            days.add(day)
+        # Цена заказа — выбранная ставка: её изменение меняет день заказа
+        order = inspect(obj).dict.get("order") if isinstance(obj, Bid) else None
+        order_day = _created_day(order) if order is not None else None
+        if order_day is not None and order_day < horizon:
+            days.add(order_day)
+    if days:
+        session.connection().execute(insert(AnalyticsDirtyDay), [{"day": day} for day in sorted(days)])
@@ -24,6 +24,10 @@ class Bid(Base):
     __tablename__ = "bids"
     __table_args__ = (
         Index("ix_bids_order_created_at", "order_id", "created_at"),
+        Index("ix_bids_master_order", "master_id", "order_id"),
+        # Дневные агрегаты аналитики (диапазоны дат) и страницы админки:
+        # ORDER BY created_at DESC, id DESC
+        Index("ix_bids_created_at_id", "created_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
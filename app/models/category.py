@@ -1,5 +1,5 @@
 """SQLAlchemy model for master categories."""
-from sqlalchemy import Column, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table
 
 from app.models.base import Base
 
@@ -9,6 +9,8 @@ master_categories = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
     Column("category", String, primary_key=True),
+    # Подбор мастеров по категории заказа: category -> user_id без скана таблицы
+    Index("ix_master_categories_category_user", "category", "user_id"),
 )
 
 
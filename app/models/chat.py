@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, String, Text, func
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -25,6 +25,8 @@ class ChatSession(Base):
     started_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
     closed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime, nullable=True)
     last_activity_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+    # Сообщения перенесены в архив (app.services.chat_archive); в chat_messages их больше нет
+    archived_at: Mapped[Optional[DateTime]] = mapped_column(DateTime, nullable=True)
 
     # relationships
     order = relationship("Order")
@@ -37,10 +39,22 @@ class ChatSession(Base):
 
 
 class ChatMessage(Base):
+    """Сообщение чата.
+
+    В PostgreSQL таблица секционирована по месяцам ``created_at`` (миграция
+    ``partition_chat_messages``, первичный ключ там ``(id, created_at)``);
+    в SQLite это обычная таблица. Сообщения закрытых чатов со временем
+    переносятся в сжатый архив, см. :mod:`app.services.chat_archive`.
+    """
+
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_created", "session_id", "created_at"),
+    )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
-    session_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("chat_sessions.id"), nullable=False, index=True)
+    # В SQLite автоинкремент есть только у INTEGER PRIMARY KEY (журнал вставляет строки без id)
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
+    session_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("chat_sessions.id"), nullable=False)
     sender_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=False)
     receiver_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=False)
     message_type: Mapped[str] = mapped_column(
@@ -51,7 +65,7 @@ class ChatMessage(Base):
     )
     content_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     file_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+    created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
 
     session: Mapped[ChatSession] = relationship("ChatSession", back_populates="messages")
 
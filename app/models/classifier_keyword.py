@@ -0,0 +1,23 @@
+"""Keywords of the AI text classifier editable without a deploy."""
+from __future__ import annotations
+
+from sqlalchemy import Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ClassifierKeyword(Base):
+    __tablename__ = "classifier_keywords"
+    __table_args__ = (
+        UniqueConstraint("dictionary", "category", "keyword", name="uq_classifier_keywords"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # Словарь классификатора: order | query | urgency
+    dictionary: Mapped[str] = mapped_column(String(16), nullable=False)
+    category: Mapped[str] = mapped_column(String(64), nullable=False)
+    keyword: Mapped[str] = mapped_column(String(128), nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<ClassifierKeyword({self.dictionary}:{self.category}={self.keyword!r})>"
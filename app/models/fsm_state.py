@@ -0,0 +1,24 @@
+"""FSM state record shared by all bot processes."""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import JSON, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class FSMState(Base):
+    __tablename__ = "fsm_states"
+
+    # bot_id:chat_id:thread_id:user_id:destiny
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    state: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    data: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
+    # Брошенные сценарии (не дошли до state.clear()) удаляются после этого момента
+    expires_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<FSMState(key={self.key}, state={self.state})>"
@@ -5,6 +5,7 @@ from sqlalchemy import (
     BigInteger,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Index,
     String,
@@ -13,7 +14,9 @@ from sqlalchemy import (
     func,
 )
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+
+from core.geohash import encode as geohash_encode
 
 from .base import Base
 
@@ -28,16 +31,27 @@ class Order(Base):
     __tablename__ = "orders"
     __table_args__ = (
         Index("ix_orders_category_status", "category", "status"),
+        # Лента новых заказов мастера: WHERE status = 'new' ORDER BY created_at DESC, id DESC
+        Index("ix_orders_status_created_id", "status", "created_at", "id"),
+        # Поиск заказов рядом с точкой: диапазоны префиксов геохэша
+        Index("ix_orders_geohash", "geohash"),
+        # Дневные агрегаты аналитики (диапазоны дат) и страницы админки:
+        # ORDER BY created_at DESC, id DESC
+        Index("ix_orders_created_at_id", "created_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
-    client_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=False)
+    client_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=False, index=True)
     master_id: Mapped[int | None] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=True)  # ID мастера, которому назначен заказ
     category: Mapped[str] = mapped_column(String, nullable=False, index=True)
     # zone поле удалено
     address: Mapped[str | None] = mapped_column(String)
     latitude: Mapped[str | None] = mapped_column(String, nullable=True)  # Широта в формате строки для совместимости
     longitude: Mapped[str | None] = mapped_column(String, nullable=True)  # Долгота в формате строки для совместимости
+    # Числовые координаты и геохэш; заполняются автоматически при записи latitude/longitude
+    geo_lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    geo_lon: Mapped[float | None] = mapped_column(Float, nullable=True)
+    geohash: Mapped[str | None] = mapped_column(String(12), nullable=True)
     location_updated_at: Mapped[DateTime | None] = mapped_column(DateTime, nullable=True)  # Время последнего обновления геолокации
     when_at: Mapped[DateTime | None] = mapped_column(DateTime)
     description: Mapped[str | None] = mapped_column(Text)
@@ -62,5 +76,24 @@ class Order(Base):
     rating: Mapped[Optional["Rating"]] = relationship("Rating", back_populates="order", uselist=False)
     payout: Mapped[Optional["Payout"]] = relationship("Payout", back_populates="order", uselist=False)
 
+    @validates("latitude", "longitude")
+    def _sync_geo(self, key: str, value):
+        """Синхронизировать geo_lat/geo_lon/geohash со строковыми координатами."""
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        try:
+            number = float(value) if value else None
+        except ValueError:
+            number = None
+        if key == "latitude":
+            self.geo_lat = number if number is not None and -90 <= number <= 90 else None
+        else:
+            self.geo_lon = number if number is not None and -180 <= number <= 180 else None
+        if self.geo_lat is not None and self.geo_lon is not None:
+            self.geohash = geohash_encode(self.geo_lat, self.geo_lon)
+        else:
+            self.geohash = None
+        return value
+
     def __repr__(self) -> str:
         return f"<Order(id={self.id}, client_id={self.client_id}, status='{self.status}')>"
@@ -0,0 +1,237 @@
+"""Per-partner summary of referral statistics, kept current on every flush."""
+from __future__ import annotations
+
+import datetime
+from collections.abc import Iterable
+
+from sqlalchemy import BigInteger, Connection, DateTime, ForeignKey, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Mapped, Session, attributes, mapped_column
+
+from .base import Base
+from .order import Order
+from .payout import Payout
+from .user import User
+
+
+class PartnerStats(Base):
+    """Сводка партнёра: приведённые клиенты, их заказы и партнёрские выплаты."""
+
+    __tablename__ = "partner_stats"
+
+    partner_user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    referred_users: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    active_orders: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    completed_orders: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    pending_payouts: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total_earned: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    pending_amount: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # Для среднего чека: число выплат и сумма партнёрской доли по всем статусам
+    payouts_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    payouts_partner_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<PartnerStats(partner_user_id={self.partner_user_id}, referred_users={self.referred_users})>"
+
+
+STAT_FIELDS = (
+    "referred_users", "active_orders", "completed_orders", "pending_payouts",
+    "total_earned", "pending_amount", "payouts_count", "payouts_partner_sum",
+)
+
+
+def partner_stats_select(partner_ids: Iterable[int] | None = None):
+    """Одним проходом по приведённым клиентам, их заказам и выплатам (FILTER-агрегаты)."""
+    paid, pending = Payout.status == "paid", Payout.status == "pending"
+    query = (
+        select(
+            User.referrer_id,
+            func.count(func.distinct(User.id)),
+            func.count(Order.id).filter(Order.status == "assigned"),
+            func.count(Payout.id).filter(paid),
+            func.count(Payout.id).filter(pending),
+            func.coalesce(func.sum(Payout.amount_partner).filter(paid), 0),
+            func.coalesce(func.sum(Payout.amount_partner).filter(pending), 0),
+            func.count(Payout.id),
+            func.coalesce(func.sum(Payout.amount_partner), 0),
+        )
+        .select_from(User)
+        .outerjoin(Order, Order.client_id == User.id)
+        # У заказа не больше одной выплаты (payouts.order_id уникален), строки не размножаются
+        .outerjoin(Payout, Payout.order_id == Order.id)
+        .where(User.referrer_id.is_not(None))
+        .group_by(User.referrer_id)
+    )
+    if partner_ids is not None:
+        query = query.where(User.referrer_id.in_(list(partner_ids)))
+    return query
+
+
+def recompute_partner_stats(connection: Connection, partner_ids: Iterable[int]) -> int:
+    """Пересчитать сводки указанных партнёров в текущей транзакции."""
+    partner_ids = sorted(set(partner_ids))
+    if not partner_ids:
+        return 0
+    now = datetime.datetime.now()
+    rows = {pid: dict.fromkeys(STAT_FIELDS, 0) for pid in partner_ids}
+    for referrer_id, *values in connection.execute(partner_stats_select(partner_ids)):
+        rows[referrer_id] = dict(zip(STAT_FIELDS, (int(value or 0) for value in values)))
+    values = [{"partner_user_id": pid, **stats, "updated_at": now} for pid, stats in rows.items()]
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        statement = upsert(PartnerStats).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[PartnerStats.partner_user_id],
+            set_={name: statement.excluded[name] for name in (*STAT_FIELDS, "updated_at")},
+        )
+        connection.execute(statement)
+    else:
+        connection.execute(delete(PartnerStats).where(PartnerStats.partner_user_id.in_(partner_ids)))
+        connection.execute(insert(PartnerStats), values)
+    return len(values)
+
+
+_MISSING = object()
+
+
+def _changed(obj, fields: Iterable[str]) -> bool:
+    return any(
+        attributes.get_history(obj, name, passive=attributes.PASSIVE_NO_INITIALIZE).has_changes()
+        for name in fields
+    )
+
+
+def _values(obj, fields: Iterable[str], *, previous: bool) -> dict | None:
+    """Значения полей до flush (``previous``) или после; None, если какое-то не загружено."""
+    state = inspect(obj)
+    values = {}
+    for name in fields:
+        history = attributes.get_history(obj, name, passive=attributes.PASSIVE_NO_INITIALIZE)
+        if previous and history.has_changes():
+            value = history.deleted[0] if history.deleted else None
+        else:
+            value = state.dict.get(name, _MISSING)
+        if value is _MISSING:
+            return None
+        values[name] = value
+    return values
+
+
+def _contribution(obj, values: dict) -> dict[str, int]:
+    """Вклад одной строки в сводку её партнёра."""
+    if isinstance(obj, User):
+        return {"referred_users": 1}
+    if isinstance(obj, Order):
+        return {"active_orders": int(values["status"] == "assigned")}
+    amount = values["amount_partner"] or 0
+    paid, pending = values["status"] == "paid", values["status"] == "pending"
+    return {
+        "completed_orders": int(paid), "pending_payouts": int(pending),
+        "total_earned": amount if paid else 0, "pending_amount": amount if pending else 0,
+        "payouts_count": 1, "payouts_partner_sum": amount,
+    }
+
+
+# Поля, от которых зависят партнёр строки и её вклад
+_TRACKED = {
+    User: ("referrer_id",),
+    Order: ("client_id", "status"),
+    Payout: ("order_id", "status", "amount_partner"),
+}
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_partner_stats(session: Session, flush_context) -> None:
+    """Применить к сводкам партнёров изменения приведённых клиентов, их заказов и выплат.
+
+    Каждая строка вычитает свой прежний вклад и добавляет новый атомарным
+    ``UPDATE ... SET x = x + d``, так что параллельные транзакции не теряют
+    изменений. Если прежние значения не загружены, клиент сменил партнёра
+    или у партнёра ещё нет сводки, она пересчитывается целиком.
+    """
+    changes = []  # (obj, значения до flush | None, после | None, новая ли строка)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        fields = _TRACKED.get(type(obj))
+        if fields is None:
+            continue
+        is_new, deleted = obj in session.new, obj in session.deleted
+        if not (is_new or deleted or _changed(obj, fields)):
+            continue
+        old = None if is_new else _values(obj, fields, previous=True)
+        new = None if deleted else _values(obj, fields, previous=False)
+        changes.append((obj, old, new, is_new))
+    if not changes:
+        return
+
+    def tracked_values(model, name):
+        return {
+            values[name] for obj, old, new, _ in changes if isinstance(obj, model)
+            for values in (old, new) if values is not None
+        }
+
+    connection = session.connection()
+    # Партнёр строки: выплата -> заказ -> клиент -> referrer_id. Заказы из
+    # этого flush берём из сессии: удалённых уже нет в таблице.
+    order_clients = {
+        inspect(obj).dict.get("id"): values["client_id"]
+        for obj, old, new, _ in changes if isinstance(obj, Order)
+        for values in (new, old) if values is not None
+    }
+    order_ids = tracked_values(Payout, "order_id") - set(order_clients)
+    if order_ids:
+        order_clients.update(connection.execute(
+            select(Order.id, Order.client_id).where(Order.id.in_(list(order_ids)))
+        ).all())
+    client_ids = tracked_values(Order, "client_id") | {c for c in order_clients.values() if c is not None}
+    referrer_of = dict(connection.execute(
+        select(User.id, User.referrer_id).where(User.id.in_(list(client_ids)))
+    ).all()) if client_ids else {}
+
+    def partner_of(obj, values):
+        if isinstance(obj, User):
+            return values["referrer_id"]
+        if isinstance(obj, Order):
+            return referrer_of.get(values["client_id"])
+        return referrer_of.get(order_clients.get(values["order_id"]))
+
+    deltas: dict[int, dict[str, int]] = {}
+    recompute = set()
+    for obj, old, new, is_new in changes:
+        if old is None and not is_new:
+            # Прежних значений нет: пересчитать партнёра по текущему состоянию
+            if new is not None and partner_of(obj, new) is not None:
+                recompute.add(partner_of(obj, new))
+            continue
+        if isinstance(obj, User) and old is not None and new is not None:
+            # Смена партнёра переносит и заказы клиента: пересчитать обоих
+            recompute.update(p for p in (old["referrer_id"], new["referrer_id"]) if p is not None)
+            continue
+        for values, sign in ((old, -1), (new, 1)):
+            if values is None:
+                continue
+            partner = partner_of(obj, values)
+            if partner is None:
+                continue
+            delta = deltas.setdefault(partner, dict.fromkeys(STAT_FIELDS, 0))
+            for name, value in _contribution(obj, values).items():
+                delta[name] += sign * value
+
+    now = datetime.datetime.now()
+    for partner, delta in deltas.items():
+        if partner in recompute or not any(delta.values()):
+            continue
+        result = connection.execute(
+            update(PartnerStats)
+            .where(PartnerStats.partner_user_id == partner)
+            .values(updated_at=now, **{name: getattr(PartnerStats, name) + value
+                                      for name, value in delta.items() if value})
+        )
+        if result.rowcount == 0:
+            recompute.add(partner)
+    if recompute:
+        recompute_partner_stats(connection, recompute)
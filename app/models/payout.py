@@ -1,7 +1,7 @@
 """SQLAlchemy model for Payouts (комиссии и выплаты)."""
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Integer, func
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -13,6 +13,11 @@ if TYPE_CHECKING:
 
 class Payout(Base):
     __tablename__ = "payouts"
+    __table_args__ = (
+        # Дневные агрегаты аналитики (диапазоны дат) и страницы админки:
+        # ORDER BY created_at DESC, id DESC
+        Index("ix_payouts_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     order_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("orders.id"), unique=True, nullable=False)
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     String,
     func,
 )
@@ -24,6 +25,11 @@ if TYPE_CHECKING:
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Дневные агрегаты аналитики (диапазоны дат) и страницы админки:
+        # ORDER BY created_at DESC, id DESC
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     tg_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False, index=True)
@@ -32,7 +38,11 @@ class User(Base):
     phone: Mapped[str | None] = mapped_column(String, unique=True)
     # zones поле удалено
     rating_avg: Mapped[float] = mapped_column(Float, default=0.0)
-    referrer_id: Mapped[int | None] = mapped_column(BigInteger, ForeignKey('users.id'))
+    # Индекс: выборка приведённых партнёром клиентов
+    referrer_id: Mapped[int | None] = mapped_column(BigInteger, ForeignKey('users.id'), index=True)
+    # Рабочая точка мастера (для подбора заказов по расстоянию), может быть не задана
+    latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
 
     # Поля для админ-панели
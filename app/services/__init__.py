@@ -1,3 +1,22 @@
 from .assignments import AssignmentError, select_bid
+from .fanout import NotificationFanout, get_notification_fanout
+from .identity import UserIdentity, UserIdentityCache, get_user_cache, invalidate_user, resolve_user
+from .geo import find_orders_within
+from .matching import find_candidate_masters
+from .order_feed import FeedPage, fetch_master_feed
 
-__all__ = ["AssignmentError", "select_bid"]
+__all__ = [
+    "AssignmentError",
+    "select_bid",
+    "NotificationFanout",
+    "get_notification_fanout",
+    "find_candidate_masters",
+    "find_orders_within",
+    "FeedPage",
+    "fetch_master_feed",
+    "UserIdentity",
+    "UserIdentityCache",
+    "get_user_cache",
+    "invalidate_user",
+    "resolve_user",
+]
@@ -0,0 +1,264 @@
+"""Daily rollups behind the admin analytics endpoints.
+
+``analytics_daily_rollups`` holds one row per ``(day, metric, dimension)``
+with a row count and an amount, so the dashboard sums a few hundred rows
+instead of grouping the whole ``users``/``orders``/``bids``/``payouts``
+tables on every request:
+
+=================  ===========  ===========================================
+metric             dimension    amount
+=================  ===========  ===========================================
+users_role         role         —
+orders_status      status       sum of the selected bid price
+orders_category    category     sum of the selected bid price
+order_prices       ""           sum of the selected bid price (count: priced)
+bids_status        status       sum of bid prices
+payouts_status     status       ``amount_master + amount_partner``
+=================  ===========  ===========================================
+
+A day is always rebuilt as a whole (delete + insert of its rows), so a run
+is idempotent. :func:`run_rollups` is the scheduled job: it rebuilds the
+last ``ANALYTICS_ROLLUP_LOOKBACK_DAYS`` days plus the days queued in
+``analytics_dirty_days`` by the ORM hook in :mod:`app.models.analytics`
+(old rows that were updated, deleted or inserted with an explicit
+``created_at``). Bulk ``UPDATE``/``DELETE`` statements bypass the hook;
+callers should queue the affected days with :func:`mark_dirty_days` or run
+:func:`backfill_rollups` for the range. :func:`backfill_rollups` rebuilds
+the whole history in chunks and is used once after the migration.
+"""
+from __future__ import annotations
+
+import datetime
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from sqlalchemy import Select, and_, delete, func, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import AnalyticsDailyRollup, AnalyticsDirtyDay, Bid, Order, Payout, User
+from app.models.analytics import ALWAYS_REFRESHED_DAYS
+from core.config import get_settings
+from core.db import SessionFactory
+
+logger = logging.getLogger("bot.analytics_rollups")
+
+METRICS = ("users_role", "orders_status", "orders_category", "order_prices", "bids_status", "payouts_status")
+# Произвольный ключ pg_advisory_xact_lock: два агрегатора не пересчитывают одни и те же дни
+_LOCK_KEY = 7_021_001
+
+
+@dataclass
+class RollupReport:
+    """What a rollup run rebuilt."""
+
+    days: list[datetime.date] = field(default_factory=list)
+    rows: int = 0
+    skipped: bool = False
+
+
+def _as_date(value) -> datetime.date:
+    # SQLite отдаёт date() строкой
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def _metric_queries(start: datetime.datetime, end: datetime.datetime) -> list[tuple[str, Select]]:
+    """``(metric, SELECT day, dimension, count, amount)`` for ``[start, end)``."""
+    # Выбранная ставка у заказа одна (app.services.assignments.select_bid)
+    order_price = aliased(Bid)
+    selected = and_(order_price.order_id == Order.id, order_price.status == "selected")
+    order_day = func.date(Order.created_at)
+    in_range = (Order.created_at >= start, Order.created_at < end)
+
+    def orders_by(dimension):
+        return (
+            select(order_day, dimension, func.count(Order.id), func.coalesce(func.sum(order_price.price), 0))
+            .outerjoin(order_price, selected)
+            .where(*in_range)
+            .group_by(order_day, dimension)
+        )
+
+    user_day, bid_day, payout_day = func.date(User.created_at), func.date(Bid.created_at), func.date(Payout.created_at)
+    return [
+        ("users_role", (
+            select(user_day, User.role, func.count(User.id), literal(0))
+            .where(User.created_at >= start, User.created_at < end)
+            .group_by(user_day, User.role)
+        )),
+        ("orders_status", orders_by(Order.status)),
+        ("orders_category", orders_by(Order.category)),
+        ("order_prices", (
+            select(order_day, literal(""), func.count(order_price.price), func.coalesce(func.sum(order_price.price), 0))
+            .join(order_price, selected)
+            .where(*in_range)
+            .group_by(order_day)
+        )),
+        ("bids_status", (
+            select(bid_day, Bid.status, func.count(Bid.id), func.coalesce(func.sum(Bid.price), 0))
+            .where(Bid.created_at >= start, Bid.created_at < end)
+            .group_by(bid_day, Bid.status)
+        )),
+        ("payouts_status", (
+            select(
+                payout_day, Payout.status, func.count(Payout.id),
+                func.coalesce(func.sum(Payout.amount_master + func.coalesce(Payout.amount_partner, 0)), 0),
+            )
+            .where(Payout.created_at >= start, Payout.created_at < end)
+            .group_by(payout_day, Payout.status)
+        )),
+    ]
+
+
+async def rebuild_days(session: AsyncSession, first: datetime.date, last: datetime.date) -> int:
+    """Recompute all rollup rows of ``first..last`` (inclusive); returns rows written.
+
+    Runs inside the caller's transaction and does not commit.
+    """
+    start = datetime.datetime.combine(first, datetime.time.min)
+    end = datetime.datetime.combine(last + datetime.timedelta(days=1), datetime.time.min)
+    rows = []
+    for metric, query in _metric_queries(start, end):
+        for day, dimension, count, amount in (await session.execute(query)).all():
+            if day is None:
+                continue
+            rows.append({
+                "day": _as_date(day), "metric": metric, "dimension": "" if dimension is None else str(dimension),
+                "count": int(count), "amount": int(amount or 0),
+            })
+    await session.execute(
+        delete(AnalyticsDailyRollup).where(AnalyticsDailyRollup.day >= first, AnalyticsDailyRollup.day <= last)
+    )
+    if rows:
+        await session.execute(insert(AnalyticsDailyRollup), rows)
+    return len(rows)
+
+
+def _ranges(days: Iterable[datetime.date]) -> list[tuple[datetime.date, datetime.date]]:
+    """Collapse days into contiguous inclusive ranges."""
+    ranges: list[list[datetime.date]] = []
+    for day in sorted(set(days)):
+        if ranges and day - ranges[-1][1] == datetime.timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [(first, last) for first, last in ranges]
+
+
+async def mark_dirty_days(session: AsyncSession, days: Iterable[datetime.date]) -> None:
+    """Queue days for the next :func:`run_rollups` (for bulk statements the ORM hook misses)."""
+    rows = [{"day": _as_date(day)} for day in set(days)]
+    if rows:
+        await session.execute(insert(AnalyticsDirtyDay), rows)
+
+
+async def run_rollups(
+    *,
+    session_factory: Callable = SessionFactory,
+    lookback_days: int | None = None,
+    today: datetime.date | None = None,
+) -> RollupReport:
+    """Rebuild the trailing window and the queued dirty days in one transaction."""
+    if lookback_days is None:
+        lookback_days = get_settings().analytics_rollup_lookback_days
+    lookback_days = max(lookback_days, ALWAYS_REFRESHED_DAYS)
+    today = today or datetime.date.today()
+    report = RollupReport()
+    async with session_factory() as session:
+        if session.get_bind().dialect.name == "postgresql":
+            locked = (await session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})).scalar()
+            if not locked:
+                report.skipped = True
+                return report
+        queued = (await session.execute(select(AnalyticsDirtyDay.id, AnalyticsDirtyDay.day))).all()
+        days = {today - datetime.timedelta(days=n) for n in range(lookback_days)}
+        days.update(_as_date(day) for _, day in queued)
+        for first, last in _ranges(days):
+            report.rows += await rebuild_days(session, first, last)
+        if queued:
+            # Метки, появившиеся во время пересчёта, останутся до следующего запуска
+            await session.execute(delete(AnalyticsDirtyDay).where(AnalyticsDirtyDay.id <= max(row_id for row_id, _ in queued)))
+        await session.commit()
+    report.days = sorted(days)
+    logger.info("analytics_rollups", extra={"days": len(report.days), "rows": report.rows, "queued": len(queued)})
+    return report
+
+
+async def backfill_rollups(
+    *,
+    session_factory: Callable = SessionFactory,
+    since: datetime.date | None = None,
+    until: datetime.date | None = None,
+    chunk_days: int = 31,
+) -> RollupReport:
+    """Rebuild every day from ``since`` (default: the oldest row) to ``until`` (default: today).
+
+    Each chunk of ``chunk_days`` days is committed separately.
+    """
+    report = RollupReport()
+    if since is None:
+        async with session_factory() as session:
+            oldest = [
+                (await session.execute(select(func.min(column)))).scalar()
+                for column in (User.created_at, Order.created_at, Bid.created_at, Payout.created_at)
+            ]
+        oldest = [_as_date(value) for value in oldest if value is not None]
+        if not oldest:
+            return report
+        since = min(oldest)
+    until = until or datetime.date.today()
+    first = since
+    while first <= until:
+        last = min(first + datetime.timedelta(days=chunk_days - 1), until)
+        async with session_factory() as session:
+            report.rows += await rebuild_days(session, first, last)
+            await session.commit()
+        report.days.extend(first + datetime.timedelta(days=n) for n in range((last - first).days + 1))
+        first = last + datetime.timedelta(days=1)
+    logger.info("analytics_rollups_backfill", extra={"since": str(since), "until": str(until), "rows": report.rows})
+    return report
+
+
+async def rollup_totals(
+    session: AsyncSession,
+    metric: str,
+    *,
+    since: datetime.date | None = None,
+    until: datetime.date | None = None,
+) -> dict[str, tuple[int, int]]:
+    """``{dimension: (count, amount)}`` summed over the given days (all history by default)."""
+    query = select(
+        AnalyticsDailyRollup.dimension, func.sum(AnalyticsDailyRollup.count), func.sum(AnalyticsDailyRollup.amount)
+    ).where(AnalyticsDailyRollup.metric == metric)
+    if since is not None:
+        query = query.where(AnalyticsDailyRollup.day >= since)
+    if until is not None:
+        query = query.where(AnalyticsDailyRollup.day <= until)
+    result = await session.execute(query.group_by(AnalyticsDailyRollup.dimension).order_by(AnalyticsDailyRollup.dimension))
+    return {dimension: (int(count or 0), int(amount or 0)) for dimension, count, amount in result.all()}
+
+
+async def rollup_daily(
+    session: AsyncSession,
+    metric: str,
+    since: datetime.date,
+    until: datetime.date,
+    *,
+    dimensions: Iterable[str] | None = None,
+) -> dict[datetime.date, tuple[int, int]]:
+    """``{day: (count, amount)}`` for days with data, optionally only some dimensions."""
+    query = select(
+        AnalyticsDailyRollup.day, func.sum(AnalyticsDailyRollup.count), func.sum(AnalyticsDailyRollup.amount)
+    ).where(
+        AnalyticsDailyRollup.metric == metric,
+        AnalyticsDailyRollup.day >= since,
+        AnalyticsDailyRollup.day <= until,
+    )
+    if dimensions is not None:
+        query = query.where(AnalyticsDailyRollup.dimension.in_(list(dimensions)))
+    result = await session.execute(query.group_by(AnalyticsDailyRollup.day).order_by(AnalyticsDailyRollup.day))
+    return {_as_date(day): (int(count or 0), int(amount or 0)) for day, count, amount in result.all()}
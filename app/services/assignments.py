@@ -1,10 +1,14 @@
 """Services for assigning a master to an order based on a selected bid."""
 from __future__ import annotations
 
+import datetime
+
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Bid, Order, User
+from app.models.analytics import ALWAYS_REFRESHED_DAYS
+from app.services.analytics_rollups import mark_dirty_days
 
 
 class AssignmentError(Exception):
@@ -46,6 +50,11 @@ async def select_bid(session: AsyncSession, bid_id: int, client_tg_id: int) -> O
     order.master_id = bid.master_id
     order.status = "assigned"
 
+    # Bulk UPDATE минует ORM-хук аналитики: дни ставок ставим в очередь пересчёта сами
+    horizon = datetime.date.today() - datetime.timedelta(days=ALWAYS_REFRESHED_DAYS - 1)
+    bid_created = (await session.execute(select(Bid.created_at).where(Bid.order_id == order.id))).scalars().all()
+    await mark_dirty_days(session, {moment.date() for moment in bid_created if moment and moment.date() < horizon})
+
     # Mark selected bid and reject others
     await session.execute(
         update(Bid)
@@ -0,0 +1,409 @@
+"""Cold storage for the history of closed chats.
+
+``chat_messages`` only keeps hot history. :func:`archive_closed_sessions`
+moves the messages of chats closed more than ``CHAT_ARCHIVE_AFTER_DAYS`` ago
+into :class:`ChatArchive` and marks the sessions with ``archived_at``.
+:func:`load_chat_history` merges hot and archived messages, so the admin
+panel does not care where a message lives.
+
+Archive layout (one pair of files per month of ``created_at``)::
+
+    chat_messages-2026-01.jsonl.zst     compressed JSONL, one frame per session
+    chat_messages-2026-01.index.jsonl   {"session_id", "file", "offset", "length", "count"}
+
+Every session is written as a separate compressed frame, so reading one chat
+is a seek plus the decompression of its own frames. Frames are appended and
+fsynced before the index line and before the DB rows are deleted; if the job
+dies in between, the rows stay hot and are archived again by the next run
+(duplicates are dropped by message id on read).
+
+Compression is zstd when ``zstandard`` is installed, otherwise gzip; files of
+both kinds can be read side by side.
+
+PostgreSQL keeps ``chat_messages`` partitioned by month (migration
+``partition_chat_messages``): :func:`ensure_chat_partitions` creates the
+upcoming months and :func:`drop_archived_partitions` drops old months that
+the archival job has emptied, instead of leaving dead rows to vacuum. If the
+job did not run for a while, messages of months without a partition land in
+the DEFAULT partition; creating such a month moves them out of it.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import gzip
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, select, text, update
+
+from app.models import ChatMessage, ChatSession
+from core.config import get_settings
+from core.db import SessionFactory
+
+logger = logging.getLogger("bot.chat_archive")
+
+PARTITION_PREFIX = "chat_messages_y"
+DEFAULT_PARTITION = "chat_messages_default"
+_PARTITION_RE = re.compile(r"^chat_messages_y(\d{4})m(\d{2})$")
+_CLOCK_SLACK = datetime.timedelta(days=1)
+MESSAGE_FIELDS = ("id", "session_id", "sender_id", "receiver_id", "message_type", "content_text", "file_id")
+
+
+class _GzipCodec:
+    name = "gzip"
+    suffix = ".jsonl.gz"
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=6)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class _ZstdCodec:
+    name = "zstd"
+    suffix = ".jsonl.zst"
+
+    def __init__(self, level: int = 10) -> None:
+        import zstandard
+
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+def _codec(name: str) -> _GzipCodec | _ZstdCodec:
+    if name == "zstd":
+        try:
+            return _ZstdCodec()
+        except ImportError:
+            logger.warning("chat_archive_zstd_unavailable")
+            return _GzipCodec()
+    if name == "gzip":
+        return _GzipCodec()
+    raise ValueError(f"unknown chat archive compression: {name!r}")
+
+
+def _codec_for_file(file_name: str) -> _GzipCodec | _ZstdCodec:
+    # Архив мог писаться с другой настройкой сжатия: кодек определяется по файлу
+    return _ZstdCodec() if file_name.endswith(_ZstdCodec.suffix) else _GzipCodec()
+
+
+def month_start(moment: datetime.datetime | datetime.date) -> datetime.date:
+    return datetime.date(moment.year, moment.month, 1)
+
+
+def next_month(month: datetime.date) -> datetime.date:
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months_between(
+    first: datetime.datetime | datetime.date, last: datetime.datetime | datetime.date
+) -> list[datetime.date]:
+    """Months (first days) from the month of ``first`` to the month of ``last`` inclusive."""
+    month, end = month_start(first), month_start(last)
+    result = []
+    while month <= end:
+        result.append(month)
+        month = next_month(month)
+    return result
+
+
+def message_to_dict(message: Any) -> dict[str, Any]:
+    data = {name: getattr(message, name) for name in MESSAGE_FIELDS}
+    data["created_at"] = message.created_at.isoformat()
+    return data
+
+
+class ChatArchive:
+    """Append-only, month-sharded store of compressed chat history.
+
+    Args:
+        root: Directory of archive files (created on first write).
+        compression: ``"zstd"`` (gzip if ``zstandard`` is missing) or ``"gzip"``.
+    """
+
+    def __init__(self, root: str | os.PathLike, compression: str = "zstd") -> None:
+        self.root = Path(root)
+        self.codec = _codec(compression)
+        # Разобранные индексы месяцев: путь -> (размер файла, session_id -> записи)
+        self._indexes: dict[Path, tuple[int, dict[int, list[dict[str, Any]]]]] = {}
+
+    def _data_name(self, month: datetime.date) -> str:
+        return f"chat_messages-{month:%Y-%m}{self.codec.suffix}"
+
+    def _index_path(self, month: datetime.date) -> Path:
+        return self.root / f"chat_messages-{month:%Y-%m}.index.jsonl"
+
+    def write_session(self, month: datetime.date, session_id: int, messages: list[dict[str, Any]]) -> None:
+        """Append one frame with ``messages`` of ``session_id`` created in ``month``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = "".join(json.dumps(m, ensure_ascii=False) + "\n" for m in messages).encode()
+        frame = self.codec.compress(payload)
+        data_name = self._data_name(month)
+        with open(self.root / data_name, "ab") as data:
+            offset = data.seek(0, os.SEEK_END)
+            data.write(frame)
+            data.flush()
+            os.fsync(data.fileno())
+        entry = {"session_id": session_id, "file": data_name, "offset": offset, "length": len(frame),
+                 "count": len(messages)}
+        with open(self._index_path(month), "a") as index:
+            index.write(json.dumps(entry) + "\n")
+            index.flush()
+            os.fsync(index.fileno())
+
+    def _entries(self, month: datetime.date, session_id: int) -> list[dict[str, Any]]:
+        path = self._index_path(month)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return []
+        cached = self._indexes.get(path)
+        if cached is None or cached[0] != size:
+            # Индекс только дописывается: изменился размер — перечитываем
+            by_session: dict[int, list[dict[str, Any]]] = defaultdict(list)
+            with open(path) as index:
+                for line in index:
+                    entry = json.loads(line)
+                    by_session[entry["session_id"]].append(entry)
+            cached = self._indexes[path] = (size, by_session)
+        return cached[1].get(session_id, [])
+
+    def read_session(self, session_id: int, months: Iterable[datetime.date]) -> list[dict[str, Any]]:
+        """Archived messages of ``session_id`` in ``months``, in archive order (may repeat ids)."""
+        messages = []
+        for month in months:
+            for entry in self._entries(month, session_id):
+                codec = _codec_for_file(entry["file"])
+                with open(self.root / entry["file"], "rb") as data:
+                    data.seek(entry["offset"])
+                    frame = data.read(entry["length"])
+                messages.extend(json.loads(line) for line in codec.decompress(frame).decode().splitlines())
+        return messages
+
+    def months(self) -> list[datetime.date]:
+        """Months present in the archive."""
+        found = []
+        for path in self.root.glob("chat_messages-*.index.jsonl"):
+            year, month = path.name[len("chat_messages-"):len("chat_messages-") + 7].split("-")
+            found.append(datetime.date(int(year), int(month), 1))
+        return sorted(found)
+
+
+_archive: ChatArchive | None = None
+
+
+def get_chat_archive() -> ChatArchive:
+    """Return the process-wide archive configured from settings."""
+    global _archive
+    if _archive is None:
+        settings = get_settings()
+        _archive = ChatArchive(settings.chat_archive_dir, compression=settings.chat_archive_compression)
+    return _archive
+
+
+@dataclass
+class ArchiveReport:
+    """Result of one archival run."""
+
+    sessions: int = 0
+    messages: int = 0
+    created_partitions: list[str] | None = None
+    dropped_partitions: list[str] | None = None
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y}m{month:%m}"
+
+
+def _is_postgres(db: Any) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def ensure_chat_partitions(db: Any, *, months_ahead: int = 2, now: datetime.datetime | None = None) -> list[str]:
+    """Create monthly partitions up to ``months_ahead`` months from now (PostgreSQL only)."""
+    if not _is_postgres(db):
+        return []
+    now = now or datetime.datetime.utcnow()
+    month, created = month_start(now), []
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        exists = (await db.execute(text("SELECT to_regclass(:name)"), {"name": name})).scalar()
+        if exists is None:
+            try:
+                # Savepoint: неудачный месяц не откатывает остальные и работу архивации
+                async with db.begin_nested():
+                    await _create_partition(db, month)
+            except Exception as e:
+                logger.warning("chat_partition_skipped", extra={"partition": name, "error": str(e)})
+            else:
+                created.append(name)
+        month = next_month(month)
+    return created
+
+
+async def _create_partition(db: Any, month: datetime.date) -> None:
+    """Create the partition of ``month``, moving its rows out of the DEFAULT partition.
+
+    PostgreSQL refuses to create a partition while the DEFAULT partition holds
+    rows of its range, so such rows are moved with the DEFAULT partition detached.
+    """
+    name, bounds = partition_name(month), {"start": month, "end": next_month(month)}
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF chat_messages "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    )
+    has_default = (await db.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION})).scalar()
+    stray = has_default is not None and (await db.execute(text(
+        f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end LIMIT 1"
+    ), bounds)).first() is not None
+    if not stray:
+        await db.execute(create)
+        return
+    columns = ", ".join((*MESSAGE_FIELDS, "created_at"))
+    await db.execute(text(f"ALTER TABLE chat_messages DETACH PARTITION {DEFAULT_PARTITION}"))
+    await db.execute(create)
+    moved = await db.execute(text(
+        f"INSERT INTO chat_messages ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} "
+        "WHERE created_at >= :start AND created_at < :end"
+    ), bounds)
+    await db.execute(text(
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"
+    ), bounds)
+    await db.execute(text(f"ALTER TABLE chat_messages ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info("chat_partition_filled_from_default", extra={"partition": name, "count": moved.rowcount})
+
+
+async def drop_archived_partitions(db: Any, *, before: datetime.datetime) -> list[str]:
+    """Drop empty monthly partitions that end before ``before`` (PostgreSQL only)."""
+    if not _is_postgres(db):
+        return []
+    rows = (await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'chat_messages'::regclass"
+    ))).scalars().all()
+    dropped = []
+    for name in sorted(rows):
+        match = _PARTITION_RE.match(name)
+        if not match:
+            continue  # DEFAULT-секция и чужие таблицы
+        month = datetime.date(int(match.group(1)), int(match.group(2)), 1)
+        if datetime.datetime.combine(next_month(month), datetime.time()) > before:
+            continue
+        if (await db.execute(text(f"SELECT 1 FROM {name} LIMIT 1"))).first() is None:
+            await db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+async def archive_closed_sessions(
+    *,
+    archive: ChatArchive | None = None,
+    session_factory: Callable[[], Any] | None = None,
+    older_than_days: int | None = None,
+    batch_size: int = 100,
+    now: datetime.datetime | None = None,
+) -> ArchiveReport:
+    """Move messages of chats closed more than ``older_than_days`` ago to the archive."""
+    archive = archive or get_chat_archive()
+    factory = session_factory or SessionFactory
+    if older_than_days is None:
+        older_than_days = get_settings().chat_archive_after_days
+    now = now or datetime.datetime.utcnow()
+    cutoff = now - datetime.timedelta(days=older_than_days)
+    report = ArchiveReport()
+
+    while True:
+        async with factory() as db:
+            session_ids = (await db.execute(
+                select(ChatSession.id)
+                .where(
+                    ChatSession.status == "closed",
+                    ChatSession.closed_at < cutoff,
+                    ChatSession.archived_at.is_(None),
+                )
+                .order_by(ChatSession.id)
+                .limit(batch_size)
+            )).scalars().all()
+            if not session_ids:
+                break
+            messages = (await db.execute(
+                select(ChatMessage).where(ChatMessage.session_id.in_(session_ids)).order_by(ChatMessage.id)
+            )).scalars().all()
+
+            frames: dict[tuple[int, datetime.date], list[dict[str, Any]]] = defaultdict(list)
+            for message in messages:
+                frames[(message.session_id, month_start(message.created_at))].append(message_to_dict(message))
+            # Сначала файл (с fsync), потом удаление из БД: при сбое строки просто останутся «горячими»
+            await asyncio.to_thread(_write_frames, archive, frames)
+
+            await db.execute(delete(ChatMessage).where(ChatMessage.session_id.in_(session_ids)))
+            await db.execute(update(ChatSession).where(ChatSession.id.in_(session_ids)).values(archived_at=now))
+            await db.commit()
+        report.sessions += len(session_ids)
+        report.messages += len(messages)
+
+    async with factory() as db:
+        report.created_partitions = await ensure_chat_partitions(db, now=now)
+        report.dropped_partitions = await drop_archived_partitions(db, before=cutoff)
+        await db.commit()
+    logger.info("chat_archive_done", extra={"count": report.messages, "sessions": report.sessions})
+    return report
+
+
+def _write_frames(archive: ChatArchive, frames: dict[tuple[int, datetime.date], list[dict[str, Any]]]) -> None:
+    for (session_id, month), messages in frames.items():
+        archive.write_session(month, session_id, messages)
+
+
+async def load_chat_history(
+    db: Any,
+    session_id: int,
+    *,
+    archive: ChatArchive | None = None,
+) -> list[dict[str, Any]] | None:
+    """All messages of a chat, hot and archived, ordered by time; None if there is no such chat.
+
+    Every message gets ``archived`` telling where it was read from.
+    """
+    chat = (await db.execute(
+        select(
+            ChatSession.started_at, ChatSession.last_activity_at, ChatSession.closed_at, ChatSession.archived_at
+        ).where(ChatSession.id == session_id)
+    )).first()
+    if chat is None:
+        return None
+    hot = (await db.execute(
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+    )).scalars().all()
+
+    by_id = {}
+    if chat.archived_at is not None:
+        archive = archive or get_chat_archive()
+        moments = [m for m in (chat.started_at, chat.last_activity_at, chat.closed_at) if m is not None]
+        if moments:
+            # Часы БД (server_default) и приложения могут расходиться на границе месяца
+            months = months_between(min(moments) - _CLOCK_SLACK, max(moments) + _CLOCK_SLACK)
+        else:
+            months = archive.months()
+        for message in await asyncio.to_thread(archive.read_session, session_id, months):
+            by_id[message["id"]] = dict(message, archived=True)
+    for message in hot:
+        by_id[message.id] = dict(message_to_dict(message), archived=False)
+    return sorted(by_id.values(), key=lambda m: (m["created_at"], m["id"]))
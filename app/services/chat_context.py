@@ -0,0 +1,192 @@
+"""Cached context of chat sessions for the message relay.
+
+Relaying a chat message needs only the session status and both participants
+(DB ids for the journal, Telegram ids for delivery). ``open_chat`` already has
+all of them, so it stores a :class:`ChatContext` in :class:`ChatContextCache`;
+the relay and the chat journal then handle a steady-state message without
+any SELECT. ``close_chat`` invalidates the entry. On a miss (another process,
+restart, expired entry) the context is loaded with a single joined query.
+
+The cache is per process: a chat closed by another worker becomes visible
+after TTL at the latest.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.models import ChatSession, User
+from core.config import get_settings
+from core.db import SessionFactory
+
+
+@dataclass(frozen=True, slots=True)
+class ChatParticipants:
+    """Sender and receiver of one relayed message."""
+
+    sender_id: int
+    receiver_id: int
+    receiver_tg_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class ChatContext:
+    """Immutable snapshot of a chat session and its two participants."""
+
+    session_id: int
+    order_id: int
+    status: str
+    client_id: int
+    client_tg_id: int | None
+    master_id: int
+    master_tg_id: int | None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+    def participants(self, sender_tg_id: int) -> ChatParticipants | None:
+        """Who sends and who receives when ``sender_tg_id`` writes; None for outsiders."""
+        if sender_tg_id == self.client_tg_id:
+            receiver_id, receiver_tg_id = self.master_id, self.master_tg_id
+            sender_id = self.client_id
+        elif sender_tg_id == self.master_tg_id:
+            receiver_id, receiver_tg_id = self.client_id, self.client_tg_id
+            sender_id = self.master_id
+        else:
+            return None
+        if not receiver_tg_id:
+            return None
+        return ChatParticipants(sender_id=sender_id, receiver_id=receiver_id, receiver_tg_id=receiver_tg_id)
+
+
+class ChatContextCache:
+    """Bounded LRU cache ``session_id -> ChatContext`` with per-entry TTL.
+
+    Args:
+        maxsize: Max number of cached sessions; the least recently used is evicted.
+        ttl: Seconds an entry stays valid.
+        clock: Time source (monotonic seconds), replaceable in tests.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[int, tuple[float, ChatContext]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, session_id: int) -> ChatContext | None:
+        entry = self._data.get(session_id)
+        if entry is not None:
+            expires_at, context = entry
+            if expires_at > self._clock():
+                self._data.move_to_end(session_id)
+                self.hits += 1
+                return context
+            del self._data[session_id]
+        self.misses += 1
+        return None
+
+    def put(self, context: ChatContext) -> None:
+        self._data[context.session_id] = (self._clock() + self.ttl, context)
+        self._data.move_to_end(context.session_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, session_id: int) -> None:
+        self._data.pop(session_id, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_chat_cache: ChatContextCache | None = None
+
+
+def get_chat_context_cache() -> ChatContextCache:
+    """Return the process-wide chat context cache configured from settings."""
+    global _chat_cache
+    if _chat_cache is None:
+        settings = get_settings()
+        _chat_cache = ChatContextCache(maxsize=settings.chat_context_cache_size, ttl=settings.chat_context_cache_ttl)
+    return _chat_cache
+
+
+def remember_chat(session: Any, client: Any, master: Any) -> ChatContext:
+    """Cache the context of a just opened ``ChatSession`` with its ``User`` participants."""
+    context = ChatContext(
+        session_id=session.id,
+        order_id=session.order_id,
+        status=session.status,
+        client_id=client.id,
+        client_tg_id=client.tg_id,
+        master_id=master.id,
+        master_tg_id=master.tg_id,
+    )
+    get_chat_context_cache().put(context)
+    return context
+
+
+def invalidate_chat(session_id: int) -> None:
+    """Drop a cached chat, e.g. after it was closed."""
+    get_chat_context_cache().invalidate(session_id)
+
+
+async def load_chat_context(
+    session_id: int,
+    *,
+    session_factory: Callable[[], Any] | None = None,
+    cache: ChatContextCache | None = None,
+) -> ChatContext | None:
+    """Return the context of ``session_id`` from cache, loading it with one query on a miss."""
+    if cache is None:
+        cache = get_chat_context_cache()
+    context = cache.get(session_id)
+    if context is not None:
+        return context
+
+    client = aliased(User)
+    master = aliased(User)
+    async with (session_factory or SessionFactory)() as db:
+        row = (await db.execute(
+            select(
+                ChatSession.id,
+                ChatSession.order_id,
+                ChatSession.status,
+                ChatSession.client_id,
+                client.tg_id,
+                ChatSession.master_id,
+                master.tg_id,
+            )
+            .join(client, client.id == ChatSession.client_id)
+            .join(master, master.id == ChatSession.master_id)
+            .where(ChatSession.id == session_id)
+        )).first()
+    if row is None:
+        return None
+    context = ChatContext(*row)
+    cache.put(context)
+    return context
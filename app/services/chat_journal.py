@@ -0,0 +1,299 @@
+"""Write-behind journal of relayed chat messages.
+
+Relaying a chat message must not wait for the database: the handler calls
+:meth:`ChatJournal.record`, which only appends a row to an in-memory buffer.
+A background task flushes the buffer when it reaches ``batch_size`` rows or
+every ``flush_interval`` seconds, whichever comes first. One flush is one
+transaction: a bulk ``INSERT`` of ``chat_messages`` plus one ``UPDATE`` of
+``chat_sessions.last_activity_at`` per touched session (latest timestamp wins).
+
+Durability:
+
+- ``created_at`` is taken when the message is recorded, not when it is
+  flushed, so history keeps the relay order and time;
+- a failed flush (DB unavailable) puts the rows back in front of the buffer
+  and is retried with backoff; rows violating constraints are isolated and
+  dropped one by one so they cannot block the rest;
+- :meth:`ChatJournal.close` (``dp.shutdown``) stops the timer and flushes
+  everything that is still buffered.
+
+The buffer is per process and bounded by ``max_pending``: if the database is
+down for long, the oldest rows are dropped and counted in ``stats``.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from sqlalchemy import bindparam, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models import ChatMessage, ChatSession
+from core.config import get_settings
+from core.db import SessionFactory
+
+logger = logging.getLogger("bot.chat_journal")
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_MAX_PENDING = 50_000
+# Попытки дописать буфер при остановке и пауза между ними, сек
+CLOSE_ATTEMPTS = 3
+MAX_RETRY_DELAY = 5.0
+
+_sessions = ChatSession.__table__
+# Время активности только растёт: закрытие чата могло записать более позднее
+_UPDATE_ACTIVITY = (
+    update(_sessions)
+    .where(_sessions.c.id == bindparam("sid"))
+    .where(or_(_sessions.c.last_activity_at.is_(None), _sessions.c.last_activity_at < bindparam("ts")))
+    .values(last_activity_at=bindparam("ts"))
+)
+
+
+@dataclass
+class JournalStats:
+    """Counters of a chat journal."""
+
+    recorded: int = 0
+    flushed: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    dropped: int = 0
+    last_flush_ms: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self, pending: int) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("started_at")
+        data["pending"] = pending
+        return data
+
+
+class ChatJournal:
+    """Buffer of ``ChatMessage`` rows flushed in bulk by a background task.
+
+    Args:
+        session_factory: Async session factory; defaults to ``core.db.SessionFactory``.
+        batch_size: Buffered rows that trigger an immediate flush.
+        flush_interval: Max seconds a recorded row waits for a flush.
+        max_pending: Max buffered rows; the oldest are dropped beyond it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any] | None = None,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_MAX_PENDING,
+    ) -> None:
+        self._session_factory = session_factory or SessionFactory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.stats = JournalStats()
+        self._rows: list[dict[str, Any]] = []
+        self._activity: dict[int, datetime.datetime] = {}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+        self._late_flushes: set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def record(
+        self,
+        session_id: int,
+        sender_id: int,
+        receiver_id: int,
+        message_type: str,
+        content_text: str | None = None,
+        file_id: str | None = None,
+        created_at: datetime.datetime | None = None,
+    ) -> None:
+        """Buffer one message without touching the DB. Must be called inside a running loop."""
+        created_at = created_at or datetime.datetime.utcnow()
+        self._rows.append({
+            "session_id": session_id,
+            "sender_id": sender_id,
+            "receiver_id": receiver_id,
+            "message_type": message_type,
+            "content_text": content_text,
+            "file_id": file_id,
+            "created_at": created_at,
+        })
+        last = self._activity.get(session_id)
+        if last is None or created_at > last:
+            self._activity[session_id] = created_at
+        self.stats.recorded += 1
+        self._trim()
+
+        if self._closed:
+            # Сообщение пришло уже после close(): пишем сразу, таймера больше нет
+            task = asyncio.create_task(self._flush_quietly())
+            self._late_flushes.add(task)
+            task.add_done_callback(self._late_flushes.discard)
+            return
+        self._ensure_flusher()
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+
+    def _trim(self) -> None:
+        overflow = len(self._rows) - self.max_pending
+        if overflow > 0:
+            del self._rows[:overflow]
+            self.stats.dropped += overflow
+            logger.warning("chat_journal_overflow", extra={"count": overflow})
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run(), name="chat-journal-flusher")
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._rows and not self._activity:
+                continue
+            try:
+                # Отмена (close) не должна прервать запись посреди транзакции:
+                # буфер уже забран, прерванные строки пропали бы
+                await asyncio.shield(self.flush())
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Ошибка уже залогирована во flush(), строки вернулись в буфер
+                failures += 1
+                await asyncio.sleep(min(self.flush_interval * 2 ** failures, MAX_RETRY_DELAY))
+
+    async def flush(self) -> int:
+        """Write everything buffered so far in one transaction. Returns the rows written."""
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            activity, self._activity = self._activity, {}
+            if not rows and not activity:
+                return 0
+            started = time.perf_counter()
+            try:
+                written = await self._write(rows, activity)
+            except IntegrityError:
+                # Одна «битая» строка (например, удалённый чат) не должна блокировать остальные:
+                # пишем по одной ниже, вне обработчика, чтобы сбой там тоже вернул строки в буфер
+                written = None
+            except Exception as e:
+                self._fail(rows, activity, e)
+                raise
+            if written is None:
+                written = await self._write_one_by_one(rows, activity)
+            self.stats.flushes += 1
+            self.stats.flushed += written
+            self.stats.last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+            return written
+
+    async def _write(self, rows: list[dict[str, Any]], activity: dict[int, datetime.datetime]) -> int:
+        async with self._session_factory() as session:
+            if rows:
+                await session.execute(insert(ChatMessage), rows)
+            if activity:
+                await session.execute(_UPDATE_ACTIVITY, [{"sid": sid, "ts": ts} for sid, ts in activity.items()])
+            await session.commit()
+        return len(rows)
+
+    async def _write_one_by_one(self, rows: list[dict[str, Any]], activity: dict[int, datetime.datetime]) -> int:
+        written = 0
+        for n, row in enumerate(rows):
+            try:
+                written += await self._write([row], {})
+            except IntegrityError as e:
+                self.stats.dropped += 1
+                logger.error("chat_journal_row_rejected", extra={"session_id": row["session_id"], "error": str(e)})
+            except Exception as e:
+                # БД пропала посреди повтора: в буфер возвращаются только ещё не записанные строки
+                self.stats.flushed += written
+                self._fail(rows[n:], activity, e)
+                raise
+        try:
+            await self._write([], activity)
+        except Exception as e:
+            self.stats.flushed += written
+            self._fail([], activity, e)
+            raise
+        return written
+
+    def _fail(self, rows: list[dict[str, Any]], activity: dict[int, datetime.datetime], error: Exception) -> None:
+        self._requeue(rows, activity)
+        self.stats.failed_flushes += 1
+        logger.error("chat_journal_flush_failed", extra={"count": len(rows), "error": str(error)})
+
+    def _requeue(self, rows: list[dict[str, Any]], activity: dict[int, datetime.datetime]) -> None:
+        self._rows[:0] = rows
+        for sid, ts in activity.items():
+            last = self._activity.get(sid)
+            if last is None or ts > last:
+                self._activity[sid] = ts
+        self._trim()
+
+    async def _flush_quietly(self) -> None:
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Stop the timer and flush the buffer, retrying a few times on DB errors."""
+        self._closed = True
+        if self._flusher is not None:
+            # Запись, начатая таймером, завершится: flush() ниже дождётся её блокировки
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._late_flushes:
+            await asyncio.gather(*self._late_flushes, return_exceptions=True)
+        for attempt in range(1, CLOSE_ATTEMPTS + 1):
+            try:
+                await self.flush()
+                return
+            except Exception:
+                if attempt < CLOSE_ATTEMPTS:
+                    await asyncio.sleep(min(self.flush_interval * 2 ** attempt, MAX_RETRY_DELAY))
+        logger.error("chat_journal_lost_on_shutdown", extra={"count": self.pending})
+
+    def stats_dict(self) -> dict[str, Any]:
+        return self.stats.as_dict(self.pending)
+
+
+_journal: ChatJournal | None = None
+
+
+def get_chat_journal() -> ChatJournal:
+    """Return the process-wide chat journal configured from settings."""
+    global _journal
+    if _journal is None:
+        settings = get_settings()
+        _journal = ChatJournal(
+            batch_size=settings.chat_journal_batch_size,
+            flush_interval=settings.chat_journal_flush_interval,
+        )
+    return _journal
+
+
+async def shutdown_chat_journal() -> None:
+    """Flush buffered chat messages; register on ``dp.shutdown``."""
+    global _journal
+    if _journal is not None:
+        await _journal.close()
+        _journal = None
@@ -0,0 +1,164 @@
+"""Streaming exports of raw tables for the admin panel.
+
+Rows are read through ``AsyncSession.stream`` with ``yield_per`` (a
+server-side cursor on PostgreSQL, ``fetchmany`` elsewhere) and encoded
+chunk by chunk, so memory use depends on ``chunk_rows`` and not on the
+size of the table. Every chunk is handed to the HTTP response as soon as
+it is encoded; with ``compress=True`` the stream goes through one
+incremental gzip compressor.
+
+Formats: ``csv`` (header row, ``None`` as an empty cell) and ``ndjson``
+(one JSON object per line). Dates are ISO 8601 in both.
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Select, select
+
+from app.models import Bid, ChatMessage, Order, Payout
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """A table that can be exported: its columns and the ``created_at`` column for date filters."""
+
+    name: str
+    columns: tuple
+    created_at: Any
+
+    @property
+    def header(self) -> list[str]:
+        return [column.key for column in self.columns]
+
+    def query(
+        self,
+        *,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        filters: Iterable = (),
+    ) -> Select:
+        """Rows ordered by primary key, optionally within ``[since, until)``."""
+        query = select(*self.columns).where(*filters).order_by(self.columns[0])
+        if since is not None:
+            query = query.where(self.created_at >= since)
+        if until is not None:
+            query = query.where(self.created_at < until)
+        return query
+
+
+DATASETS = {
+    dataset.name: dataset
+    for dataset in (
+        ExportDataset("orders", (
+            Order.id, Order.client_id, Order.master_id, Order.category, Order.status, Order.address,
+            Order.latitude, Order.longitude, Order.when_at, Order.description, Order.created_at,
+        ), Order.created_at),
+        ExportDataset("bids", (
+            Bid.id, Bid.order_id, Bid.master_id, Bid.price, Bid.note, Bid.status, Bid.created_at,
+        ), Bid.created_at),
+        ExportDataset("payouts", (
+            Payout.id, Payout.order_id, Payout.master_id, Payout.amount_master, Payout.amount_service,
+            Payout.amount_partner, Payout.status, Payout.created_at,
+        ), Payout.created_at),
+        ExportDataset("chat_messages", (
+            ChatMessage.id, ChatMessage.session_id, ChatMessage.sender_id, ChatMessage.receiver_id,
+            ChatMessage.message_type, ChatMessage.content_text, ChatMessage.file_id, ChatMessage.created_at,
+        ), ChatMessage.created_at),
+    )
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+class _CsvEncoder:
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def encode(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerows(
+            [_plain(value) if not isinstance(value, (list, dict)) else json.dumps(value, ensure_ascii=False)
+             for value in row]
+            for row in rows
+        )
+        return self._buffer.getvalue().encode()
+
+
+def encode_csv(rows: Iterable[Sequence[Any]]) -> bytes:
+    """CSV bytes for a batch of rows."""
+    return _CsvEncoder().encode(rows)
+
+
+def _ndjson_encoder(header: list[str]) -> Callable[[Iterable[Sequence[Any]]], bytes]:
+    def encode(rows: Iterable[Sequence[Any]]) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(header, row)), ensure_ascii=False, default=_plain) + "\n" for row in rows
+        ).encode()
+
+    return encode
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream into one gzip member on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def stream_export(
+    session_factory: Callable,
+    query: Select,
+    header: list[str],
+    *,
+    fmt: str = "csv",
+    compress: bool = False,
+    chunk_rows: int = 2000,
+) -> AsyncIterator[bytes]:
+    """Encoded chunks of ``query`` rows; the session lives as long as the stream."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format: {fmt}")
+
+    async def chunks() -> AsyncIterator[bytes]:
+        if fmt == "csv":
+            encoder = _CsvEncoder().encode
+            yield encoder([header])
+        else:
+            encoder = _ndjson_encoder(header)
+        async with session_factory() as session:
+            result = await session.stream(query.execution_options(yield_per=chunk_rows))
+            async for rows in result.partitions():
+                yield encoder(rows)
+
+    stream = chunks()
+    if compress:
+        stream = gzip_stream(stream)
+    async for chunk in stream:
+        yield chunk
+
+
+def export_filename(name: str, fmt: str, compress: bool) -> str:
+    return f"{name}.{fmt}" + (".gz" if compress else "")
+
+
+def export_media_type(fmt: str, compress: bool) -> str:
+    return "application/gzip" if compress else MEDIA_TYPES[fmt]
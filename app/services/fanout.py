@@ -0,0 +1,249 @@
+"""Rate-limited, bounded-concurrency fan-out of bot notifications.
+
+Used to deliver "new order" notifications to masters without blocking the
+client's callback: handlers enqueue messages and return immediately, a fixed
+pool of worker tasks drains the queue while respecting Telegram limits
+(~30 msg/s per bot, ~1 msg/s per chat) and ``RetryAfter`` flood control.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from aiogram.exceptions import (
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+logger = logging.getLogger("bot.fanout")
+
+# Ограничения Telegram Bot API (с небольшим запасом)
+DEFAULT_GLOBAL_RATE = 25.0  # сообщений в секунду на бота
+DEFAULT_PER_CHAT_INTERVAL = 1.0  # секунд между сообщениями в один чат
+DEFAULT_CONCURRENCY = 16
+DEFAULT_QUEUE_SIZE = 50_000
+DEFAULT_MAX_RETRIES = 3
+
+
+class TokenBucket:
+    """Async token bucket limiting the global send rate."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+@dataclass
+class FanoutStats:
+    """Delivery counters of a fan-out engine."""
+
+    submitted: int = 0
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    retried: int = 0
+    rate_limited: int = 0
+    dropped: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.sent - self.failed - self.blocked
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("started_at")
+        data["pending"] = self.pending
+        elapsed = time.monotonic() - self.started_at
+        data["throughput_per_sec"] = round(self.sent / elapsed, 2) if elapsed > 0 else 0.0
+        return data
+
+
+@dataclass
+class _Job:
+    chat_id: int
+    text: str
+    kwargs: dict[str, Any]
+    attempt: int = 0
+
+
+class NotificationFanout:
+    """Queue of outgoing ``send_message`` calls drained by a pool of workers.
+
+    Args:
+        bot: Object with an async ``send_message(chat_id, text, **kwargs)``
+            (``aiogram.Bot`` or a test stand-in).
+        concurrency: Number of worker tasks (max in-flight requests).
+        global_rate: Max messages per second for the whole bot.
+        per_chat_interval: Min seconds between two messages to one chat.
+        max_retries: Retries for transient errors before a job is failed.
+        retry_base_delay: Base of the exponential backoff between retries.
+        queue_size: Max queued jobs; further submissions are dropped.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        global_rate: float = DEFAULT_GLOBAL_RATE,
+        per_chat_interval: float = DEFAULT_PER_CHAT_INTERVAL,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_base_delay: float = 0.5,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self.bot = bot
+        self.concurrency = concurrency
+        self.per_chat_interval = per_chat_interval
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.stats = FanoutStats()
+        self._bucket = TokenBucket(global_rate)
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue(maxsize=queue_size)
+        self._chat_next_at: dict[int, float] = {}
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not w.done() for w in self._workers)
+
+    def start(self) -> None:
+        """Spawn worker tasks (idempotent). Must be called inside a running loop."""
+        if self.running:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"fanout-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    def submit(self, chat_id: int, text: str, **kwargs: Any) -> bool:
+        """Enqueue one message without waiting. Returns False if the queue is full."""
+        self.start()
+        try:
+            self._queue.put_nowait(_Job(chat_id=chat_id, text=text, kwargs=kwargs))
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            logger.warning("fanout_queue_full", extra={"chat_id": chat_id})
+            return False
+        self.stats.submitted += 1
+        return True
+
+    def submit_many(self, chat_ids, text: str, **kwargs: Any) -> int:
+        """Enqueue the same message for many chats. Returns the number queued."""
+        return sum(1 for chat_id in chat_ids if chat_id and self.submit(chat_id, text, **kwargs))
+
+    async def join(self) -> None:
+        """Wait until every queued message is delivered or given up."""
+        await self._queue.join()
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop workers, optionally delivering what is already queued."""
+        if drain and self.running:
+            await self.join()
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _wait_chat_slot(self, chat_id: int) -> None:
+        # Слот резервируется до ожидания, чтобы параллельные воркеры не заняли один и тот же
+        now = time.monotonic()
+        slot = max(now, self._chat_next_at.get(chat_id, 0.0))
+        self._chat_next_at[chat_id] = slot + self.per_chat_interval
+        # Не даём словарю расти бесконечно при рассылке по тысячам чатов
+        if len(self._chat_next_at) > 10_000:
+            self._chat_next_at = {k: v for k, v in self._chat_next_at.items() if v > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pragma: no cover - защитный барьер воркера
+                self.stats.failed += 1
+                logger.error("fanout_worker_error", extra={"chat_id": job.chat_id, "error": str(e)})
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: _Job) -> None:
+        while True:
+            await self._wait_chat_slot(job.chat_id)
+            await self._bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=job.chat_id, text=job.text, **job.kwargs)
+                self.stats.sent += 1
+                return
+            except TelegramRetryAfter as e:
+                # Flood control: ждём указанное время и пробуем снова (не расходует попытки)
+                self.stats.rate_limited += 1
+                logger.warning("fanout_retry_after", extra={"chat_id": job.chat_id, "count": e.retry_after})
+                await asyncio.sleep(e.retry_after)
+            except TelegramForbiddenError:
+                # Пользователь заблокировал бота — повторять бессмысленно
+                self.stats.blocked += 1
+                return
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if job.attempt >= self.max_retries:
+                    self.stats.failed += 1
+                    logger.error("fanout_send_failed", extra={"chat_id": job.chat_id, "error": str(e)})
+                    return
+                job.attempt += 1
+                self.stats.retried += 1
+                await asyncio.sleep(min(self.retry_base_delay * 2 ** job.attempt, 10.0))
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error("fanout_send_failed", extra={"chat_id": job.chat_id, "error": str(e)})
+                return
+
+
+_fanout: NotificationFanout | None = None
+_global_rate = DEFAULT_GLOBAL_RATE
+
+
+def configure_notification_fanout(*, global_rate: float) -> None:
+    """Set the send rate of this process's fan-out (before the first ``get_notification_fanout``).
+
+    Several bot processes share one Telegram limit: each one gets its share.
+    """
+    global _global_rate
+    _global_rate = global_rate
+
+
+def get_notification_fanout(bot: Any) -> NotificationFanout:
+    """Return the process-wide fan-out engine, creating it for ``bot`` on first use."""
+    global _fanout
+    if _fanout is None:
+        _fanout = NotificationFanout(bot, global_rate=_global_rate)
+    return _fanout
+
+
+async def shutdown_notification_fanout() -> None:
+    """Deliver queued notifications and stop workers (called on bot shutdown)."""
+    global _fanout
+    if _fanout is not None:
+        await _fanout.stop(drain=True)
+        _fanout = None
@@ -0,0 +1,75 @@
+"""Proximity search over order locations.
+
+Orders carry numeric coordinates (``geo_lat``/``geo_lon``) and a geohash
+(``ix_orders_geohash``). A radius query becomes a few geohash prefix ranges
+covering the circle's bounding box, so only rows in nearby cells are read;
+the exact distance is then checked with the haversine formula. The same
+SQL runs on PostgreSQL and SQLite (tests), no spatial extension is needed.
+"""
+from __future__ import annotations
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Order
+from app.services.matching import bounding_box, haversine_km
+from core.geohash import covering_prefixes, prefix_range
+
+
+def geohash_condition(latitude: float, longitude: float, radius_km: float):
+    """Index-friendly condition selecting orders in cells around the point."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    ranges = []
+    for prefix in covering_prefixes(min_lat, max_lat, min_lon, max_lon):
+        low, high = prefix_range(prefix)
+        ranges.append(Order.geohash >= low if high is None else and_(Order.geohash >= low, Order.geohash < high))
+    return and_(
+        or_(*ranges),
+        Order.geo_lat.between(min_lat, max_lat),
+        Order.geo_lon.between(min_lon, max_lon),
+    )
+
+
+def orders_within_query(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    *,
+    statuses: tuple[str, ...] | None = ("new",),
+):
+    """Build the SELECT of orders whose cell intersects the circle's bounding box."""
+    stmt = select(Order).where(geohash_condition(latitude, longitude, radius_km))
+    if statuses:
+        stmt = stmt.where(Order.status.in_(statuses))
+    return stmt
+
+
+async def find_orders_within(
+    session: AsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    *,
+    statuses: tuple[str, ...] | None = ("new",),
+    limit: int | None = None,
+) -> list[tuple[Order, float]]:
+    """Return orders within ``radius_km`` of the point, nearest first.
+
+    Args:
+        session: Async DB session.
+        latitude, longitude: Search centre.
+        radius_km: Search radius in kilometres.
+        statuses: Order statuses to include (``None`` — any status).
+        limit: Max number of results.
+
+    Returns:
+        List of ``(order, distance_km)`` pairs sorted by distance.
+    """
+    stmt = orders_within_query(latitude, longitude, radius_km, statuses=statuses)
+    found = []
+    for order in (await session.execute(stmt)).scalars():
+        distance = haversine_km(latitude, longitude, order.geo_lat, order.geo_lon)
+        if distance <= radius_km:
+            found.append((order, distance))
+    found.sort(key=lambda pair: pair[1])
+    return found[:limit] if limit is not None else found
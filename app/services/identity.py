@@ -0,0 +1,147 @@
+"""Resolution of Telegram users to DB users with an in-process cache.
+
+Almost every update needs the sender's ``User`` row only for ``id``, ``role``,
+``is_active`` and ``name``. :class:`UserIdentityCache` keeps these fields for
+recently active users (bounded LRU with TTL), so the identity middleware can
+resolve ``tg_id -> user`` without a DB round trip on the hot path.
+
+The cache is per process: changes made by this bot (role selection) invalidate
+entries explicitly, changes made elsewhere (admin panel) become visible after TTL.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import select
+
+from app.models import User
+from core.config import get_settings
+from core.db import SessionFactory
+
+
+@dataclass(frozen=True, slots=True)
+class UserIdentity:
+    """Immutable snapshot of the user fields handlers need on every update."""
+
+    id: int
+    tg_id: int
+    role: str
+    is_active: bool
+    name: str | None
+
+    @classmethod
+    def from_user(cls, user: Any) -> "UserIdentity":
+        """Build from a ``User`` instance or a row with the same attributes."""
+        return cls(
+            id=user.id,
+            tg_id=user.tg_id,
+            role=user.role,
+            is_active=user.is_active is not False,
+            name=user.name,
+        )
+
+
+class UserIdentityCache:
+    """Bounded LRU cache ``tg_id -> UserIdentity`` with per-entry TTL.
+
+    Args:
+        maxsize: Max number of cached users; the least recently used is evicted.
+        ttl: Seconds an entry stays valid.
+        clock: Time source (monotonic seconds), replaceable in tests.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[int, tuple[float, UserIdentity]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, tg_id: int) -> UserIdentity | None:
+        entry = self._data.get(tg_id)
+        if entry is not None:
+            expires_at, identity = entry
+            if expires_at > self._clock():
+                self._data.move_to_end(tg_id)
+                self.hits += 1
+                return identity
+            del self._data[tg_id]
+        self.misses += 1
+        return None
+
+    def put(self, identity: UserIdentity) -> None:
+        self._data[identity.tg_id] = (self._clock() + self.ttl, identity)
+        self._data.move_to_end(identity.tg_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, tg_id: int) -> None:
+        self._data.pop(tg_id, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_user_cache: UserIdentityCache | None = None
+
+
+def get_user_cache() -> UserIdentityCache:
+    """Return the process-wide user cache configured from settings."""
+    global _user_cache
+    if _user_cache is None:
+        settings = get_settings()
+        _user_cache = UserIdentityCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+    return _user_cache
+
+
+def invalidate_user(tg_id: int) -> None:
+    """Drop a cached user, e.g. after role or status change."""
+    get_user_cache().invalidate(tg_id)
+
+
+async def resolve_user(
+    tg_id: int,
+    *,
+    session_factory: Callable[[], Any] | None = None,
+    cache: UserIdentityCache | None = None,
+) -> UserIdentity | None:
+    """Return the identity of ``tg_id`` from cache, loading it from DB on a miss.
+
+    Unregistered users are not cached so that registration via /start is
+    picked up by the very next update.
+    """
+    if cache is None:
+        cache = get_user_cache()
+    identity = cache.get(tg_id)
+    if identity is not None:
+        return identity
+
+    async with (session_factory or SessionFactory)() as session:
+        row = (await session.execute(
+            select(User.id, User.tg_id, User.role, User.is_active, User.name).where(User.tg_id == tg_id)
+        )).first()
+    if row is None:
+        return None
+    identity = UserIdentity.from_user(row)
+    cache.put(identity)
+    return identity
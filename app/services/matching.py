@@ -0,0 +1,143 @@
+"""Services for selecting masters who should be notified about a new order."""
+from __future__ import annotations
+
+import math
+from collections.abc import Collection
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Specialty, User, master_categories, master_specialties
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lon, max_lon) of a box enclosing the circle."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlon = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
+
+
+def candidate_masters_query(
+    category: str,
+    *,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    radius_km: float | None = None,
+    exclude_user_id: int | None = None,
+    include_unconfigured: bool = True,
+    include_unlocated: bool = True,
+    category_master_ids: Collection[int] | None = None,
+):
+    """Build the single SELECT returning (tg_id, latitude, longitude) of candidate masters.
+
+    A master matches when he picked the order category (``master_categories``)
+    or has a specialty named like the category (``master_specialties``).
+    With ``include_unconfigured`` masters without any category are treated as
+    "all categories", so a new master still gets orders until he configures them.
+    The distance filter is a bounding box (index friendly); exact distance is
+    checked by :func:`find_candidate_masters`.
+
+    ``category_master_ids`` are the masters who picked ``category``, already
+    known from :meth:`core.cache_service.MasterCategoriesCache.masters_for_category`;
+    they replace the ``master_categories`` lookup for the category.
+    """
+    if category_master_ids is not None:
+        by_category = User.id.in_(category_master_ids)
+    else:
+        by_category = exists().where(
+            master_categories.c.user_id == User.id,
+            master_categories.c.category == category,
+        )
+    by_specialty = exists().where(
+        master_specialties.c.user_id == User.id,
+        master_specialties.c.specialty_id == Specialty.id,
+        Specialty.name == category,
+        Specialty.is_active.is_not(False),
+    )
+    matches = [by_category, by_specialty]
+    if include_unconfigured:
+        matches.append(~exists().where(master_categories.c.user_id == User.id))
+
+    conditions = [
+        User.role == "master",
+        User.is_active.is_not(False),
+        User.tg_id.is_not(None),
+        or_(*matches),
+    ]
+    if exclude_user_id is not None:
+        conditions.append(User.id != exclude_user_id)
+
+    if radius_km is not None and latitude is not None and longitude is not None:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        in_box = and_(
+            User.latitude.between(min_lat, max_lat),
+            User.longitude.between(min_lon, max_lon),
+        )
+        if include_unlocated:
+            conditions.append(or_(User.latitude.is_(None), User.longitude.is_(None), in_box))
+        else:
+            conditions.append(in_box)
+
+    return select(User.tg_id, User.latitude, User.longitude).where(*conditions)
+
+
+async def find_candidate_masters(
+    session: AsyncSession,
+    category: str,
+    *,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    radius_km: float | None = None,
+    exclude_user_id: int | None = None,
+    include_unconfigured: bool = True,
+    include_unlocated: bool = True,
+    category_master_ids: Collection[int] | None = None,
+) -> list[int]:
+    """Return Telegram IDs of masters to notify about an order in ``category``.
+
+    Args:
+        session: Async DB session.
+        category: Order category.
+        latitude, longitude: Order coordinates (optional).
+        radius_km: Max distance from the order; ignored without coordinates.
+        exclude_user_id: User to skip (e.g. the client who created the order).
+        include_unconfigured: Also match masters without selected categories.
+        include_unlocated: Keep masters without a saved location when filtering by distance.
+        category_master_ids: Masters who picked ``category``, if known from the category index.
+
+    Returns:
+        List of distinct ``tg_id`` values.
+    """
+    stmt = candidate_masters_query(
+        category,
+        latitude=latitude,
+        longitude=longitude,
+        radius_km=radius_km,
+        exclude_user_id=exclude_user_id,
+        include_unconfigured=include_unconfigured,
+        include_unlocated=include_unlocated,
+        category_master_ids=category_master_ids,
+    )
+    rows = (await session.execute(stmt)).all()
+
+    check_distance = radius_km is not None and latitude is not None and longitude is not None
+    tg_ids: list[int] = []
+    for tg_id, m_lat, m_lon in rows:
+        if check_distance and m_lat is not None and m_lon is not None:
+            if haversine_km(latitude, longitude, m_lat, m_lon) > radius_km:
+                continue
+        tg_ids.append(tg_id)
+    return tg_ids
@@ -0,0 +1,162 @@
+"""Paginated feed of new orders for a master.
+
+The whole page is produced by one SELECT: category matching (the inverse of
+:mod:`app.services.matching`), the "already bid" flag and the page limit are
+evaluated in the database. Pages are addressed by a keyset cursor over
+``(created_at, id)``, so the cost of a page does not depend on how many orders
+exist or how deep the master has scrolled (``ix_orders_status_created_id``).
+On SQLite the cursor carries the stored ``created_at`` text (see
+:func:`core.db.stored_text`).
+"""
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Bid, Order, Specialty, master_categories, master_specialties
+from app.services.geo import geohash_condition
+from core.db import stored_text, stores_datetime_as_text
+
+FEED_PAGE_SIZE = 10
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True, slots=True)
+class FeedItem:
+    """Order fields shown in the master feed."""
+
+    id: int
+    category: str
+    created_at: datetime.datetime | None
+    has_bid: bool
+
+
+@dataclass(frozen=True, slots=True)
+class FeedPage:
+    items: list[FeedItem]
+    next_cursor: str | None
+
+
+def encode_cursor(created_at: datetime.datetime | str | None, order_id: int) -> str:
+    """Compact cursor for callback data.
+
+    ``<microseconds since epoch>.<order id>``, or ``s<stored created_at>.<order id>``
+    when ``created_at`` is the stored text (SQLite).
+    """
+    if isinstance(created_at, str):
+        return f"s{created_at}.{order_id}"
+    micros = (created_at - _EPOCH) // datetime.timedelta(microseconds=1) if created_at else 0
+    return f"{micros}.{order_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime | str, int]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on malformed input."""
+    key, dot, order_id = cursor.rpartition(".")
+    if not dot or not key:
+        raise ValueError("malformed cursor")
+    if key.startswith("s"):
+        return key[1:], int(order_id)
+    try:
+        return _EPOCH + datetime.timedelta(microseconds=int(key)), int(order_id)
+    except OverflowError as exc:
+        # Микросекунды за пределами datetime
+        raise ValueError("malformed cursor") from exc
+
+
+def master_category_filter(master_id: int):
+    """Condition matching orders in categories the master works in.
+
+    Same rules as :func:`app.services.matching.candidate_masters_query`: a
+    selected category, a specialty named like the category, or no categories
+    selected at all (the master sees every category).
+    """
+    by_category = Order.category.in_(
+        select(master_categories.c.category).where(master_categories.c.user_id == master_id)
+    )
+    by_specialty = Order.category.in_(
+        select(Specialty.name).where(
+            master_specialties.c.user_id == master_id,
+            master_specialties.c.specialty_id == Specialty.id,
+            Specialty.is_active.is_not(False),
+        )
+    )
+    unconfigured = ~exists().where(master_categories.c.user_id == master_id)
+    return or_(by_category, by_specialty, unconfigured)
+
+
+def master_feed_query(
+    master_id: int,
+    *,
+    cursor: str | None = None,
+    limit: int = FEED_PAGE_SIZE,
+    near: tuple[float, float, float] | None = None,
+    stored_key: bool = False,
+):
+    """Build the SELECT for one feed page (``limit + 1`` rows to detect the next page).
+
+    ``near`` is ``(latitude, longitude, radius_km)`` of the master; orders
+    outside the radius (bounding box precision) are skipped, orders without
+    coordinates are kept. With ``stored_key`` the page key is the stored
+    ``created_at`` text, returned as ``created_key``.
+    """
+    key = stored_text(Order.created_at) if stored_key else Order.created_at
+    has_bid = exists().where(Bid.order_id == Order.id, Bid.master_id == master_id)
+    conditions = [
+        Order.status == "new",
+        # Заказы, созданные самим мастером как клиентом, не показываем
+        Order.client_id != master_id,
+        master_category_filter(master_id),
+    ]
+    if near is not None:
+        conditions.append(or_(Order.geohash.is_(None), geohash_condition(*near)))
+    if cursor:
+        created_at, order_id = decode_cursor(cursor)
+        if isinstance(created_at, str) != stored_key:
+            raise ValueError("cursor of another database")
+        conditions.append(or_(
+            key < created_at,
+            and_(key == created_at, Order.id < order_id),
+        ))
+    return (
+        select(Order.id, Order.category, Order.created_at, has_bid.label("has_bid"), key.label("created_key"))
+        .where(*conditions)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+    )
+
+
+async def fetch_master_feed(
+    session: AsyncSession,
+    master_id: int,
+    *,
+    cursor: str | None = None,
+    limit: int = FEED_PAGE_SIZE,
+    near: tuple[float, float, float] | None = None,
+) -> FeedPage:
+    """Return one page of new orders for ``master_id``.
+
+    Args:
+        session: Async DB session.
+        master_id: ``users.id`` of the master.
+        cursor: ``next_cursor`` of the previous page (``None`` for the first page).
+        limit: Page size.
+        near: Optional ``(latitude, longitude, radius_km)`` distance filter.
+
+    Returns:
+        FeedPage with at most ``limit`` items and the cursor of the next page.
+    """
+    query = master_feed_query(
+        master_id, cursor=cursor, limit=limit, near=near, stored_key=stores_datetime_as_text(session)
+    )
+    rows = (await session.execute(query)).all()
+    items = [
+        FeedItem(id=row.id, category=row.category, created_at=row.created_at, has_bid=bool(row.has_bid))
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(rows[limit - 1].created_key, rows[limit - 1].id)
+    return FeedPage(items=items, next_cursor=next_cursor)
@@ -0,0 +1,84 @@
+"""Partner referral statistics for the partner dashboard.
+
+The numbers come from ``partner_stats``, a one-row-per-partner summary that
+the ``after_flush`` hook in :mod:`app.models.partner_stats` adjusts in the
+same transaction, by atomic increments, whenever a referred client, one of
+their orders or a payout changes. Reading the dashboard is therefore a single lookup by
+``partners.user_id`` joined with the summary by primary key.
+
+A missing summary row (a partner created before the migration) is computed
+on first read. Bulk ``UPDATE`` statements that bypass the ORM can leave a
+summary behind; :func:`refresh_all_partner_stats` recomputes every
+partner and runs with the scheduled analytics job
+(``scripts/rollup_analytics.py``).
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Partner, PartnerStats
+from app.models.partner_stats import STAT_FIELDS, partner_stats_select, recompute_partner_stats
+from core.db import SessionFactory
+
+logger = logging.getLogger("bot.partner_stats")
+
+# Партнёрская доля — 5% заказа: средний чек = доля * 20
+_ORDER_VALUE_FACTOR = 20
+
+
+def _as_dict(values: dict[str, int]) -> dict[str, Any]:
+    count = values["payouts_count"]
+    return {
+        "referred_users": values["referred_users"],
+        "active_orders": values["active_orders"],
+        "completed_orders": values["completed_orders"],
+        "pending_payouts": values["pending_payouts"],
+        "total_earned": values["total_earned"],
+        "pending_amount": values["pending_amount"],
+        "avg_order_value": int(values["payouts_partner_sum"] * _ORDER_VALUE_FACTOR / count) if count else 0,
+    }
+
+
+async def compute_partner_statistics(session: AsyncSession, partner_user_id: int) -> dict[str, Any]:
+    """Statistics straight from the source tables, in one conditional-aggregation query."""
+    row = (await session.execute(partner_stats_select([partner_user_id]))).first()
+    values = dict(zip(STAT_FIELDS, (int(v or 0) for v in row[1:]))) if row else dict.fromkeys(STAT_FIELDS, 0)
+    return _as_dict(values)
+
+
+async def load_partner_dashboard(
+    session: AsyncSession, partner_user_id: int
+) -> tuple[Partner | None, dict[str, Any] | None]:
+    """The partner record and its statistics; ``(None, None)`` if the user is not a partner."""
+    row = (await session.execute(
+        select(Partner, PartnerStats)
+        .outerjoin(PartnerStats, PartnerStats.partner_user_id == Partner.user_id)
+        .where(Partner.user_id == partner_user_id)
+    )).first()
+    if row is None:
+        return None, None
+    partner, summary = row
+    if summary is None:
+        await session.run_sync(lambda sync_session: recompute_partner_stats(sync_session.connection(), [partner_user_id]))
+        await session.commit()
+        summary = await session.get(PartnerStats, partner_user_id)
+    return partner, _as_dict({name: getattr(summary, name) for name in STAT_FIELDS})
+
+
+async def refresh_all_partner_stats(*, session_factory: Callable = SessionFactory, batch_size: int = 500) -> int:
+    """Recompute the summaries of all partners; returns how many were written."""
+    async with session_factory() as session:
+        partner_ids = (await session.execute(select(Partner.user_id).order_by(Partner.user_id))).scalars().all()
+    written = 0
+    for start in range(0, len(partner_ids), batch_size):
+        batch = partner_ids[start:start + batch_size]
+        async with session_factory() as session:
+            written += await session.run_sync(lambda sync_session: recompute_partner_stats(sync_session.connection(), batch))
+            await session.commit()
+    logger.info("partner_stats_refreshed", extra={"partners": written})
+    return written
@@ -1,37 +1,163 @@
 """
 Сервис кэширования для категорий мастеров
+
+Версия индекса категорий — счётчик в core.redis. Изменения из другого процесса
+(бот и админка) видны только при общем кэше (REDIS_URL): без него у каждого
+процесса свой счётчик, индекс не узнаёт о чужих изменениях, и поиск мастеров
+по категории идёт в БД.
 """
 
 import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from typing import Any
 
-from core.redis import get_cache, get_redis_connection, invalidate_cache, set_cache
+from core.redis import (
+    get_cache,
+    get_counter,
+    get_redis_connection,
+    incr_key,
+    invalidate_cache,
+    is_shared,
+    set_cache,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class CategoryIndex:
+    """Индекс категорий в памяти процесса: категория -> ID мастеров и мастер -> категории.
+
+    Категории мастера хранятся битовой маской (категорий немного), поэтому
+    100k мастеров занимают единицы мегабайт. Индекс ограничен ``max_masters``:
+    при переполнении вытесняются давно не обновлявшиеся мастера, а индекс
+    помечается неполным — поиск мастеров по категории тогда идёт в БД.
+
+    ``version`` совпадает с общим счётчиком версий в кэше, если индекс
+    актуален; расхождение означает, что категории менял другой процесс.
+    """
+
+    def __init__(self, max_masters: int = 200_000) -> None:
+        self.max_masters = max_masters
+        self.version = 0
+        self.complete = False
+        self._bits: dict[str, int] = {}
+        self._names: list[str] = []
+        self._by_master: OrderedDict[int, int] = OrderedDict()
+        self._by_category: dict[str, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_master)
+
+    def _bit(self, category: str) -> int:
+        bit = self._bits.get(category)
+        if bit is None:
+            bit = 1 << len(self._names)
+            self._bits[category] = bit
+            self._names.append(category)
+            self._by_category[category] = set()
+        return bit
+
+    def _mask(self, categories: Iterable[str]) -> int:
+        mask = 0
+        for category in categories:
+            mask |= self._bit(category)
+        return mask
+
+    def _unmask(self, mask: int) -> list[str]:
+        return [name for i, name in enumerate(self._names) if mask >> i & 1]
+
+    def load(self, rows: Iterable[tuple[int, str]], version: int) -> None:
+        """Полная перестройка из пар (master_id, category)."""
+        self._by_master.clear()
+        for ids in self._by_category.values():
+            ids.clear()
+        self.complete = True
+        for master_id, category in rows:
+            bit = self._bit(category)
+            if master_id not in self._by_master and len(self._by_master) >= self.max_masters:
+                self.complete = False
+                continue
+            self._by_master[master_id] = self._by_master.get(master_id, 0) | bit
+            self._by_category[category].add(master_id)
+        self.version = version
+
+    def update_master(self, master_id: int, categories: Iterable[str]) -> None:
+        """Инкрементально заменить категории одного мастера."""
+        new_mask = self._mask(categories)
+        old_mask = self._by_master.pop(master_id, 0)
+        for i, name in enumerate(self._names):
+            bit = 1 << i
+            if old_mask & bit and not new_mask & bit:
+                self._by_category[name].discard(master_id)
+            elif new_mask & bit and not old_mask & bit:
+                self._by_category[name].add(master_id)
+        if new_mask:
+            self._by_master[master_id] = new_mask
+        while len(self._by_master) > self.max_masters:
+            evicted, mask = self._by_master.popitem(last=False)
+            for name in self._unmask(mask):
+                self._by_category[name].discard(evicted)
+            self.complete = False
+
+    def remove_master(self, master_id: int) -> None:
+        self.update_master(master_id, ())
+
+    def categories_of(self, master_id: int) -> list[str] | None:
+        """Категории мастера; None, если мастер не в индексе и индекс неполный."""
+        mask = self._by_master.get(master_id)
+        if mask is None:
+            return [] if self.complete else None
+        return self._unmask(mask)
+
+    def masters_for(self, category: str) -> set[int] | None:
+        """ID мастеров категории; None, если индекс неполный."""
+        if not self.complete:
+            return None
+        return set(self._by_category.get(category, ()))
+
+    def snapshot(self) -> dict[int, list[str]]:
+        return {master_id: self._unmask(mask) for master_id, mask in self._by_master.items()}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "masters": len(self._by_master),
+            "categories": len(self._names),
+            "version": self.version,
+            "complete": self.complete,
+        }
+
+
 class MasterCategoriesCache:
-    """Сервис кэширования для категорий мастеров (заглушка без Redis)"""
+    """Сервис кэширования для категорий мастеров поверх core.redis"""
 
     CACHE_TTL = 3600  # 1 час
     MASTER_CATEGORIES_PREFIX = "master:categories"
     ALL_MASTERS_CATEGORIES_PREFIX = "masters:categories:all"
-    
-    # Локальный кэш в памяти для имитации работы Redis
-    _memory_cache = {}
-
-    def __init__(self):
+    MASTER_STATS_PREFIX = "master:stats"
+    # Общий для процессов счётчик изменений категорий (версия индекса)
+    CATEGORIES_VERSION_KEY = "masters:categories:version"
+    # Как часто читатель сверяет версию индекса с общим счётчиком, сек
+    INDEX_CHECK_INTERVAL = 1.0
+    # Больший список ID в запрос не передаём: EXISTS по индексу таблицы дешевле
+    MAX_FILTER_MASTERS = 5_000
+
+    def __init__(self, max_indexed_masters: int = 200_000):
         self.redis = None
+        self.index = CategoryIndex(max_masters=max_indexed_masters)
+        self._index_loaded = False
+        self._index_checked_at = 0.0
 
     async def _get_redis(self):
-        """Получение соединения Redis (заглушка)"""
+        """Получение объекта кэша"""
         if self.redis is None:
             self.redis = await get_redis_connection()
         return self.redis
 
     async def get_master_categories(self, master_id: int) -> list[str] | None:
         """
-        Получение категорий мастера из кэша (заглушка)
+        Получение категорий мастера из кэша
 
         Args:
             master_id: ID мастера
@@ -41,23 +167,22 @@ class MasterCategoriesCache:
         """
         try:
             cache_key = f"{self.MASTER_CATEGORIES_PREFIX}:{master_id}"
-            # Используем локальный кэш вместо Redis
-            categories = self._memory_cache.get(cache_key)
-            
-            if categories:
-                logger.info(f"Memory cache hit for master {master_id} categories", extra={
+            categories = await get_cache(cache_key)
+
+            if categories is not None:
+                logger.debug(f"Cache hit for master {master_id} categories", extra={
                     "master_id": master_id,
-                    "categories_count": len(categories) if categories else 0
+                    "categories_count": len(categories)
                 })
                 return categories
             else:
-                logger.info(f"Memory cache miss for master {master_id} categories", extra={
+                logger.debug(f"Cache miss for master {master_id} categories", extra={
                     "master_id": master_id
                 })
                 return None
 
         except Exception as e:
-            logger.error("Error getting master categories from memory cache", extra={
+            logger.error("Error getting master categories from cache", extra={
                 "master_id": master_id,
                 "error": str(e),
                 "error_type": type(e).__name__
@@ -66,7 +191,7 @@ class MasterCategoriesCache:
 
     async def set_master_categories(self, master_id: int, categories: list[str]) -> bool:
         """
-        Сохранение категорий мастера в кэш (заглушка)
+        Сохранение категорий мастера в кэш
 
         Args:
             master_id: ID мастера
@@ -77,22 +202,16 @@ class MasterCategoriesCache:
         """
         try:
             cache_key = f"{self.MASTER_CATEGORIES_PREFIX}:{master_id}"
-
-            # Сохраняем в локальный кэш вместо Redis
-            self._memory_cache[cache_key] = categories
-            success = True
+            success = await set_cache(cache_key, list(categories), self.CACHE_TTL)
 
             if success:
-                logger.info(f"Successfully cached categories for master {master_id} in memory", extra={
+                logger.info(f"Successfully cached categories for master {master_id}", extra={
                     "master_id": master_id,
                     "categories_count": len(categories),
                     "cache_key": cache_key
                 })
-
-                # Также инвалидируем кэш всех мастеров
-                await self.invalidate_all_masters_categories_cache()
             else:
-                logger.warning(f"Failed to cache categories for master {master_id} in memory", extra={
+                logger.warning(f"Failed to cache categories for master {master_id}", extra={
                     "master_id": master_id,
                     "categories_count": len(categories)
                 })
@@ -100,7 +219,7 @@ class MasterCategoriesCache:
             return success
 
         except Exception as e:
-            logger.error("Error setting master categories to memory cache", extra={
+            logger.error("Error setting master categories to cache", extra={
                 "master_id": master_id,
                 "error": str(e),
                 "error_type": type(e).__name__
@@ -109,7 +228,7 @@ class MasterCategoriesCache:
 
     async def invalidate_master_categories_cache(self, master_id: int) -> bool:
         """
-        Инвалидация кэша категорий мастера (заглушка)
+        Инвалидация кэша категорий мастера
 
         Args:
             master_id: ID мастера
@@ -119,54 +238,133 @@ class MasterCategoriesCache:
         """
         try:
             cache_key = f"{self.MASTER_CATEGORIES_PREFIX}:{master_id}"
-
-            # Удаляем из локального кэша
-            if cache_key in self._memory_cache:
-                del self._memory_cache[cache_key]
-            success = True
+            success = await invalidate_cache(cache_key)
 
             if success:
-                logger.info(f"Successfully invalidated memory cache for master {master_id}", extra={
+                logger.info(f"Successfully invalidated cache for master {master_id}", extra={
                     "master_id": master_id,
                     "cache_key": cache_key
                 })
             else:
-                logger.warning(f"Failed to invalidate memory cache for master {master_id}", extra={
+                logger.warning(f"Failed to invalidate cache for master {master_id}", extra={
                     "master_id": master_id
                 })
 
             return success
 
         except Exception as e:
-            logger.error("Error invalidating master categories memory cache", extra={
+            logger.error("Error invalidating master categories cache", extra={
                 "master_id": master_id,
                 "error": str(e),
                 "error_type": type(e).__name__
             })
             return False
 
+    async def update_master_categories(self, master_id: int, categories: list[str]) -> bool:
+        """
+        Зафиксировать изменение категорий мастера (после commit в БД)
+
+        Обновляет запись мастера в кэше, инкрементально правит индекс категорий
+        и увеличивает общую версию, чтобы другие процессы перестроили свои индексы.
+
+        Args:
+            master_id: ID мастера
+            categories: Новый список категорий
+
+        Returns:
+            bool: Успешность обновления кэша
+        """
+        success = await self.set_master_categories(master_id, categories)
+        before = self.index.version
+        self.index.update_master(master_id, categories)
+        version = await incr_key(self.CATEGORIES_VERSION_KEY)
+        # Индекс остаётся актуальным, только если между чтением и нашей записью версию никто не менял
+        if version is not None and version == before + 1:
+            self.index.version = version
+        logger.info(f"Category index updated for master {master_id}", extra={
+            "master_id": master_id,
+            "categories_count": len(categories),
+            "version": version
+        })
+        return success
+
+    async def get_category_index(self, session) -> CategoryIndex:
+        """
+        Индекс категорий, перестроенный из БД, если его версия устарела
+
+        Args:
+            session: Асинхронная сессия БД (нужна только при перестройке)
+
+        Returns:
+            CategoryIndex: Актуальный индекс
+        """
+        now = time.monotonic()
+        if self._index_loaded and now - self._index_checked_at < self.INDEX_CHECK_INTERVAL:
+            return self.index
+        version = await get_counter(self.CATEGORIES_VERSION_KEY)
+        self._index_checked_at = now
+        if not self._index_loaded or version != self.index.version:
+            from sqlalchemy import select
+
+            from app.models import master_categories
+
+            started = time.perf_counter()
+            rows = await session.execute(select(master_categories.c.user_id, master_categories.c.category))
+            self.index.load(rows.tuples(), version)
+            self._index_loaded = True
+            logger.info("Category index rebuilt", extra={
+                **self.index.stats(),
+                "took_ms": int((time.perf_counter() - started) * 1000)
+            })
+        return self.index
+
+    async def masters_for_category(self, session, category: str) -> set[int] | None:
+        """
+        ID мастеров, выбравших категорию, из индекса
+
+        Args:
+            session: Асинхронная сессия БД (нужна только при перестройке индекса)
+            category: Категория заказа
+
+        Returns:
+            Optional[Set[int]]: ID мастеров или None, если индексу нельзя верить
+            (кэш не общий, индекс неполный) или ID больше MAX_FILTER_MASTERS —
+            тогда категорию проверяет сам запрос к БД
+        """
+        if not is_shared():
+            return None
+        master_ids = (await self.get_category_index(session)).masters_for(category)
+        if master_ids is None or len(master_ids) > self.MAX_FILTER_MASTERS:
+            return None
+        return master_ids
+
+    async def _all_masters_key(self) -> str:
+        # Снимок привязан к версии: после любого изменения читатели просто не найдут старый ключ
+        version = await get_counter(self.CATEGORIES_VERSION_KEY)
+        return f"{self.ALL_MASTERS_CATEGORIES_PREFIX}:v{version}"
+
     async def get_all_masters_categories(self) -> dict[int, list[str]] | None:
         """
-        Получение категорий всех мастеров из кэша (заглушка)
+        Получение категорий всех мастеров из кэша
 
         Returns:
             Optional[Dict[int, List[str]]]: Словарь {master_id: categories} или None
         """
         try:
-            # Получаем из локального кэша
-            categories = self._memory_cache.get(self.ALL_MASTERS_CATEGORIES_PREFIX)
+            categories = await get_cache(await self._all_masters_key())
 
-            if categories:
-                logger.info("Memory cache hit for all masters categories", extra={
-                    "masters_count": len(categories) if categories else 0
+            if categories is not None:
+                logger.debug("Cache hit for all masters categories", extra={
+                    "masters_count": len(categories)
                 })
-                return categories
+                # JSON превращает ключи в строки — возвращаем ID мастеров как int
+                return {int(master_id): value for master_id, value in categories.items()}
             else:
-                logger.info("Memory cache miss for all masters categories")
+                logger.debug("Cache miss for all masters categories")
                 return None
 
         except Exception as e:
-            logger.error("Error getting all masters categories from memory cache", extra={
+            logger.error("Error getting all masters categories from cache", extra={
                 "error": str(e),
                 "error_type": type(e).__name__
             })
@@ -174,7 +372,7 @@ class MasterCategoriesCache:
 
     async def set_all_masters_categories(self, all_categories: dict[int, list[str]]) -> bool:
         """
-        Сохранение категорий всех мастеров в кэш (заглушка)
+        Сохранение категорий всех мастеров в кэш
 
         Args:
             all_categories: Словарь {master_id: categories}
@@ -183,22 +381,21 @@ class MasterCategoriesCache:
             bool: Успешность операции
         """
         try:
-            # Сохраняем в локальный кэш
-            self._memory_cache[self.ALL_MASTERS_CATEGORIES_PREFIX] = all_categories
-            success = True
+            cache_key = await self._all_masters_key()
+            success = await set_cache(cache_key, all_categories, self.CACHE_TTL)
 
             if success:
-                logger.info("Successfully cached all masters categories in memory", extra={
+                logger.info("Successfully cached all masters categories", extra={
                     "masters_count": len(all_categories),
-                    "cache_key": self.ALL_MASTERS_CATEGORIES_PREFIX
+                    "cache_key": cache_key
                 })
             else:
-                logger.warning("Failed to cache all masters categories in memory")
+                logger.warning("Failed to cache all masters categories")
 
             return success
 
         except Exception as e:
-            logger.error("Error setting all masters categories to memory cache", extra={
+            logger.error("Error setting all masters categories to cache", extra={
                 "error": str(e),
                 "error_type": type(e).__name__
             })
@@ -206,28 +403,26 @@ class MasterCategoriesCache:
 
     async def invalidate_all_masters_categories_cache(self) -> bool:
         """
-        Инвалидация кэша всех категорий мастеров (заглушка)
+        Инвалидация кэша всех категорий мастеров
 
         Returns:
             bool: Успешность операции
         """
         try:
-            # Удаляем из локального кэша
-            if self.ALL_MASTERS_CATEGORIES_PREFIX in self._memory_cache:
-                del self._memory_cache[self.ALL_MASTERS_CATEGORIES_PREFIX]
-            success = True
+            cache_key = await self._all_masters_key()
+            success = await invalidate_cache(cache_key)
 
             if success:
-                logger.info("Successfully invalidated all masters categories memory cache", extra={
-                    "cache_key": self.ALL_MASTERS_CATEGORIES_PREFIX
+                logger.debug("Successfully invalidated all masters categories cache", extra={
+                    "cache_key": cache_key
                 })
             else:
-                logger.warning("Failed to invalidate all masters categories memory cache")
+                logger.warning("Failed to invalidate all masters categories cache")
 
             return success
 
         except Exception as e:
-            logger.error("Error invalidating all masters categories memory cache", extra={
+            logger.error("Error invalidating all masters categories cache", extra={
                 "error": str(e),
                 "error_type": type(e).__name__
             })
@@ -235,7 +430,7 @@ class MasterCategoriesCache:
 
     async def get_master_stats(self, master_id: int) -> dict[str, Any] | None:
         """
-        Получение статистики мастера из кэша (заглушка)
+        Получение статистики мастера из кэша
 
         Args:
             master_id: ID мастера
@@ -244,23 +439,22 @@ class MasterCategoriesCache:
             Optional[Dict[str, Any]]: Статистика мастера или None
         """
         try:
-            cache_key = f"master:stats:{master_id}"
-            # Получаем из локального кэша
-            stats = self._memory_cache.get(cache_key)
+            cache_key = f"{self.MASTER_STATS_PREFIX}:{master_id}"
+            stats = await get_cache(cache_key)
 
-            if stats:
-                logger.info(f"Memory cache hit for master {master_id} stats", extra={
+            if stats is not None:
+                logger.debug(f"Cache hit for master {master_id} stats", extra={
                     "master_id": master_id
                 })
                 return stats
             else:
-                logger.info(f"Memory cache miss for master {master_id} stats", extra={
+                logger.debug(f"Cache miss for master {master_id} stats", extra={
                     "master_id": master_id
                 })
                 return None
 
         except Exception as e:
-            logger.error("Error getting master stats from memory cache", extra={
+            logger.error("Error getting master stats from cache", extra={
                 "master_id": master_id,
                 "error": str(e),
                 "error_type": type(e).__name__
@@ -269,7 +463,7 @@ class MasterCategoriesCache:
 
     async def set_master_stats(self, master_id: int, stats: dict[str, Any]) -> bool:
         """
-        Сохранение статистики мастера в кэш (заглушка)
+        Сохранение статистики мастера в кэш
 
         Args:
             master_id: ID мастера
@@ -279,26 +473,23 @@ class MasterCategoriesCache:
             bool: Успешность операции
         """
         try:
-            cache_key = f"master:stats:{master_id}"
-
-            # Сохраняем в локальный кэш
-            self._memory_cache[cache_key] = stats
-            success = True
+            cache_key = f"{self.MASTER_STATS_PREFIX}:{master_id}"
+            success = await set_cache(cache_key, stats, self.CACHE_TTL)
 
             if success:
-                logger.info(f"Successfully cached stats for master {master_id} in memory", extra={
+                logger.info(f"Successfully cached stats for master {master_id}", extra={
                     "master_id": master_id,
                     "cache_key": cache_key
                 })
             else:
-                logger.warning(f"Failed to cache stats for master {master_id} in memory", extra={
+                logger.warning(f"Failed to cache stats for master {master_id}", extra={
                     "master_id": master_id
                 })
 
             return success
 
         except Exception as e:
-            logger.error("Error setting master stats to memory cache", extra={
+            logger.error("Error setting master stats to cache", extra={
                 "master_id": master_id,
                 "error": str(e),
                 "error_type": type(e).__name__
@@ -307,7 +498,7 @@ class MasterCategoriesCache:
 
     async def invalidate_master_stats_cache(self, master_id: int) -> bool:
         """
-        Инвалидация кэша статистики мастера (заглушка)
+        Инвалидация кэша статистики мастера
 
         Args:
             master_id: ID мастера
@@ -316,27 +507,23 @@ class MasterCategoriesCache:
             bool: Успешность операции
         """
         try:
-            cache_key = f"master:stats:{master_id}"
-
-            # Удаляем из локального кэша
-            if cache_key in self._memory_cache:
-                del self._memory_cache[cache_key]
-            success = True
+            cache_key = f"{self.MASTER_STATS_PREFIX}:{master_id}"
+            success = await invalidate_cache(cache_key)
 
             if success:
-                logger.info(f"Successfully invalidated stats memory cache for master {master_id}", extra={
+                logger.info(f"Successfully invalidated stats cache for master {master_id}", extra={
                     "master_id": master_id,
                     "cache_key": cache_key
                 })
             else:
-                logger.warning(f"Failed to invalidate stats memory cache for master {master_id}", extra={
+                logger.warning(f"Failed to invalidate stats cache for master {master_id}", extra={
                     "master_id": master_id
                 })
 
             return success
 
         except Exception as e:
-            logger.error("Error invalidating master stats memory cache", extra={
+            logger.error("Error invalidating master stats cache", extra={
                 "master_id": master_id,
                 "error": str(e),
                 "error_type": type(e).__name__
@@ -36,6 +36,51 @@ class Settings(BaseSettings):
     # Security / roles
     superadmin_usernames: str = Field("", alias="SUPERADMIN_USERNAMES")
 
+    # Order matching: радиус подбора мастеров (км); None — без ограничения по расстоянию
+    master_match_radius_km: float | None = Field(None, alias="MASTER_MATCH_RADIUS_KM")
+    # Кэш пользователей бота (tg_id -> id/роль/статус): время жизни записи, сек, и размер
+    user_cache_ttl: float = Field(60.0, alias="USER_CACHE_TTL")
+    user_cache_size: int = Field(10_000, alias="USER_CACHE_SIZE")
+    # Кэш открытых чатов (участники и статус сессии): время жизни записи, сек, и размер
+    chat_context_cache_ttl: float = Field(300.0, alias="CHAT_CONTEXT_CACHE_TTL")
+    chat_context_cache_size: int = Field(10_000, alias="CHAT_CONTEXT_CACHE_SIZE")
+    # Журнал сообщений чата: строк в пакете записи и макс. задержка записи, сек
+    chat_journal_batch_size: int = Field(200, alias="CHAT_JOURNAL_BATCH_SIZE")
+    chat_journal_flush_interval: float = Field(0.5, alias="CHAT_JOURNAL_FLUSH_INTERVAL")
+    # Архив истории чатов: каталог, через сколько дней после закрытия чат уходит в архив, сжатие (zstd/gzip)
+    chat_archive_dir: str = Field("data/chat_archive", alias="CHAT_ARCHIVE_DIR")
+    chat_archive_after_days: int = Field(90, alias="CHAT_ARCHIVE_AFTER_DAYS")
+    chat_archive_compression: str = Field("zstd", alias="CHAT_ARCHIVE_COMPRESSION")
+    # Дневные агрегаты аналитики: сколько последних дней пересчитывать при каждом запуске агрегатора
+    analytics_rollup_lookback_days: int = Field(3, alias="ANALYTICS_ROLLUP_LOOKBACK_DAYS")
+    # Сколько секунд админка отдаёт дашборд аналитики из кэша
+    analytics_dashboard_cache_ttl: int = Field(30, alias="ANALYTICS_DASHBOARD_CACHE_TTL")
+    # FSM storage: "memory" (по умолчанию, теряется при рестарте) или "db" (таблица fsm_states)
+    fsm_storage: str = Field("memory", alias="FSM_STORAGE")
+    fsm_state_ttl: int = Field(24 * 3600, alias="FSM_STATE_TTL")
+    # Локальный кэш FSM storage "db": срок (сек, 0 — всегда читать из БД) и размер
+    fsm_cache_ttl: float = Field(30.0, alias="FSM_CACHE_TTL")
+    fsm_cache_size: int = Field(10_000, alias="FSM_CACHE_SIZE")
+
+    # Cache (core/redis.py): локальный TTL+LRU уровень и опциональный сетевой (Redis / RESP)
+    cache_max_entries: int = Field(10_000, alias="CACHE_MAX_ENTRIES")
+    # Сколько секунд процесс доверяет своей копии: изменения из другого процесса
+    # (админка <-> бот) становятся видны не позже этого срока
+    cache_local_ttl: float = Field(60.0, alias="CACHE_LOCAL_TTL")
+    redis_url: str | None = Field(None, alias="REDIS_URL")
+
+    # Режим получения апдейтов: "polling" (по умолчанию) или "webhook" (python -m app.bot.webhook)
+    bot_mode: str = Field("polling", alias="BOT_MODE")
+    # Публичный адрес, на который Telegram шлёт апдейты (https://host); без него вебхук не ставится
+    webhook_url: str | None = Field(None, alias="WEBHOOK_URL")
+    webhook_path: str = Field("/telegram/webhook", alias="WEBHOOK_PATH")
+    webhook_secret: str | None = Field(None, alias="WEBHOOK_SECRET")
+    webhook_host: str = Field("0.0.0.0", alias="WEBHOOK_HOST")
+    webhook_port: int = Field(8081, alias="WEBHOOK_PORT")
+    # Процессы-обработчики апдейтов (0 — по числу ядер) и очередь каждого
+    webhook_workers: int = Field(0, alias="WEBHOOK_WORKERS")
+    webhook_queue_size: int = Field(1000, alias="WEBHOOK_QUEUE_SIZE")
+
     # Admin settings
     @property
     def database_url(self) -> str:
@@ -1,6 +1,9 @@
 """Async SQLAlchemy engine and session factory."""
 from __future__ import annotations
 
+from typing import Any
+
+from sqlalchemy import String, type_coerce
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -24,6 +27,20 @@ SessionFactory: async_sessionmaker[AsyncSession] = async_sessionmaker(
 )
 
 
+def stores_datetime_as_text(session: Any) -> bool:
+    """SQLite keeps DateTime as text: ``server_default=func.now()`` without microseconds, the ORM with them."""
+    return session.get_bind().dialect.name == "sqlite"
+
+
+def stored_text(column: Any) -> Any:
+    """``column`` read and compared as the stored value, with no conversion to datetime.
+
+    Keyset cursors over a DateTime column carry this value on SQLite, so the
+    comparison follows the same text order as ``ORDER BY column``.
+    """
+    return type_coerce(column, String)
+
+
 async def get_session() -> AsyncSession:  # pragma: no cover
     """FastAPI dependency to get an async DB session."""
     async with SessionFactory() as session:
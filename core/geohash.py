@@ -0,0 +1,125 @@
+"""
+Geohash: кодирование координат в строку и покрытие области ячейками.
+
+Соседние точки имеют общий префикс геохэша, поэтому поиск «в радиусе R км»
+сводится к нескольким диапазонам ``prefix <= geohash < next(prefix)`` по
+обычному B-tree индексу — одинаково в PostgreSQL и SQLite, без PostGIS.
+"""
+from __future__ import annotations
+
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Точность, с которой геохэш хранится в БД (~1.2 x 0.6 км)
+STORED_PRECISION = 6
+# Сколько ячеек допускается в покрытии области (больше — берём ячейки крупнее)
+MAX_COVER_CELLS = 16
+
+
+def encode(latitude: float, longitude: float, precision: int = STORED_PRECISION) -> str:
+    """
+    Геохэш точки
+
+    Args:
+        latitude: Широта (-90..90)
+        longitude: Долгота (-180..180)
+        precision: Длина геохэша в символах
+
+    Returns:
+        str: Геохэш
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # чётные биты — долгота
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Размер ячейки (высота по широте, ширина по долготе) в градусах."""
+    total = 5 * precision
+    lon_bits = (total + 1) // 2
+    lat_bits = total // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def prefix_range(prefix: str) -> tuple[str, str | None]:
+    """
+    Диапазон ``[low, high)`` строк, начинающихся с префикса
+
+    Верхняя граница строится по алфавиту геохэша (с переносом), поэтому
+    сравнение корректно и для не-бинарных сортировок БД. ``None`` — без
+    верхней границы (префикс из одних "z").
+    """
+    chars = list(prefix)
+    while chars:
+        index = BASE32.index(chars[-1])
+        if index + 1 < len(BASE32):
+            chars[-1] = BASE32[index + 1]
+            return prefix, "".join(chars)
+        chars.pop()
+    return prefix, None
+
+
+def covering_prefixes(
+    min_lat: float,
+    max_lat: float,
+    min_lon: float,
+    max_lon: float,
+    *,
+    max_cells: int = MAX_COVER_CELLS,
+    max_precision: int = STORED_PRECISION,
+) -> list[str]:
+    """
+    Префиксы геохэша, ячейки которых покрывают прямоугольник
+
+    Выбирается самая мелкая точность, при которой ячеек не больше ``max_cells``,
+    чтобы отсечь как можно больше строк индексом и не раздувать запрос.
+    """
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0)
+    for precision in range(max_precision, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        cols = math.floor(max_lon / width) - math.floor(min_lon / width) + 1
+        if rows * cols <= max_cells or precision == 1:
+            break
+
+    cells = set()
+    lat = min_lat
+    while True:
+        lon = min_lon
+        while True:
+            cells.add(encode(lat, lon, precision))
+            if lon >= max_lon:
+                break
+            lon = min(lon + width, max_lon)
+        if lat >= max_lat:
+            break
+        lat = min(lat + height, max_lat)
+    return sorted(cells)
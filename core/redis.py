@@ -1,9 +1,28 @@
+"""
+Кэш приложения: локальный TTL+LRU уровень и опциональный сетевой (Redis) уровень.
+
+Публичный асинхронный API не изменился: set_key/get_key/delete_key и
+set_cache/get_cache/invalidate_cache (с префиксом "cache:").
+
+- Локальный уровень (MemoryCache) ограничен по числу записей (CACHE_MAX_ENTRIES),
+  хранит записи не дольше своего TTL и считает попадания/промахи.
+- Сетевой уровень (RespCache) включается переменной REDIS_URL и говорит с сервером
+  по протоколу RESP (GET/SET/DEL/PING), поэтому его может обслуживать как Redis,
+  так и локальный сервер-заглушка в тестах. Недоступность сервера не ломает
+  вызывающий код: операции деградируют до локального уровня.
+
+Значения сериализуются в JSON на обоих уровнях, поэтому вызывающий код всегда
+получает копию и не может случайно изменить закэшированный объект.
+"""
+from __future__ import annotations
+
+import asyncio
 import json
 import logging
+import time
+from collections import OrderedDict
 from typing import Any
-
-# Импорт Redis отключен временно
-# from redis import asyncio as aioredis
+from urllib.parse import urlparse
 
 from core.config import get_settings
 
@@ -12,119 +31,399 @@ settings = get_settings()
 
 logger = logging.getLogger(__name__)
 
-# Заглушка вместо подключения к Redis
-class RedisMock:
-    """Заглушка для Redis при отсутствии подключения"""
-    async def get(self, key):
-        logger.warning(f"Redis отключен: попытка получить ключ {key}")
+
+class MemoryCache:
+    """Локальный кэш процесса с TTL и вытеснением давно не используемых записей."""
+
+    def __init__(self, maxsize: int = 10_000, default_ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: OrderedDict[str, tuple[float | None, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> str | None:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, raw = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return raw
+            del self._data[key]
+            self.expired += 1
+        self.misses += 1
         return None
-        
-    async def set(self, key, value, ex=None):
-        logger.warning(f"Redis отключен: попытка установить ключ {key}")
-        return True
-        
-    async def delete(self, key):
-        logger.warning(f"Redis отключен: попытка удалить ключ {key}")
+
+    def set(self, key: str, raw: str, ttl: float | None = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        self._data[key] = (time.monotonic() + ttl if ttl else None, raw)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class RespCache:
+    """Минимальный асинхронный клиент RESP (Redis) для GET/SET/DEL/PING.
+
+    Одно соединение, команды выполняются последовательно под блокировкой.
+    После ошибки соединения клиент считает сервер недоступным ``retry_after``
+    секунд и сразу возвращает промах, не задерживая обработчики.
+    """
+
+    def __init__(self, url: str, *, timeout: float = 0.5, retry_after: float = 5.0) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    async def get(self, key: str) -> str | None:
+        value = await self._call("GET", key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key: str, raw: str, ttl: float | None = None) -> bool:
+        args = ["SET", key, raw]
+        if ttl:
+            args += ["PX", str(int(ttl * 1000))]
+        return await self._call(*args) == "OK"
+
+    async def delete(self, key: str) -> bool:
+        return bool(await self._call("DEL", key))
+
+    async def incr(self, key: str) -> int | None:
+        return await self._call("INCR", key)
+
+    async def ping(self) -> bool:
+        return await self._call("PING") == "PONG"
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+        self._reader = self._writer = None
+
+    def stats(self) -> dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "available": self.available}
+
+    async def _call(self, *args: str) -> Any:
+        if not self.available:
+            return None
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._roundtrip(*args), self.timeout)
+            except Exception as e:
+                self.errors += 1
+                self._down_until = time.monotonic() + self.retry_after
+                logger.warning(f"Cache server unavailable: {e!r}")
+                await self.close()
+                return None
+
+    async def _roundtrip(self, *args: str) -> Any:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            if self.password:
+                await self._send("AUTH", self.password)
+            if self.db:
+                await self._send("SELECT", str(self.db))
+        return await self._send(*args)
+
+    async def _send(self, *args: str) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RuntimeError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            size = int(payload)
+            if size < 0:
+                return None
+            data = await self._reader.readexactly(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            return [await self._read_reply() for _ in range(int(payload))]
+        raise RuntimeError(f"unexpected reply: {line!r}")
+
+
+class TieredCache:
+    """Локальный уровень перед опциональным сетевым.
+
+    Чтение сначала идёт в память, затем в сеть (найденное значение кладётся в
+    память не дольше ``local_ttl``); запись и удаление выполняются на обоих уровнях.
+    """
+
+    def __init__(self, local: MemoryCache, remote: RespCache | None = None, local_ttl: float | None = None) -> None:
+        self.local = local
+        self.remote = remote
+        self.local_ttl = local_ttl
+
+    def _local_ttl(self, ttl: float | None) -> float | None:
+        if self.local_ttl is None:
+            return ttl
+        return min(ttl, self.local_ttl) if ttl else self.local_ttl
+
+    async def get(self, key: str) -> str | None:
+        raw = self.local.get(key)
+        if raw is not None or self.remote is None:
+            return raw
+        raw = await self.remote.get(key)
+        if raw is not None:
+            self.local.set(key, raw, self._local_ttl(None))
+        return raw
+
+    async def set(self, key: str, value: str, ex: float | None = None) -> bool:
+        self.local.set(key, value, self._local_ttl(ex))
+        if self.remote is not None:
+            await self.remote.set(key, value, ex)
         return True
 
-# Используем заглушку вместо реального подключения
-redis = RedisMock()
+    async def delete(self, key: str) -> bool:
+        deleted = self.local.delete(key)
+        if self.remote is not None:
+            deleted = await self.remote.delete(key) or deleted
+        return deleted
+
+    async def incr(self, key: str) -> int:
+        """Атомарно увеличить счётчик (на сервере, если он доступен)."""
+        if self.remote is not None:
+            value = await self.remote.incr(key)
+            if value is not None:
+                return value
+        raw = self.local.get(key)
+        value = (int(raw) if raw is not None else 0) + 1
+        self.local.set(key, str(value), None)
+        return value
+
+    async def get_counter(self, key: str) -> int:
+        """Текущее значение счётчика; сетевой уровень читается без локальной копии."""
+        if self.remote is not None and self.remote.available:
+            raw = await self.remote.get(key)
+            if raw is not None or self.remote.available:
+                return int(raw) if raw is not None else 0
+        raw = self.local.get(key)
+        return int(raw) if raw is not None else 0
+
+    def stats(self) -> dict[str, Any]:
+        data = {"local": self.local.stats()}
+        if self.remote is not None:
+            data["remote"] = self.remote.stats()
+        return data
+
+
+def create_cache() -> TieredCache:
+    """Создать кэш по настройкам (CACHE_MAX_ENTRIES, CACHE_LOCAL_TTL, REDIS_URL)."""
+    remote = RespCache(settings.redis_url) if settings.redis_url else None
+    return TieredCache(
+        MemoryCache(maxsize=settings.cache_max_entries),
+        remote,
+        local_ttl=settings.cache_local_ttl or None,
+    )
+
+
+redis = create_cache()
+
 
-async def get_redis_connection():
-    """Получение соединения с Redis (заглушка)"""
-    logger.warning("Redis отключен: возвращаем заглушку вместо соединения")
+async def get_redis_connection() -> TieredCache:
+    """Получение объекта кэша (интерфейс get/set/delete как у клиента Redis)"""
     return redis
 
+
+def is_shared() -> bool:
+    """Общий ли кэш для всех процессов (задан REDIS_URL); иначе у каждого процесса свой"""
+    return redis.remote is not None
+
+
+def cache_stats() -> dict[str, Any]:
+    """Счётчики попаданий/промахов по уровням кэша"""
+    return redis.stats()
+
+
 async def set_key(key: str, value: Any, expire: int | None = None) -> bool:
     """
-    Установка значения в Redis с опциональным временем жизни (заглушка)
-    
+    Установка значения в кэш с опциональным временем жизни
+
     Args:
         key: Ключ
         value: Значение (будет сериализовано в JSON)
         expire: Время жизни в секундах (None - бессрочно)
-    
+
     Returns:
         bool: Успешность операции
     """
     try:
-        logger.info(f"Redis отключен: имитация установки ключа {key}")
-        return True
+        return await redis.set(key, json.dumps(value, ensure_ascii=False), ex=expire)
     except Exception as e:
-        logger.error(f"Redis set error: {e}")
+        logger.error(f"Cache set error: {e}")
         return False
 
+
 async def get_key(key: str, default: Any = None) -> Any:
     """
-    Получение значения из Redis (заглушка)
-    
+    Получение значения из кэша
+
     Args:
         key: Ключ
         default: Значение по умолчанию
-    
+
     Returns:
         Any: Значение или default, если ключ не найден
     """
     try:
-        logger.info(f"Redis отключен: имитация получения ключа {key}, возвращаем значение по умолчанию")
-        return default
+        raw = await redis.get(key)
+        return default if raw is None else json.loads(raw)
     except Exception as e:
-        logger.error(f"Redis get error: {e}")
+        logger.error(f"Cache get error: {e}")
         return default
 
+
 async def delete_key(key: str) -> bool:
     """
-    Удаление ключа из Redis (заглушка)
-    
+    Удаление ключа из кэша
+
     Args:
         key: Ключ для удаления
-    
+
     Returns:
         bool: Успешность операции
     """
     try:
-        logger.info(f"Redis отключен: имитация удаления ключа {key}")
+        await redis.delete(key)
         return True
     except Exception as e:
-        logger.error(f"Redis delete error: {e}")
+        logger.error(f"Cache delete error: {e}")
         return False
 
+
+async def incr_key(key: str) -> int | None:
+    """
+    Атомарное увеличение счётчика (версии) на 1
+
+    Args:
+        key: Ключ счётчика
+
+    Returns:
+        Optional[int]: Новое значение или None при ошибке
+    """
+    try:
+        return await redis.incr(key)
+    except Exception as e:
+        logger.error(f"Cache incr error: {e}")
+        return None
+
+
+async def get_counter(key: str) -> int:
+    """
+    Текущее значение счётчика (0, если его нет)
+
+    Args:
+        key: Ключ счётчика
+
+    Returns:
+        int: Значение счётчика
+    """
+    try:
+        return await redis.get_counter(key)
+    except Exception as e:
+        logger.error(f"Cache counter error: {e}")
+        return 0
+
+
 async def set_cache(key: str, value: Any, expire: int = 3600) -> bool:
     """
     Установка значения в кэш с временем жизни
-    
+
     Args:
         key: Ключ кэша
         value: Значение для кэширования
         expire: Время жизни в секундах (по умолчанию 1 час)
-    
+
     Returns:
         bool: Успешность операции
     """
     cache_key = f"cache:{key}"
     return await set_key(cache_key, value, expire)
 
+
 async def get_cache(key: str, default: Any = None) -> Any:
     """
     Получение значения из кэша
-    
+
     Args:
         key: Ключ кэша
         default: Значение по умолчанию
-    
+
     Returns:
         Any: Закэшированное значение или default
     """
     cache_key = f"cache:{key}"
     return await get_key(cache_key, default)
 
+
 async def invalidate_cache(key: str) -> bool:
     """
     Инвалидация кэша
-    
+
     Args:
         key: Ключ кэша для инвалидации
-    
+
     Returns:
         bool: Успешность операции
     """
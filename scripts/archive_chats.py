@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Archival of closed chats (run daily by cron or as a long-running process
+with --every, like the archive-chats service in docker-compose.yml).
+
+Moves messages of chats closed more than CHAT_ARCHIVE_AFTER_DAYS ago from
+chat_messages to compressed monthly files in CHAT_ARCHIVE_DIR, creates the
+upcoming monthly partitions of chat_messages and drops emptied old ones
+(PostgreSQL). See app/services/chat_archive.py.
+
+    python scripts/archive_chats.py [--older-than-days 90] [--dir data/chat_archive] [--every 86400]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Ensure project root on PYTHONPATH
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from app.services.chat_archive import ChatArchive, archive_closed_sessions, get_chat_archive  # noqa: E402
+from core.config import get_settings  # noqa: E402
+
+
+async def main(args) -> None:
+    archive = ChatArchive(args.dir, compression=get_settings().chat_archive_compression) if args.dir else None
+    while True:
+        report = await archive_closed_sessions(
+            archive=archive or get_chat_archive(),
+            older_than_days=args.older_than_days,
+            batch_size=args.batch_size,
+        )
+        print(
+            f"archived sessions={report.sessions} messages={report.messages} "
+            f"created partitions={report.created_partitions} dropped partitions={report.dropped_partitions}"
+        )
+        if not args.every:
+            return
+        await asyncio.sleep(args.every)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--older-than-days", type=int, default=None, help="default: CHAT_ARCHIVE_AFTER_DAYS")
+    parser.add_argument("--dir", default=None, help="default: CHAT_ARCHIVE_DIR")
+    parser.add_argument("--batch-size", type=int, default=100, help="sessions per transaction")
+    parser.add_argument("--every", type=float, default=0, help="repeat every N seconds (0: run once)")
+    asyncio.run(main(parser.parse_args()))
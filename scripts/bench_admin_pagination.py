@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Бенчмарк пагинации списков админки.
+
+Наполняет БД --rows заказами и замеряет p50 загрузки страницы N списка
+заказов (от новых к старым) двумя способами:
+
+- offset — как раньше: ORDER BY created_at DESC OFFSET (N-1)*limit;
+- keyset — ``admin.app.pagination.fetch_keyset_page`` с курсором
+  предыдущей страницы.
+
+Отдельно — цена ``with_total`` (оценка общего числа строк).
+
+    python scripts/bench_admin_pagination.py --rows 200000 --pages 1,10,100,1000,10000
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import String, insert, select, type_coerce  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from admin.app.pagination import encode_cursor, estimate_total, fetch_keyset_page  # noqa: E402
+from app.models import Order, User  # noqa: E402
+from app.models.base import Base  # noqa: E402
+
+START = datetime.datetime(2025, 1, 1)
+
+
+async def prepare(factory, rows: int) -> None:
+    async with factory() as db:
+        await db.execute(insert(User), [{"id": 1, "tg_id": 1, "role": "client", "name": "c"}])
+        for start in range(0, rows, 10_000):
+            await db.execute(insert(Order), [
+                # По две строки на минуту: ключ страницы держится на id
+                {"id": n, "client_id": 1, "category": "Сантехника", "status": "new",
+                 "created_at": START + datetime.timedelta(minutes=n // 2)}
+                for n in range(start + 1, min(start + 10_000, rows) + 1)
+            ])
+        await db.commit()
+
+
+async def p50(factory, fn, repeat: int) -> float:
+    samples = []
+    async with factory() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fn(db)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def offset_page(db, page: int, limit: int):
+    query = select(Order).order_by(Order.created_at.desc()).offset((page - 1) * limit).limit(limit)
+    return (await db.execute(query)).scalars().all()
+
+
+async def cursor_before(factory, page: int, limit: int) -> str | None:
+    """Курсор, который клиент получил бы на странице page-1 (не замеряется)."""
+    if page == 1:
+        return None
+    async with factory() as db:
+        # В SQLite ключ курсора — хранимый текст даты (см. admin.app.pagination)
+        key = Order.created_at
+        if db.get_bind().dialect.name == "sqlite":
+            key = type_coerce(key, String)
+        created_at, order_id = (await db.execute(
+            select(key, Order.id)
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .offset((page - 1) * limit - 1).limit(1)
+        )).one()
+    return encode_cursor(created_at, order_id)
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(args.db or f"sqlite+aiosqlite:///{tmp}/bench.sqlite3")
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await prepare(factory, args.rows)
+        print(f"заказов {args.rows}, limit {args.limit}, db={engine.url.get_backend_name()}")
+        print(f"{'страница':>10s} {'offset, мс':>12s} {'keyset, мс':>12s}")
+
+        query = select(Order)
+        for page in (int(p) for p in args.pages.split(",")):
+            if (page - 1) * args.limit >= args.rows:
+                continue
+            cursor = await cursor_before(factory, page, args.limit)
+            legacy = await p50(factory, lambda db: offset_page(db, page, args.limit), args.repeat)
+            keyset = await p50(factory, lambda db: fetch_keyset_page(
+                db, query, created_at=Order.created_at, id_column=Order.id, cursor=cursor, limit=args.limit,
+            ), args.repeat)
+            print(f"{page:>10d} {legacy * 1000:12.2f} {keyset * 1000:12.2f}")
+
+        for name, filtered in (("без фильтров", query), ("status='new'", query.where(Order.status == "new"))):
+            cost = await p50(factory, lambda db: estimate_total(db, filtered), args.repeat)
+            print(f"with_total, {name}: p50 {cost * 1000:.2f} мс")
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", default="1,10,100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="async URL пустой БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Бенчмарк ИИ-помощника под нагрузкой: отдельные вызовы в пуле потоков vs пакетная генерация.
+
+N пользователей одновременно задают вопрос. Базовый вариант повторяет прежний
+обработчик (run_in_executor(None, get_ai_response) на каждый вопрос),
+второй идёт через InferenceBatcher. По умолчанию используется настоящая
+модель; с --simulate стоимость вызова модели имитируется как
+``fixed + per_item * batch`` с общим «процессором» (блокировкой).
+
+    python scripts/bench_ai_batching.py --users 50
+    python scripts/bench_ai_batching.py --simulate --users 50 --fixed-ms 120 --per-item-ms 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+import app.ai_agent.simple_ai as simple_ai  # noqa: E402
+from app.ai_agent.batching import InferenceBatcher, answer_question  # noqa: E402
+from app.ai_agent.registry import ModelRegistry  # noqa: E402
+
+QUESTIONS = [
+    "Как выбрать мастера для ремонта?",
+    "Как оформить заявку на сантехника?",
+    "Когда списывается оплата за работу?",
+    "Можно ли изменить адрес в заявке?",
+]
+
+
+def simulated_backend(fixed: float, per_item: float):
+    cpu = threading.Lock()
+
+    class SimulatedAI:
+        _gemini_model = None
+        _pipe = object()
+
+        def initialize(self):
+            pass
+
+        def get_responses(self, prompts):
+            with cpu:
+                time.sleep(fixed + per_item * len(prompts))
+            return ["Создайте заявку и выберите мастера по рейтингу."] * len(prompts)
+
+        def get_response(self, prompt):
+            return self.get_responses([prompt])[0]
+
+    return SimulatedAI()
+
+
+async def timed_user(coro_factory, latencies):
+    started = time.perf_counter()
+    await coro_factory()
+    latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(name, coro_factory, users):
+    latencies: list[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(timed_user(lambda i=i: coro_factory(QUESTIONS[i % len(QUESTIONS)]), latencies)
+                           for i in range(users)))
+    total = time.perf_counter() - started
+    latencies.sort()
+    print(f"{name:<18} users={users:>3} total={total:6.2f}s  throughput={users / total:6.1f} q/s  "
+          f"p50={statistics.median(latencies):7.0f} ms  p95={latencies[int(len(latencies) * 0.95) - 1]:7.0f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--simulate", action="store_true")
+    parser.add_argument("--fixed-ms", type=float, default=120.0)
+    parser.add_argument("--per-item-ms", type=float, default=8.0)
+    parser.add_argument("--max-batch", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.simulate:
+        backend = simulated_backend(args.fixed_ms / 1000, args.per_item_ms / 1000)
+        registry = ModelRegistry(lambda: backend)
+    else:
+        registry = ModelRegistry()
+    registry.warm_up()
+    simple_ai.get_model_registry = lambda: registry
+
+    loop = asyncio.get_running_loop()
+    await run("unbatched pool", lambda q: loop.run_in_executor(None, simple_ai.get_ai_response, q), args.users)
+
+    batcher = InferenceBatcher(registry, max_batch=args.max_batch, window=0.02, max_queue=args.users * 2)
+    await run("micro-batched", lambda q: answer_question(q, batcher=batcher), args.users)
+    print(f"batcher stats: {batcher.stats()}")
+    await batcher.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
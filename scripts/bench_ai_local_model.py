@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Бенчмарк локальной модели ИИ: время старта, RSS и задержка на токен.
+
+Каждый замер идёт в отдельном процессе (чистые sys.modules и RSS):
+
+- импорт ``app.ai_agent.simple_ai`` как раньше (transformers при импорте) и
+  с ленивым импортом;
+- загрузка модели и генерация --tokens токенов для каждого режима весов
+  (AI_MODEL_QUANTIZE: none / int8 / bf16). Нужны torch и веса модели.
+
+    python scripts/bench_ai_local_model.py --modes none int8 --tokens 40
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+PROMPT = "Вопрос: Как выбрать мастера для замены смесителя?\nКраткий ответ:"
+
+
+def rss_mb() -> float:
+    # ru_maxrss в Linux — килобайты
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child_import(eager: bool) -> dict:
+    started = time.perf_counter()
+    if eager:
+        # Прежний путь: transformers импортировался вместе с simple_ai
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline  # noqa: F401
+    import app.ai_agent.simple_ai  # noqa: F401
+
+    return {"seconds": time.perf_counter() - started, "rss_mb": rss_mb(), "transformers": "transformers" in sys.modules}
+
+
+def child_model(mode: str, model_name: str, tokens: int) -> dict:
+    import torch
+
+    from app.ai_agent.local_model import load_seq2seq
+
+    started = time.perf_counter()
+    tokenizer, model = load_seq2seq(model_name, quantize=mode)
+    load_seconds = time.perf_counter() - started
+    inputs = tokenizer(PROMPT, return_tensors="pt")
+    kwargs = dict(max_new_tokens=tokens, min_new_tokens=tokens, do_sample=False, num_beams=1)
+    with torch.inference_mode():
+        model.generate(**inputs, max_new_tokens=2)  # прогрев
+        started = time.perf_counter()
+        output = model.generate(**inputs, **kwargs)
+        generate_seconds = time.perf_counter() - started
+    return {
+        "load_seconds": load_seconds,
+        "rss_mb": rss_mb(),
+        "ms_per_token": generate_seconds / tokens * 1000,
+        "sample": tokenizer.decode(output[0], skip_special_tokens=True)[:80],
+    }
+
+
+def run_child(*args: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", *args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "TRANSFORMERS_VERBOSITY": "error"},
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", default=["none", "int8"])
+    parser.add_argument("--model", default=os.getenv("AI_MODEL_NAME", "cointegrated/rut5-base-multitask"))
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3, help="повторов замера импорта")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        kind = args.child[0]
+        if kind == "import":
+            print(json.dumps(child_import(args.child[1] == "eager")))
+        else:
+            print(json.dumps(child_model(args.child[1], args.model, args.tokens)))
+        return
+
+    for label, kind in (("импорт при старте (прежний)", "eager"), ("ленивый импорт", "lazy")):
+        runs = [run_child("import", kind) for _ in range(args.repeat)]
+        if "error" in runs[0]:
+            print(f"{label}: ошибка {runs[0]['error']}")
+            continue
+        best = min(runs, key=lambda r: r["seconds"])
+        print(
+            f"{label:28s} {best['seconds'] * 1000:7.0f} мс  RSS {best['rss_mb']:6.0f} МБ  "
+            f"transformers загружен: {best['transformers']}"
+        )
+
+    for mode in args.modes:
+        result = run_child("model", mode, "--model", args.model, "--tokens", str(args.tokens))
+        if "error" in result:
+            print(f"модель [{mode}]: пропуск ({result['error']})")
+            continue
+        print(
+            f"модель [{mode:4s}] загрузка {result['load_seconds']:5.1f} с  RSS {result['rss_mb']:6.0f} МБ  "
+            f"{result['ms_per_token']:6.1f} мс/токен  «{result['sample']}»"
+        )
+
+
+if __name__ == "__main__":
+    main()
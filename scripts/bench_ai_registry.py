@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Бенчмарк ответа ИИ-помощника: GeminiAI() на каждый запрос vs общий бэкенд из реестра.
+
+Меряется первый ответ (включает загрузку модели) и установившаяся задержка.
+По умолчанию используется настоящая модель (AI_MODEL_NAME / API_GEMINI_FREE);
+без доступа к весам можно запустить с --simulate, тогда загрузка и генерация
+имитируются задержками.
+
+    python scripts/bench_ai_registry.py --requests 10
+    python scripts/bench_ai_registry.py --simulate --load-seconds 3 --generate-seconds 0.2
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+import app.ai_agent.simple_ai as simple_ai  # noqa: E402
+from app.ai_agent.registry import ModelRegistry  # noqa: E402
+
+QUESTION = "Как выбрать мастера для ремонта?"
+
+
+def simulated_backend(load_seconds: float, generate_seconds: float):
+    class SimulatedAI:
+        def __init__(self):
+            self._gemini_model = None
+            self._pipe = None
+
+        def initialize(self):
+            if self._pipe is None:
+                time.sleep(load_seconds)
+                self._pipe = object()
+
+        def get_response(self, prompt):
+            self.initialize()
+            time.sleep(generate_seconds)
+            return "Создайте заявку и выберите мастера по рейтингу."
+
+    return SimulatedAI
+
+
+def measure(requests: int) -> list[float]:
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        simple_ai.get_ai_response(QUESTION)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    steady = timings[1:] or timings
+    print(f"{name:<22} first={timings[0]:9.1f} ms  steady median={statistics.median(steady):9.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--simulate", action="store_true")
+    parser.add_argument("--load-seconds", type=float, default=2.0)
+    parser.add_argument("--generate-seconds", type=float, default=0.1)
+    args = parser.parse_args()
+
+    factory = simple_ai.GeminiAI
+    if args.simulate:
+        factory = simulated_backend(args.load_seconds, args.generate_seconds)
+
+    # Прежнее поведение: новый бэкенд и загрузка модели на каждый вопрос
+    class PerRequest(ModelRegistry):
+        def get(self):
+            backend = factory()
+            backend.initialize()
+            return backend
+
+    simple_ai.get_model_registry = lambda: per_request
+    per_request = PerRequest(factory)
+    report("backend per request", measure(args.requests))
+
+    shared = ModelRegistry(factory)
+    simple_ai.get_model_registry = lambda: shared
+    report("shared registry", measure(args.requests))
+    print(f"registry health: {shared.health()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Бенчмарк потокового ответа ИИ-помощника: время до первого видимого текста.
+
+Бэкенд имитирует генерацию на CPU: --tokens токенов по --token-ms мс. Ответ
+без потока виден только после всей генерации; с потоком — после первого
+токена, дальше сообщение дописывается правками не чаще --interval секунд.
+
+    python scripts/bench_ai_streaming.py --tokens 60 --token-ms 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from app.ai_agent import answer_cache  # noqa: E402
+from app.ai_agent.batching import InferenceBatcher, answer_question, stream_answer  # noqa: E402
+from app.ai_agent.registry import ModelRegistry  # noqa: E402
+from app.bot.streaming import StreamedReply  # noqa: E402
+
+WORDS = (
+    "Чтобы создать заявку, откройте меню и нажмите «Создать заказ». Опишите задачу, укажите адрес и "
+    "удобное время. Мастера предложат цену, вы выберете подходящего по рейтингу и отзывам."
+).split()
+
+
+class SlowBackend:
+    def __init__(self, tokens: int, token_delay: float):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self._pipe = object()
+        self._gemini_model = None
+
+    def initialize(self) -> None:
+        pass
+
+    def _words(self):
+        return [WORDS[i % len(WORDS)] for i in range(self.tokens)]
+
+    def stream_response(self, prompt):
+        for i, word in enumerate(self._words()):
+            time.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+    def get_responses(self, prompts):
+        time.sleep(self.token_delay * self.tokens)
+        return [" ".join(self._words()) for _ in prompts]
+
+
+class FakeMessage:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_visible: float | None = None
+        self.edit_times: list[float] = []
+        self.bot = SimpleNamespace(edit_message_text=self._edit)
+
+    async def answer(self, text):
+        self.first_visible = time.perf_counter() - self.started
+        return SimpleNamespace(chat=SimpleNamespace(id=1), message_id=1)
+
+    async def _edit(self, text, chat_id, message_id):
+        self.edit_times.append(time.perf_counter())
+
+
+async def run(args) -> None:
+    backend = SlowBackend(args.tokens, args.token_ms / 1000)
+    batcher = InferenceBatcher(ModelRegistry(lambda: backend))
+
+    answer_cache._cache = answer_cache.AnswerCache()
+    message = FakeMessage()
+    await message.answer(await answer_question("Как создать заказ?", batcher=batcher))
+    batched_first, batched_total = message.first_visible, time.perf_counter() - message.started
+
+    answer_cache._cache = answer_cache.AnswerCache()
+    message = FakeMessage()
+    reply = StreamedReply(message, min_interval=args.interval)
+    response = ""
+    async for response in stream_answer("Как создать заказ?", batcher=batcher):
+        await reply.update(response)
+    await reply.finish(response)
+    streamed_total = time.perf_counter() - message.started
+    gaps = [b - a for a, b in zip(message.edit_times, message.edit_times[1:])]
+    await batcher.close()
+
+    print(f"tokens={args.tokens} token_ms={args.token_ms} interval={args.interval}s")
+    print(f"без потока: первый текст {batched_first * 1000:7.0f} мс, всего {batched_total * 1000:7.0f} мс")
+    print(f"поток:      первый текст {message.first_visible * 1000:7.0f} мс, всего {streamed_total * 1000:7.0f} мс")
+    print(
+        f"правок: {len(message.edit_times)} (пропущено версий {reply.skipped}), "
+        f"мин. интервал между правками {min(gaps, default=0):.2f} с"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--token-ms", type=float, default=50)
+    parser.add_argument("--interval", type=float, default=1.0, help="AI_STREAM_EDIT_INTERVAL")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
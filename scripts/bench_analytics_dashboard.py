@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Бенчмарк загрузки страницы аналитики.
+
+Наполняет БД историей за --history дней (как bench_analytics_rollups.py),
+строит дневные агрегаты и замеряет p50 одной загрузки дашборда:
+
+- sequential — шесть разделов по очереди на одной сессии (как раньше делали
+  страница и export_analytics);
+- concurrent — ``build_dashboard``: разделы параллельно на отдельных
+  соединениях пула;
+- cached — ``get_cached_dashboard`` при тёплом кэше.
+
+На SQLite (один файл, один CPU) параллельность почти ничего не даёт; на
+PostgreSQL выигрыш растёт с сетевой задержкой до сервера (``--db``).
+
+    python scripts/bench_analytics_dashboard.py --history 360 --per-day 40
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from admin.app.routers import analytics  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.services.analytics_rollups import backfill_rollups  # noqa: E402
+from bench_analytics_rollups import prepare  # noqa: E402
+
+SECTIONS = (
+    (analytics.get_statistics, {}),
+    (analytics.get_user_growth, {"days": 30}),
+    (analytics.get_order_statistics, {"days": 30}),
+    (analytics.get_bid_statistics, {"days": 30}),
+    (analytics.get_payout_statistics, {"days": 30}),
+    (analytics.get_revenue_statistics, {"period": "month"}),
+)
+
+
+async def sequential(factory) -> None:
+    async with factory() as db:
+        for endpoint, params in SECTIONS:
+            await endpoint(db=db, current_user=None, **params)
+
+
+async def p50(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(args.db or f"sqlite+aiosqlite:///{tmp}/bench.sqlite3")
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        orders = await prepare(factory, args.history, args.per_day)
+        await backfill_rollups(session_factory=factory)
+        print(f"история {args.history} дней, заказов {orders}, db={engine.url.get_backend_name()}")
+
+        before = await p50(lambda: sequential(factory), args.repeat)
+        concurrent = await p50(lambda: analytics.build_dashboard(factory), args.repeat)
+        await analytics.get_cached_dashboard(factory)
+        cached = await p50(lambda: analytics.get_cached_dashboard(factory), args.repeat)
+        print(f"sequential  p50 {before * 1000:8.2f} мс")
+        print(f"concurrent  p50 {concurrent * 1000:8.2f} мс")
+        print(f"cached      p50 {cached * 1000:8.3f} мс")
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=360)
+    parser.add_argument("--per-day", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--db", help="async URL пустой БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Бенчмарк дашборда аналитики: группировка исходных таблиц против дневных агрегатов.
+
+Для каждой длины истории из --history (дней) наполняет пустую БД
+пользователями, заказами, ставками и выплатами (--per-day заказов в день) и
+замеряет p50 одного «открытия дашборда»:
+
+- live — те же GROUP BY date(created_at) по users/orders/bids/payouts за всю
+  историю, что раньше делали эндпоинты;
+- rollup — пять эндпоинтов admin/app/routers/analytics.py, читающих
+  analytics_daily_rollups.
+
+Также печатает время полного backfill и инкрементального запуска агрегатора.
+
+    python scripts/bench_analytics_rollups.py --history 90,360,1080 --per-day 40
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from admin.app.routers import analytics  # noqa: E402
+from app.models import Bid, Order, Payout, User  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.services.analytics_rollups import _metric_queries, backfill_rollups, run_rollups  # noqa: E402
+
+CATEGORIES = ["Сантехника", "Электрика", "Отделка", "Мебель", "Техника"]
+ORDER_STATUSES = ["new", "assigned", "done", "done", "cancelled"]
+
+
+async def prepare(factory, days: int, per_day: int) -> int:
+    rng = random.Random(days)
+    today = datetime.date.today()
+    users, orders, bids, payouts = [], [], [], []
+    masters = list(range(1, 51))
+    users.extend({"id": m, "tg_id": m, "role": "master", "name": "m",
+                  "created_at": datetime.datetime.combine(today - datetime.timedelta(days=days), datetime.time())}
+                 for m in masters)
+    next_id = 1000
+    for offset in range(days):
+        day = datetime.datetime.combine(today - datetime.timedelta(days=offset), datetime.time(9))
+        for _ in range(per_day):
+            next_id += 1
+            at = day + datetime.timedelta(minutes=rng.randrange(600))
+            status = rng.choice(ORDER_STATUSES)
+            master = rng.choice(masters)
+            users.append({"id": next_id, "tg_id": next_id, "role": "client", "name": "c", "created_at": at})
+            orders.append({"id": next_id, "client_id": next_id, "master_id": master if status != "new" else None,
+                           "category": rng.choice(CATEGORIES), "status": status, "created_at": at})
+            for n in range(3):
+                selected = status != "new" and n == 0
+                bids.append({"id": next_id * 4 + n, "order_id": next_id, "master_id": rng.choice(masters),
+                             "price": rng.randrange(500, 5000), "status": "selected" if selected else "active",
+                             "created_at": at})
+            if status == "done":
+                payouts.append({"id": next_id, "order_id": next_id, "master_id": master, "amount_master": 900,
+                                "amount_service": 100, "amount_partner": 0, "status": rng.choice(["paid", "pending"]),
+                                "created_at": at})
+    async with factory() as db:
+        for model, rows in ((User, users), (Order, orders), (Bid, bids), (Payout, payouts)):
+            for start in range(0, len(rows), 5000):
+                await db.execute(insert(model), rows[start:start + 5000])
+        await db.commit()
+    return len(orders)
+
+
+async def live_dashboard(db) -> None:
+    start, end = datetime.datetime(1970, 1, 1), datetime.datetime.now() + datetime.timedelta(days=1)
+    for _, query in _metric_queries(start, end):
+        (await db.execute(query)).all()
+
+
+async def rollup_dashboard(db) -> None:
+    await analytics.get_statistics(db=db, current_user=None)
+    await analytics.get_user_growth(days=30, db=db, current_user=None)
+    await analytics.get_order_statistics(days=30, db=db, current_user=None)
+    await analytics.get_payout_statistics(days=30, db=db, current_user=None)
+    await analytics.get_revenue_statistics(period="year", db=db, current_user=None)
+
+
+async def p50(factory, fn, repeat: int) -> float:
+    samples = []
+    async with factory() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fn(db)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def run(args) -> None:
+    print(f"{'дней':>6} {'заказов':>8} {'live p50':>10} {'rollup p50':>11} {'backfill':>9} {'инкремент':>10}")
+    for days in (int(value) for value in args.history.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_async_engine(args.db or f"sqlite+aiosqlite:///{tmp}/bench.sqlite3")
+            factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+            orders = await prepare(factory, days, args.per_day)
+
+            started = time.perf_counter()
+            await backfill_rollups(session_factory=factory)
+            backfill = time.perf_counter() - started
+            started = time.perf_counter()
+            await run_rollups(session_factory=factory, lookback_days=3)
+            incremental = time.perf_counter() - started
+
+            live = await p50(factory, live_dashboard, args.repeat)
+            rollup = await p50(factory, rollup_dashboard, args.repeat)
+            print(f"{days:6d} {orders:8d} {live * 1000:8.1f}мс {rollup * 1000:9.2f}мс "
+                  f"{backfill:8.2f}с {incremental * 1000:8.1f}мс")
+            await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", default="90,360,1080", help="длины истории в днях через запятую")
+    parser.add_argument("--per-day", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="async URL пустой БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
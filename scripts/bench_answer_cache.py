@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Бенчмарк кэша ответов ИИ-помощника: задержка точного/похожего попадания и hit rate.
+
+Поток вопросов — варианты нескольких типовых тем (регистр, пунктуация,
+окончания) и доля уникальных вопросов.
+
+    python scripts/bench_answer_cache.py --size 1000 --questions 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from app.ai_agent.answer_cache import AnswerCache  # noqa: E402
+
+TOPICS = [
+    "как создать заказ",
+    "как выбрать мастера",
+    "как проходит оплата",
+    "можно ли отменить заявку",
+    "как связаться с мастером",
+    "как оставить отзыв",
+]
+VARIANTS = ["{}?", "{}", "{}??", "Подскажите, {}", "{} пожалуйста", "{}ы?"]
+
+
+def make_stream(count: int, unique_share: float) -> list[str]:
+    stream = []
+    for i in range(count):
+        if random.random() < unique_share:
+            stream.append(f"вопрос номер {i} про ремонт {random.randint(0, 10**6)}")
+        else:
+            stream.append(random.choice(VARIANTS).format(random.choice(TOPICS)).capitalize())
+    return stream
+
+
+def bench_lookup(cache: AnswerCache, question: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cache.get(question)
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=20_000)
+    parser.add_argument("--unique-share", type=float, default=0.2)
+    parser.add_argument("--similarity", type=float, default=0.85)
+    args = parser.parse_args()
+
+    cache = AnswerCache(maxsize=args.size, similarity=args.similarity)
+    for i in range(args.size - len(TOPICS)):
+        cache.put(f"вопрос номер {i} про ремонт", f"ответ {i}")
+    for topic in TOPICS:
+        cache.put(topic, f"ответ на «{topic}»")
+
+    print(f"exact hit:   {bench_lookup(cache, 'Как создать заказ?', 10_000):7.1f} us")
+    print(f"similar hit: {bench_lookup(cache, 'Как выбрать мастеров?', 2_000):7.1f} us")
+    print(f"miss:        {bench_lookup(cache, 'Сколько стоит замена труб в ванной?', 2_000):7.1f} us")
+
+    stream_cache = AnswerCache(maxsize=args.size, similarity=args.similarity)
+    model_calls = 0
+    for question in make_stream(args.questions, args.unique_share):
+        if stream_cache.get(question) is None:
+            model_calls += 1
+            stream_cache.put(question, "ответ модели")
+    print(f"stream: {args.questions} questions -> {model_calls} model calls; {stream_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Бенчмарк старта бота: время до первого обработанного апдейта.
+
+Модель ИИ имитируется бэкендом, чья загрузка длится --load секунд. Сравниваются:
+
+- прежний старт: ``await asyncio.to_thread(registry.warm_up)``, затем опрос;
+- фоновый прогрев (:mod:`app.bot.startup`): опрос сразу, модель грузится в фоне.
+
+Апдейт подаётся в настоящий Dispatcher через ``feed_update`` сразу после старта.
+
+    python scripts/bench_bot_startup.py --load 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.types import Update  # noqa: E402
+
+from app.ai_agent.registry import ModelRegistry  # noqa: E402
+from app.bot.startup import StartupOrchestrator  # noqa: E402
+
+
+class SlowBackend:
+    def __init__(self, load: float):
+        self.load = load
+        self._pipe = None
+        self._gemini_model = None
+
+    def initialize(self) -> None:
+        time.sleep(self.load)
+        self._pipe = object()
+
+
+def make_update(update_id: int) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "u"},
+            "text": "/start",
+        },
+    })
+
+
+async def first_update_latency(load: float, background: bool) -> tuple[float, float]:
+    registry = ModelRegistry(lambda: SlowBackend(load))
+    dp = Dispatcher()
+    handled = asyncio.Event()
+
+    @dp.message()
+    async def on_message(message) -> None:
+        handled.set()
+
+    bot = Bot("123:abc")
+    started = time.perf_counter()
+    startup = StartupOrchestrator()
+    if background:
+        startup.add("ai", registry.warm_up)
+        startup.start()
+    else:
+        await asyncio.to_thread(registry.warm_up)
+    # Опрос запущен: первый апдейт
+    await dp.feed_update(bot, make_update(1))
+    await handled.wait()
+    first = time.perf_counter() - started
+    await startup.wait("ai")
+    ready = time.perf_counter() - started
+    await bot.session.close()
+    return first, ready
+
+
+async def run(args) -> None:
+    for label, background in (("прежний старт", False), ("фоновый прогрев", True)):
+        first, ready = await first_update_latency(args.load, background)
+        print(f"{label:16s} первый апдейт {first * 1000:8.1f} мс, модель готова {ready * 1000:8.1f} мс")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--load", type=float, default=3.0, help="время загрузки модели, с")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
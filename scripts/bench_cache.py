@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Бенчмарк кэша core.redis: чтение категорий мастера из БД vs get_cache.
+
+Запросы идут с перекосом (часть мастеров «горячие»), размер локального
+уровня можно ограничить, чтобы увидеть влияние LRU-вытеснения на hit rate.
+
+    python scripts/bench_cache.py --masters 5000 --lookups 20000 --max-entries 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import Base, MasterCategory, User, master_categories  # noqa: E402
+from core import redis as cache  # noqa: E402
+from core.cache_service import MasterCategoriesCache  # noqa: E402
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--masters", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--max-entries", type=int, default=1000)
+    parser.add_argument("--alpha", type=float, default=1.2)
+    args = parser.parse_args()
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as session:
+        await session.execute(insert(User), [
+            {"id": i, "tg_id": i, "role": "master", "rating_avg": 0.0} for i in range(1, args.masters + 1)
+        ])
+        await session.execute(insert(master_categories), [
+            {"user_id": i, "category": c}
+            for i in range(1, args.masters + 1)
+            for c in random.sample(MasterCategory.CATEGORIES, 2)
+        ])
+        await session.commit()
+
+    stream = [min(args.masters, int(random.paretovariate(args.alpha))) for _ in range(args.lookups)]
+
+    async def load(session, master_id):
+        rows = await session.execute(
+            select(master_categories.c.category).where(master_categories.c.user_id == master_id)
+        )
+        return [r[0] for r in rows]
+
+    async with Session() as session:
+        started = time.perf_counter()
+        for master_id in stream:
+            await load(session, master_id)
+        db_time = time.perf_counter() - started
+
+        cache.redis = cache.TieredCache(cache.MemoryCache(maxsize=args.max_entries))
+        service = MasterCategoriesCache()
+        started = time.perf_counter()
+        for master_id in stream:
+            if await service.get_master_categories(master_id) is None:
+                await service.set_master_categories(master_id, await load(session, master_id))
+        cached_time = time.perf_counter() - started
+
+    us = lambda total: total / len(stream) * 1_000_000  # noqa: E731
+    print(f"lookups={len(stream)} distinct={len(set(stream))} max_entries={args.max_entries}")
+    print(f"db only:      {db_time:.2f}s ({us(db_time):.1f} us/lookup)")
+    print(f"read-through: {cached_time:.2f}s ({us(cached_time):.1f} us/lookup)")
+    print(f"cache stats:  {cache.cache_stats()['local']}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Бенчмарк индекса категорий мастеров (CategoryIndex) на 100k мастеров.
+
+Меряет перестройку индекса, инкрементальное обновление одного мастера,
+поиск мастеров по категории (индекс vs SQL-запрос) и объём памяти индекса.
+
+    python scripts/bench_category_index.py --masters 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import Base, MasterCategory, master_categories  # noqa: E402
+from core.cache_service import CategoryIndex  # noqa: E402
+
+
+def us(total: float, n: int) -> str:
+    return f"{total / n * 1_000_000:.1f} us"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--masters", type=int, default=100_000)
+    parser.add_argument("--updates", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--skip-sql", action="store_true")
+    args = parser.parse_args()
+
+    categories = MasterCategory.CATEGORIES
+    rows = [
+        (master_id, category)
+        for master_id in range(1, args.masters + 1)
+        for category in random.sample(categories, k=random.randint(1, 3))
+    ]
+
+    tracemalloc.start()
+    index = CategoryIndex(max_masters=args.masters * 2)
+    started = time.perf_counter()
+    index.load(rows, version=1)
+    load_time = time.perf_counter() - started
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    print(f"masters={args.masters} rows={len(rows)}")
+    print(f"rebuild:            {load_time * 1000:.0f} ms, ~{memory_mb:.1f} MB")
+
+    started = time.perf_counter()
+    for _ in range(args.updates):
+        index.update_master(random.randint(1, args.masters), random.sample(categories, k=2))
+    print(f"incremental update: {us(time.perf_counter() - started, args.updates)} per master")
+
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        index.masters_for(random.choice(categories))
+    print(f"masters_for (index): {us(time.perf_counter() - started, args.lookups)}")
+
+    if args.skip_sql:
+        return
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as session:
+        await session.execute(insert(master_categories), [{"user_id": m, "category": c} for m, c in rows])
+        await session.commit()
+        started = time.perf_counter()
+        for _ in range(args.lookups):
+            result = await session.execute(
+                select(master_categories.c.user_id).where(master_categories.c.category == random.choice(categories))
+            )
+            set(result.scalars())
+        print(f"masters_for (SQL):   {us(time.perf_counter() - started, args.lookups)}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
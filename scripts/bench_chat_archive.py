@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Бенчмарк архива истории чатов.
+
+Генерирует --sessions закрытых чатов по --messages сообщений, растянутых на
+несколько месяцев, и замеряет:
+
+- время архивации и размер архива против несжатого JSONL;
+- чтение истории одного чата (``load_chat_history``) из БД и из архива.
+
+По умолчанию SQLite-файл во временном каталоге (секционирования там нет,
+проверяется формат архива и чтение); ``--db`` — любой async URL (PostgreSQL
+после миграции ``partition_chat_messages``).
+
+    python scripts/bench_chat_archive.py --sessions 500 --messages 40 --compression zstd
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.models import ChatMessage, ChatSession, Order, User  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.services.chat_archive import (  # noqa: E402
+    ChatArchive,
+    archive_closed_sessions,
+    load_chat_history,
+    message_to_dict,
+)
+
+BASE_ID = 700_000_000
+NOW = datetime.datetime(2026, 6, 1)
+PHRASES = [
+    "Здравствуйте! Когда сможете подъехать?", "Завтра после обеда, около 15:00.",
+    "Хорошо, адрес прежний.", "Нужно купить смеситель или у вас есть?", "Привезу свой, чек пришлю.",
+    "Спасибо, всё работает!", "Оплата переводом, как договаривались.",
+]
+
+
+async def prepare(factory, sessions: int, messages: int) -> int:
+    rng = random.Random(1)
+    rows = []
+    async with factory() as db:
+        for n in range(sessions):
+            client, master = BASE_ID + 2 * n, BASE_ID + 2 * n + 1
+            db.add_all([
+                User(id=client, tg_id=client, role="client", name="c"),
+                User(id=master, tg_id=master, role="master", name="m"),
+            ])
+            await db.flush()
+            started = NOW - datetime.timedelta(days=200 + rng.randrange(120))
+            db.add(Order(id=BASE_ID + n, client_id=client, master_id=master, category="bench", status="completed"))
+            await db.flush()
+            db.add(ChatSession(
+                id=BASE_ID + n, order_id=BASE_ID + n, client_id=client, master_id=master, status="closed",
+                started_at=started, closed_at=started + datetime.timedelta(days=40), last_activity_at=started,
+            ))
+            for i in range(messages):
+                sender, receiver = (client, master) if i % 2 else (master, client)
+                rows.append({
+                    "session_id": BASE_ID + n, "sender_id": sender, "receiver_id": receiver, "message_type": "text",
+                    "content_text": rng.choice(PHRASES),
+                    "created_at": started + datetime.timedelta(days=40 * i / messages),
+                })
+        await db.flush()
+        await db.execute(insert(ChatMessage), rows)
+        await db.commit()
+    return len(rows)
+
+
+async def read_latency(factory, archive, session_ids) -> float:
+    samples = []
+    for session_id in session_ids:
+        async with factory() as db:
+            started = time.perf_counter()
+            await load_chat_history(db, session_id, archive=archive)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def run(args) -> None:
+    tmp = tempfile.TemporaryDirectory()
+    url = args.db or f"sqlite+aiosqlite:///{tmp.name}/bench.sqlite3"
+    engine = create_async_engine(url)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    total = await prepare(factory, args.sessions, args.messages)
+    archive = ChatArchive(os.path.join(tmp.name, "archive"), compression=args.compression)
+    print(f"sessions={args.sessions} messages={total} db={engine.url.get_backend_name()} codec={archive.codec.name}")
+
+    sample = random.Random(2).sample(range(BASE_ID, BASE_ID + args.sessions), min(50, args.sessions))
+    hot = await read_latency(factory, archive, sample)
+    async with factory() as db:
+        raw_bytes = sum(
+            len(json.dumps(message_to_dict(m), ensure_ascii=False).encode()) + 1
+            for m in (await db.execute(select(ChatMessage))).scalars()
+        )
+
+    started = time.perf_counter()
+    report = await archive_closed_sessions(archive=archive, session_factory=factory, older_than_days=90, now=NOW)
+    elapsed = time.perf_counter() - started
+    async with factory() as db:
+        left = (await db.execute(select(func.count()).select_from(ChatMessage))).scalar_one()
+
+    archived_bytes = sum(os.path.getsize(os.path.join(archive.root, name)) for name in os.listdir(archive.root))
+    cold = await read_latency(factory, archive, sample)
+    print(f"архивация: {report.messages} сообщений за {elapsed:6.2f} с ({report.messages / elapsed:8.0f} сообщ/с), "
+          f"осталось в chat_messages {left}")
+    print(f"архив {archived_bytes / 1024:8.1f} КиБ против JSONL {raw_bytes / 1024:8.1f} КиБ "
+          f"(x{raw_bytes / archived_bytes:.1f}), месяцев {len(archive.months())}")
+    print(f"история чата p50: из БД {hot * 1000:6.2f} мс, из архива {cold * 1000:6.2f} мс")
+
+    await engine.dispose()
+    tmp.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--compression", choices=["zstd", "gzip"], default="zstd")
+    parser.add_argument("--db", help="async URL БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
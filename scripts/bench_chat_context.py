@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Бенчмарк поиска участников чата при пересылке сообщения.
+
+Сравниваются:
+
+- прежний путь: SELECT отправителя и получателя по tg_id на каждое сообщение;
+- кэш контекста чата (:mod:`app.services.chat_context`): участники и статус
+  сессии сохраняются при открытии чата.
+
+Печатается время на сообщение и число SQL-запросов. По умолчанию SQLite-файл
+во временном каталоге; ``--db`` — любой async URL (PostgreSQL).
+
+    python scripts/bench_chat_context.py --messages 5000 --chats 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.models import ChatSession, Order, User  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.services.chat_context import get_chat_context_cache, load_chat_context, remember_chat  # noqa: E402
+
+BASE_ID = 700_000_000
+
+
+async def prepare(factory, chats: int) -> list[tuple[ChatSession, User, User]]:
+    opened = []
+    async with factory() as session:
+        for chat in range(chats):
+            client = User(id=BASE_ID + 2 * chat, tg_id=BASE_ID + 2 * chat, role="client", name="c")
+            master = User(id=BASE_ID + 2 * chat + 1, tg_id=BASE_ID + 2 * chat + 1, role="master", name="m")
+            session.add_all([client, master])
+            await session.flush()
+            session.add(Order(id=BASE_ID + chat, client_id=client.id, master_id=master.id, category="bench",
+                              status="assigned"))
+            await session.flush()
+            chat_session = ChatSession(id=BASE_ID + chat, order_id=BASE_ID + chat, client_id=client.id,
+                                       master_id=master.id, status="active")
+            session.add(chat_session)
+            opened.append((chat_session, client, master))
+        await session.commit()
+    return opened
+
+
+async def lookup_per_message(factory, sender_tg: int, peer_tg: int) -> tuple[int, int]:
+    async with factory() as db:
+        sender = (await db.execute(select(User).where(User.tg_id == sender_tg))).scalars().first()
+        receiver = (await db.execute(select(User).where(User.tg_id == peer_tg))).scalars().first()
+    return sender.id, receiver.id
+
+
+async def lookup_cached(factory, cache, session_id: int, sender_tg: int) -> tuple[int, int]:
+    context = await load_chat_context(session_id, session_factory=factory, cache=cache)
+    participants = context.participants(sender_tg)
+    return participants.sender_id, participants.receiver_id
+
+
+async def run(args) -> None:
+    tmp = None
+    url = args.db
+    if url is None:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmp.name}/bench.sqlite3"
+    engine = create_async_engine(url)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    opened = await prepare(factory, args.chats)
+
+    rng = random.Random(1)
+    load = []
+    for _ in range(args.messages):
+        chat_session, client, master = rng.choice(opened)
+        sender, peer = (client, master) if rng.random() < 0.5 else (master, client)
+        load.append((chat_session.id, sender.tg_id, peer.tg_id))
+
+    statements = 0
+
+    def on_execute(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    print(f"messages={args.messages} chats={args.chats} db={engine.url.get_backend_name()}")
+
+    statements = 0
+    started = time.perf_counter()
+    for session_id, sender_tg, peer_tg in load:
+        await lookup_per_message(factory, sender_tg, peer_tg)
+    elapsed = time.perf_counter() - started
+    print(f"SELECT по tg_id     {elapsed / args.messages * 1e6:9.1f} мкс/сообщ, запросов {statements}")
+
+    cache = get_chat_context_cache()
+    # Как в open_chat: контекст кладётся в кэш при открытии
+    for chat_session, client, master in opened:
+        remember_chat(chat_session, client=client, master=master)
+    statements = 0
+    started = time.perf_counter()
+    for session_id, sender_tg, _ in load:
+        await lookup_cached(factory, cache, session_id, sender_tg)
+    elapsed = time.perf_counter() - started
+    print(f"кэш контекста чата  {elapsed / args.messages * 1e6:9.1f} мкс/сообщ, запросов {statements}")
+
+    await engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--db", help="async URL БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Бенчмарк записи сообщений чата: по сообщению на транзакцию против журнала.
+
+Сравниваются:
+
+- прежний путь ``relay_to_peer``: новая сессия, два SELECT пользователей по
+  tg_id, SELECT сессии чата, INSERT сообщения и COMMIT на каждое сообщение;
+- журнал (:mod:`app.services.chat_journal`): ``record()`` в буфер, запись
+  пакетами в фоне.
+
+Печатается задержка, которую запись добавляет к пересылке одного сообщения
+(p50/p99), и время, за которое все сообщения оказываются в БД. По умолчанию
+SQLite-файл во временном каталоге; ``--db`` — любой async URL (PostgreSQL).
+
+    python scripts/bench_chat_journal.py --messages 2000 --chats 50
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import delete, func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.models import ChatMessage, ChatSession, Order, User  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.services.chat_journal import ChatJournal  # noqa: E402
+
+BASE_ID = 700_000_000
+
+
+async def prepare(factory, chats: int) -> None:
+    async with factory() as session:
+        for chat in range(chats):
+            client, master = BASE_ID + 2 * chat, BASE_ID + 2 * chat + 1
+            session.add_all([
+                User(id=client, tg_id=client, role="client", name="c"),
+                User(id=master, tg_id=master, role="master", name="m"),
+            ])
+            await session.flush()
+            session.add(Order(id=BASE_ID + chat, client_id=client, master_id=master, category="bench", status="assigned"))
+            await session.flush()
+            session.add(ChatSession(
+                id=BASE_ID + chat, order_id=BASE_ID + chat, client_id=client, master_id=master, status="active",
+            ))
+        await session.commit()
+
+
+async def persist_per_message(factory, session_id: int, sender_tg: int, peer_tg: int, text: str) -> None:
+    async with factory() as db:
+        sender = (await db.execute(select(User).where(User.tg_id == sender_tg))).scalars().first()
+        receiver = (await db.execute(select(User).where(User.tg_id == peer_tg))).scalars().first()
+        db.add(ChatMessage(
+            session_id=session_id, sender_id=sender.id, receiver_id=receiver.id, message_type="text", content_text=text,
+        ))
+        cs = (await db.execute(select(ChatSession).where(ChatSession.id == session_id))).scalars().first()
+        cs.last_activity_at = datetime.datetime.utcnow()
+        await db.commit()
+
+
+def workload(messages: int, chats: int, seed: int = 1) -> list[tuple[int, int, int]]:
+    rng = random.Random(seed)
+    result = []
+    for _ in range(messages):
+        chat = rng.randrange(chats)
+        client, master = BASE_ID + 2 * chat, BASE_ID + 2 * chat + 1
+        sender, peer = (client, master) if rng.random() < 0.5 else (master, client)
+        result.append((BASE_ID + chat, sender, peer))
+    return result
+
+
+async def count_messages(factory) -> int:
+    async with factory() as session:
+        return (await session.execute(select(func.count()).select_from(ChatMessage))).scalar_one()
+
+
+async def clear_messages(factory) -> None:
+    async with factory() as session:
+        await session.execute(delete(ChatMessage))
+        await session.commit()
+
+
+def report(label: str, latencies: list[float], total: float, messages: int) -> None:
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:22s} задержка пересылки p50 {statistics.median(latencies) * 1e6:9.1f} мкс, "
+        f"p99 {p99 * 1e6:9.1f} мкс; всё в БД за {total:6.2f} с ({messages / total:7.0f} сообщ/с)"
+    )
+
+
+async def run(args) -> None:
+    tmp = None
+    url = args.db
+    if url is None:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite+aiosqlite:///{tmp.name}/bench.sqlite3"
+    engine = create_async_engine(url)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await prepare(factory, args.chats)
+    load = workload(args.messages, args.chats)
+    print(f"messages={args.messages} chats={args.chats} db={engine.url.get_backend_name()}")
+
+    latencies = []
+    started = time.perf_counter()
+    for i, (session_id, sender, peer) in enumerate(load):
+        t = time.perf_counter()
+        await persist_per_message(factory, session_id, sender, peer, f"m{i}")
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - started
+    assert await count_messages(factory) == args.messages
+    report("по сообщению", latencies, total, args.messages)
+
+    await clear_messages(factory)
+    journal = ChatJournal(factory, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    latencies = []
+    started = time.perf_counter()
+    for i, (session_id, sender, peer) in enumerate(load):
+        t = time.perf_counter()
+        # id участников хендлер берёт из состояния FSM — без запросов
+        journal.record(session_id, sender, peer, "text", content_text=f"m{i}")
+        latencies.append(time.perf_counter() - t)
+        if i % args.yield_every == 0:
+            await asyncio.sleep(0)  # пересылка в Telegram отдаёт управление циклу
+    await journal.close()
+    total = time.perf_counter() - started
+    assert await count_messages(factory) == args.messages
+    report("журнал", latencies, total, args.messages)
+    print(f"журнал: {journal.stats_dict()}")
+
+    await engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    parser.add_argument("--yield-every", type=int, default=10)
+    parser.add_argument("--db", help="async URL БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Бенчмарк потоковой выгрузки заказов.
+
+Наполняет БД --rows заказами и выгружает их:
+
+- buffered — как раньше export_analytics: все строки в память, CSV в
+  io.StringIO, потом ответ;
+- stream csv / ndjson / csv+gzip — ``app.services.exports.stream_export``.
+
+Печатает пропускную способность (строк/с, МиБ/с на выходе) и пик памяти
+Python (tracemalloc, отдельным прогоном).
+
+    python scripts/bench_exports.py --rows 200000 --chunk-rows 2000
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.models import Order, User  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.services.exports import DATASETS, stream_export  # noqa: E402
+
+START = datetime.datetime(2025, 1, 1)
+
+
+async def prepare(factory, rows: int) -> None:
+    async with factory() as db:
+        await db.execute(insert(User), [{"id": 1, "tg_id": 1, "role": "client", "name": "c"}])
+        for start in range(0, rows, 10_000):
+            await db.execute(insert(Order), [
+                {"id": n, "client_id": 1, "category": "Сантехника", "status": "new", "address": f"ул. Ленина, {n % 200}",
+                 "description": "Течёт кран на кухне, нужен мастер", "created_at": START + datetime.timedelta(minutes=n)}
+                for n in range(start + 1, min(start + 10_000, rows) + 1)
+            ])
+        await db.commit()
+
+
+async def buffered(factory, spec) -> int:
+    async with factory() as db:
+        rows = (await db.execute(spec.query())).all()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(spec.header)
+    writer.writerows(rows)
+    return len(output.getvalue().encode())
+
+
+async def streamed(factory, spec, fmt: str, compress: bool, chunk_rows: int) -> int:
+    size = 0
+    async for chunk in stream_export(factory, spec.query(), spec.header, fmt=fmt, compress=compress, chunk_rows=chunk_rows):
+        size += len(chunk)
+    return size
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(args.db or f"sqlite+aiosqlite:///{tmp}/bench.sqlite3")
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await prepare(factory, args.rows)
+        spec = DATASETS["orders"]
+        print(f"заказов {args.rows}, db={engine.url.get_backend_name()}, chunk_rows={args.chunk_rows}")
+        variants = [
+            ("buffered csv", lambda: buffered(factory, spec)),
+            ("stream csv", lambda: streamed(factory, spec, "csv", False, args.chunk_rows)),
+            ("stream ndjson", lambda: streamed(factory, spec, "ndjson", False, args.chunk_rows)),
+            ("stream csv+gzip", lambda: streamed(factory, spec, "csv", True, args.chunk_rows)),
+        ]
+        for name, fn in variants:
+            started = time.perf_counter()
+            size = await fn()
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()
+            await fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:16s} {args.rows / elapsed:9.0f} строк/с {size / elapsed / 2**20:7.1f} МиБ/с "
+                  f"размер {size / 2**20:7.1f} МиБ, пик памяти {peak / 2**20:7.1f} МиБ")
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-rows", type=int, default=2000)
+    parser.add_argument("--db", help="async URL пустой БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Бенчмарк рассылки уведомлений: последовательный цикл vs NotificationFanout.
+
+Использует FakeBot с искусственной сетевой задержкой, реальный Telegram не нужен.
+
+    python scripts/bench_fanout.py --masters 2000 --latency 0.05 --rate 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fanout import NotificationFanout  # noqa: E402
+
+
+class FakeBot:
+    """Заглушка Bot: имитирует задержку сети и редкие ошибки."""
+
+    def __init__(self, latency: float, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.sent = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError("simulated send failure")
+        self.sent += 1
+
+
+async def bench_sequential(masters: int, latency: float) -> float:
+    bot = FakeBot(latency)
+    started = time.perf_counter()
+    for chat_id in range(1, masters + 1):
+        try:
+            await bot.send_message(chat_id=chat_id, text="Новая заявка")
+        except Exception:
+            pass
+    return time.perf_counter() - started
+
+
+async def bench_fanout(masters: int, latency: float, rate: float, concurrency: int, error_rate: float):
+    bot = FakeBot(latency, error_rate)
+    fanout = NotificationFanout(bot, concurrency=concurrency, global_rate=rate)
+    started = time.perf_counter()
+    fanout.submit_many(range(1, masters + 1), text="Новая заявка")
+    handler_took = time.perf_counter() - started
+    await fanout.stop(drain=True)
+    return handler_took, time.perf_counter() - started, fanout.stats.as_dict()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--masters", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Средняя задержка send_message, сек")
+    parser.add_argument("--rate", type=float, default=25.0, help="Глобальный лимит, сообщений/с")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_sequential:
+        seq = await bench_sequential(args.masters, args.latency)
+        print(f"sequential: handler blocked {seq:.2f}s, {args.masters / seq:.1f} msg/s")
+
+    handler_took, total, stats = await bench_fanout(
+        args.masters, args.latency, args.rate, args.concurrency, args.error_rate
+    )
+    print(f"fanout:     handler blocked {handler_took * 1000:.2f}ms, delivered in {total:.2f}s, "
+          f"{stats['sent'] / total:.1f} msg/s")
+    print(f"stats: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
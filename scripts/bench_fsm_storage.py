@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Бенчмарк FSM-хранилищ: MemoryStorage vs SQLAlchemyStorage.
+
+Имитирует шаг сценария создания заказа: get_state, get_data, update_data,
+set_state для множества пользователей. По умолчанию использует файл SQLite;
+для PostgreSQL передайте --dsn postgresql+asyncpg://...
+
+    python scripts/bench_fsm_storage.py --users 500 --steps 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from aiogram.fsm.storage.base import StorageKey  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.bot.storage import SQLAlchemyStorage  # noqa: E402
+from app.models import Base  # noqa: E402
+
+STATES = ["OrderCreate:category", "OrderCreate:address", "OrderCreate:description", "OrderCreate:confirm"]
+
+
+async def run_steps(storage, users: int, steps: int) -> list[float]:
+    keys = [StorageKey(bot_id=1, chat_id=i, user_id=i) for i in range(1, users + 1)]
+    timings = []
+    for step in range(steps):
+        random.shuffle(keys)
+        for key in keys:
+            started = time.perf_counter()
+            await storage.get_state(key)
+            await storage.get_data(key)
+            await storage.update_data(key, {f"field_{step}": "x" * 32})
+            await storage.set_state(key, STATES[step % len(STATES)])
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+def report(name: str, timings: list[float], total: float) -> None:
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:28s} p50={statistics.median(timings):8.1f}us p95={p95:8.1f}us total={total:6.2f}s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--dsn", default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    timings = await run_steps(MemoryStorage(), args.users, args.steps)
+    report("MemoryStorage", timings, time.perf_counter() - started)
+
+    tmp = None
+    dsn = args.dsn
+    if dsn is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False)
+        dsn = f"sqlite+aiosqlite:///{tmp.name}"
+    engine = create_async_engine(dsn)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    for name, kwargs in (
+        ("SQLAlchemyStorage (cached)", {}),
+        ("SQLAlchemyStorage (no cache)", {"cache_ttl": 0}),
+    ):
+        storage = SQLAlchemyStorage(factory, **kwargs)
+        started = time.perf_counter()
+        timings = await run_steps(storage, args.users, args.steps)
+        await storage.close()
+        report(name, timings, time.perf_counter() - started)
+
+    await engine.dispose()
+    if tmp is not None:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
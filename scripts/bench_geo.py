@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Бенчмарк поиска заказов в радиусе: разбор строковых координат в Python vs геохэш-индекс.
+
+Заказы случайно разбросаны по области ~600 x 600 км; поиск идёт вокруг
+случайных точек внутри неё.
+
+    python scripts/bench_geo.py --orders 10000 100000 --radius 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import Base, Order, User  # noqa: E402
+from app.services.geo import find_orders_within  # noqa: E402
+from app.services.matching import haversine_km  # noqa: E402
+from core.geohash import encode  # noqa: E402
+
+MIN_LAT, MAX_LAT, MIN_LON, MAX_LON = 39.0, 44.5, 66.0, 73.0
+
+
+async def legacy_within(session, lat, lon, radius_km):
+    """Как раньше: все заказы со строковыми координатами и расстояние в Python."""
+    rows = (await session.execute(
+        select(Order.id, Order.latitude, Order.longitude).where(Order.status == "new")
+    )).all()
+    found = []
+    for order_id, o_lat, o_lon in rows:
+        if o_lat and o_lon:
+            distance = haversine_km(lat, lon, float(o_lat), float(o_lon))
+            if distance <= radius_km:
+                found.append((order_id, distance))
+    return found
+
+
+async def run(size: int, radius_km: float, queries: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    rows = []
+    for i in range(1, size + 1):
+        lat, lon = random.uniform(MIN_LAT, MAX_LAT), random.uniform(MIN_LON, MAX_LON)
+        rows.append({
+            "id": i, "client_id": 1, "category": "c", "status": "new",
+            "latitude": str(lat), "longitude": str(lon),
+            "geo_lat": lat, "geo_lon": lon, "geohash": encode(lat, lon),
+        })
+    async with Session() as session:
+        await session.execute(insert(User), [{"id": 1, "tg_id": 1, "role": "client", "rating_avg": 0.0}])
+        await session.execute(insert(Order), rows)
+        await session.commit()
+
+    points = [(random.uniform(MIN_LAT, MAX_LAT), random.uniform(MIN_LON, MAX_LON)) for _ in range(queries)]
+    async with Session() as session:
+        started = time.perf_counter()
+        expected = [len(await legacy_within(session, lat, lon, radius_km)) for lat, lon in points]
+        legacy = (time.perf_counter() - started) / queries * 1000
+        started = time.perf_counter()
+        got = [len(await find_orders_within(session, lat, lon, radius_km)) for lat, lon in points]
+        indexed = (time.perf_counter() - started) / queries * 1000
+    assert got == expected, "результаты должны совпадать"
+    print(f"orders={size:>7} radius={radius_km} km  legacy={legacy:8.2f} ms  geohash={indexed:6.2f} ms  "
+          f"avg found={sum(got) / queries:.1f}")
+    await engine.dispose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--radius", type=float, default=10.0)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    for size in args.orders:
+        await run(size, args.radius, args.queries)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
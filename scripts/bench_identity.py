@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Бенчмарк определения пользователя по tg_id: запрос в БД на каждый апдейт vs UserIdentityCache.
+
+Поток апдейтов генерируется с «горячими» пользователями (распределение Парето),
+как в реальном боте, где активная часть аудитории пишет много сообщений подряд.
+
+    python scripts/bench_identity.py --users 5000 --updates 50000 --cache-size 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import Base, User  # noqa: E402
+from app.services.identity import UserIdentityCache, resolve_user  # noqa: E402
+
+
+def update_stream(users: int, updates: int, alpha: float) -> list[int]:
+    return [min(users, int(random.paretovariate(alpha))) for _ in range(updates)]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=50_000)
+    parser.add_argument("--cache-size", type=int, default=1000)
+    parser.add_argument("--ttl", type=float, default=60.0)
+    parser.add_argument("--alpha", type=float, default=1.2, help="Параметр Парето (меньше — «горячее»)")
+    args = parser.parse_args()
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as session:
+        await session.execute(insert(User), [
+            {"id": i, "tg_id": i, "role": "master" if i % 3 else "client", "name": f"User {i}", "rating_avg": 0.0}
+            for i in range(1, args.users + 1)
+        ])
+        await session.commit()
+
+    stream = update_stream(args.users, args.updates, args.alpha)
+
+    started = time.perf_counter()
+    for tg_id in stream:
+        async with Session() as session:
+            (await session.execute(select(User).where(User.tg_id == tg_id))).scalars().first()
+    uncached = time.perf_counter() - started
+
+    cache = UserIdentityCache(maxsize=args.cache_size, ttl=args.ttl)
+    started = time.perf_counter()
+    for tg_id in stream:
+        await resolve_user(tg_id, session_factory=Session, cache=cache)
+    cached = time.perf_counter() - started
+
+    per_update = lambda total: total / len(stream) * 1_000_000  # noqa: E731
+    stats = cache.stats()
+    print(f"updates={len(stream)} distinct_users={len(set(stream))}")
+    print(f"db every update: {uncached:.2f}s ({per_update(uncached):.1f} us/update, {len(stream)} queries)")
+    print(f"identity cache:  {cached:.2f}s ({per_update(cached):.1f} us/update, {stats['misses']} queries)")
+    print(f"cache stats: {stats}")
+    print(f"saved: {per_update(uncached) - per_update(cached):.1f} us/update")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Бенчмарк подбора мастеров для заявки: «все мастера» vs find_candidate_masters.
+
+Создаёт in-memory SQLite с N мастерами, распределёнными по категориям и
+координатам, и сравнивает задержку и число получателей уведомления.
+
+    python scripts/bench_matching.py --masters 20000 --categories 12 --radius 15
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import Base, User, master_categories  # noqa: E402
+from app.services.matching import find_candidate_masters  # noqa: E402
+
+CENTER_LAT, CENTER_LON = 41.3111, 69.2797
+
+
+async def seed(session, masters: int, categories: list[str]) -> None:
+    users, links = [], []
+    for i in range(1, masters + 1):
+        users.append({
+            "id": i,
+            "tg_id": 1_000_000 + i,
+            "role": "master",
+            "name": f"Master {i}",
+            "is_active": True,
+            "rating_avg": 0.0,
+            "latitude": CENTER_LAT + random.uniform(-1.5, 1.5),
+            "longitude": CENTER_LON + random.uniform(-1.5, 1.5),
+        })
+        for category in random.sample(categories, k=random.randint(1, 2)):
+            links.append({"user_id": i, "category": category})
+    await session.execute(insert(User), users)
+    await session.execute(insert(master_categories), links)
+    await session.commit()
+
+
+async def measure(fn, repeats: int) -> tuple[float, float, int]:
+    timings, count = [], 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        count = len(await fn())
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], count
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--masters", type=int, default=20_000)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--radius", type=float, default=15.0, help="Радиус, км (0 — без фильтра)")
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    categories = [f"Категория {i}" for i in range(args.categories)]
+
+    async with Session() as session:
+        await seed(session, args.masters, categories)
+
+        async def all_masters():
+            return (await session.execute(
+                select(User.tg_id).where(User.role == "master", User.tg_id.is_not(None))
+            )).scalars().all()
+
+        async def targeted():
+            return await find_candidate_masters(
+                session,
+                categories[0],
+                latitude=CENTER_LAT,
+                longitude=CENTER_LON,
+                radius_km=args.radius or None,
+            )
+
+        for name, fn in (("all masters", all_masters), ("targeted", targeted)):
+            p50, p95, count = await measure(fn, args.repeats)
+            print(f"{name:12s} p50={p50:7.2f}ms p95={p95:7.2f}ms recipients={count}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Бенчмарк ленты новых заказов мастера: старая выборка всех заказов vs fetch_master_feed.
+
+Для каждого размера таблицы orders меряется первая страница и страница
+«глубоко» в ленте (через курсор), чтобы показать, что задержка не растёт.
+
+    python scripts/bench_order_feed.py --orders 1000 10000 50000
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models import Base, Bid, MasterCategory, Order, User, master_categories  # noqa: E402
+from app.services.order_feed import encode_cursor, fetch_master_feed  # noqa: E402
+from core.db import stored_text  # noqa: E402
+
+MASTER_ID, CLIENT_ID = 1, 2
+
+
+async def legacy_feed(session):
+    """Прежний nearby_orders_button: все новые заказы и все ставки в Python, затем [:10]."""
+    orders = (await session.execute(
+        select(Order).where(Order.status == "new", Order.client_id != MASTER_ID).order_by(Order.created_at.desc())
+    )).scalars().all()
+    bids = set((await session.execute(select(Bid.order_id).where(Bid.master_id == MASTER_ID))).scalars().all())
+    return [(o.id, o.id in bids) for o in orders[:10]]
+
+
+async def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def run(size: int, repeat: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    categories = MasterCategory.CATEGORIES
+    started = datetime.datetime(2026, 1, 1)
+    async with Session() as session:
+        await session.execute(insert(User), [
+            {"id": MASTER_ID, "tg_id": MASTER_ID, "role": "master", "rating_avg": 0.0},
+            {"id": CLIENT_ID, "tg_id": CLIENT_ID, "role": "client", "rating_avg": 0.0},
+        ])
+        await session.execute(insert(master_categories), [
+            {"user_id": MASTER_ID, "category": c} for c in categories[:3]
+        ])
+        await session.execute(insert(Order), [
+            {"id": i, "client_id": CLIENT_ID, "category": random.choice(categories),
+             "status": "new", "created_at": started + datetime.timedelta(seconds=i)}
+            for i in range(1, size + 1)
+        ])
+        await session.execute(insert(Bid), [
+            {"id": i, "order_id": random.randint(1, size), "master_id": MASTER_ID, "price": 100}
+            for i in range(1, size // 10 + 1)
+        ])
+        await session.commit()
+
+    async with Session() as session:
+        # Курсор SQLite — хранимый текст created_at (см. app/services/order_feed.py)
+        stored = (await session.execute(
+            select(stored_text(Order.created_at)).where(Order.id == size // 2)
+        )).scalar_one()
+        deep = encode_cursor(stored, size // 2)
+        legacy = await timed(lambda: legacy_feed(session), repeat)
+        first = await timed(lambda: fetch_master_feed(session, MASTER_ID), repeat)
+        middle = await timed(lambda: fetch_master_feed(session, MASTER_ID, cursor=deep), repeat)
+    print(f"orders={size:>7}  legacy={legacy:8.2f} ms  feed first={first:6.2f} ms  feed middle={middle:6.2f} ms")
+    await engine.dispose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, nargs="+", default=[1000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for size in args.orders:
+        await run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
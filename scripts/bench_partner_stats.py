@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Бенчмарк партнёрского дашборда.
+
+Партнёр с --referred приведёнными клиентами (у каждого заказ, у половины
+заказов выплата) плюс --noise клиентов других партнёров. Замеряет p50:
+
+- legacy — семь отдельных запросов с JOIN Payout → Order → User (как было);
+- aggregate — один запрос с FILTER-агрегатами (compute_partner_statistics);
+- summary — партнёр и сводка partner_stats одним запросом по индексу
+  (load_partner_dashboard);
+- цену записи: новый заказ клиента партнёра (инкремент сводки в after_flush)
+  и клиента без партнёра.
+
+    python scripts/bench_partner_stats.py --referred 10000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.models import Order, Partner, Payout, User  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.services.partner_stats import (  # noqa: E402
+    compute_partner_statistics,
+    load_partner_dashboard,
+    refresh_all_partner_stats,
+)
+
+PARTNER, OTHER_PARTNER, MASTER, LONER = 1, 2, 3, 4
+_ids = itertools.count(1000)
+
+
+async def prepare(factory, referred: int, noise: int) -> None:
+    users = [
+        {"id": PARTNER, "tg_id": PARTNER, "role": "partner", "name": "p"},
+        {"id": OTHER_PARTNER, "tg_id": OTHER_PARTNER, "role": "partner", "name": "p2"},
+        {"id": MASTER, "tg_id": MASTER, "role": "master", "name": "m"},
+        {"id": LONER, "tg_id": LONER, "role": "client", "name": "c"},
+    ]
+    orders, payouts = [], []
+    for n in range(referred + noise):
+        client = next(_ids)
+        users.append({"id": client, "tg_id": client, "role": "client", "name": "c",
+                      "referrer_id": PARTNER if n < referred else OTHER_PARTNER})
+        orders.append({"id": client, "client_id": client, "master_id": MASTER, "category": "bench",
+                       "status": ("assigned", "done")[n % 2]})
+        if n % 2:
+            payouts.append({"id": client, "order_id": client, "master_id": MASTER, "amount_master": 9500,
+                            "amount_service": 0, "amount_partner": 500, "status": ("paid", "pending")[n % 4 == 1]})
+    async with factory() as db:
+        for model, rows in ((User, users), (Order, orders), (Payout, payouts)):
+            for start in range(0, len(rows), 5000):
+                await db.execute(insert(model), rows[start:start + 5000])
+        await db.execute(insert(Partner), [
+            {"id": PARTNER, "user_id": PARTNER, "referral_code": "BENCH1"},
+            {"id": OTHER_PARTNER, "user_id": OTHER_PARTNER, "referral_code": "BENCH2"},
+        ])
+        await db.commit()
+
+
+async def legacy_statistics(session, partner_user_id):
+    def referred_payouts():
+        return (Payout.order_id == Order.id, Order.client_id == User.id, User.referrer_id == partner_user_id)
+
+    results = [(await session.execute(select(func.count(User.id)).where(User.referrer_id == partner_user_id))).scalar()]
+    results.append((await session.execute(
+        select(func.count(Order.id)).join(User, Order.client_id == User.id)
+        .where(User.referrer_id == partner_user_id, Order.status == "assigned")
+    )).scalar())
+    for column, status in ((func.count(Payout.id), "paid"), (func.count(Payout.id), "pending"),
+                           (func.sum(Payout.amount_partner), "paid"), (func.sum(Payout.amount_partner), "pending")):
+        results.append((await session.execute(
+            select(func.coalesce(column, 0)).where(*referred_payouts(), Payout.status == status)
+        )).scalar())
+    results.append((await session.execute(
+        select(func.coalesce(func.avg(Payout.amount_partner * 20), 0)).where(*referred_payouts())
+    )).scalar())
+    return results
+
+
+async def p50(factory, fn, repeat: int) -> float:
+    samples = []
+    async with factory() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fn(db)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def new_order(db, client_id: int) -> None:
+    order_id = next(_ids) + 10_000_000
+    db.add(Order(id=order_id, client_id=client_id, master_id=MASTER, category="bench", status="new"))
+    await db.commit()
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(args.db or f"sqlite+aiosqlite:///{tmp}/bench.sqlite3")
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await prepare(factory, args.referred, args.noise)
+        started = time.perf_counter()
+        await refresh_all_partner_stats(session_factory=factory)
+        print(f"приведено клиентов {args.referred}, чужих {args.noise}, db={engine.url.get_backend_name()}; "
+              f"полный пересчёт сводок {(time.perf_counter() - started) * 1000:.1f} мс")
+
+        async with factory() as db:
+            _, summary = await load_partner_dashboard(db, PARTNER)
+            assert summary == await compute_partner_statistics(db, PARTNER)
+        referred_client = 1000
+        rows = [
+            ("legacy, 7 запросов", lambda db: legacy_statistics(db, PARTNER)),
+            ("aggregate, 1 запрос", lambda db: compute_partner_statistics(db, PARTNER)),
+            ("summary, 1 lookup", lambda db: load_partner_dashboard(db, PARTNER)),
+            ("запись: заказ без партнёра", lambda db: new_order(db, LONER)),
+            ("запись: заказ клиента партнёра", lambda db: new_order(db, referred_client)),
+        ]
+        for name, fn in rows:
+            print(f"{name:32s} p50 {await p50(factory, fn, args.repeat) * 1000:8.2f} мс")
+        async with factory() as db:
+            _, summary = await load_partner_dashboard(db, PARTNER)
+            assert summary == await compute_partner_statistics(db, PARTNER), "сводка разошлась с данными"
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--referred", type=int, default=10_000)
+    parser.add_argument("--noise", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--db", help="async URL пустой БД (по умолчанию временный SQLite)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
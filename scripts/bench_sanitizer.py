@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Бенчмарк очистки ответов модели: прежняя ``_sanitize_text`` vs :func:`sanitize`.
+
+Прежняя реализация (импорт ``re`` и поиск паттернов в кэше ``re`` на каждый
+вызов, список частей ``re.split``) воспроизведена здесь для сравнения.
+Отдельно меряется потоковая очистка по токенам.
+
+    python scripts/bench_sanitizer.py --texts 2000 --rounds 5
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from app.ai_agent.sanitizer import StreamingSanitizer, sanitize  # noqa: E402
+
+SENTENCES = [
+    "Чтобы создать заявку, нажмите «Создать заказ» и опишите задачу.",
+    "Мастер свяжется с вами в течение часа.",
+    "Что?", "Да.", "Оплата после выполнения работ!!!", "да да да",
+    "Выберите мастера по рейтингу и цене...", "Ок.",
+]
+TOKEN_RE = re.compile(r"\s*\S+")
+
+
+def legacy_sanitize(text: str) -> str:
+    import re
+    s = text.strip()
+    s = re.sub(r"^(Ответ|Assistant|Bot)\s*:\s*", "", s, flags=re.IGNORECASE)
+    s = re.sub(r"([!?.,])\1{2,}", r"\1\1", s)
+    s = re.sub(r"\b(\w{1,3})\b(\s+\1\b){2,}", r"\1", s, flags=re.IGNORECASE)
+    parts = re.split(r"(\s*[!?\.]+\s*)", s)
+    rebuilt = []
+    last_short_norm = None
+
+    def norm_sent(x):
+        return re.sub(r"\s+", " ", x.strip().lower())
+
+    i = 0
+    while i < len(parts):
+        sent = parts[i]
+        delim = parts[i + 1] if i + 1 < len(parts) else ""
+        full = (sent + (delim or "")).strip()
+        if full:
+            sent_norm = norm_sent(full)
+            is_short = len(sent_norm) <= 12 or len(sent_norm.split()) <= 2
+            if not (is_short and last_short_norm == sent_norm):
+                rebuilt.append(full)
+            last_short_norm = sent_norm if is_short else None
+        i += 2
+    return " ".join(rebuilt).strip()
+
+
+def stream(text: str) -> str:
+    sanitizer = StreamingSanitizer()
+    # Токены модели — примерно слова с пробелом перед ними
+    out = "".join(sanitizer.feed(token) for token in TOKEN_RE.findall(text))
+    return out + sanitizer.finish()
+
+
+def bench(fn, texts, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best / len(texts) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--sentences", type=int, default=6, help="предложений в ответе")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = [
+        "Ответ: " + " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, args.sentences)))
+        for _ in range(args.texts)
+    ]
+    mismatches = sum(not (sanitize(t) == stream(t) == legacy_sanitize(t)) for t in texts)
+
+    legacy = bench(legacy_sanitize, texts, args.rounds)
+    new = bench(sanitize, texts, args.rounds)
+    streamed = bench(stream, texts, args.rounds)
+    print(f"texts={args.texts} mismatches={mismatches}")
+    print(f"legacy _sanitize_text:   {legacy:7.2f} us/answer")
+    print(f"sanitize (precompiled):  {new:7.2f} us/answer  x{legacy / new:.2f}")
+    print(f"StreamingSanitizer:      {streamed:7.2f} us/answer (по словам)")
+
+
+if __name__ == "__main__":
+    main()
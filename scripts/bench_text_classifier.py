@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Бенчмарк классификатора заказов: ``keyword in text`` по всем словам vs автомат Ахо-Корасик.
+
+Меряется классификация длинных описаний заказов на встроенных словарях и на
+словарях, расширенных до --keywords слов (как после загрузки из БД).
+
+    python scripts/bench_text_classifier.py --length 3000 --keywords 20 500 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+from app.ai_agent.models.text_classifier import TextClassifier  # noqa: E402
+
+WORDS = (
+    "нужно заменить смеситель в ванной и проверить трубы под раковиной потому что капает вода "
+    "также не работает розетка на кухне и мигает свет в коридоре хотелось бы сделать всё за один "
+    "визит мастера желательно вечером после работы оплата наличными или переводом"
+).split()
+
+
+def naive_order_category(categories, text):
+    text_lower = text.lower()
+    scores = {c: sum(1 for k in keywords if k in text_lower) for c, keywords in categories.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else "other"
+
+
+def fake_keyword(rng):
+    return "".join(rng.choice("абвгдежзиклмнопрстуфхцчшщыэюя") for _ in range(rng.randint(5, 10)))
+
+
+def expand(categories, total, rng):
+    expanded = {c: list(k) for c, k in categories.items()}
+    names = list(expanded)
+    while sum(len(k) for k in expanded.values()) < total:
+        expanded[rng.choice(names)].append(fake_keyword(rng))
+    return expanded
+
+
+def timed(fn, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (repeat * len(texts)) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--length", type=int, default=3000, help="длина описания в символах")
+    parser.add_argument("--keywords", type=int, nargs="+", default=[20, 500, 2000])
+    parser.add_argument("--texts", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    texts = []
+    for _ in range(args.texts):
+        words = []
+        while sum(len(w) + 1 for w in words) < args.length:
+            words.append(rng.choice(WORDS))
+        texts.append(" ".join(words).capitalize())
+
+    base = TextClassifier().order_categories
+    for total in args.keywords:
+        categories = expand(base, total, rng)
+        classifier = TextClassifier()
+        started = time.perf_counter()
+        classifier.reload_keywords(order_categories=categories)
+        build_ms = (time.perf_counter() - started) * 1000
+        for text in texts:
+            assert classifier.classify_order_category(text) == naive_order_category(categories, text)
+        naive = timed(lambda t: naive_order_category(categories, t), texts, args.repeat)
+        automaton = timed(classifier.classify_order_category, texts, args.repeat)
+        print(f"keywords={total:>5} length={args.length}  naive={naive:8.1f} us  "
+              f"matcher={automaton:8.1f} us  build={build_ms:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
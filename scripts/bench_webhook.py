@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Бенчмарк вебхук-режима: пропускная способность по числу процессов-обработчиков.
+
+Локальный «фейковый Telegram» (aiohttp) проигрывает записанные апдейты
+(JSONL, --updates; без файла генерируется запись --chats x --per-chat
+сообщений) в FastAPI-приложение из :mod:`app.bot.webhook`. Апдейты одного
+чата идут по порядку, разные чаты — параллельно, до --connections
+одновременно (как max_connections вебхука). Обработчик тратит --work-ms CPU
+и отвечает ``sendMessage`` в тот же фейковый API. Замеряется время до
+получения всех ответов и проверяется порядок ответов в каждом чате.
+
+    python scripts/bench_webhook.py --workers 1 2 4 --chats 200 --per-chat 10 --work-ms 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+
+import httpx  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from app.bot.webhook import WorkerPool, create_webhook_app  # noqa: E402
+
+
+def bench_worker_setup():
+    """Dispatcher процесса-обработчика: CPU-работа и ответ в фейковый Telegram."""
+    from aiogram import Bot, Dispatcher
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+
+    work = float(os.environ["BENCH_WORK_MS"]) / 1000
+    session = AiohttpSession(api=TelegramAPIServer.from_base(os.environ["FAKE_TELEGRAM_URL"]))
+    dp = Dispatcher()
+
+    @dp.message()
+    async def echo(message) -> None:
+        deadline = time.perf_counter() + work
+        while time.perf_counter() < deadline:
+            pass
+        await message.answer(message.text)
+
+    return Bot("123:abc", session=session), dp
+
+
+class FakeTelegram:
+    def __init__(self):
+        self.replies: dict[int, list[str]] = defaultdict(list)
+        self.count = 0
+        self.expected = 0
+        self.done = asyncio.Event()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        chat_id = int(data["chat_id"])
+        self.replies[chat_id].append(data["text"])
+        self.count += 1
+        if self.count >= self.expected:
+            self.done.set()
+        result = {"message_id": self.count, "date": 0, "chat": {"id": chat_id, "type": "private"}, "text": data["text"]}
+        return web.json_response({"ok": True, "result": result})
+
+    def expect(self, n: int) -> None:
+        self.replies.clear()
+        self.count = 0
+        self.expected = n
+        self.done.clear()
+
+
+def record_updates(chats: int, per_chat: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    updates = []
+    for seq in range(per_chat):
+        for chat in rng.sample(range(1, chats + 1), chats):
+            chat_id = 1_000_000 + chat
+            updates.append({
+                "update_id": len(updates) + 1,
+                "message": {
+                    "message_id": len(updates) + 1,
+                    "date": 0,
+                    "chat": {"id": chat_id, "type": "private"},
+                    "from": {"id": chat_id, "is_bot": False, "first_name": "u"},
+                    "text": str(seq),
+                },
+            })
+    return updates
+
+
+async def replay(client: httpx.AsyncClient, updates: list[dict], connections: int) -> int:
+    by_chat: dict[int, list[dict]] = defaultdict(list)
+    for update in updates:
+        by_chat[update["message"]["chat"]["id"]].append(update)
+    limit = asyncio.Semaphore(connections)
+    retries = 0
+
+    async def send_chat(chat_updates):
+        nonlocal retries
+        for update in chat_updates:
+            while True:
+                async with limit:
+                    response = await client.post("/telegram/webhook", json=update)
+                if response.status_code != 503:
+                    break
+                retries += 1  # очередь полна: Telegram повторил бы позже
+                await asyncio.sleep(float(response.headers.get("Retry-After", "1")) / 10)
+
+    await asyncio.gather(*(send_chat(u) for u in by_chat.values()))
+    return retries
+
+
+async def run_once(workers: int, updates: list[dict], fake: FakeTelegram, args) -> None:
+    pool = WorkerPool(workers, queue_size=args.queue_size, setup="bench_webhook:bench_worker_setup")
+    app = create_webhook_app(pool)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+            # Прогрев: по апдейту в каждый процесс (импорт aiogram и т.п. не в замере)
+            warm = [dict(u, message=dict(u["message"], chat={"id": i, "type": "private"})) for i, u in
+                    zip(range(workers), updates)]
+            fake.expect(len(warm))
+            await replay(client, warm, args.connections)
+            await asyncio.wait_for(fake.done.wait(), 120)
+
+            fake.expect(len(updates))
+            started = time.perf_counter()
+            retries = await replay(client, updates, args.connections)
+            await asyncio.wait_for(fake.done.wait(), 600)
+            elapsed = time.perf_counter() - started
+    ordered = all(texts == sorted(texts, key=int) for texts in fake.replies.values())
+    print(
+        f"workers={workers}: {len(updates)} апдейтов за {elapsed:6.2f} с = {len(updates) / elapsed:7.0f} апд/с, "
+        f"503-повторов {retries}, порядок в чатах сохранён: {ordered}"
+    )
+
+
+async def run(args) -> None:
+    if args.updates:
+        with open(args.updates) as f:
+            updates = [json.loads(line) for line in f if line.strip()]
+    else:
+        updates = record_updates(args.chats, args.per_chat)
+    if args.save:
+        with open(args.save, "w") as f:
+            f.writelines(json.dumps(u, ensure_ascii=False) + "\n" for u in updates)
+
+    fake = FakeTelegram()
+    server = web.Application()
+    server.router.add_post("/bot{token}/{method}", fake.handle)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    os.environ["FAKE_TELEGRAM_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["BENCH_WORK_MS"] = str(args.work_ms)
+    print(f"cpu={os.cpu_count()} updates={len(updates)} work_ms={args.work_ms}")
+    try:
+        for workers in args.workers:
+            await run_once(workers, updates, fake, args)
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--updates", help="JSONL с записанными апдейтами")
+    parser.add_argument("--save", help="сохранить проигрываемые апдейты в JSONL")
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--per-chat", type=int, default=10)
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    parser.add_argument("--connections", type=int, default=40)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8799)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
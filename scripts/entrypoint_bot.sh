@@ -7,5 +7,8 @@ python scripts/wait_for_db.py
 # Do NOT run migrations here to avoid race conditions with admin service
 # alembic upgrade heads
 
-# Start Telegram bot (long polling)
+# Start Telegram bot: long polling (default) or webhook with worker processes
+if [ "${BOT_MODE:-polling}" = "webhook" ]; then
+  exec python -m app.bot.webhook
+fi
 exec python -m app.bot.main
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Daily rollups for the admin analytics (run by cron every few minutes or as
+a long-running process with --every).
+
+Without flags rebuilds the last ANALYTICS_ROLLUP_LOOKBACK_DAYS days and the
+days queued in analytics_dirty_days, then recomputes the per-partner
+summaries (partner_stats). --backfill rebuilds the whole history (or
+--since/--until), run it once after the add_analytics_rollups migration.
+See app/services/analytics_rollups.py and app/services/partner_stats.py.
+
+    python scripts/rollup_analytics.py [--every 300]
+    python scripts/rollup_analytics.py --backfill [--since 2025-01-01] [--until 2025-12-31]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+
+# Ensure project root on PYTHONPATH
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from app.services.analytics_rollups import backfill_rollups, run_rollups  # noqa: E402
+from app.services.partner_stats import refresh_all_partner_stats  # noqa: E402
+
+
+async def main(args) -> None:
+    if args.backfill:
+        report = await backfill_rollups(since=args.since, until=args.until, chunk_days=args.chunk_days)
+        print(f"backfilled days={len(report.days)} rows={report.rows}")
+        return
+    while True:
+        report = await run_rollups(lookback_days=args.lookback_days)
+        if report.skipped:
+            print("another aggregator holds the lock, skipped")
+        else:
+            print(f"rebuilt days={len(report.days)} rows={report.rows}")
+        print(f"refreshed partner summaries={await refresh_all_partner_stats()}")
+        if not args.every:
+            return
+        await asyncio.sleep(args.every)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backfill", action="store_true", help="rebuild the whole history")
+    parser.add_argument("--since", type=datetime.date.fromisoformat, default=None, help="backfill from (default: oldest row)")
+    parser.add_argument("--until", type=datetime.date.fromisoformat, default=None, help="backfill to (default: today)")
+    parser.add_argument("--chunk-days", type=int, default=31, help="days per backfill transaction")
+    parser.add_argument("--lookback-days", type=int, default=None, help="default: ANALYTICS_ROLLUP_LOOKBACK_DAYS")
+    parser.add_argument("--every", type=float, default=0, help="repeat every N seconds (0: run once)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,143 @@
+"""Тесты keyset-пагинации списков админки."""
+import datetime
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from admin.app.auth import get_current_admin
+from admin.app.models import ClientAction
+from admin.app.pagination import decode_cursor, encode_cursor, fetch_keyset_page
+from admin.app.routers import client_actions as client_actions_router
+from admin.app.routers import partners as partners_router
+from app.models import Order, Partner, User
+from core.db import get_session
+
+
+def _id() -> int:
+    return random.randint(1_000_000_000_000, 9_000_000_000_000)
+
+
+def _client(test_db_session):
+    async def override_session():
+        async with test_db_session() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(client_actions_router.router, prefix="/client-actions")
+    app.include_router(partners_router.router, prefix="/partners")
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_admin] = lambda: {"username": "admin"}
+    return TestClient(app)
+
+
+def test_cursor_roundtrip_and_rejects_garbage():
+    naive = datetime.datetime(2001, 2, 3, 4, 5, 6, 789)
+    aware = naive.replace(tzinfo=datetime.timezone.utc)
+    assert decode_cursor(encode_cursor(naive, 42)) == (naive, 42)
+    assert decode_cursor(encode_cursor(aware, 42)) == (aware, 42)
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+    assert decode_cursor(encode_cursor("2001-02-03 04:05:06", 42)) == ("2001-02-03 04:05:06", 42)
+    # Микросекунды за пределами datetime и id больше BIGINT — тоже ValueError
+    huge = "OTk5OTk5OTk5OTk5OTk5OTk5OTkuMQ"  # "99999999999999999999.1"
+    for garbage in ("not a cursor", "MTIz", "!!", huge, encode_cursor(None, 2**64)):
+        with pytest.raises(ValueError):
+            decode_cursor(garbage)
+
+
+@pytest.mark.asyncio
+async def test_pages_are_stable_under_inserts_and_ties(test_db_session):
+    async with test_db_session() as session:
+        client = User(id=_id(), tg_id=_id(), role="client", name="Client")
+        session.add(client)
+        await session.flush()
+        # Пять заказов в одну и ту же секунду: порядок задаёт id
+        created_at = datetime.datetime(1991, 1, 1, 12)
+        orders = [Order(id=_id(), client_id=client.id, category="pagination", created_at=created_at)
+                  for _ in range(5)]
+        session.add_all(orders)
+        await session.commit()
+        expected = [o.id for o in sorted(orders, key=lambda o: o.id, reverse=True)]
+
+        query = select(Order).where(Order.client_id == client.id)
+        kwargs = dict(created_at=Order.created_at, id_column=Order.id, limit=2)
+        first = await fetch_keyset_page(session, query, **kwargs, with_total=True)
+        assert [o.id for o in first.items] == expected[:2]
+        assert (first.total, first.total_estimated) == (5, False)
+
+        # Новый заказ не сдвигает следующие страницы
+        session.add(Order(id=_id(), client_id=client.id, category="pagination", created_at=created_at
+                          + datetime.timedelta(days=1)))
+        await session.commit()
+        second = await fetch_keyset_page(session, query, **kwargs, cursor=first.next_cursor)
+        third = await fetch_keyset_page(session, query, **kwargs, cursor=second.next_cursor)
+        assert [o.id for o in second.items + third.items] == expected[2:]
+        assert third.next_cursor is None
+
+        recount = await fetch_keyset_page(session, query, **kwargs, with_total=True)
+        assert recount.total == 6
+
+
+@pytest.mark.asyncio
+async def test_pages_walk_rows_with_server_default_timestamps(test_db_session):
+    async with test_db_session() as session:
+        client = User(id=_id(), tg_id=_id(), role="client", name="Client")
+        session.add(client)
+        await session.flush()
+        # created_at ставит БД: в SQLite это текст без микросекунд
+        orders = [Order(id=_id(), client_id=client.id, category="pagination") for _ in range(5)]
+        session.add_all(orders)
+        await session.commit()
+
+        query = select(Order).where(Order.client_id == client.id)
+        seen, cursor = [], None
+        for _ in range(len(orders)):
+            page = await fetch_keyset_page(
+                session, query, created_at=Order.created_at, id_column=Order.id, cursor=cursor, limit=2,
+            )
+            seen += [o.id for o in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert sorted(seen) == sorted(o.id for o in orders)
+        assert len(seen) == len(set(seen))
+        assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints_follow_cursor_headers(test_db_session):
+    async with test_db_session() as session:
+        user = User(id=_id(), tg_id=_id(), role="partner", name=f"Pager{_id()}")
+        session.add(user)
+        await session.flush()
+        session.add(Partner(id=_id(), user_id=user.id, referral_code=f"PG{user.id}"))
+        session.add_all([
+            ClientAction(user_id=user.id, action_type="view_master", description=str(n),
+                         created_at=datetime.datetime(1991, 1, 1, tzinfo=datetime.timezone.utc)
+                         + datetime.timedelta(minutes=n))
+            for n in range(5)
+        ])
+        await session.commit()
+
+    with _client(test_db_session) as client:
+        seen, cursor = [], None
+        while True:
+            params = {"user_id": user.id, "limit": 2, "with_total": True}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/client-actions/api", params=params)
+            assert response.status_code == 200
+            assert response.headers["X-Total-Count"] == "5"
+            seen += [action["description"] for action in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        assert seen == ["4", "3", "2", "1", "0"]
+        for garbage in ("garbage", "OTk5OTk5OTk5OTk5OTk5OTk5OTkuMQ"):
+            assert client.get("/client-actions/api", params={"cursor": garbage}).status_code == 400
+
+        partners = client.get("/partners/api", params={"search": user.name, "limit": 1})
+        assert [p["user_id"] for p in partners.json()] == [user.id]
+        assert "X-Next-Cursor" not in partners.headers
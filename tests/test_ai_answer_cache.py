@@ -0,0 +1,100 @@
+"""Tests for the AI assistant answer cache."""
+from __future__ import annotations
+
+from app.ai_agent import answer_cache
+from app.ai_agent.answer_cache import AnswerCache, normalize_question
+from app.ai_agent.simple_ai import GeminiAI, get_ai_response
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalize_question():
+    assert normalize_question("  Как СОЗДАТЬ заказ?!  ") == "как создать заказ"
+    assert normalize_question("Всё ли включено") == "все ли включено"
+
+
+def test_exact_and_similar_hits_with_stats():
+    cache = AnswerCache(similarity=0.85)
+    cache.put("Как создать заказ?", "Нажмите «Создать заказ» в меню.")
+
+    assert cache.get("как создать заказ") == "Нажмите «Создать заказ» в меню."
+    assert cache.get("Как создать заказы?") == "Нажмите «Создать заказ» в меню."
+    # Общие слова, но другой смысл — ниже порога
+    assert cache.get("Как отменить заказ?") is None
+    assert cache.get("Как оплатить работу мастера?") is None
+
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["similar_hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_similarity_tier_is_off_by_default():
+    cache = AnswerCache()
+    cache.put("Как создать заказ?", "ответ")
+    assert cache.get("Как создать заказы?") is None
+    assert cache.get("как создать заказ") == "ответ"
+
+
+def test_similar_hit_needs_same_negations_and_numbers():
+    cache = AnswerCache(similarity=0.85)
+    cache.put("Мастер не пришел, что делать?", "про неявку")
+    cache.put("Как отменить заказ 123?", "про заказ 123")
+    cache.put("Я не хочу платить комиссию", "про отказ")
+    cache.put("Мастер едет на адрес улица Ленина 10", "про адрес 10")
+
+    assert cache.get("мастер пришел что делать") is None
+    assert cache.get("я хочу платить комиссию") is None
+    assert cache.get("Как отменить заказ 124?") is None
+    assert cache.get("Мастер едет на адрес улица Ленина 12") is None
+    assert cache.get("Мастер не пришел что делать!") == "про неявку"
+    assert cache.get("Как отменить заказ 123") == "про заказ 123"
+
+
+def test_ttl_and_size_bounds():
+    clock = _Clock()
+    cache = AnswerCache(maxsize=2, ttl=10, similarity=0, clock=clock)
+    cache.put("первый вопрос", "1")
+    cache.put("второй вопрос", "2")
+    cache.get("первый вопрос")
+    cache.put("третий вопрос", "3")  # вытесняет «второй» (давно не читали)
+    assert cache.get("второй вопрос") is None
+    assert cache.get("первый вопрос") == "1"
+
+    clock.now = 11
+    assert cache.get("третий вопрос") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expired"] == 1
+    assert stats["size"] == 1
+
+
+def test_get_ai_response_answers_repeated_question_from_cache(monkeypatch):
+    monkeypatch.setattr(answer_cache, "_cache", AnswerCache())
+    monkeypatch.setattr(GeminiAI, "initialize", lambda self: None)
+    calls = []
+
+    def fake_response(self, prompt):
+        calls.append(prompt)
+        return "Откройте меню и нажмите «Создать заказ»."
+
+    monkeypatch.setattr(GeminiAI, "get_response", fake_response)
+
+    first = get_ai_response("Как создать заказ?")
+    second = get_ai_response("как создать заказ")
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_fallback_answers_are_not_cached(monkeypatch):
+    monkeypatch.setattr(answer_cache, "_cache", AnswerCache())
+    monkeypatch.setattr(GeminiAI, "initialize", lambda self: None)
+    monkeypatch.setattr(GeminiAI, "get_response", lambda self, prompt: None)
+
+    get_ai_response("Как создать заказ?")
+    assert len(answer_cache.get_answer_cache()) == 0
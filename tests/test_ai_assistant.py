@@ -1,6 +1,7 @@
 import re
 import pytest
 
+from app.ai_agent import answer_cache
 from app.ai_agent.simple_ai import GeminiAI, get_ai_response
 
 
@@ -8,6 +9,8 @@ from app.ai_agent.simple_ai import GeminiAI, get_ai_response
 def _no_model_init(monkeypatch):
     """Prevent heavy model initialization during tests."""
     monkeypatch.setattr(GeminiAI, "initialize", lambda self: None)
+    # Ответы из других тестов не должны попадать из кэша
+    monkeypatch.setattr(answer_cache, "_cache", answer_cache.AnswerCache())
 
 
 def test_short_or_unclear_input_returns_clarifying_message():
@@ -0,0 +1,130 @@
+"""Tests for micro-batched AI inference."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.ai_agent import answer_cache
+from app.ai_agent.batching import InferenceBatcher, InferenceOverloaded, answer_question
+from app.ai_agent.registry import ModelRegistry
+from app.ai_agent.simple_ai import GeminiAI
+
+
+class _BatchBackend:
+    """Backend whose cost grows slowly with batch size, like a padded seq2seq batch."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.batch_sizes: list[int] = []
+        self._pipe = object()
+        self._gemini_model = None
+
+    def initialize(self) -> None:
+        pass
+
+    def get_responses(self, prompts):
+        self.batch_sizes.append(len(prompts))
+        time.sleep(self.delay)
+        return [f"Ответ на: {p}" for p in prompts]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_answer_cache(monkeypatch):
+    monkeypatch.setattr(answer_cache, "_cache", answer_cache.AnswerCache())
+
+
+def _batcher(backend, **kwargs) -> InferenceBatcher:
+    return InferenceBatcher(ModelRegistry(lambda: backend), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_prompts_are_batched_in_order():
+    backend = _BatchBackend()
+    batcher = _batcher(backend, max_batch=8, window=0.01)
+    prompts = [f"вопрос {i}" for i in range(20)]
+
+    results = await asyncio.gather(*(batcher.generate(p) for p in prompts))
+
+    assert results == [f"Ответ на: {p}" for p in prompts]
+    assert sum(backend.batch_sizes) == 20
+    assert max(backend.batch_sizes) == 8
+    assert len(backend.batch_sizes) <= 4
+    assert batcher.stats()["pending"] == 0
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_limit_sheds_load():
+    backend = _BatchBackend(delay=0.05)
+    batcher = _batcher(backend, max_batch=1, window=0, max_queue=2)
+
+    results = await asyncio.gather(*(batcher.generate(str(i)) for i in range(5)), return_exceptions=True)
+
+    shed = [r for r in results if isinstance(r, InferenceOverloaded)]
+    assert len(shed) == 3
+    assert batcher.stats()["shed"] == 3
+    assert [r for r in results if isinstance(r, str)] == ["Ответ на: 0", "Ответ на: 1"]
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_answer_question_short_input_skips_model():
+    backend = _BatchBackend()
+    batcher = _batcher(backend)
+    answer = await answer_question("Что?", batcher=batcher)
+    assert "Чем могу помочь?" in answer
+    assert backend.batch_sizes == []
+
+    answer = await answer_question("Как выбрать мастера?", batcher=batcher)
+    assert answer.startswith("Ответ на:")
+    await batcher.close()
+
+
+class _RemoteBackend:
+    """Gemini-like backend: every call is a separate network request."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pipe = None
+        self._gemini_model = object()
+
+    def initialize(self) -> None:
+        pass
+
+    def get_response(self, prompt):
+        time.sleep(self.delay)
+        return f"Ответ на: {prompt}"
+
+    def get_responses(self, prompts):  # pragma: no cover - must not be used for Gemini
+        raise AssertionError("Gemini prompts must not be batched")
+
+
+@pytest.mark.asyncio
+async def test_gemini_prompts_bypass_the_batch_queue():
+    backend = _RemoteBackend(delay=0.2)
+    batcher = _batcher(backend)
+    batcher._registry().get()
+
+    started = time.perf_counter()
+    answers = await asyncio.gather(*(answer_question(f"Как выбрать мастера {i}?", batcher=batcher) for i in range(5)))
+
+    assert time.perf_counter() - started < 0.6
+    assert all(answer.startswith("Ответ на:") for answer in answers)
+    assert batcher.stats()["direct"] == 5 and batcher.stats()["batches"] == 0
+    await batcher.close()
+
+
+def test_gemini_ai_get_responses_runs_one_padded_batch(monkeypatch):
+    monkeypatch.delenv("API_GEMINI_FREE", raising=False)
+    calls = []
+
+    def fake_pipe(inputs, **kwargs):
+        calls.append((list(inputs), kwargs.get("batch_size")))
+        return [{"generated_text": f"Ответ: {text} готов."} for text in inputs]
+
+    ai = GeminiAI()
+    ai._pipe = fake_pipe
+    assert ai.get_responses(["один", "два", "три"]) == ["один готов.", "два готов.", "три готов."]
+    assert calls == [(["один", "два", "три"], 3)]
@@ -0,0 +1,78 @@
+"""Tests for the lazily imported (optionally quantized) local AI model."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from app.ai_agent import local_model
+
+
+def test_bot_import_does_not_load_transformers():
+    code = "import sys, app.bot.main; print('transformers' in sys.modules, 'torch' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "BOT_TOKEN": os.getenv("BOT_TOKEN", "123:abc")},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "False"]
+
+
+@pytest.mark.parametrize("value,expected", [(None, "none"), ("INT8", "int8"), (" bf16 ", "bf16"), ("fp4", "none")])
+def test_quantize_mode_from_env(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("AI_MODEL_QUANTIZE", raising=False)
+    else:
+        monkeypatch.setenv("AI_MODEL_QUANTIZE", value)
+    assert local_model.quantize_mode() == expected
+
+
+def _fake_modules(monkeypatch):
+    calls = {}
+
+    class _Model:
+        def eval(self):
+            calls["eval"] = True
+            return self
+
+        def to(self, dtype):
+            calls["to"] = dtype
+            return self
+
+    transformers = types.ModuleType("transformers")
+    transformers.AutoTokenizer = types.SimpleNamespace(from_pretrained=lambda name: f"tokenizer:{name}")
+    transformers.AutoModelForSeq2SeqLM = types.SimpleNamespace(from_pretrained=lambda name: _Model())
+
+    def quantize_dynamic(model, layers, dtype, inplace):
+        calls["quantize"] = (layers, dtype, inplace)
+        return model
+
+    torch = types.ModuleType("torch")
+    torch.nn = types.SimpleNamespace(Linear="Linear")
+    torch.qint8 = "qint8"
+    torch.bfloat16 = "bfloat16"
+    torch.ao = types.SimpleNamespace(quantization=types.SimpleNamespace(quantize_dynamic=quantize_dynamic))
+    monkeypatch.setitem(sys.modules, "transformers", transformers)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    return calls
+
+
+def test_load_seq2seq_int8_quantizes_linear_layers_in_place(monkeypatch):
+    calls = _fake_modules(monkeypatch)
+    tokenizer, _ = local_model.load_seq2seq("rut5", quantize="int8")
+    assert tokenizer == "tokenizer:rut5"
+    assert calls["eval"] is True
+    assert calls["quantize"] == ({"Linear"}, "qint8", True)
+    assert "to" not in calls
+
+
+def test_load_seq2seq_full_precision_by_default(monkeypatch):
+    calls = _fake_modules(monkeypatch)
+    local_model.load_seq2seq("rut5")
+    assert "quantize" not in calls and "to" not in calls
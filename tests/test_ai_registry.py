@@ -0,0 +1,90 @@
+"""Tests for the process-wide AI backend registry."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import app.ai_agent.registry as registry_module
+from app.ai_agent import answer_cache
+from app.ai_agent.registry import ModelRegistry
+from app.ai_agent.simple_ai import get_ai_response
+
+
+class _FakeBackend:
+    created = 0
+
+    def __init__(self, usable: bool = True):
+        type(self).created += 1
+        self.usable = usable
+        self._gemini_model = None
+        self._pipe = None
+        self.prompts: list[str] = []
+
+    def initialize(self) -> None:
+        time.sleep(0.01)  # имитация загрузки весов
+        if self.usable:
+            self._pipe = object()
+
+    def get_response(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return "Создайте заявку в меню и выберите мастера по отзывам."
+
+
+@pytest.fixture(autouse=True)
+def _reset_counter(monkeypatch):
+    _FakeBackend.created = 0
+    monkeypatch.setattr(answer_cache, "_cache", answer_cache.AnswerCache(similarity=0))
+
+
+def test_backend_loaded_once_for_concurrent_callers():
+    registry = ModelRegistry(_FakeBackend)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert _FakeBackend.created == 1
+    assert len({id(r) for r in results}) == 1
+    health = registry.health()
+    assert health["state"] == "ready"
+    assert health["backend"] == "hf"
+    assert health["loads"] == 1
+
+
+def test_config_change_reloads_backend(monkeypatch):
+    monkeypatch.setenv("AI_MAX_NEW_TOKENS", "60")
+    registry = ModelRegistry(_FakeBackend)
+    first = registry.get()
+    assert registry.get() is first
+
+    monkeypatch.setenv("AI_MAX_NEW_TOKENS", "120")
+    assert registry.get() is not first
+    assert registry.loads == 2
+
+
+def test_failed_load_is_retried_after_backoff():
+    registry = ModelRegistry(lambda: _FakeBackend(usable=False), retry_after=0.05)
+    assert registry.warm_up() is False
+    registry.get()
+    assert _FakeBackend.created == 1  # в пределах паузы повторной загрузки нет
+    assert registry.health()["state"] == "failed"
+
+    time.sleep(0.06)
+    registry.get()
+    assert _FakeBackend.created == 2
+
+
+def test_get_ai_response_reuses_registry_backend(monkeypatch):
+    registry = ModelRegistry(_FakeBackend)
+    monkeypatch.setattr(registry_module, "_registry", registry)
+
+    for i in range(3):
+        answer = get_ai_response(f"Как выбрать мастера для ремонта #{i}?")
+        assert "мастера" in answer
+
+    assert _FakeBackend.created == 1
+    assert len(registry.get().prompts) == 3
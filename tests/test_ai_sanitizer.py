@@ -0,0 +1,63 @@
+"""Тесты очистки ответов модели: эталонные выходы прежней реализации и потоковый режим."""
+import random
+
+import pytest
+
+from app.ai_agent.sanitizer import StreamingSanitizer, sanitize
+
+# Выходы прежней ``_sanitize_text`` из simple_ai.py на тех же входах
+GOLDEN = [
+    ("Ответ: Что? Что? Что? Что? Что?", "Что?"),
+    ("  assistant :  Мы поможем оформить заявку.  ", "Мы поможем оформить заявку."),
+    ("Bot: да да да, конечно", "да, конечно"),
+    ("Отлично!!!!! Спасибо...", "Отлично!! Спасибо.."),
+    ("Хорошо,,,, понял", "Хорошо,, понял"),
+    ("Да. Да. Да. Мастер приедет завтра.", "Да. Мастер приедет завтра."),
+    ("Мастер приедет завтра. Мастер приедет завтра.", "Мастер приедет завтра. Мастер приедет завтра."),
+    ("Что? что ?  Что?", "Что? что ? Что?"),
+    ("Нет!! Нет! Готово?!", "Нет!! Нет! Готово?!"),
+    ("Ответ: ", ""),
+    ("Ответственный мастер уже выехал.", "Ответственный мастер уже выехал."),
+    ("Assistant: Bot: привет", "Bot: привет"),
+    ("не не не знаю. не знаю", "не знаю. не знаю"),
+    ("Да. Нет. Да.", "Да. Нет. Да."),
+    ("", ""),
+]
+
+
+def _stream(text, sizes):
+    sanitizer = StreamingSanitizer()
+    out, pos = "", 0
+    for size in sizes:
+        out += sanitizer.feed(text[pos:pos + size])
+        pos += size
+    return out + sanitizer.feed(text[pos:]) + sanitizer.finish()
+
+
+@pytest.mark.parametrize("raw,expected", GOLDEN)
+def test_sanitize_matches_golden_output(raw, expected):
+    assert sanitize(raw) == expected
+
+
+@pytest.mark.parametrize("raw,expected", GOLDEN)
+def test_streaming_matches_golden_output_token_by_token(raw, expected):
+    assert _stream(raw, [1] * len(raw)) == expected
+
+
+def test_streaming_agrees_with_sanitize_on_random_chunking():
+    rng = random.Random(13)
+    atoms = ["Ответ", "Bot", ":", " ", "\n", ".", "...", "!", "?", ",,,", "да", "Да", "Что", "мастер", "?!"]
+    for _ in range(500):
+        text = "".join(rng.choice(atoms) for _ in range(rng.randint(0, 20)))
+        sizes = [rng.randint(1, 5) for _ in range(len(text))]
+        assert _stream(text, sizes) == sanitize(text), text
+
+
+def test_streaming_releases_sentence_once_its_delimiter_is_complete():
+    sanitizer = StreamingSanitizer()
+    assert sanitizer.feed("Ответ: Мастер приедет") == ""
+    assert sanitizer.feed(" завтра?") == ""  # "?" может продолжиться: "?!"
+    assert sanitizer.feed("! Что") == "Мастер приедет завтра?!"
+    assert sanitizer.feed("? Что? ") == " Что?"
+    assert sanitizer.feed("Да") == ""  # повтор "Что?" отброшен
+    assert sanitizer.finish() == " Да"
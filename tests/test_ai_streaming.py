@@ -0,0 +1,152 @@
+"""Tests for streamed AI assistant replies."""
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText
+
+from app.ai_agent import answer_cache
+from app.ai_agent.batching import InferenceBatcher, answer_question, stream_answer
+from app.ai_agent.registry import ModelRegistry
+from app.bot.streaming import StreamedReply
+
+ANSWER = "Ответ: Создайте заявку в меню. Что? Что? Мастер откликнется за час."
+
+
+class _StreamingBackend:
+    """Backend that produces the answer word by word."""
+
+    def __init__(self, text: str = ANSWER, delay: float = 0.0):
+        self.text = text
+        self.delay = delay
+        self._pipe = object()
+        self._gemini_model = None
+        self.streamed = 0
+
+    def initialize(self) -> None:
+        pass
+
+    def stream_response(self, prompt):
+        self.streamed += 1
+        for i, word in enumerate(self.text.split(" ")):
+            time.sleep(self.delay)
+            yield word if i == 0 else " " + word
+
+    def get_responses(self, prompts):
+        return [self.text for _ in prompts]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_answer_cache(monkeypatch):
+    monkeypatch.setattr(answer_cache, "_cache", answer_cache.AnswerCache())
+
+
+async def _collect(question, batcher):
+    return [text async for text in stream_answer(question, batcher=batcher)]
+
+
+@pytest.mark.asyncio
+async def test_stream_answer_grows_and_ends_with_the_batched_answer():
+    backend = _StreamingBackend()
+    batcher = InferenceBatcher(ModelRegistry(lambda: backend))
+
+    snapshots = await _collect("Как создать заказ?", batcher)
+    expected = await answer_question("Как создать новый заказ в сервисе?", batcher=batcher)
+
+    assert snapshots[-1] == expected == "Создайте заявку в меню. Что? Мастер откликнется за час."
+    assert len(snapshots) > 3
+    assert snapshots[0] == "Создайте"  # маркер "Ответ:" не показывается
+    assert backend.streamed == 1
+    assert batcher.stats()["streams"] == 1 and batcher.pending == 0
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_streamed_answer_is_cached():
+    backend = _StreamingBackend()
+    batcher = InferenceBatcher(ModelRegistry(lambda: backend))
+
+    await _collect("Как создать заказ?", batcher)
+    assert await _collect("Как создать заказ?", batcher) == ["Создайте заявку в меню. Что? Мастер откликнется за час."]
+    assert backend.streamed == 1
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_answer_uses_batched_path_under_load():
+    backend = _StreamingBackend()
+    batcher = InferenceBatcher(ModelRegistry(lambda: backend))
+    batcher._pending = 1  # кто-то уже ждёт в очереди
+
+    snapshots = await _collect("Как создать заказ?", batcher)
+
+    assert snapshots == ["Создайте заявку в меню. Что? Мастер откликнется за час."]
+    assert backend.streamed == 0
+    batcher._pending = 0
+    await batcher.close()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _message(fail_edits=None):
+    calls = {"answer": [], "edit": []}
+    fail_edits = list(fail_edits or [])
+
+    async def answer(text):
+        calls["answer"].append(text)
+        return SimpleNamespace(chat=SimpleNamespace(id=1), message_id=10)
+
+    async def edit_message_text(text, chat_id, message_id):
+        if fail_edits:
+            raise fail_edits.pop(0)
+        calls["edit"].append(text)
+
+    return SimpleNamespace(answer=answer, bot=SimpleNamespace(edit_message_text=edit_message_text)), calls
+
+
+@pytest.mark.asyncio
+async def test_streamed_reply_throttles_edits():
+    clock = _Clock()
+    message, calls = _message()
+    reply = StreamedReply(message, min_interval=1.0, clock=clock)
+
+    for i in range(1, 31):
+        await reply.update("слово " * i)
+        clock.now += 0.1  # 3 секунды генерации, 30 версий текста
+    await reply.finish("итог")
+
+    assert calls["answer"] == ["слово "]  # первое слово показано сразу
+    assert len(calls["edit"]) <= 4
+    assert calls["edit"][-1] == "итог"
+    assert reply.skipped > 20
+
+
+@pytest.mark.asyncio
+async def test_streamed_reply_finish_waits_for_retry_after():
+    clock = _Clock()
+    flood = TelegramRetryAfter(method=EditMessageText(text="x"), message="flood", retry_after=0)
+    message, calls = _message(fail_edits=[flood])
+    reply = StreamedReply(message, min_interval=0, clock=clock)
+
+    await reply.update("начало")
+    await reply.finish("итог")
+
+    assert calls["answer"] == ["начало"]
+    assert calls["edit"] == ["итог"]
+
+
+@pytest.mark.asyncio
+async def test_streamed_reply_sends_final_text_when_nothing_was_shown():
+    message, calls = _message()
+    reply = StreamedReply(message)
+    await reply.finish("Сейчас много вопросов")
+    assert calls["answer"] == ["Сейчас много вопросов"] and calls["edit"] == []
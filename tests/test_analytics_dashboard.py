@@ -0,0 +1,85 @@
+"""Тесты общего эндпоинта дашборда аналитики."""
+import asyncio
+import datetime
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from admin.app.auth import get_current_admin
+from admin.app.database import get_db, get_session_factory
+from admin.app.routers import analytics as analytics_router
+from app.models import AnalyticsDailyRollup
+
+
+@pytest.fixture
+def cache_prefix(monkeypatch):
+    prefix = f"test:dashboard:{random.randint(0, 10**9)}"
+    monkeypatch.setattr(analytics_router, "DASHBOARD_CACHE_PREFIX", prefix)
+    return prefix
+
+
+async def _seed(test_db_session, users: int) -> None:
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    async with test_db_session() as session:
+        await session.execute(delete(AnalyticsDailyRollup))
+        session.add_all([
+            AnalyticsDailyRollup(day=yesterday, metric="users_role", dimension="client", count=users, amount=0),
+            AnalyticsDailyRollup(day=yesterday, metric="orders_status", dimension="done", count=2, amount=3000),
+            AnalyticsDailyRollup(day=yesterday, metric="bids_status", dimension="selected", count=2, amount=3000),
+            AnalyticsDailyRollup(day=yesterday, metric="payouts_status", dimension="paid", count=1, amount=1000),
+        ])
+        await session.commit()
+
+
+def _client(test_db_session):
+    async def override_db():
+        async with test_db_session() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(analytics_router.router, prefix="/analytics")
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_session_factory] = lambda: test_db_session
+    app.dependency_overrides[get_current_admin] = lambda: {"username": "admin"}
+    return TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_dashboard_matches_sections_and_is_cached(test_db_session, cache_prefix):
+    await _seed(test_db_session, users=3)
+    with _client(test_db_session) as client:
+        dashboard = client.get("/analytics/api/dashboard").json()
+        assert dashboard["statistics"] == client.get("/analytics/api/statistics").json()
+        assert dashboard["order_statistics"] == client.get("/analytics/api/order-statistics").json()
+        assert dashboard["bid_statistics"] == client.get("/analytics/api/bid-statistics").json()
+        assert dashboard["payout_statistics"] == client.get("/analytics/api/payout-statistics").json()
+        assert dashboard["revenue_statistics"] == client.get("/analytics/api/revenue-statistics").json()
+        assert dashboard["user_growth"] == client.get("/analytics/api/user-growth").json()
+
+        await _seed(test_db_session, users=10)
+        # В пределах TTL отдаётся тот же ответ, другие параметры — другой ключ
+        assert client.get("/analytics/api/dashboard").json() == dashboard
+        assert client.get("/analytics/api/dashboard", params={"days": 7}).json()["statistics"]["total_users"] == 10
+
+        export = client.get("/analytics/api/export")
+    assert export.status_code == 200
+    assert "Всего пользователей:,3" in export.text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_requests_build_once(test_db_session, cache_prefix, monkeypatch):
+    calls = 0
+
+    async def slow_build(session_factory, days=30, period="month"):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"days": days, "period": period}
+
+    monkeypatch.setattr(analytics_router, "build_dashboard", slow_build)
+    results = await asyncio.gather(*(analytics_router.get_cached_dashboard(test_db_session) for _ in range(5)))
+    assert calls == 1
+    assert results == [{"days": 30, "period": "month"}] * 5
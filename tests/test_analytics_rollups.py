@@ -0,0 +1,176 @@
+"""Тесты дневных агрегатов аналитики и эндпоинтов, которые их читают."""
+import datetime
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from admin.app.auth import get_current_admin
+from admin.app.database import get_db
+from admin.app.routers import analytics as analytics_router
+from app.models import AnalyticsDailyRollup, AnalyticsDirtyDay, Bid, Order, Payout, User
+from app.services.analytics_rollups import backfill_rollups, rebuild_days, rollup_totals, run_rollups
+from app.services.assignments import select_bid
+
+
+def _past_day() -> datetime.date:
+    """Случайный день далеко в прошлом, чтобы не пересекаться с другими тестами."""
+    return datetime.date(1990, 1, 1) + datetime.timedelta(days=random.randint(0, 3000))
+
+
+async def _history(session, day: datetime.date) -> dict:
+    """Клиент, мастер, два заказа (один с выбранной ставкой) и выплата за ``day``."""
+    base = random.randint(100_000_000, 900_000_000)
+    at = datetime.datetime.combine(day, datetime.time(10, 0))
+    session.add_all([
+        User(id=base, tg_id=base, role="client", name="Client", created_at=at),
+        User(id=base + 1, tg_id=base + 1, role="master", name="Master", created_at=at),
+    ])
+    await session.flush()
+    session.add_all([
+        Order(id=base, client_id=base, master_id=base + 1, category="Сантехника", status="done", created_at=at),
+        Order(id=base + 1, client_id=base, category="Электрика", status="new", created_at=at),
+    ])
+    await session.flush()
+    session.add_all([
+        Bid(id=base, order_id=base, master_id=base + 1, price=1500, status="selected", created_at=at),
+        Bid(id=base + 1, order_id=base + 1, master_id=base + 1, price=900, status="active", created_at=at),
+        Payout(id=base, order_id=base, master_id=base + 1, amount_master=1200, amount_service=200,
+               amount_partner=100, status="paid", created_at=at),
+    ])
+    await session.commit()
+    return {"base": base}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_day_counts_and_sums(test_db_session):
+    day = _past_day()
+    async with test_db_session() as session:
+        await _history(session, day)
+        assert await rebuild_days(session, day, day) > 0
+        await session.commit()
+
+        totals = {
+            metric: await rollup_totals(session, metric, since=day, until=day)
+            for metric in ("users_role", "orders_status", "orders_category", "order_prices", "bids_status", "payouts_status")
+        }
+    assert totals["users_role"] == {"client": (1, 0), "master": (1, 0)}
+    assert totals["orders_status"] == {"done": (1, 1500), "new": (1, 0)}
+    assert totals["orders_category"] == {"Сантехника": (1, 1500), "Электрика": (1, 0)}
+    assert totals["order_prices"] == {"": (1, 1500)}
+    assert totals["bids_status"] == {"active": (1, 900), "selected": (1, 1500)}
+    assert totals["payouts_status"] == {"paid": (1, 1300)}
+
+    # Пересчёт идемпотентен
+    async with test_db_session() as session:
+        await rebuild_days(session, day, day)
+        await session.commit()
+        assert await rollup_totals(session, "orders_status", since=day, until=day) == totals["orders_status"]
+
+
+@pytest.mark.asyncio
+async def test_old_row_update_is_queued_and_picked_up(test_db_session):
+    day = _past_day()
+    async with test_db_session() as session:
+        base = (await _history(session, day))["base"]
+    await backfill_rollups(session_factory=test_db_session, since=day, until=day)
+
+    async with test_db_session() as session:
+        order = (await session.execute(select(Order).where(Order.id == base + 1))).scalar_one()
+        order.status = "cancelled"
+        await session.commit()
+        queued = (await session.execute(select(AnalyticsDirtyDay.day))).scalars().all()
+    assert day in queued
+
+    report = await run_rollups(session_factory=test_db_session, lookback_days=2, today=datetime.date(1980, 1, 2))
+    assert day in report.days
+    async with test_db_session() as session:
+        assert await rollup_totals(session, "orders_status", since=day, until=day) == {
+            "cancelled": (1, 0), "done": (1, 1500),
+        }
+        assert day not in (await session.execute(select(AnalyticsDirtyDay.day))).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_bid_selection_on_old_order_queues_bid_days(test_db_session):
+    day, bid_day = _past_day(), _past_day() + datetime.timedelta(days=4000)
+    async with test_db_session() as session:
+        base = (await _history(session, day))["base"]
+        # Вторая ставка на заказ base + 1 сделана в другой день
+        session.add(Bid(id=base + 2, order_id=base + 1, master_id=base + 1, price=700, status="active",
+                        created_at=datetime.datetime.combine(bid_day, datetime.time(9, 0))))
+        await session.commit()
+    await backfill_rollups(session_factory=test_db_session, since=day, until=bid_day)
+
+    async with test_db_session() as session:
+        await select_bid(session, base + 1, client_tg_id=base)
+        queued = (await session.execute(select(AnalyticsDirtyDay.day))).scalars().all()
+    assert {day, bid_day} <= set(queued)
+
+    await run_rollups(session_factory=test_db_session, lookback_days=2, today=datetime.date(1980, 1, 2))
+    async with test_db_session() as session:
+        assert await rollup_totals(session, "bids_status", since=day, until=day) == {"selected": (2, 2400)}
+        assert await rollup_totals(session, "bids_status", since=bid_day, until=bid_day) == {"rejected": (1, 700)}
+
+
+@pytest.mark.asyncio
+async def test_fresh_rows_are_not_queued(test_db_session):
+    async with test_db_session() as session:
+        before = len((await session.execute(select(AnalyticsDirtyDay.id))).scalars().all())
+        base = random.randint(100_000_000, 900_000_000)
+        session.add(User(id=base, tg_id=base, role="client", name="Client"))
+        await session.commit()
+        after = len((await session.execute(select(AnalyticsDirtyDay.id))).scalars().all())
+    assert after == before
+
+
+@pytest.mark.asyncio
+async def test_endpoints_read_rollups(test_db_session):
+    today = datetime.date.today()
+    yesterday, week_ago = today - datetime.timedelta(days=1), today - datetime.timedelta(days=7)
+
+    def row(day, metric, dimension, count, amount=0):
+        return AnalyticsDailyRollup(day=day, metric=metric, dimension=dimension, count=count, amount=amount)
+
+    async with test_db_session() as session:
+        await session.execute(delete(AnalyticsDailyRollup))
+        session.add_all([
+            row(week_ago, "users_role", "client", 3), row(yesterday, "users_role", "master", 2),
+            row(week_ago, "orders_status", "done", 2, 3000), row(yesterday, "orders_status", "new", 4, 0),
+            row(yesterday, "orders_status", "cancelled", 1, 500),
+            row(week_ago, "order_prices", "", 2, 3000),
+            row(yesterday, "payouts_status", "paid", 2, 2400), row(yesterday, "payouts_status", "pending", 1, 700),
+            # За пределами периода
+            row(today - datetime.timedelta(days=400), "users_role", "client", 10),
+        ])
+        await session.commit()
+
+    async def override_db():
+        async with test_db_session() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(analytics_router.router, prefix="/analytics")
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_admin] = lambda: {"username": "admin"}
+    with TestClient(app) as client:
+        stats = client.get("/analytics/api/statistics").json()
+        growth = client.get("/analytics/api/user-growth", params={"days": 30}).json()
+        orders = client.get("/analytics/api/order-statistics", params={"days": 3}).json()
+        payouts = client.get("/analytics/api/payout-statistics").json()
+        revenue = client.get("/analytics/api/revenue-statistics", params={"period": "year"}).json()
+
+    assert stats["total_users"] == 15 and stats["total_orders"] == 7 and stats["active_orders"] == 4
+    assert stats["average_order_price"] == 1500.0
+    assert stats["users_by_role"] == [{"role": "client", "count": 13}, {"role": "master", "count": 2}]
+    assert growth == [
+        {"date": week_ago.isoformat(), "count": 3}, {"date": yesterday.isoformat(), "count": 2},
+    ]
+    assert orders["daily_orders"] == [{"date": yesterday.isoformat(), "count": 5}]
+    assert {s["status"]: s["count"] for s in orders["status_statistics"]} == {"cancelled": 1, "done": 2, "new": 4}
+    assert payouts["amount_statistics"] == [{"date": yesterday.isoformat(), "amount": 3100.0}]
+    # Отменённые заказы не выручка, неоплаченные выплаты не расходы
+    assert revenue["total_revenue"] == 3000 and revenue["total_expenses"] == 2400 and revenue["total_profit"] == 600
+    assert all(item["date"].endswith("-01") for item in revenue["revenue_data"])
@@ -0,0 +1,97 @@
+"""Тесты фонового прогрева подсистем при старте бота."""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai_agent import answer_cache
+from app.bot import startup as startup_module
+from app.bot.handlers import ai_assistant
+from app.bot.startup import StartupOrchestrator
+
+
+@pytest.mark.asyncio
+async def test_start_does_not_wait_for_warm_up():
+    release = threading.Event()
+    orchestrator = StartupOrchestrator()
+    orchestrator.add("ai", lambda: release.wait(5))
+
+    orchestrator.start()
+    await asyncio.sleep(0.01)
+    assert orchestrator.is_warming("ai")
+    assert orchestrator.readiness()["ai"]["state"] == "warming"
+
+    release.set()
+    assert await orchestrator.wait("ai", timeout=5) == "ready"
+    assert not orchestrator.is_warming("ai")
+    assert orchestrator.readiness()["ai"]["seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_failures_are_reported_per_subsystem():
+    async def broken_db():
+        raise ConnectionError("db is down")
+
+    orchestrator = StartupOrchestrator()
+    orchestrator.add("db", broken_db)
+    orchestrator.add("ai", lambda: False)  # warm_up() модели вернул "не готова"
+    orchestrator.add("commands", lambda: None)
+    orchestrator.start()
+    for name in ("db", "ai", "commands"):
+        await orchestrator.wait(name)
+
+    readiness = orchestrator.readiness()
+    assert readiness["db"]["state"] == "failed" and "db is down" in readiness["db"]["error"]
+    assert readiness["ai"]["state"] == "failed"
+    assert readiness["commands"]["state"] == "ready"
+    assert not orchestrator.is_warming("unknown")
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_pending_warm_up():
+    async def slow():
+        await asyncio.sleep(10)
+
+    orchestrator = StartupOrchestrator()
+    orchestrator.add("slow", slow)
+    orchestrator.start()
+    await asyncio.sleep(0)
+    await orchestrator.stop()
+    readiness = orchestrator.readiness()["slow"]
+    assert readiness["state"] == "failed" and readiness["error"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_ai_query_answers_warming_up_while_model_loads(monkeypatch):
+    release = threading.Event()
+    orchestrator = StartupOrchestrator()
+    orchestrator.add("ai", lambda: release.wait(5))
+    monkeypatch.setattr(startup_module, "_startup", orchestrator)
+    monkeypatch.setattr(answer_cache, "_cache", answer_cache.AnswerCache())
+    answer_cache._cache.put("Как выбрать мастера?", "По рейтингу и отзывам.")
+
+    async def fail_stream(*args, **kwargs):
+        raise AssertionError("модель не должна вызываться во время прогрева")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(ai_assistant, "stream_answer", fail_stream)
+    monkeypatch.setattr(ai_assistant, "ai_users", {42})
+    answers = []
+
+    async def answer(text):
+        answers.append(text)
+
+    def message(text):
+        return SimpleNamespace(text=text, from_user=SimpleNamespace(id=42), answer=answer)
+
+    orchestrator.start()
+    await ai_assistant.ai_assistant_query(message("Расскажите про оплату заказа"))
+    await ai_assistant.ai_assistant_query(message("Как выбрать мастера?"))
+    await ai_assistant.ai_assistant_query(message("Что?"))
+
+    assert answers[0] == ai_assistant.AI_WARMING_UP_TEXT
+    assert answers[1] == "По рейтингу и отзывам."  # из кэша ответов, без модели
+    assert "Чем могу помочь?" in answers[2]
+    release.set()
+    await orchestrator.wait("ai")
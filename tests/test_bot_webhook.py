@@ -0,0 +1,127 @@
+"""Тесты приёма апдейтов через вебхук и их распределения по процессам."""
+import asyncio
+import json
+import os
+import random
+from collections import defaultdict
+
+from fastapi.testclient import TestClient
+
+from app.bot.webhook import SECRET_HEADER, WorkerPool, create_webhook_app, partition, update_partition_key
+
+
+def _message_update(update_id, chat_id, text, user_id=None):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "group"},
+            "from": {"id": user_id or abs(chat_id), "is_bot": False, "first_name": "u"},
+            "text": text,
+        },
+    }
+
+
+def record_worker_setup(workers: int = 1):
+    """Dispatcher процесса-обработчика для теста: пишет обработанные апдейты в файл."""
+    from aiogram import Bot, Dispatcher
+
+    dp = Dispatcher()
+    log_path = os.environ["WEBHOOK_TEST_LOG"]
+
+    @dp.message()
+    async def record(message) -> None:
+        # Случайная задержка: без упорядочивания апдейты чата перемешались бы
+        await asyncio.sleep(random.random() * 0.01)
+        with open(log_path, "a") as log:
+            log.write(f"{message.chat.id} {message.text} {os.getpid()} {workers}\n")
+
+    return Bot("123:abc"), dp
+
+
+def test_partition_key_by_chat_or_user():
+    assert update_partition_key(_message_update(1, -100, "hi", user_id=7)) == -100
+    callback = {"update_id": 2, "callback_query": {"id": "q", "from": {"id": 7}, "message": {"chat": {"id": 7}}}}
+    assert update_partition_key(callback) == 7
+    inline = {"update_id": 3, "inline_query": {"id": "q", "from": {"id": 9}, "query": ""}}
+    assert update_partition_key(inline) == 9
+    assert update_partition_key({"update_id": 4, "poll": {"id": "p"}}) == 4
+    assert partition(-100, 3) == partition(-100, 3) in range(3)
+
+
+class _FakePool:
+    def __init__(self, accept=True):
+        self.accept = accept
+        self.submitted = []
+        self.started = self.stopped = False
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.stopped = True
+
+    def submit(self, key, raw):
+        self.submitted.append((key, json.loads(raw)["update_id"]))
+        return self.accept
+
+    def stats(self):
+        return {"accepted": len(self.submitted)}
+
+
+def test_webhook_checks_secret_and_applies_back_pressure():
+    pool = _FakePool()
+    app = create_webhook_app(pool, path="/hook", secret="s3cret")
+    with TestClient(app) as client:
+        assert pool.started
+        update = _message_update(1, 42, "hi")
+        assert client.post("/hook", json=update).status_code == 403
+        assert client.post("/hook", json=update, headers={SECRET_HEADER: "s3cret"}).json() == {"ok": True}
+        assert client.post("/hook", content=b"{", headers={SECRET_HEADER: "s3cret"}).status_code == 400
+
+        pool.accept = False
+        response = client.post("/hook", json=_message_update(2, 42, "hi"), headers={SECRET_HEADER: "s3cret"})
+        assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+        assert client.get("/health").json() == {"accepted": 2}
+    assert pool.stopped
+    assert pool.submitted == [(42, 1), (42, 2)]
+
+
+def test_worker_pool_keeps_chat_order_and_affinity(tmp_path, monkeypatch):
+    log_path = tmp_path / "handled.log"
+    monkeypatch.setenv("WEBHOOK_TEST_LOG", str(log_path))
+    pool = WorkerPool(2, queue_size=100, setup="tests.test_bot_webhook:record_worker_setup")
+    pool.start()
+    try:
+        update_id = 0
+        for seq in range(10):
+            for chat_id in (101, 102, 103, -200):
+                update_id += 1
+                raw = json.dumps(_message_update(update_id, chat_id, str(seq))).encode()
+                assert pool.submit(chat_id, raw)
+    finally:
+        pool.stop(timeout=60)
+
+    handled = defaultdict(list)
+    pids = defaultdict(set)
+    for line in log_path.read_text().splitlines():
+        chat_id, seq, pid, workers = line.split()
+        assert workers == "2"
+        handled[int(chat_id)].append(int(seq))
+        pids[int(chat_id)].add(pid)
+    assert {chat: seqs for chat, seqs in handled.items()} == {chat: list(range(10)) for chat in (101, 102, 103, -200)}
+    assert all(len(p) == 1 for p in pids.values())
+    assert len(set().union(*pids.values())) == 2  # оба процесса работали
+    assert pool.stats()["accepted_per_worker"] == [20, 20]
+
+
+def test_worker_pool_rejects_when_queue_is_full():
+    pool = WorkerPool(1, queue_size=1)
+    # Процесс не запускаем: очередь никто не разбирает
+    pool._queues = [pool._context.Queue(maxsize=1)]
+    pool._processes = [type("Alive", (), {"is_alive": lambda self: True})()]
+    raw = json.dumps(_message_update(1, 5, "x")).encode()
+    assert pool.submit(5, raw) is True
+    assert pool.submit(5, raw) is False
+    assert pool.stats()["rejected"] == 1
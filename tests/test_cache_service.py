@@ -6,7 +6,7 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from core.cache_service import MasterCategoriesCache
+from core.cache_service import CategoryIndex, MasterCategoriesCache
 
 
 class TestMasterCategoriesCache:
@@ -253,3 +253,94 @@ class TestCacheIntegration:
             # Это должно быть медленнее, но мы просто проверяем None
             result = await cache_service.get_master_categories(master_id)
             assert result is None
+
+
+class TestCategoryIndex:
+    """Тесты индекса категорий мастеров"""
+
+    def test_incremental_update(self):
+        index = CategoryIndex()
+        index.load([(1, "Электрика"), (1, "Сантехника"), (2, "Электрика")], version=5)
+
+        assert index.masters_for("Электрика") == {1, 2}
+        assert sorted(index.categories_of(1)) == ["Сантехника", "Электрика"]
+
+        index.update_master(1, ["Клининг"])
+        assert index.masters_for("Электрика") == {2}
+        assert index.masters_for("Сантехника") == set()
+        assert index.masters_for("Клининг") == {1}
+
+        index.remove_master(2)
+        assert index.masters_for("Электрика") == set()
+        assert index.categories_of(2) == []
+        assert index.version == 5
+
+    def test_bounded_index_becomes_incomplete(self):
+        index = CategoryIndex(max_masters=2)
+        index.load([(1, "Электрика"), (2, "Электрика")], version=0)
+        assert index.complete is True
+
+        index.update_master(3, ["Электрика"])  # вытесняет мастера 1
+        assert len(index) == 2
+        assert index.complete is False
+        assert index.masters_for("Электрика") is None
+        assert index.categories_of(1) is None
+        assert index.categories_of(3) == ["Электрика"]
+
+    @pytest.mark.asyncio
+    async def test_versioned_reload_across_processes(self, monkeypatch):
+        from core import redis as cache
+
+        monkeypatch.setattr(cache, "redis", cache.TieredCache(cache.MemoryCache()))
+        rows = [(1, "Электрика"), (2, "Сантехника")]
+
+        class FakeResult:
+            def tuples(self):
+                return list(rows)
+
+        session = AsyncMock()
+        session.execute.return_value = FakeResult()
+
+        bot = MasterCategoriesCache()
+        admin = MasterCategoriesCache()
+        bot.INDEX_CHECK_INTERVAL = admin.INDEX_CHECK_INTERVAL = 0
+
+        assert (await bot.get_category_index(session)).masters_for("Электрика") == {1}
+        assert session.execute.await_count == 1
+
+        # Свои изменения применяются инкрементально, без перестройки
+        await bot.update_master_categories(2, ["Электрика"])
+        rows[:] = [(1, "Электрика"), (2, "Электрика")]
+        assert (await bot.get_category_index(session)).masters_for("Электрика") == {1, 2}
+        assert session.execute.await_count == 1
+
+        # Изменение из другого процесса меняет версию — индекс перестраивается
+        await admin.update_master_categories(1, [])
+        rows[:] = [(2, "Электрика")]
+        assert (await bot.get_category_index(session)).masters_for("Электрика") == {2}
+        assert session.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_masters_for_category_needs_shared_cache(self, monkeypatch):
+        from core import redis as cache
+
+        monkeypatch.setattr(cache, "redis", cache.TieredCache(cache.MemoryCache()))
+        rows = [(1, "Электрика"), (2, "Электрика"), (3, "Сантехника")]
+
+        class FakeResult:
+            def tuples(self):
+                return list(rows)
+
+        session = AsyncMock()
+        session.execute.return_value = FakeResult()
+        service = MasterCategoriesCache()
+
+        # Без REDIS_URL чужие изменения не видны — категорию проверяет БД
+        assert await service.masters_for_category(session, "Электрика") is None
+        assert session.execute.await_count == 0
+
+        monkeypatch.setattr("core.cache_service.is_shared", lambda: True)
+        assert await service.masters_for_category(session, "Электрика") == {1, 2}
+        service.MAX_FILTER_MASTERS = 1
+        assert await service.masters_for_category(session, "Электрика") is None
+        assert await service.masters_for_category(session, "Сантехника") == {3}
@@ -0,0 +1,221 @@
+"""Тесты архива истории чатов и чтения истории из БД и архива."""
+import datetime
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from admin.app.auth import get_current_admin
+from admin.app.routers import chats as chats_router
+from app.models import ChatMessage, ChatSession, Order, User
+from app.services.chat_archive import (
+    ChatArchive,
+    archive_closed_sessions,
+    ensure_chat_partitions,
+    load_chat_history,
+    months_between,
+)
+from core.db import get_session
+
+NOW = datetime.datetime(2026, 6, 15, 12, 0)
+
+
+def _message(message_id, session_id, created_at, text):
+    return {
+        "id": message_id, "session_id": session_id, "sender_id": 1, "receiver_id": 2,
+        "message_type": "text", "content_text": text, "file_id": None, "created_at": created_at.isoformat(),
+    }
+
+
+async def _chat(test_db_session, *, closed_at=None, messages=()):
+    """Чат со случайными id и сообщениями ``(created_at, text)``."""
+    base = random.randint(100_000_000, 900_000_000)
+    async with test_db_session() as session:
+        session.add_all([
+            User(id=base, tg_id=base, role="client", name="Client"),
+            User(id=base + 1, tg_id=base + 1, role="master", name="Master"),
+        ])
+        await session.flush()
+        session.add(Order(id=base, client_id=base, master_id=base + 1, category="Тест", status="assigned"))
+        await session.flush()
+        started_at = messages[0][0] if messages else NOW
+        session.add(ChatSession(
+            id=base, order_id=base, client_id=base, master_id=base + 1,
+            status="closed" if closed_at else "active", started_at=started_at, closed_at=closed_at,
+            last_activity_at=closed_at or NOW,
+        ))
+        await session.flush()
+        for created_at, text in messages:
+            session.add(ChatMessage(
+                session_id=base, sender_id=base, receiver_id=base + 1, message_type="text",
+                content_text=text, created_at=created_at,
+            ))
+        await session.commit()
+    return base
+
+
+def test_archive_frames_are_per_session(tmp_path):
+    archive = ChatArchive(tmp_path, compression="gzip")
+    may, june = datetime.date(2026, 5, 1), datetime.date(2026, 6, 1)
+    archive.write_session(may, 1, [_message(1, 1, NOW, "a"), _message(3, 1, NOW, "c")])
+    archive.write_session(may, 2, [_message(2, 2, NOW, "b")])
+    archive.write_session(june, 1, [_message(4, 1, NOW, "д")])
+
+    assert [m["content_text"] for m in archive.read_session(1, [may, june])] == ["a", "c", "д"]
+    assert [m["id"] for m in archive.read_session(2, [may, june])] == [2]
+    assert archive.read_session(1, [datetime.date(2026, 7, 1)]) == []
+    assert archive.months() == [may, june]
+    assert sorted(p.name for p in tmp_path.iterdir())[0] == "chat_messages-2026-05.index.jsonl"
+
+
+def test_zstd_archive_reads_gzip_files(tmp_path):
+    pytest.importorskip("zstandard")
+    month = datetime.date(2026, 5, 1)
+    ChatArchive(tmp_path, compression="gzip").write_session(month, 1, [_message(1, 1, NOW, "gzip")])
+    archive = ChatArchive(tmp_path, compression="zstd")
+    archive.write_session(month, 1, [_message(2, 1, NOW, "zstd")])
+    assert [m["content_text"] for m in archive.read_session(1, [month])] == ["gzip", "zstd"]
+
+
+def test_months_between_crosses_year():
+    assert months_between(datetime.datetime(2025, 11, 30), datetime.date(2026, 2, 1)) == [
+        datetime.date(2025, 11, 1), datetime.date(2025, 12, 1), datetime.date(2026, 1, 1), datetime.date(2026, 2, 1),
+    ]
+
+
+class _FakePostgres:
+    """Записывает SQL; в DEFAULT-секции лежат строки июля, секции июля нет."""
+
+    class _Result:
+        def __init__(self, value=None):
+            self.value, self.rowcount = value, 3
+
+        def scalar(self):
+            return self.value
+
+        def first(self):
+            return self.value
+
+    class _Savepoint:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    def __init__(self, fail_on=None):
+        self.sql, self.fail_on = [], fail_on
+
+    def get_bind(self):
+        return type("Bind", (), {"dialect": type("Dialect", (), {"name": "postgresql"})})()
+
+    def begin_nested(self):
+        return self._Savepoint()
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.sql.append(sql)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("boom")
+        if sql.startswith("SELECT to_regclass"):
+            return self._Result("chat_messages_default" if params["name"] == "chat_messages_default" else None)
+        if sql.startswith("SELECT 1 FROM chat_messages_default"):
+            return self._Result((1,) if params["start"] == datetime.date(2026, 7, 1) else None)
+        return self._Result()
+
+
+@pytest.mark.asyncio
+async def test_partition_of_month_in_default_moves_its_rows():
+    db = _FakePostgres()
+    created = await ensure_chat_partitions(db, months_ahead=1, now=NOW)
+    assert created == ["chat_messages_y2026m06", "chat_messages_y2026m07"]
+    ddl = [sql.split(" FOR VALUES")[0].split(" WHERE")[0] for sql in db.sql if not sql.startswith("SELECT")]
+    assert ddl == [
+        "CREATE TABLE chat_messages_y2026m06 PARTITION OF chat_messages",
+        "ALTER TABLE chat_messages DETACH PARTITION chat_messages_default",
+        "CREATE TABLE chat_messages_y2026m07 PARTITION OF chat_messages",
+        "INSERT INTO chat_messages (id, session_id, sender_id, receiver_id, message_type, content_text, file_id, "
+        "created_at) SELECT id, session_id, sender_id, receiver_id, message_type, content_text, file_id, "
+        "created_at FROM chat_messages_default",
+        "DELETE FROM chat_messages_default",
+        "ALTER TABLE chat_messages ATTACH PARTITION chat_messages_default DEFAULT",
+    ]
+
+    # Сбой одного месяца не обрывает задачу: месяц пропускается с предупреждением
+    failing = _FakePostgres(fail_on="DETACH PARTITION")
+    assert await ensure_chat_partitions(failing, months_ahead=2, now=NOW) == [
+        "chat_messages_y2026m06", "chat_messages_y2026m08",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_archival_moves_old_closed_chats_and_history_merges(tmp_path, test_db_session):
+    old = await _chat(test_db_session, closed_at=NOW - datetime.timedelta(days=100), messages=[
+        (datetime.datetime(2026, 1, 31, 23, 59), "январь"),
+        (datetime.datetime(2026, 2, 1, 0, 1), "февраль"),
+        (datetime.datetime(2026, 2, 2, 10, 0), "ещё февраль"),
+    ])
+    recent = await _chat(test_db_session, closed_at=NOW - datetime.timedelta(days=10), messages=[
+        (NOW - datetime.timedelta(days=11), "недавний"),
+    ])
+    archive = ChatArchive(tmp_path, compression="gzip")
+
+    report = await archive_closed_sessions(
+        archive=archive, session_factory=test_db_session, older_than_days=90, now=NOW,
+    )
+    assert report.sessions >= 1 and report.messages >= 3
+    assert report.created_partitions == [] and report.dropped_partitions == []  # SQLite: без секций
+
+    async with test_db_session() as session:
+        hot = (await session.execute(
+            select(ChatMessage.session_id).where(ChatMessage.session_id.in_([old, recent]))
+        )).scalars().all()
+        archived_at = dict((await session.execute(
+            select(ChatSession.id, ChatSession.archived_at).where(ChatSession.id.in_([old, recent]))
+        )).all())
+    assert hot == [recent]
+    assert archived_at == {old: NOW, recent: None}
+    assert archive.months() == [datetime.date(2026, 1, 1), datetime.date(2026, 2, 1)]
+
+    async with test_db_session() as session:
+        # Сбой после записи архива, но до удаления строк: сообщение и там, и там
+        session.add(ChatMessage(
+            id=archive.read_session(old, archive.months())[0]["id"], session_id=old, sender_id=old,
+            receiver_id=old + 1, message_type="text", content_text="январь",
+            created_at=datetime.datetime(2026, 1, 31, 23, 59),
+        ))
+        await session.commit()
+        history = await load_chat_history(session, old, archive=archive)
+        assert [m["content_text"] for m in history] == ["январь", "февраль", "ещё февраль"]
+        assert [m["archived"] for m in history] == [False, True, True]
+
+        recent_history = await load_chat_history(session, recent, archive=archive)
+        assert [(m["content_text"], m["archived"]) for m in recent_history] == [("недавний", False)]
+        assert await load_chat_history(session, -1, archive=archive) is None
+
+
+@pytest.mark.asyncio
+async def test_admin_chat_history_endpoint(tmp_path, test_db_session, monkeypatch):
+    chat_id = await _chat(test_db_session, closed_at=NOW - datetime.timedelta(days=100), messages=[
+        (datetime.datetime(2026, 3, 1, 9, 0), "архивное"),
+    ])
+    archive = ChatArchive(tmp_path, compression="gzip")
+    await archive_closed_sessions(archive=archive, session_factory=test_db_session, older_than_days=90, now=NOW)
+    monkeypatch.setattr(chats_router, "get_chat_archive", lambda: archive)
+
+    async def override_session():
+        async with test_db_session() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(chats_router.router, prefix="/chats")
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_admin] = lambda: {"username": "admin"}
+    with TestClient(app) as client:
+        body = client.get(f"/chats/api/{chat_id}/messages").json()
+        assert client.get("/chats/api/-1/messages").status_code == 404
+
+    assert body["archived"] is True
+    assert [(m["content_text"], m["archived"]) for m in body["messages"]] == [("архивное", True)]
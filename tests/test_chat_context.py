@@ -0,0 +1,136 @@
+"""Тесты кэша контекста чата и пересылки сообщений без запросов к БД."""
+import datetime
+import random
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from app.bot.handlers import chat as chat_handlers
+from app.models import ChatSession, Order, User
+from app.services import chat_context
+from app.services.chat_context import ChatContext, ChatContextCache, invalidate_chat, load_chat_context
+
+
+async def _open_chat(test_db_session, status="active"):
+    base = random.randint(100_000_000, 900_000_000)
+    async with test_db_session() as session:
+        session.add_all([
+            User(id=base, tg_id=base + 10, role="client", name="Client"),
+            User(id=base + 1, tg_id=base + 11, role="master", name="Master"),
+        ])
+        await session.flush()
+        session.add(Order(id=base, client_id=base, master_id=base + 1, category="Тест", status="assigned"))
+        await session.flush()
+        session.add(ChatSession(
+            id=base, order_id=base, client_id=base, master_id=base + 1, status=status,
+            last_activity_at=datetime.datetime.utcnow(),
+        ))
+        await session.commit()
+    return base
+
+
+class _Relay:
+    """Сообщение, состояние FSM и журнал для вызова ``relay_to_peer`` без Telegram."""
+
+    def __init__(self, session_id, sender_tg_id):
+        self.sent, self.answers, self.recorded = [], [], []
+        self.cleared = False
+        self.data = {"chat_session_id": session_id, "order_id": session_id}
+
+        async def send_message(chat_id, text):
+            self.sent.append((chat_id, text))
+
+        async def answer(text, **kwargs):
+            self.answers.append(text)
+
+        async def get_data():
+            return self.data
+
+        async def clear():
+            self.cleared = True
+
+        self.message = SimpleNamespace(
+            text="Привет", from_user=SimpleNamespace(id=sender_tg_id),
+            bot=SimpleNamespace(send_message=send_message), answer=answer,
+        )
+        self.state = SimpleNamespace(get_data=get_data, clear=clear)
+        self.journal = SimpleNamespace(record=lambda **kw: self.recorded.append(kw))
+
+    async def __call__(self):
+        await chat_handlers.relay_to_peer(self.message, self.state, role="client")
+
+
+@pytest.fixture
+def statements(test_engine, test_db_session, monkeypatch):
+    """SQL-запросы к тестовой БД; кэш контекста чата свой на каждый тест."""
+    executed = []
+
+    def on_execute(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    monkeypatch.setattr(chat_context, "SessionFactory", test_db_session)
+    monkeypatch.setattr(chat_context, "_chat_cache", ChatContextCache())
+    event.listen(test_engine.sync_engine, "before_cursor_execute", on_execute)
+    yield executed
+    event.remove(test_engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+def test_participants_by_sender():
+    context = ChatContext(
+        session_id=1, order_id=2, status="active", client_id=10, client_tg_id=100, master_id=20, master_tg_id=200,
+    )
+    assert context.participants(100).receiver_tg_id == 200
+    assert (context.participants(200).sender_id, context.participants(200).receiver_id) == (20, 10)
+    assert context.participants(300) is None
+
+
+@pytest.mark.asyncio
+async def test_load_uses_one_query_then_cache(test_db_session, statements):
+    session_id = await _open_chat(test_db_session)
+    statements.clear()
+
+    context = await load_chat_context(session_id)
+    assert (context.client_tg_id, context.master_tg_id, context.status) == (session_id + 10, session_id + 11, "active")
+    assert len(statements) == 1
+    assert await load_chat_context(session_id) is context
+    assert len(statements) == 1
+    assert await load_chat_context(-1) is None
+
+
+@pytest.mark.asyncio
+async def test_steady_state_relay_runs_no_queries(test_db_session, statements, monkeypatch):
+    session_id = await _open_chat(test_db_session)
+    relay = _Relay(session_id, sender_tg_id=session_id + 11)  # пишет мастер
+    monkeypatch.setattr(chat_handlers, "get_chat_journal", lambda: relay.journal)
+    statements.clear()
+
+    await relay()  # первое сообщение после рестарта: контекст из БД
+    assert len(statements) == 1
+    for _ in range(5):
+        await relay()
+    assert len(statements) == 1
+
+    assert relay.sent == [(session_id + 10, "Привет")] * 6
+    assert relay.recorded[0] == {
+        "session_id": session_id, "sender_id": session_id + 1, "receiver_id": session_id,
+        "message_type": "text", "content_text": "Привет", "file_id": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_relay_stops_after_chat_is_closed(test_db_session, statements, monkeypatch):
+    session_id = await _open_chat(test_db_session)
+    relay = _Relay(session_id, sender_tg_id=session_id + 10)
+    monkeypatch.setattr(chat_handlers, "get_chat_journal", lambda: relay.journal)
+    await relay()
+    assert len(relay.sent) == 1
+
+    async with test_db_session() as session:
+        (await session.get(ChatSession, session_id)).status = "closed"
+        await session.commit()
+    invalidate_chat(session_id)  # как в close_chat
+    await relay()
+
+    assert len(relay.sent) == 1 and len(relay.recorded) == 1
+    assert relay.answers[-1] == "Чат закрыт." and relay.cleared
@@ -0,0 +1,150 @@
+"""Тесты отложенной пакетной записи сообщений чата."""
+import asyncio
+import datetime
+import random
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.models import ChatMessage, ChatSession, Order, User
+from app.services.chat_journal import ChatJournal
+
+
+async def _chat(test_db_session):
+    """Клиент, мастер, заказ и активная сессия чата со случайными id."""
+    base = random.randint(100_000_000, 900_000_000)
+    async with test_db_session() as session:
+        session.add_all([
+            User(id=base, tg_id=base, role="client", name="Client"),
+            User(id=base + 1, tg_id=base + 1, role="master", name="Master"),
+        ])
+        await session.flush()
+        session.add(Order(id=base, client_id=base, master_id=base + 1, category="Тест", status="assigned"))
+        await session.flush()
+        session.add(ChatSession(
+            id=base, order_id=base, client_id=base, master_id=base + 1, status="active",
+            last_activity_at=datetime.datetime(2020, 1, 1),
+        ))
+        await session.commit()
+    return base
+
+
+async def _messages(test_db_session, session_id):
+    async with test_db_session() as session:
+        return (await session.execute(
+            select(ChatMessage).where(ChatMessage.session_id == session_id).order_by(ChatMessage.id)
+        )).scalars().all()
+
+
+async def _last_activity(test_db_session, session_id):
+    async with test_db_session() as session:
+        return (await session.execute(
+            select(ChatSession.last_activity_at).where(ChatSession.id == session_id)
+        )).scalar_one()
+
+
+class FlakySessionFactory:
+    """Первые ``failures`` сессий падают при записи, как при недоступной БД."""
+
+    def __init__(self, factory, failures):
+        self.factory = factory
+        self.failures = failures
+
+    def __call__(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise OperationalError("INSERT", {}, ConnectionError("db is down"))
+        return self.factory()
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full(test_db_session):
+    chat_id = await _chat(test_db_session)
+    journal = ChatJournal(test_db_session, batch_size=3, flush_interval=60)
+    now = datetime.datetime.utcnow()
+    for i in range(3):
+        journal.record(chat_id, chat_id, chat_id + 1, "text", content_text=str(i),
+                       created_at=now + datetime.timedelta(seconds=i))
+    assert journal.pending == 3  # record() не ждёт БД
+
+    for _ in range(100):
+        if journal.stats.flushed == 3:
+            break
+        await asyncio.sleep(0.01)
+    rows = await _messages(test_db_session, chat_id)
+    assert [m.content_text for m in rows] == ["0", "1", "2"]
+    assert journal.stats.flushes == 1
+    assert await _last_activity(test_db_session, chat_id) == now + datetime.timedelta(seconds=2)
+    await journal.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_timer(test_db_session):
+    chat_id = await _chat(test_db_session)
+    journal = ChatJournal(test_db_session, batch_size=100, flush_interval=0.05)
+    journal.record(chat_id, chat_id + 1, chat_id, "photo", file_id="file-1")
+
+    await asyncio.sleep(0.3)
+    rows = await _messages(test_db_session, chat_id)
+    assert [(m.message_type, m.file_id, m.sender_id) for m in rows] == [("photo", "file-1", chat_id + 1)]
+    await journal.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows_and_close_writes_them(test_db_session):
+    chat_id = await _chat(test_db_session)
+    journal = ChatJournal(FlakySessionFactory(test_db_session, failures=1), batch_size=100, flush_interval=60)
+    journal.record(chat_id, chat_id, chat_id + 1, "text", content_text="a")
+    with pytest.raises(OperationalError):
+        await journal.flush()
+    assert journal.pending == 1 and journal.stats.failed_flushes == 1
+
+    journal.record(chat_id, chat_id + 1, chat_id, "text", content_text="b")
+    await journal.close()
+    assert [m.content_text for m in await _messages(test_db_session, chat_id)] == ["a", "b"]
+    assert journal.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_row_does_not_block_batch(test_db_session):
+    chat_id = await _chat(test_db_session)
+    journal = ChatJournal(test_db_session, batch_size=100, flush_interval=60)
+    journal.record(chat_id, chat_id, chat_id + 1, "text", content_text="ok-1")
+    journal.record(chat_id, None, chat_id + 1, "text", content_text="broken")  # sender_id NOT NULL
+    journal.record(chat_id, chat_id, chat_id + 1, "text", content_text="ok-2")
+
+    assert await journal.flush() == 2
+    assert [m.content_text for m in await _messages(test_db_session, chat_id)] == ["ok-1", "ok-2"]
+    assert journal.stats.dropped == 1
+    await journal.close()
+
+
+@pytest.mark.asyncio
+async def test_db_failure_during_row_retry_requeues_unwritten_rows(test_db_session):
+    chat_id = await _chat(test_db_session)
+    # Пакет падает на «битой» строке, затем первая строка пишется, а на второй пропадает БД
+    factory = FlakySessionFactory(test_db_session, failures=0)
+    journal = ChatJournal(factory, batch_size=100, flush_interval=60)
+    journal.record(chat_id, chat_id, chat_id + 1, "text", content_text="ok-1")
+    journal.record(chat_id, None, chat_id + 1, "text", content_text="broken")  # sender_id NOT NULL
+    journal.record(chat_id, chat_id, chat_id + 1, "text", content_text="ok-2")
+
+    write = journal._write
+
+    async def write_then_fail(rows, activity):
+        written = await write(rows, activity)
+        if len(rows) == 1 and rows[0]["content_text"] == "ok-1":
+            factory.failures = 1  # следующая сессия (строка "broken") не откроется
+        return written
+
+    journal._write = write_then_fail
+    with pytest.raises(OperationalError):
+        await journal.flush()
+    assert journal.pending == 2 and journal.stats.failed_flushes == 1
+    assert journal.stats.flushed == 1
+
+    journal._write = write
+    await journal.close()
+    assert [m.content_text for m in await _messages(test_db_session, chat_id)] == ["ok-1", "ok-2"]
+    assert journal.pending == 0 and journal.stats.dropped == 1
@@ -0,0 +1,97 @@
+"""Тесты потоковой выгрузки сырых данных."""
+import csv
+import datetime
+import gzip
+import io
+import json
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from admin.app.auth import get_current_admin
+from admin.app.database import get_session_factory
+from admin.app.routers import exports as exports_router
+from app.models import ChatMessage, ChatSession, Order, User
+from app.services.exports import DATASETS, stream_export
+
+DAY = datetime.datetime(1995, 3, 1, 12, 0)
+PERIOD = {"since": "1995-03-01T00:00:00", "until": "1995-03-02T00:00:00"}
+
+
+async def _seed(test_db_session, orders: int = 5) -> int:
+    """Клиент, мастер, заказы, чат с сообщениями за DAY."""
+    base = random.randint(100_000_000, 900_000_000)
+    async with test_db_session() as session:
+        session.add_all([
+            User(id=base, tg_id=base, role="client", name="Client"),
+            User(id=base + 1, tg_id=base + 1, role="master", name="Master"),
+        ])
+        await session.flush()
+        session.add_all([
+            Order(id=base + n, client_id=base, category="Сантехника", status="new",
+                  description=f"Кран, \"срочно\"\n#{n}", created_at=DAY + datetime.timedelta(minutes=n))
+            for n in range(orders)
+        ])
+        await session.flush()
+        session.add(ChatSession(id=base, order_id=base, client_id=base, master_id=base + 1, status="active"))
+        await session.flush()
+        session.add_all([
+            ChatMessage(session_id=base, sender_id=base, receiver_id=base + 1, message_type="text",
+                        content_text=text, created_at=DAY)
+            for text in ("Здравствуйте", "Когда придёте?")
+        ])
+        await session.commit()
+    return base
+
+
+def _client(test_db_session):
+    app = FastAPI()
+    app.include_router(exports_router.router, prefix="/exports")
+    app.dependency_overrides[get_session_factory] = lambda: test_db_session
+    app.dependency_overrides[get_current_admin] = lambda: {"username": "admin"}
+    return TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_stream_export_yields_chunks(test_db_session):
+    base = await _seed(test_db_session, orders=7)
+    spec = DATASETS["orders"]
+    query = spec.query(filters=[Order.id.between(base, base + 6)])
+    chunks = [chunk async for chunk in stream_export(test_db_session, query, spec.header, chunk_rows=3)]
+    # Заголовок + три порции по 3, 3 и 1 строке
+    assert len(chunks) == 4
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == spec.header
+    assert [int(row[0]) for row in rows[1:]] == list(range(base, base + 7))
+    assert rows[1][spec.header.index("description")] == "Кран, \"срочно\"\n#0"
+    assert rows[1][spec.header.index("master_id")] == ""
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint_formats(test_db_session):
+    base = await _seed(test_db_session)
+    with _client(test_db_session) as client:
+        as_csv = client.get("/exports/api/orders", params=PERIOD)
+        as_ndjson = client.get("/exports/api/orders", params={**PERIOD, "format": "ndjson"})
+        as_gzip = client.get("/exports/api/orders", params={**PERIOD, "format": "ndjson", "gzip": "true"})
+        messages = client.get("/exports/api/chat_messages", params={"session_id": base, "format": "ndjson"})
+        assert client.get("/exports/api/users").status_code == 404
+        assert client.get("/exports/api/orders", params={"session_id": base}).status_code == 400
+
+    assert as_csv.headers["content-disposition"] == "attachment; filename=orders.csv"
+    csv_ids = [int(row["id"]) for row in csv.DictReader(io.StringIO(as_csv.text))]
+    assert set(range(base, base + 5)) <= set(csv_ids)
+
+    records = [json.loads(line) for line in as_ndjson.text.splitlines()]
+    assert [r["id"] for r in records] == csv_ids
+    mine = next(r for r in records if r["id"] == base)
+    assert mine["created_at"] == "1995-03-01T12:00:00" and mine["master_id"] is None
+
+    assert as_gzip.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(as_gzip.content).decode() == as_ndjson.text
+
+    assert [json.loads(line)["content_text"] for line in messages.text.splitlines()] == [
+        "Здравствуйте", "Когда придёте?",
+    ]
@@ -0,0 +1,133 @@
+"""Тесты персистентного FSM-хранилища SQLAlchemyStorage."""
+import asyncio
+import datetime
+import random
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.bot.states import OrderCreate
+from app.bot.storage import SQLAlchemyStorage
+from app.models import FSMState
+
+
+@pytest.fixture
+def session_factory(test_engine):
+    return sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _key() -> StorageKey:
+    chat_id = random.randint(1, 10**12)
+    return StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id)
+
+
+@pytest.mark.asyncio
+async def test_state_and_data_survive_restart(session_factory):
+    key = _key()
+    storage = SQLAlchemyStorage(session_factory)
+    await storage.set_state(key, OrderCreate.category)
+    await storage.set_data(key, {"category": "Сантехника", "media": ["photo:1"]})
+    await storage.close()
+
+    restarted = SQLAlchemyStorage(session_factory)
+    assert await restarted.get_state(key) == OrderCreate.category.state
+    assert await restarted.get_data(key) == {"category": "Сантехника", "media": ["photo:1"]}
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched(session_factory):
+    storage = SQLAlchemyStorage(session_factory, flush_interval=3600)
+    keys = [_key() for _ in range(20)]
+    for key in keys:
+        await storage.set_state(key, "OrderCreate:description")
+        await storage.update_data(key, {"n": key.chat_id})
+
+    # До flush записи видны процессу (буфер), но ещё не в БД
+    assert await storage.get_data(keys[0]) == {"n": keys[0].chat_id}
+    other = SQLAlchemyStorage(session_factory, cache_ttl=0)
+    assert await other.get_state(keys[0]) is None
+
+    assert await storage.flush() == 20
+    assert await other.get_state(keys[0]) == "OrderCreate:description"
+    assert await other.get_data(keys[-1]) == {"n": keys[-1].chat_id}
+    await storage.close()
+    await other.close()
+
+
+@pytest.mark.asyncio
+async def test_background_flush_and_clear(session_factory):
+    key = _key()
+    storage = SQLAlchemyStorage(session_factory, flush_interval=0.01)
+    await storage.set_state(key, "ChatStates:active")
+    await asyncio.sleep(0.1)
+
+    reader = SQLAlchemyStorage(session_factory, cache_ttl=0)
+    assert await reader.get_state(key) == "ChatStates:active"
+
+    await storage.set_state(key, None)
+    await storage.set_data(key, {})
+    await storage.close()
+    assert await reader.get_state(key) is None
+    assert await reader.get_data(key) == {}
+    await reader.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_states_are_ignored_and_purged(session_factory):
+    key = _key()
+    storage = SQLAlchemyStorage(session_factory, state_ttl=60)
+    await storage.set_state(key, "OrderCreate:address")
+    await storage.flush()
+
+    async with session_factory() as session:
+        row = await session.get(FSMState, SQLAlchemyStorage.build_key(key))
+        row.expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        await session.commit()
+
+    fresh = SQLAlchemyStorage(session_factory)
+    assert await fresh.get_state(key) is None
+    assert await fresh.purge_expired() >= 1
+    async with session_factory() as session:
+        assert (await session.execute(
+            select(FSMState).where(FSMState.key == SQLAlchemyStorage.build_key(key))
+        )).first() is None
+    await storage.close()
+    await fresh.close()
+
+
+@pytest.mark.asyncio
+async def test_flushing_records_stay_visible_until_commit(session_factory):
+    key = _key()
+    storage = SQLAlchemyStorage(session_factory, flush_interval=3600, cache_ttl=0)
+    await storage.set_state(key, OrderCreate.category)
+    await storage.set_data(key, {"category": "Сантехника"})
+
+    started, release = asyncio.Event(), asyncio.Event()
+    upsert = storage._upsert
+
+    async def failing_upsert(session, rows):
+        started.set()
+        await release.wait()
+        raise RuntimeError("db is down")
+
+    storage._upsert = failing_upsert
+    flush = asyncio.create_task(storage.flush())
+    await started.wait()
+    # Пока батч не закоммичен, процесс читает его, а не старую строку из БД
+    assert await storage.get_state(key) == OrderCreate.category.state
+    await storage.update_data(key, {"address": "ул. Новая"})
+    release.set()
+    with pytest.raises(RuntimeError):
+        await flush
+    assert await storage.get_data(key) == {"category": "Сантехника", "address": "ул. Новая"}
+
+    storage._upsert = upsert
+    await storage.close()
+    reader = SQLAlchemyStorage(session_factory, cache_ttl=0)
+    assert await reader.get_state(key) == OrderCreate.category.state
+    assert await reader.get_data(key) == {"category": "Сантехника", "address": "ул. Новая"}
+    await reader.close()
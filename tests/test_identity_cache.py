@@ -0,0 +1,110 @@
+"""Тесты кэша пользователей и IdentityMiddleware."""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.bot.middlewares.identity_middleware import IdentityMiddleware
+from app.models import User
+from app.services.identity import UserIdentity, UserIdentityCache, resolve_user
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _identity(tg_id: int, role: str = "client") -> UserIdentity:
+    return UserIdentity(id=tg_id, tg_id=tg_id, role=role, is_active=True, name=None)
+
+
+def test_cache_lru_eviction_and_stats():
+    cache = UserIdentityCache(maxsize=2, ttl=60)
+    cache.put(_identity(1))
+    cache.put(_identity(2))
+    assert cache.get(1) is not None  # 1 становится «свежим»
+    cache.put(_identity(3))  # вытесняет 2
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_cache_ttl_and_invalidation():
+    clock = FakeClock()
+    cache = UserIdentityCache(maxsize=10, ttl=5, clock=clock)
+    cache.put(_identity(1))
+    clock.now = 4.9
+    assert cache.get(1) is not None
+    clock.now = 5.1
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+    cache.put(_identity(2))
+    cache.invalidate(2)
+    assert cache.get(2) is None
+
+
+@pytest.mark.asyncio
+async def test_resolve_user_hits_db_once_and_sees_role_change(test_db_session):
+    tg_id = random.randint(100_000_000, 900_000_000)
+    async with test_db_session() as session:
+        session.add(User(id=tg_id, tg_id=tg_id, role="client", name="Cached"))
+        await session.commit()
+
+    calls = 0
+
+    def counting_factory():
+        nonlocal calls
+        calls += 1
+        return test_db_session()
+
+    cache = UserIdentityCache(maxsize=10, ttl=60)
+    first = await resolve_user(tg_id, session_factory=counting_factory, cache=cache)
+    second = await resolve_user(tg_id, session_factory=counting_factory, cache=cache)
+    assert first == second
+    assert first.role == "client" and first.name == "Cached"
+    assert calls == 1
+
+    async with test_db_session() as session:
+        user = await session.get(User, tg_id)
+        user.role = "master"
+        await session.commit()
+    cache.invalidate(tg_id)
+
+    updated = await resolve_user(tg_id, session_factory=counting_factory, cache=cache)
+    assert updated.role == "master"
+    assert calls == 2
+
+    # Незарегистрированные пользователи не кэшируются
+    assert await resolve_user(tg_id + 1, session_factory=counting_factory, cache=cache) is None
+    assert await resolve_user(tg_id + 1, session_factory=counting_factory, cache=cache) is None
+    assert calls == 4
+
+
+@pytest.mark.asyncio
+async def test_identity_middleware_injects_identity():
+    cache = UserIdentityCache()
+    cache.put(_identity(42, role="master"))
+    middleware = IdentityMiddleware(cache=cache)
+    seen = {}
+
+    async def handler(event, data):
+        seen.update(data)
+        return "ok"
+
+    result = await middleware(handler, object(), {"event_from_user": SimpleNamespace(id=42)})
+    assert result == "ok"
+    assert seen["identity"].role == "master"
+
+    seen.clear()
+    await middleware(handler, object(), {})
+    assert seen["identity"] is None
@@ -0,0 +1,101 @@
+"""Тесты подбора мастеров для уведомления о новой заявке."""
+import random
+
+import pytest
+from sqlalchemy import insert
+
+from app.models import Specialty, User, master_categories, master_specialties
+from app.services.matching import bounding_box, find_candidate_masters, haversine_km
+
+# Центр Ташкента
+ORDER_LAT, ORDER_LON = 41.3111, 69.2797
+
+
+async def _create_master(session, tg_id, *, categories=(), specialty_id=None,
+                         latitude=None, longitude=None, role="master", is_active=True):
+    # BigInteger PK в SQLite не автоинкрементный — задаём id явно
+    user = User(id=tg_id, tg_id=tg_id, role=role, name=f"Master {tg_id}",
+                latitude=latitude, longitude=longitude, is_active=is_active)
+    session.add(user)
+    await session.flush()
+    for category in categories:
+        await session.execute(insert(master_categories).values(user_id=user.id, category=category))
+    if specialty_id is not None:
+        await session.execute(insert(master_specialties).values(user_id=user.id, specialty_id=specialty_id))
+    return user
+
+
+@pytest.mark.asyncio
+async def test_find_candidate_masters_by_category_and_specialty(test_db_session):
+    base = random.randint(10_000_000, 90_000_000)
+    category = f"Сантехника-{base}"
+    async with test_db_session() as session:
+        specialty = Specialty(name=category)
+        session.add(specialty)
+        await session.flush()
+
+        await _create_master(session, base + 1, categories=[category])
+        await _create_master(session, base + 2, categories=["Другая категория"])
+        await _create_master(session, base + 3, categories=["Другая категория"], specialty_id=specialty.id)
+        await _create_master(session, base + 4)  # без категорий — получает все заявки
+        await _create_master(session, base + 5, categories=[category], is_active=False)
+        client = await _create_master(session, base + 6, categories=[category], role="client")
+        await session.commit()
+
+        ours = {base + i for i in range(1, 7)}
+        found = set(await find_candidate_masters(session, category)) & ours
+        assert found == {base + 1, base + 3, base + 4}
+
+        strict = set(await find_candidate_masters(session, category, include_unconfigured=False)) & ours
+        assert strict == {base + 1, base + 3}
+
+        # Мастера категории из индекса заменяют поиск по master_categories
+        indexed = set(await find_candidate_masters(session, category, category_master_ids={base + 1, base + 5}))
+        assert indexed & ours == {base + 1, base + 3, base + 4}
+        assert set(await find_candidate_masters(session, category, category_master_ids=set())) & ours == {
+            base + 3, base + 4,
+        }
+
+        own = await _create_master(session, base + 7, categories=[category])
+        await session.commit()
+        excluded = set(await find_candidate_masters(session, category, exclude_user_id=own.id))
+        assert base + 7 not in excluded
+        assert client.tg_id not in excluded
+
+
+@pytest.mark.asyncio
+async def test_find_candidate_masters_radius_filter(test_db_session):
+    base = random.randint(10_000_000, 90_000_000)
+    category = f"Электрика-{base}"
+    async with test_db_session() as session:
+        await _create_master(session, base + 1, categories=[category], latitude=41.32, longitude=69.29)  # ~1.3 км
+        await _create_master(session, base + 2, categories=[category], latitude=41.55, longitude=69.60)  # ~38 км
+        await _create_master(session, base + 3, categories=[category])  # точка не задана
+        await session.commit()
+
+        ours = {base + 1, base + 2, base + 3}
+        nearby = set(await find_candidate_masters(
+            session, category, latitude=ORDER_LAT, longitude=ORDER_LON, radius_km=10,
+        )) & ours
+        assert nearby == {base + 1, base + 3}
+
+        located_only = set(await find_candidate_masters(
+            session, category, latitude=ORDER_LAT, longitude=ORDER_LON, radius_km=10, include_unlocated=False,
+        )) & ours
+        assert located_only == {base + 1}
+
+        # Без координат заявки радиус не применяется
+        everywhere = set(await find_candidate_masters(session, category, radius_km=10)) & ours
+        assert everywhere == ours
+
+
+def test_geo_helpers():
+    assert haversine_km(ORDER_LAT, ORDER_LON, ORDER_LAT, ORDER_LON) == pytest.approx(0.0)
+    # Ташкент — Самарканд ≈ 270 км по прямой
+    assert haversine_km(41.3111, 69.2797, 39.6542, 66.9597) == pytest.approx(270, rel=0.05)
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(ORDER_LAT, ORDER_LON, 10)
+    assert min_lat < ORDER_LAT < max_lat
+    assert min_lon < ORDER_LON < max_lon
+    # Точка на краю круга лежит внутри рамки
+    assert haversine_km(ORDER_LAT, ORDER_LON, max_lat, ORDER_LON) == pytest.approx(10, rel=0.01)
@@ -0,0 +1,111 @@
+"""Тесты ленты новых заказов мастера (одна выборка + курсорная пагинация)."""
+import datetime
+import random
+
+import pytest
+from sqlalchemy import insert
+
+from app.models import Bid, Order, User, master_categories
+from app.services.order_feed import decode_cursor, encode_cursor, fetch_master_feed
+
+
+async def _collect(session, master_id, *, limit):
+    pages, cursor = [], None
+    while True:
+        page = await fetch_master_feed(session, master_id, cursor=cursor, limit=limit)
+        pages.append(page)
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_cursor_roundtrip():
+    created = datetime.datetime(2026, 10, 17, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created, 42)) == (created, 42)
+    assert decode_cursor(encode_cursor("2026-10-17 12:30:15", 42)) == ("2026-10-17 12:30:15", 42)
+    # Микросекунды за пределами datetime — ValueError, как и прочий мусор
+    for garbage in ("garbage", "99999999999999999999.1", "12.x"):
+        with pytest.raises(ValueError):
+            decode_cursor(garbage)
+
+
+@pytest.mark.asyncio
+async def test_feed_filters_categories_marks_bids_and_paginates(test_db_session):
+    base = random.randint(10_000_000, 90_000_000)
+    category, other = f"Сантехника-{base}", f"Электрика-{base}"
+    started = datetime.datetime(2026, 1, 1, 12, 0, 0)
+    async with test_db_session() as session:
+        client = User(id=base + 1, tg_id=base + 1, role="client", name="Client")
+        master = User(id=base + 2, tg_id=base + 2, role="master", name="Master")
+        session.add_all([client, master])
+        await session.flush()
+        await session.execute(insert(master_categories).values(user_id=master.id, category=category))
+
+        # Пять заказов в категории мастера, два с одинаковым created_at
+        times = [started + datetime.timedelta(minutes=m) for m in (0, 1, 2, 2, 3)]
+        ours = [
+            Order(id=base + 10 + i, client_id=client.id, category=category, status="new", created_at=t)
+            for i, t in enumerate(times)
+        ]
+        session.add_all(ours)
+        session.add_all([
+            Order(id=base + 20, client_id=client.id, category=other, status="new", created_at=started),
+            Order(id=base + 21, client_id=client.id, category=category, status="assigned", created_at=started),
+            Order(id=base + 22, client_id=master.id, category=category, status="new", created_at=started),
+        ])
+        await session.flush()
+        session.add(Bid(id=base + 30, order_id=base + 12, master_id=master.id, price=100))
+        await session.commit()
+
+        pages = await _collect(session, master.id, limit=2)
+        assert [len(p.items) for p in pages] == [2, 2, 1]
+        items = [item for page in pages for item in page.items]
+        assert [item.id for item in items] == [base + 14, base + 13, base + 12, base + 11, base + 10]
+        assert {item.id for item in items if item.has_bid} == {base + 12}
+
+
+@pytest.mark.asyncio
+async def test_feed_for_master_without_categories_shows_all(test_db_session):
+    base = random.randint(10_000_000, 90_000_000)
+    async with test_db_session() as session:
+        client = User(id=base + 1, tg_id=base + 1, role="client", name="Client")
+        master = User(id=base + 2, tg_id=base + 2, role="master", name="Master")
+        session.add_all([client, master])
+        await session.flush()
+        session.add_all([
+            Order(id=base + 10, client_id=client.id, category=f"A-{base}", status="new",
+                  created_at=datetime.datetime(2099, 1, 1, 0, 0, 1)),
+            Order(id=base + 11, client_id=client.id, category=f"B-{base}", status="new",
+                  created_at=datetime.datetime(2099, 1, 1, 0, 0, 2)),
+        ])
+        await session.commit()
+
+        seen = {item.id for page in await _collect(session, master.id, limit=50) for item in page.items}
+        assert {base + 10, base + 11} <= seen
+
+
+@pytest.mark.asyncio
+async def test_feed_pages_through_server_default_timestamps(test_db_session):
+    base = random.randint(10_000_000, 90_000_000)
+    category = f"Сервер-{base}"
+    async with test_db_session() as session:
+        client = User(id=base + 1, tg_id=base + 1, role="client", name="Client")
+        master = User(id=base + 2, tg_id=base + 2, role="master", name="Master")
+        session.add_all([client, master])
+        await session.flush()
+        await session.execute(insert(master_categories).values(user_id=master.id, category=category))
+        # created_at ставит БД: в SQLite это текст без микросекунд
+        session.add_all([
+            Order(id=base + 10 + i, client_id=client.id, category=category, status="new") for i in range(5)
+        ])
+        await session.commit()
+
+        seen, cursor = [], None
+        for _ in range(5):
+            page = await fetch_master_feed(session, master.id, cursor=cursor, limit=2)
+            seen += [item.id for item in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert sorted(seen) == [base + 10 + i for i in range(5)]
+        assert cursor is None
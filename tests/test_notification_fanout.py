@@ -0,0 +1,134 @@
+"""Тесты очереди рассылки уведомлений мастерам (NotificationFanout)."""
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from app.services import fanout
+from app.services.fanout import NotificationFanout, TokenBucket
+
+
+class FakeBot:
+    """Заглушка Bot: запоминает отправленные сообщения и может имитировать ошибки."""
+
+    def __init__(self, latency: float = 0.0, errors: dict | None = None):
+        self.latency = latency
+        self.errors = errors or {}
+        self.sent: list[tuple[int, float]] = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        queue = self.errors.get(chat_id)
+        if queue:
+            raise queue.pop(0)
+        self.sent.append((chat_id, time.monotonic()))
+
+
+def _method(chat_id: int) -> SendMessage:
+    return SendMessage(chat_id=chat_id, text="x")
+
+
+@pytest.mark.asyncio
+async def test_fanout_delivers_all_messages_and_returns_immediately():
+    bot = FakeBot(latency=0.01)
+    fanout = NotificationFanout(bot, concurrency=8, global_rate=10_000)
+
+    started = time.perf_counter()
+    queued = fanout.submit_many(range(1, 101), text="Новая заявка")
+    submit_took = time.perf_counter() - started
+
+    assert queued == 100
+    # Постановка в очередь не ждёт отправки
+    assert submit_took < 0.05
+
+    await fanout.stop(drain=True)
+    assert len(bot.sent) == 100
+    assert fanout.stats.sent == 100
+    assert fanout.stats.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_fanout_respects_global_rate():
+    bot = FakeBot()
+    fanout = NotificationFanout(bot, concurrency=4, global_rate=50)
+
+    started = time.monotonic()
+    fanout.submit_many(range(1, 101), text="x")
+    await fanout.stop(drain=True)
+    elapsed = time.monotonic() - started
+
+    # Первые ~50 сообщений уходят из «ведра» сразу, остальные — по 50/с
+    assert elapsed >= 0.9
+    assert fanout.stats.sent == 100
+
+
+@pytest.mark.asyncio
+async def test_fanout_respects_per_chat_interval():
+    bot = FakeBot()
+    fanout = NotificationFanout(bot, concurrency=4, global_rate=10_000, per_chat_interval=0.2)
+
+    for _ in range(3):
+        fanout.submit(42, "x")
+    await fanout.stop(drain=True)
+
+    times = [t for chat_id, t in bot.sent if chat_id == 42]
+    assert len(times) == 3
+    assert all(b - a >= 0.19 for a, b in zip(times, times[1:]))
+
+
+@pytest.mark.asyncio
+async def test_fanout_handles_retry_after_and_errors():
+    bot = FakeBot(errors={
+        1: [TelegramRetryAfter(method=_method(1), message="flood", retry_after=0)],
+        2: [TelegramForbiddenError(method=_method(2), message="blocked")],
+        3: [TelegramNetworkError(method=_method(3), message="timeout")],
+        4: [TelegramNetworkError(method=_method(4), message="timeout")] * 5,
+    })
+    fanout = NotificationFanout(bot, concurrency=2, global_rate=10_000, max_retries=1, retry_base_delay=0)
+
+    fanout.submit_many([1, 2, 3, 4, 5], text="x")
+    await fanout.stop(drain=True)
+
+    delivered = {chat_id for chat_id, _ in bot.sent}
+    assert delivered == {1, 3, 5}
+    stats = fanout.stats.as_dict()
+    assert stats["sent"] == 3
+    assert stats["blocked"] == 1
+    assert stats["failed"] == 1
+    assert stats["rate_limited"] == 1
+    assert stats["retried"] == 2
+    assert stats["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fanout_drops_when_queue_full():
+    fanout = NotificationFanout(FakeBot(), concurrency=1, queue_size=2)
+    fanout._workers = [asyncio.create_task(asyncio.sleep(10))]  # воркеры «заняты»
+
+    assert fanout.submit(1, "x") is True
+    assert fanout.submit(2, "x") is True
+    assert fanout.submit(3, "x") is False
+    assert fanout.stats.dropped == 1
+    await fanout.stop(drain=False)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, capacity=1)
+    started = time.monotonic()
+    for _ in range(21):
+        await bucket.acquire()
+    assert time.monotonic() - started >= 0.19
+
+
+def test_configured_rate_is_used_by_process_fanout(monkeypatch):
+    monkeypatch.setattr(fanout, "_fanout", None)
+    monkeypatch.setattr(fanout, "_global_rate", fanout.DEFAULT_GLOBAL_RATE)
+    # Четыре процесса-обработчика делят общий лимит бота
+    fanout.configure_notification_fanout(global_rate=fanout.DEFAULT_GLOBAL_RATE / 4)
+    engine = fanout.get_notification_fanout(FakeBot())
+    assert engine._bucket.rate == fanout.DEFAULT_GLOBAL_RATE / 4
+    monkeypatch.setattr(fanout, "_fanout", None)
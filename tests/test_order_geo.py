@@ -0,0 +1,81 @@
+"""Тесты геохэша и поиска заказов в радиусе."""
+import math
+import random
+
+import pytest
+
+from app.models import Order, User
+from app.services.geo import find_orders_within
+from app.services.matching import bounding_box, haversine_km
+from app.services.order_feed import fetch_master_feed
+from core.geohash import covering_prefixes, encode, prefix_range
+
+# Центр Ташкента
+CENTER_LAT, CENTER_LON = 41.3111, 69.2797
+
+
+def test_encode_known_value():
+    assert encode(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert encode(CENTER_LAT, CENTER_LON).startswith(encode(CENTER_LAT, CENTER_LON, precision=3))
+
+
+def test_prefix_range_carries_over_last_symbol():
+    assert prefix_range("tx3") == ("tx3", "tx4")
+    assert prefix_range("t9") == ("t9", "tb")
+    assert prefix_range("tz") == ("tz", "u")
+    assert prefix_range("zz") == ("zz", None)
+
+
+@pytest.mark.parametrize("radius_km", [0.5, 5, 30, 200])
+def test_cover_contains_every_point_in_radius(radius_km):
+    rng = random.Random(radius_km)
+    prefixes = covering_prefixes(*bounding_box(CENTER_LAT, CENTER_LON, radius_km))
+    assert 0 < len(prefixes) <= 16
+    for _ in range(500):
+        distance = radius_km * math.sqrt(rng.random())
+        bearing = rng.uniform(0, 2 * math.pi)
+        lat = CENTER_LAT + distance * math.cos(bearing) / 111.32
+        lon = CENTER_LON + distance * math.sin(bearing) / (111.32 * math.cos(math.radians(CENTER_LAT)))
+        if haversine_km(CENTER_LAT, CENTER_LON, lat, lon) > radius_km:
+            continue
+        assert any(encode(lat, lon).startswith(prefix) for prefix in prefixes)
+
+
+def test_order_keeps_numeric_coordinates_in_sync():
+    order = Order(client_id=1, category="x", latitude="41.3111", longitude=69.2797)
+    assert order.longitude == "69.2797"
+    assert (order.geo_lat, order.geo_lon) == (41.3111, 69.2797)
+    assert order.geohash == encode(41.3111, 69.2797)
+
+    order.latitude = "не число"
+    assert order.geo_lat is None and order.geohash is None
+
+
+@pytest.mark.asyncio
+async def test_find_orders_within_radius(test_db_session):
+    base = random.randint(10_000_000, 90_000_000)
+    async with test_db_session() as session:
+        client = User(id=base, tg_id=base, role="client", name="Client")
+        master = User(id=base + 1, tg_id=base + 1, role="master", name="Master")
+        session.add_all([client, master])
+        await session.flush()
+        session.add_all([
+            Order(id=base + 1, client_id=client.id, category="c", status="new", latitude="41.32", longitude="69.29"),  # ~1.3 км
+            Order(id=base + 2, client_id=client.id, category="c", status="new", latitude="41.36", longitude="69.35"),  # ~8 км
+            Order(id=base + 3, client_id=client.id, category="c", status="new", latitude="41.55", longitude="69.60"),  # ~38 км
+            Order(id=base + 4, client_id=client.id, category="c", status="done", latitude="41.31", longitude="69.28"),
+            Order(id=base + 5, client_id=client.id, category="c", status="new"),  # без координат
+        ])
+        await session.commit()
+
+        ours = {base + i for i in range(1, 6)}
+        found = [(o.id, d) for o, d in await find_orders_within(session, CENTER_LAT, CENTER_LON, 10) if o.id in ours]
+        assert [order_id for order_id, _ in found] == [base + 1, base + 2]
+        assert found[0][1] < found[1][1] < 10
+
+        any_status = {o.id for o, _ in await find_orders_within(session, CENTER_LAT, CENTER_LON, 10, statuses=None)}
+        assert base + 4 in any_status
+
+        # Лента мастера с рабочей точкой: дальние заказы отсекаются, заказы без координат остаются
+        page = await fetch_master_feed(session, master.id, limit=1000, near=(CENTER_LAT, CENTER_LON, 10))
+        assert {item.id for item in page.items} & ours == {base + 1, base + 2, base + 5}
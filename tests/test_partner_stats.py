@@ -0,0 +1,107 @@
+"""Тесты сводки партнёра (partner_stats) и её поддержки при изменениях."""
+import random
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.models import Order, Partner, PartnerStats, Payout, User
+from app.services.partner_stats import compute_partner_statistics, load_partner_dashboard, refresh_all_partner_stats
+
+
+def _id() -> int:
+    return random.randint(1_000_000_000_000, 9_000_000_000_000)
+
+
+async def _partner_with_clients(session, clients: int = 2):
+    partner_user = User(id=_id(), tg_id=_id(), role="partner", name="Partner")
+    master = User(id=_id(), tg_id=_id(), role="master", name="Master")
+    session.add_all([partner_user, master])
+    await session.flush()
+    session.add(Partner(id=_id(), user_id=partner_user.id, referral_code=f"REF{partner_user.id}"))
+    referred = [User(id=_id(), tg_id=_id(), role="client", name="Client", referrer_id=partner_user.id)
+                for _ in range(clients)]
+    session.add_all(referred)
+    await session.commit()
+    return partner_user, master, referred
+
+
+@pytest.mark.asyncio
+async def test_summary_follows_orders_and_payouts(test_db_session):
+    async with test_db_session() as session:
+        partner_user, master, (client1, client2) = await _partner_with_clients(session)
+        summary = await session.get(PartnerStats, partner_user.id)
+        assert summary.referred_users == 2 and summary.active_orders == 0
+
+        order1 = Order(id=_id(), client_id=client1.id, master_id=master.id, category="Сантехника", status="assigned")
+        order2 = Order(id=_id(), client_id=client2.id, master_id=master.id, category="Электрика", status="done")
+        session.add_all([order1, order2])
+        await session.flush()
+        payout = Payout(id=_id(), order_id=order2.id, master_id=master.id, amount_master=9_500,
+                        amount_service=0, amount_partner=500, status="pending")
+        session.add(payout)
+        await session.commit()
+
+        await session.refresh(summary)
+        assert (summary.active_orders, summary.pending_payouts, summary.pending_amount) == (1, 1, 500)
+
+        payout.status = "paid"
+        order1.status = "done"
+        await session.commit()
+        await session.refresh(summary)
+        assert (summary.active_orders, summary.completed_orders, summary.total_earned, summary.pending_amount) == (
+            0, 1, 500, 0,
+        )
+
+        partner, stats = await load_partner_dashboard(session, partner_user.id)
+        assert partner.user_id == partner_user.id
+        assert stats == await compute_partner_statistics(session, partner_user.id)
+        assert stats == {
+            "referred_users": 2, "active_orders": 0, "completed_orders": 1, "pending_payouts": 0,
+            "total_earned": 500, "pending_amount": 0, "avg_order_value": 10_000,
+        }
+
+        await session.delete(payout)
+        await session.commit()
+        await session.refresh(summary)
+        assert (summary.completed_orders, summary.total_earned, summary.payouts_count) == (0, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_missing_summary_is_computed_on_read_and_by_refresh(test_db_session):
+    async with test_db_session() as session:
+        partner_user, _, _ = await _partner_with_clients(session, clients=3)
+        await session.execute(delete(PartnerStats).where(PartnerStats.partner_user_id == partner_user.id))
+        await session.commit()
+
+        _, stats = await load_partner_dashboard(session, partner_user.id)
+        assert stats["referred_users"] == 3
+        assert await session.get(PartnerStats, partner_user.id) is not None
+
+        # Массовое изменение мимо ORM: сводку догоняет плановый пересчёт
+        await session.execute(delete(PartnerStats).where(PartnerStats.partner_user_id == partner_user.id))
+        await session.commit()
+    assert await refresh_all_partner_stats(session_factory=test_db_session) >= 1
+    async with test_db_session() as session:
+        referred = (await session.execute(
+            select(PartnerStats.referred_users).where(PartnerStats.partner_user_id == partner_user.id)
+        )).scalar_one()
+        assert referred == 3
+        assert await load_partner_dashboard(session, _id()) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_referrer_change_moves_client_between_summaries(test_db_session):
+    async with test_db_session() as session:
+        first, master, (client,) = await _partner_with_clients(session, clients=1)
+        second, _, _ = await _partner_with_clients(session, clients=1)
+        session.add(Order(id=_id(), client_id=client.id, master_id=master.id, category="Сантехника", status="assigned"))
+        await session.commit()
+
+        client.referrer_id = second.id
+        await session.commit()
+        for partner_user, expected in ((first, (0, 0)), (second, (2, 1))):
+            summary = await session.get(PartnerStats, partner_user.id)
+            await session.refresh(summary)
+            assert (summary.referred_users, summary.active_orders) == expected
+            _, stats = await load_partner_dashboard(session, partner_user.id)
+            assert stats == await compute_partner_statistics(session, partner_user.id)
@@ -0,0 +1,140 @@
+"""Тесты кэша core.redis: локальный TTL+LRU уровень и сетевой RESP-уровень."""
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from core import redis as cache
+from core.redis import MemoryCache, RespCache, TieredCache
+
+
+class StandInRespServer:
+    """Минимальный RESP-сервер (GET/SET [PX]/DEL/PING) вместо настоящего Redis."""
+
+    def __init__(self):
+        self.data: dict[bytes, tuple[float | None, bytes]] = {}
+        self.commands = 0
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    async def _handle(self, reader, writer):
+        while True:
+            args = await self._read_command(reader)
+            if args is None:
+                break
+            self.commands += 1
+            cmd = args[0].upper()
+            if cmd == b"PING":
+                writer.write(b"+PONG\r\n")
+            elif cmd == b"SET":
+                expires = None
+                if len(args) == 5 and args[3].upper() == b"PX":
+                    expires = time.monotonic() + int(args[4]) / 1000
+                self.data[args[1]] = (expires, args[2])
+                writer.write(b"+OK\r\n")
+            elif cmd == b"GET":
+                entry = self.data.get(args[1])
+                if entry is None or (entry[0] is not None and entry[0] < time.monotonic()):
+                    writer.write(b"$-1\r\n")
+                else:
+                    writer.write(b"$%d\r\n%s\r\n" % (len(entry[1]), entry[1]))
+            elif cmd == b"DEL":
+                writer.write(b":%d\r\n" % (1 if self.data.pop(args[1], None) else 0))
+            else:
+                writer.write(b"-ERR unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest_asyncio.fixture
+async def resp_server():
+    server = StandInRespServer()
+    port = await server.start()
+    yield server, port
+    await server.stop()
+
+
+def test_memory_cache_lru_ttl_and_counters():
+    mem = MemoryCache(maxsize=2)
+    mem.set("a", "1")
+    mem.set("b", "2", ttl=0.05)
+    assert mem.get("a") == "1"
+    mem.set("c", "3")  # вытесняет b (a недавно читали)
+    assert mem.get("b") is None
+    assert mem.get("c") == "3"
+
+    mem.set("d", "4", ttl=0.01)
+    time.sleep(0.02)
+    assert mem.get("d") is None
+
+    stats = mem.stats()
+    assert stats["evictions"] == 2
+    assert stats["expired"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_public_api_caches_values(monkeypatch):
+    monkeypatch.setattr(cache, "redis", TieredCache(MemoryCache(maxsize=100)))
+
+    assert await cache.get_cache("k", default="none") == "none"
+    assert await cache.set_cache("k", {"ids": [1, 2]}, expire=60) is True
+    value = await cache.get_cache("k")
+    assert value == {"ids": [1, 2]}
+    value["ids"].append(3)  # вызывающий код получает копию
+    assert await cache.get_cache("k") == {"ids": [1, 2]}
+
+    assert await cache.invalidate_cache("k") is True
+    assert await cache.get_cache("k") is None
+    assert cache.cache_stats()["local"]["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_remote_tier_shared_between_processes(resp_server):
+    server, port = resp_server
+    url = f"redis://127.0.0.1:{port}/0"
+    bot_cache = TieredCache(MemoryCache(), RespCache(url), local_ttl=60)
+    admin_cache = TieredCache(MemoryCache(), RespCache(url), local_ttl=60)
+
+    assert await bot_cache.remote.ping() is True
+    await admin_cache.set("cache:x", '"v1"', ex=30)
+    # Другой «процесс» видит значение через сетевой уровень и кладёт его в память
+    assert await bot_cache.get("cache:x") == '"v1"'
+    commands = server.commands
+    assert await bot_cache.get("cache:x") == '"v1"'
+    assert server.commands == commands  # второй раз — из памяти
+
+    await admin_cache.delete("cache:x")
+    assert await admin_cache.get("cache:x") is None
+    await bot_cache.remote.close()
+    await admin_cache.remote.close()
+
+
+@pytest.mark.asyncio
+async def test_remote_tier_unavailable_degrades_to_local():
+    # Порт 1 заведомо закрыт
+    tiered = TieredCache(MemoryCache(), RespCache("redis://127.0.0.1:1/0", retry_after=60))
+    await tiered.set("k", '"v"', ex=10)
+    assert await tiered.get("k") == '"v"'
+    assert await tiered.get("missing") is None
+    assert tiered.remote.available is False
+    assert tiered.remote.stats()["errors"] == 1
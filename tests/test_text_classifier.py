@@ -0,0 +1,121 @@
+"""Тесты классификатора текста на автомате Ахо-Корасик."""
+import asyncio
+import random
+
+import pytest
+from sqlalchemy import delete
+
+from app.ai_agent.models.keyword_matcher import KeywordMatcher
+from app.ai_agent.models import text_classifier
+from app.ai_agent.models.text_classifier import (
+    TextClassifier,
+    get_text_classifier,
+    load_classifier_keywords,
+    start_keyword_refresh,
+    stop_keyword_refresh,
+)
+from app.models import ClassifierKeyword
+
+
+def _naive_scores(groups, text):
+    text = text.lower()
+    return {group: sum(1 for keyword in set(keywords) if keyword in text) for group, keywords in groups.items()}
+
+
+def test_matcher_counts_overlapping_keywords_like_substring_search():
+    groups = {"a": ["нужно", "нужно срочно", "срочно"], "b": ["не работает", "работа"], "c": []}
+    matcher = KeywordMatcher(groups)
+    text = "Нужно СРОЧНО: не работает розетка, работа на час"
+    assert matcher.scores(text) == {"a": 3, "b": 2, "c": 0}
+
+
+def test_matcher_agrees_with_naive_search_on_random_texts():
+    rng = random.Random(7)
+    alphabet = "абвгд е"
+    for _ in range(200):
+        groups = {
+            g: ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(0, 5))]
+            for g in ("x", "y", "z")
+        }
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        matcher = KeywordMatcher(groups)
+        assert matcher.scores(text) == _naive_scores(groups, text)
+        # Автомат (для больших словарей) даёт то же, что и поиск подстрок
+        assert matcher.scan(text) == matcher.matches(text)
+
+
+def test_classifier_results_match_previous_behaviour():
+    classifier = TextClassifier()
+    assert classifier.classify_order_category("Срочно нужен сантехник, течёт кран и труба") == "plumbing"
+    assert classifier.classify_order_category("Покрасить забор") == "other"
+    assert classifier.classify_query_category("Сколько стоит и как оплата?") == "billing"
+    assert classifier.classify_query_category("Добрый день") == "general"
+    assert classifier.determine_urgency("Авария, протечка!") == "high"
+    assert classifier.determine_urgency("Планирую ремонт в будущем") == "low"
+    assert classifier.determine_urgency("Поклеить обои") == "medium"
+
+
+def test_reload_keywords_recompiles_automaton():
+    classifier = TextClassifier()
+    assert classifier.classify_order_category("Поклеить обои в спальне") == "other"
+    classifier.reload_keywords(order_categories={**classifier.order_categories, "finishing": ["обои", "покраска"]})
+    assert classifier.classify_order_category("Поклеить обои в спальне") == "finishing"
+    # Остальные словари не тронуты
+    assert classifier.determine_urgency("срочно") == "high"
+
+
+@pytest.mark.asyncio
+async def test_reload_from_db(test_db_session):
+    async with test_db_session() as session:
+        await session.execute(delete(ClassifierKeyword))
+        session.add_all([
+            ClassifierKeyword(dictionary="order", category="finishing", keyword="Обои"),
+            ClassifierKeyword(dictionary="order", category="plumbing", keyword="унитаз"),
+            ClassifierKeyword(dictionary="unknown", category="x", keyword="y"),
+        ])
+        await session.commit()
+
+        classifier = TextClassifier()
+        counts = await classifier.reload_from_db(session)
+
+        assert counts == {"order": 2}
+        # Словарь order заменён содержимым таблицы, порядок известных категорий сохранён
+        assert list(classifier.order_categories)[:2] == ["plumbing", "electrical"]
+        assert classifier.classify_order_category("Заменить унитаз") == "plumbing"
+        assert classifier.classify_order_category("Поклеить обои") == "finishing"
+        assert classifier.classify_order_category("Сантехник нужен") == "other"
+        # Словари без строк в таблице остаются встроенными
+        assert classifier.determine_urgency("срочно") == "high"
+
+        await session.execute(delete(ClassifierKeyword))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_shared_classifier_loads_and_refreshes_keywords(test_db_session, monkeypatch):
+    monkeypatch.setattr(text_classifier, "_classifier", None)
+    async with test_db_session() as session:
+        await session.execute(delete(ClassifierKeyword))
+        session.add(ClassifierKeyword(dictionary="order", category="finishing", keyword="обои"))
+        await session.commit()
+
+    assert await load_classifier_keywords(test_db_session) == {"order": 1}
+    classifier = get_text_classifier()
+    assert classifier.classify_order_category("Поклеить обои") == "finishing"
+
+    # Новое слово в таблице подхватывается фоновым перечитыванием
+    start_keyword_refresh(0.05, test_db_session)
+    try:
+        async with test_db_session() as session:
+            session.add(ClassifierKeyword(dictionary="order", category="finishing", keyword="ламинат"))
+            await session.commit()
+        for _ in range(50):
+            if classifier.classify_order_category("Положить ламинат") == "finishing":
+                break
+            await asyncio.sleep(0.02)
+        assert classifier.classify_order_category("Положить ламинат") == "finishing"
+    finally:
+        await stop_keyword_refresh()
+        async with test_db_session() as session:
+            await session.execute(delete(ClassifierKeyword))
+            await session.commit()